@@ -65,6 +65,13 @@ except ImportError:
     OPENAI_AVAILABLE = False
     print("⚠️ OpenAI client not installed. Install with: pip install openai httpx")
 
+# Közös, upstreamenkénti tartós HTTP kliens (OpenRouter kapcsolatok újrahasznosítása)
+try:
+    from modules.shared.http_pool import OPENROUTER_UPSTREAM, get_upstream_pool
+    SHARED_HTTP_POOL_AVAILABLE = True
+except ImportError:
+    SHARED_HTTP_POOL_AVAILABLE = False
+
 # ==========================================================================
 # CONFIGURATION & ENVIRONMENT
 # ==========================================================================
@@ -284,9 +291,12 @@ class AIServiceManager:
     def __init__(self):
         # OpenRouter kliens inicializálása
         if OPENAI_AVAILABLE and OPENROUTER_API_KEY:
+            # A közös pool kliense: az OpenRouter TLS/HTTP2 kapcsolatai a hívások között megmaradnak
+            shared_http_client = get_upstream_pool().client(OPENROUTER_UPSTREAM) if SHARED_HTTP_POOL_AVAILABLE else None
             self.client = AsyncOpenAI(
                 api_key=OPENROUTER_API_KEY,
-                base_url=OPENROUTER_BASE_URL
+                base_url=OPENROUTER_BASE_URL,
+                http_client=shared_http_client
             )
             self.available = True
         else:
@@ -25,7 +25,10 @@ import sys
 # --- Core Szolgáltatások Importálása ---
 # A CacheService Redis-alapú implementáció
 from ..core.cache_service import CacheService
-from ..core.chat.context_manager import InMemoryHistoryManager, AbstractHistoryManager # Ha még használatban van
+from ..core.chat.context_manager import AbstractHistoryManager, create_history_manager
+from ..core.ai.llm_http import close_llm_http_pool, warm_up_llm_http_pool # Közös LLM upstream kliens
+from ..core.chat.template_registry import get_template_registry # Előfordított prompt sablonok
+from ..core.fetchers._base_helpers import bind_circuit_breaker_redis # Workerek közötti breaker állapot
 
 # --- Konfiguráció és Logger Import ---
 try:
@@ -87,7 +90,8 @@ async def lifespan_manager(app: FastAPI):
             )
             limits = httpx.Limits(
                 max_connections=settings.HTTP_CLIENT.MAX_CONNECTIONS,
-                max_keepalive_connections=settings.HTTP_CLIENT.MAX_KEEPALIVE_CONNECTIONS
+                max_keepalive_connections=settings.HTTP_CLIENT.MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_CLIENT.KEEPALIVE_EXPIRY_SECONDS
             )
             headers = {
                 "User-Agent": settings.HTTP_CLIENT.USER_AGENT,
@@ -102,6 +106,22 @@ async def lifespan_manager(app: FastAPI):
             _http_client_instance = None # Hiba esetén None
             app.state.http_client = None # Ensure it's None on failure
 
+        # --- 1b. LLM upstream pool bemelegítése (OpenRouter TLS/HTTP2 kapcsolat) ---
+        try:
+            if await warm_up_llm_http_pool():
+                logger.info("[Lifespan] LLM upstream HTTP pool warmed up.")
+        except Exception as e:
+            logger.warning(f"[Lifespan] LLM upstream HTTP pool warm-up failed: {e}")
+
+        # --- 1c. Prompt sablonok fordítása (+ hot reload polling) ---
+        try:
+            template_registry = get_template_registry()
+            if settings.AI.PROMPT_TEMPLATE_HOT_RELOAD:
+                template_registry.start_watching(settings.AI.PROMPT_TEMPLATE_POLL_SECONDS)
+            logger.info(f"[Lifespan] Prompt template registry ready ({len(template_registry.names())} templates).")
+        except Exception as e:
+            logger.error(f"[Lifespan] Prompt template registry initialization failed: {e}", exc_info=True)
+
         # --- 2. Redis-based CacheService Inicializálása ---
         if resources_initialized["http_client"]: # Csak ha az előző sikeres volt
              logger.debug("[Lifespan] Initializing global Redis-based CacheService...")
@@ -111,6 +131,7 @@ async def lifespan_manager(app: FastAPI):
                  app.state.cache_service = _cache_service_instance # ASSIGN TO APP.STATE
                  logger.info("[Lifespan] Global Redis-based CacheService initialized and assigned to app.state.cache_service.")
                  resources_initialized["cache_service"] = True
+                 bind_circuit_breaker_redis(_cache_service_instance)
              except Exception as e:
                  logger.critical(f"[Lifespan] CRITICAL FAILURE: CacheService initialization failed: {e}")
                  _cache_service_instance = None # Hiba esetén None
@@ -120,7 +141,7 @@ async def lifespan_manager(app: FastAPI):
         if resources_initialized["cache_service"]: # Csak ha az előzőek sikeresek
              logger.debug("[Lifespan] Initializing global HistoryManager...")
              try:
-                 _history_manager_instance = InMemoryHistoryManager() # Vagy más implementáció
+                 _history_manager_instance = create_history_manager(_cache_service_instance) # Redis vagy korlátos in-memory
                  app.state.history_manager = _history_manager_instance # ASSIGN TO APP.STATE
                  logger.info(f"[Lifespan] Global {_history_manager_instance.__class__.__name__} instance created and assigned to app.state.history_manager.")
                  resources_initialized["history_manager"] = True
@@ -167,6 +188,18 @@ async def lifespan_manager(app: FastAPI):
         if _cache_service_instance: # Also clear the global
              _cache_service_instance = None
 
+        # 1c. Prompt sablon polling leállítása
+        try:
+            await get_template_registry().stop_watching()
+        except Exception as e:
+            logger.error(f"[Lifespan] Error stopping prompt template watcher: {e}")
+
+        # 1b. LLM upstream pool lezárása
+        try:
+            await close_llm_http_pool()
+        except Exception as e:
+            logger.error(f"[Lifespan] Error closing LLM upstream HTTP pool: {e}")
+
         # 1. HTTP Kliens Lezárása
         if hasattr(app.state, 'http_client') and app.state.http_client: # Check app.state first
              logger.info("[Lifespan] Closing HTTP Client (from app.state)...")
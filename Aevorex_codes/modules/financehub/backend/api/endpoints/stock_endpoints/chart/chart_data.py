@@ -41,6 +41,7 @@ async def get_chart_data_endpoint(
     period: str = Query("1y", description="Time period", regex="^(1d|5d|1mo|3mo|6mo|1y|2y|5y|10y|max)$"),
     interval: str = Query("1d", description="Data interval", regex="^(1m|2m|5m|15m|30m|60m|90m|1h|1d|5d|1wk|1mo|3mo)$"),
     force_refresh: bool = Query(False, description="Force cache refresh"),
+    ohlcv_format: str = Query("records", alias="format", description="OHLCV shape: 'records' (list of objects) or 'columnar' ({t,o,h,l,c,v} arrays, t in ms)", regex="^(records|columnar)$"),
     http_client: httpx.AsyncClient = Depends(get_http_client),
     cache: CacheService = Depends(get_cache_service)
 ) -> JSONResponse:
@@ -56,7 +57,7 @@ async def get_chart_data_endpoint(
     
     try:
         # Use REAL API service instead of mock data
-        chart_data = await get_chart_data(symbol, period, interval, http_client, cache)
+        chart_data = await get_chart_data(symbol, period, interval, http_client, cache, compact=ohlcv_format == "columnar")
         
         if not chart_data:
             logger.warning(f"[{request_id}] No chart data returned from API for {symbol}")
@@ -67,6 +68,7 @@ async def get_chart_data_endpoint(
         
         # Process the real chart data
         ohlcv_data = chart_data.get("ohlcv", [])
+        data_points = chart_data.get("data_points", len(ohlcv_data))
         
         # Unified response structure with REAL chart data
         response_data = {
@@ -81,7 +83,8 @@ async def get_chart_data_endpoint(
                 "version": "3.0.0",
                 "period": period,
                 "interval": interval,
-                "data_points": len(ohlcv_data)
+                "data_points": data_points,
+                "ohlcv_format": ohlcv_format
             },
             "chart_data": {
                 "symbol": symbol,
@@ -94,7 +97,7 @@ async def get_chart_data_endpoint(
         }
         
         processing_time = round((time.monotonic() - request_start) * 1000, 2)
-        logger.info(f"[{request_id}] REAL chart data completed in {processing_time}ms ({len(ohlcv_data)} points)")
+        logger.info(f"[{request_id}] REAL chart data completed in {processing_time}ms ({data_points} points)")
         
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -6,11 +6,11 @@ Now powers FinBot with real-time stock analytics
 import logging
 import json
 import asyncio
+import re
 import time
 import uuid
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
 from datetime import datetime, timezone
-from pathlib import Path as FsPath
 
 from fastapi import (
     APIRouter, 
@@ -23,7 +23,6 @@ from fastapi import (
 )
 from fastapi.responses import StreamingResponse, JSONResponse
 import httpx
-import jinja2
 
 # Import models and services
 from modules.financehub.backend.models.chat import ChatRequest, ChatResponse, ChatMessage, ChatRole
@@ -34,9 +33,13 @@ from modules.financehub.backend.core.chat.context_manager import AbstractHistory
 from modules.financehub.backend.core.chat import prompt_builder
 from modules.financehub.backend.models.stock import FinBotStockResponse
 from modules.financehub.backend.core.chat.query_classifier import QueryClassifier, QueryType
-from modules.financehub.backend.core.chat.template_router import TemplateRouter
 from modules.financehub.backend.core.chat.rapid_renderer import RapidRenderer
 from modules.financehub.backend.core.chat.model_selector import ModelSelector
+from modules.financehub.backend.core.chat.chat_prefetch import MODEL_CACHE_KEY, start_chat_prefetch
+from modules.financehub.backend.core.chat.response_cache import ChatResponseCache, aggregate_version
+from modules.financehub.backend.core.chat.template_registry import get_template_registry
+from modules.financehub.backend.core.chat.template_router import SYSTEM_TEMPLATE
+from modules.financehub.backend.config import settings
 
 from pydantic import BaseModel, Field
 
@@ -47,7 +50,6 @@ router = APIRouter(
     tags=["Stock Chat"]
 )
 
-MODEL_CACHE_KEY = "sessmodel:"  # Redis kulcs prefix a felhasználó által választott modellhez
 
 # ---------------------------------------------------------------------------
 # Pydantic payload modellek az új endpointokhoz
@@ -108,84 +110,84 @@ async def stream_chat_response(
     ticker_upper = ticker.upper()
     user_message = request_data.get("message") or request_data.get("question", "")
     history = request_data.get("history", [])
-
-    # 0) Session-szintű modell preferencia (Redis-ből)
-    selected_model: str | None = None
     session_id = request_data.get("session_id") if isinstance(request_data, dict) else None
 
-    if session_id:
-        try:
-            cache_val = await cache.get(f"{MODEL_CACHE_KEY}{session_id}")
-            if cache_val:
-                selected_model = cache_val
-        except Exception as e:
-            logger.debug("Session model fetch err: %s", e)
+    # 0) Osztályozás + párhuzamos előkészítés már a kérés beérkezésekor:
+    #    részvényadat (csak ha a kérdéstípus igényli), sablon és session-modell lookup
+    prefetch = start_chat_prefetch(
+        ticker_upper, user_message, client=http_client, cache=cache, session_id=session_id
+    )
 
     # 1) Request-level override (legmagasabb prioritás)
+    payload_model: str | None = None
     if isinstance(request_data, dict):
         try:
-            model_from_payload = (
+            payload_model = (
                 request_data.get("config_override", {}) or {}
-            ).get("model")
-            if model_from_payload:
-                selected_model = model_from_payload
+            ).get("model") or None
         except Exception:
             pass
 
     async def generate_response() -> AsyncGenerator[str, None]:
-        # --- Rapid pipeline (rev 2) ---
-        # 1) Osztályozzuk a kérdést (ez még jól jöhet később template-választáshoz)
-        classifier = QueryClassifier()
-        q_type, lang, is_valid = classifier.classify(user_message)
-        logger.debug(f"[stream_chat] q_type={q_type} lang={lang} valid={is_valid}")
-
-        # 2) Valódi részvényadatok lekérése (cache-elt) – így a prompt valós számokkal
+        # --- Rapid pipeline (rev 3, pipelined) ---
         try:
-            stock_data_model = await process_premium_stock_data(
-                symbol=ticker_upper,
-                client=http_client,
-                cache=cache,
-                force_refresh=False,
-            )
-        except Exception as fetch_err:
-            logger.error("[stream_chat] Failed to fetch stock data for %s: %s", ticker_upper, fetch_err, exc_info=True)
-            stock_data_model = None  # graceful degradation – prompt builder jelezni fogja az adat hiányát
-
-        # 3) Kiválasztjuk a kérés típusához illő sablont a TemplateRouterrel
-        tpl_router = TemplateRouter(cache)
-        template_name = await tpl_router.get_template(q_type)
-
-        # Teljes elérési út felépítése; ha a sablonfájl hiányzik, visszaesünk a defaultra
-        template_path = prompt_builder.PROMPT_TEMPLATE_DIR / template_name
-        if not template_path.exists():
-            logger.warning(
-                "[stream_chat] Requested template %s not found. Falling back to default template %s",
-                template_path.name,
-                prompt_builder.DEFAULT_CHAT_TEMPLATE_FILE.name,
-            )
-            template_path = prompt_builder.DEFAULT_CHAT_TEMPLATE_FILE
-
-        # 4) Build rich prompt a PromptBuilderrel (adatok + sablon alapján)
-        prompt_text = prompt_builder.build_chat_prompt_from_model(
-            stock_data_model=stock_data_model,
-            history=history,
-            question=user_message,
-            system_template_file=template_path,
-        )
-
-        # 5) Ha a kérés angolul érkezett, prefixeljük nyelvi instrukcióval, hogy angol választ kérünk
-        if lang == "en":
-            prompt_text = (
-                "You are a financial assistant. Answer in English.\n\n" + prompt_text
+            # 2) A lookupok és a részvényadat-lekérés már futnak; itt csak bevárjuk őket együtt
+            session_model, stock_data_model = await asyncio.gather(
+                prefetch.session_model(),
+                prefetch.stock_data(),
             )
+        finally:
+            prefetch.release()
+        selected_model = payload_model or session_model
+        lang = prefetch.language
 
         # Init model selector with preferred model (if any) and create renderer
         model_selector = ModelSelector(override_model=selected_model)
         rapid_renderer = RapidRenderer(model_selector)
 
-        async for token in rapid_renderer.stream(prompt_text, metadata={"ticker": ticker_upper, "phase": "rapid"}):
-            yield f"data: {{\"type\":\"token\",\"content\":{json.dumps(token)},\"done\":false}}\n\n"
-            await asyncio.sleep(0)  # yield control
+        # 3) Válasz-cache: ismétlődő (vagy közel azonos) kérdésre az eltárolt választ streameljük vissza.
+        #    Előzményfüggő beszélgetésnél nem cache-elünk.
+        response_cache = ChatResponseCache.from_settings(cache) if not history and prefetch.is_valid else None
+        cache_args = (
+            ticker_upper,
+            prefetch.q_type,
+            lang,
+            f"rapid:{rapid_renderer.model_id}",
+            aggregate_version(stock_data_model),
+            user_message,
+        )
+        cached = await response_cache.get(*cache_args) if response_cache is not None else None
+        if cached is not None:
+            logger.info("[stream_chat] Serving cached answer for %s (fuzzy=%s).", ticker_upper, cached.fuzzy)
+            for token in re.findall(r"\S+\s*", cached.answer):
+                yield f"data: {{\"type\":\"token\",\"content\":{json.dumps(token)},\"done\":false}}\n\n"
+        else:
+            # 4) Slim prompt: csak a kérdéstípushoz szükséges kontextus szekciók
+            prompt_text = prompt_builder.build_chat_prompt_from_model(
+                stock_data_model=stock_data_model,
+                history=history,
+                question=user_message,
+                system_message=prefetch.system_message,
+                sections=prefetch.sections,
+                token_budget=prefetch.token_budget,
+            )
+
+            # 5) Ha a kérés angolul érkezett, prefixeljük nyelvi instrukcióval, hogy angol választ kérünk
+            if lang == "en":
+                prompt_text = (
+                    "You are a financial assistant. Answer in English.\n\n" + prompt_text
+                )
+
+            answer_parts = []
+            async for token in rapid_renderer.stream(prompt_text, metadata={"ticker": ticker_upper, "phase": "rapid"}):
+                answer_parts.append(token)
+                yield f"data: {{\"type\":\"token\",\"content\":{json.dumps(token)},\"done\":false}}\n\n"
+                await asyncio.sleep(0)  # yield control
+
+            # Ha a szükséges részvényadat nem érkezett meg időben, a válasz nem reprezentatív: nem tároljuk
+            has_context = stock_data_model is not None or not prefetch.sections
+            if response_cache is not None and has_context and not rapid_renderer.last_stream_degraded:
+                await response_cache.set(*cache_args, "".join(answer_parts), settings.CACHE.AGGREGATED_TTL_SECONDS)
 
         # Rapid vége, felhasználói döntés
         ask_payload = {
@@ -231,10 +233,13 @@ async def chat_response(
         q_type, lang, is_valid = classifier.classify(request_data.question)
         logger.debug(f"[{request_id}] Detected q_type={q_type} lang={lang} valid={is_valid}")
 
+        response_cache = ChatResponseCache.from_settings(cache) if not request_data.history and is_valid else None
         final_prompt = prompt_builder.build_chat_prompt_from_model(
             stock_data_model=stock_data_model,
             history=request_data.history,
-            question=request_data.question
+            question=request_data.question,
+            sections=prompt_builder.sections_for_query_type(q_type),
+            token_budget=prompt_builder.token_budget_for_query_type(q_type),
         )
         
         # Generate response
@@ -244,7 +249,10 @@ async def chat_response(
             stock_data_model=stock_data_model,
             final_prompt=final_prompt,
             history=request_data.history,
-            http_client=http_client
+            http_client=http_client,
+            response_cache=response_cache,
+            q_type=q_type,
+            language=lang,
         )
         
         processing_time = round((time.monotonic() - request_start) * 1000, 2)
@@ -313,12 +321,22 @@ async def generate_comprehensive_analysis_with_template(
     stock_data_model: FinBotStockResponse,
     final_prompt: str,
     history: list,
-    http_client: httpx.AsyncClient
+    http_client: httpx.AsyncClient,
+    response_cache: Optional[ChatResponseCache] = None,
+    q_type: Optional[QueryType] = None,
+    language: str = "",
 ) -> str:
     """
     Generate a comprehensive stock analysis response using the template system.
     This version is adapted to use the FinBotStockResponse model directly.
+    A *response_cache* megadásakor az ismétlődő kérdések a tárolt választ kapják.
     """
+    cache_args = (ticker, q_type, language, "analysis", aggregate_version(stock_data_model), question)
+    if response_cache is not None:
+        cached = await response_cache.get(*cache_args)
+        if cached is not None:
+            return cached.answer
+
     try:
         # Import AI service
         from modules.financehub.backend.core.ai.ai_service import generate_ai_summary
@@ -343,7 +361,9 @@ async def generate_comprehensive_analysis_with_template(
         if not ai_response:
             logger.warning(f"[{request_id}] AI service returned an empty response for {ticker}.")
             return "I am sorry, but I could not generate an analysis at this time. Please try again later."
-            
+
+        if response_cache is not None:
+            await response_cache.set(*cache_args, ai_response, settings.CACHE.AGGREGATED_TTL_SECONDS)
         return ai_response
 
     except Exception as e:
@@ -386,24 +406,17 @@ async def deep_chat_response(
         except Exception:
             pass
 
-    tpl_name = f"{q_type.value}_deep.j2"
-    tpl_path = FsPath(__file__).resolve().parents[4] / "prompt_templates" / "financehub" / "deep" / tpl_name
-    if not tpl_path.exists():
-        # fallback generic template
-        tpl_path = FsPath(__file__).resolve().parents[4] / "prompt_templates" / "financehub" / "deep" / "generic_deep.j2"
-
-    tpl_src = tpl_path.read_text(encoding="utf-8")
-    template = jinja2.Template(tpl_src)
+    # Lefordított sablonok a registry-ből (típus-specifikus deep sablon, különben a generikus)
+    registry = get_template_registry()
+    tpl_name = f"deep/{q_type.value}_deep.j2"
+    if registry.get(tpl_name) is None:
+        tpl_name = "deep/generic_deep.j2"
+    prompt_body = registry.render(tpl_name, question=request_data.question, ticker=ticker_upper) or request_data.question
 
     # Prepend system prompt (lite)
-    lite_prompt_path = FsPath(__file__).resolve().parents[4] / "prompt_templates" / "financehub" / "system" / "lite_system_prompt.j2"
-    system_prompt = ""
-    try:
-        system_prompt = lite_prompt_path.read_text(encoding="utf-8")
-    except FileNotFoundError:
-        logger.warning("Lite system prompt not found at %s", lite_prompt_path)
-
-    prompt_body = template.render(question=request_data.question, ticker=ticker_upper)
+    system_prompt = registry.render(SYSTEM_TEMPLATE, ticker=ticker_upper) or ""
+    if not system_prompt:
+        logger.warning("Lite system prompt %s not available in template registry.", SYSTEM_TEMPLATE)
     prompt_text = f"{system_prompt}\n\n{prompt_body}"
 
     model_selector = ModelSelector()
@@ -14,15 +14,15 @@ router = APIRouter(
     tags=["Stock Header Data"]
 )
 
-@router.get("/{ticker}", summary="Realtime stock header snapshot", description="OHLCV-based quote + basic info, latency < 400 ms")
+@router.get("/{ticker}", summary="Realtime stock header snapshot", description="Quote snapshot + cached company profile, latency < 400 ms")
 async def get_stock_header_data_endpoint(
     ticker: str = Path(..., description="Stock ticker symbol", example="AAPL"),
     http_client: httpx.AsyncClient = Depends(get_http_client),
     cache: CacheService = Depends(get_cache_service),
 ) -> JSONResponse:
     """Light-weight endpoint that returns the latest price/volume/basic fields
-    required by the stock-header component. Uses the existing get_basic_stock_data
-    helper (EODHD/yfinance hybrid).
+    required by the stock-header component. Uses the get_basic_stock_data
+    helper (cached quote snapshot + long-TTL company profile, no OHLCV download).
     """
     req_id = f"hdr-{uuid.uuid4().hex[:6]}"
     start = time.monotonic()
@@ -36,6 +36,7 @@ logger = get_logger(__name__) # Modul szintű logger
 from modules.financehub.backend.api.deps import get_cache_service, get_http_client
 # Core Szolgáltatások
 from modules.financehub.backend.core.cache_service import CacheService
+from modules.financehub.backend.core.news_dedup import dedupe_news_dicts
 # Configuration and settings
 try:
     from modules.financehub.backend.config import settings
@@ -100,7 +101,7 @@ async def get_market_news(
             ]
             
             # Limit results
-            news_data = news_data[:limit]
+            news_data = dedupe_news_dicts(news_data, limit=limit or None)
             
             # Cache the data for 5 minutes
             try:
@@ -141,9 +142,8 @@ async def get_market_news(
                 detail="Internal error: Failed to process cached data correctly."
             )
 
-        # Apply limit
-        if limit:
-            processed_data = processed_data[:limit]
+        # Deduplikáció (kanonikus URL + közel-azonos cím) és limit egy lépésben
+        processed_data = dedupe_news_dicts(processed_data, limit=limit or None)
 
         item_count = len(processed_data)
         logger.info(f"{LOG_PREFIX_ENDPOINT} Successfully retrieved {item_count} news items from cache.")
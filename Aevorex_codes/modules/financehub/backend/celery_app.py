@@ -16,6 +16,7 @@ import logging # Import logging for potential setup issues
 
 # --- Core Celery Import ---
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 
 # --- Kritikus Első Lépés: Konfiguráció és Logging ---
 # Biztosítjuk, hogy a központi konfiguráció és a logger elérhető legyen.
@@ -159,6 +160,24 @@ else:
     logger.info("No periodic tasks defined in Celery Beat schedule.")
 
 
+# --- Worker Async Runtime (egy hosszú életű eseményhurok + megosztott poolok folyamatonként) ---
+# Prefork poolnál a gyermek folyamatban indul (a szülő szálai a fork után nem futnának);
+# solo/threads poolnál nincs `worker_process_init`, ott az első task indítja lustán.
+from modules.financehub.backend.core.worker_runtime import get_worker_runtime, shutdown_worker_runtime
+
+
+@worker_process_init.connect
+def _start_worker_runtime(**_kwargs):
+    if get_worker_runtime().warm_up(timeout=30):
+        logger.info("Worker async runtime started with shared Redis and HTTP pools.")
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_worker_runtime(**_kwargs):
+    shutdown_worker_runtime()
+
+
 # --- Záró Log Üzenet ---
 logger.info("--- Celery Application Setup Complete ---")
 logger.info(f"Celery app '{celery_app.main}' is configured and ready.")
@@ -9,7 +9,7 @@ from pathlib import Path as _Path
 import json
 import logging
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Union, Tuple
+from typing import Optional, List, Dict, Any, Union, Tuple, Literal
 from pydantic import Field, BaseModel, validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic.types import SecretStr, PositiveInt, NonNegativeInt, PositiveFloat, NonNegativeFloat, DirectoryPath
@@ -299,6 +299,17 @@ class AISettings(BaseModel):
         default=60,
         description="Number of days of historical price data to include in AI prompts. Must be positive."
     )
+    CHAT_CONTEXT_WAIT_SECONDS: PositiveFloat = Field(
+        default=8.0,
+        description="Streaming chatnél legfeljebb ennyi másodpercig várunk a részvényadatra; utána a prompt nélküle készül, a lekérés a háttérben fut tovább."
+    )
+    CHAT_HISTORY_BACKEND: Literal["memory", "redis"] = Field(default="redis", description="Beszélgetési előzmények tárolója: 'redis' (workerek között közös) vagy 'memory'.")
+    CHAT_HISTORY_MAX_CONVERSATIONS: PositiveInt = Field(default=10_000, description="In-memory tárolónál a workerenként megtartott beszélgetések maximális száma (LRU kiszorítás).")
+    CHAT_HISTORY_MAX_MESSAGES: PositiveInt = Field(default=50, description="Beszélgetésenként megtartott üzenetek maximális száma.")
+    CHAT_HISTORY_TTL_SECONDS: PositiveInt = Field(default=24 * 3600, description="Ennyi tétlenség után a beszélgetés előzménye lejár.")
+    PROMPT_TEMPLATE_HOT_RELOAD: bool = Field(default=True, description="A prompt sablonkönyvtár mtime-pollingja; a módosított sablonok újraindítás nélkül újrafordulnak.")
+    PROMPT_TEMPLATE_POLL_SECONDS: PositiveFloat = Field(default=2.0, description="A sablonkönyvtár ellenőrzésének gyakorisága másodpercben.")
+    PROMPT_TEMPLATE_BYTECODE_CACHE_DIR: Optional[str] = Field(default=None, description="Jinja2 bytecode cache könyvtár; üresen a rendszer temp könyvtárán belül.")
 
     @validator('PROVIDER')
     @classmethod
@@ -318,13 +329,53 @@ class HttpClientSettings(BaseModel):
     POOL_TIMEOUT_SECONDS: PositiveFloat = Field(default=5.0)
     MAX_CONNECTIONS: Optional[PositiveInt] = Field(default=100)
     MAX_KEEPALIVE_CONNECTIONS: Optional[PositiveInt] = Field(default=20)
+    KEEPALIVE_EXPIRY_SECONDS: PositiveFloat = Field(default=60.0, description="Tétlen keep-alive kapcsolatok élettartama másodpercben.")
     USER_AGENT: str = Field(default="AevorexFinBot/UnsetVersion (Backend; +https://aevorex.com/finbot)")
     DEFAULT_REFERER: AnyHttpUrl = Field(default=AnyHttpUrl("https://aevorex.com/"))
     RETRY_COUNT: NonNegativeInt = Field(default=2)
     RETRY_BACKOFF_FACTOR: NonNegativeFloat = Field(default=0.5)
+    LLM_SHARED_POOL_ENABLED: bool = Field(default=True, description="Az LLM hívások (OpenRouter) a közös, upstreamenkénti tartós kliensen mennek.")
+    LLM_MAX_CONNECTIONS: PositiveInt = Field(default=20, description="Maximális egyidejű kapcsolatszám az LLM upstream felé.")
+    LLM_MAX_KEEPALIVE_CONNECTIONS: PositiveInt = Field(default=10, description="Nyitva tartott (keep-alive) kapcsolatok száma az LLM upstream felé.")
+    LLM_KEEPALIVE_EXPIRY_SECONDS: PositiveFloat = Field(default=120.0, description="Tétlen LLM kapcsolatok élettartama másodpercben.")
+    LLM_WARMUP_ON_STARTUP: bool = Field(default=True, description="Induláskor egy könnyű kéréssel felépíti az LLM upstream kapcsolatát.")
 
     model_config = SettingsConfigDict(env_prefix='FINBOT_HTTP_CLIENT__', env_file='.env', extra='ignore')
 
+class ProviderRateLimitSettings(BaseModel):
+    """Külső adatszolgáltatók kvótái (token-bucket a `make_api_request` előtt)."""
+    ENABLED: bool = Field(default=True, description="Szolgáltatónkénti rate limit és prioritásos várakozási sor engedélyezése.")
+    PROVIDER_REQUESTS_PER_MINUTE: Dict[str, PositiveInt] = Field(
+        default_factory=lambda: {"alphavantage": 5, "fmp": 250, "marketaux": 10, "newsapi": 30, "eodhd": 900},
+        description="Szolgáltató -> percenkénti kérés kvóta; a nem szereplő szolgáltatók korlátlanok."
+    )
+    PROVIDER_BURST: Dict[str, PositiveInt] = Field(default_factory=dict, description="Szolgáltató -> bucket méret (alapértelmezés: ~10 másodpercnyi kvóta, legalább 1).")
+    REDIS_SHARED: bool = Field(default=True, description="A bucketok Redisben élnek, így a workerek közösen fogyasztják a kvótát.")
+    INTERACTIVE_MAX_WAIT_SECONDS: PositiveFloat = Field(default=5.0, description="Interaktív kérés legfeljebb ennyit vár tokenre, utána a fetcher tartalék úton megy tovább.")
+    BACKGROUND_MAX_WAIT_SECONDS: PositiveFloat = Field(default=60.0, description="Háttérfrissítés legfeljebb ennyit vár tokenre.")
+    DEFAULT_RETRY_AFTER_SECONDS: PositiveFloat = Field(default=30.0, description="429 válasznál ennyi ideig blokkolt a szolgáltató, ha nincs `Retry-After` fejléc.")
+
+class CircuitBreakerSettings(BaseModel):
+    """Szolgáltatónkénti circuit breaker (gördülő hibaarány és késleltetés alapján)."""
+    ENABLED: bool = Field(default=True, description="Circuit breaker engedélyezése a `make_api_request` és a yfinance hívások körül.")
+    WINDOW_SECONDS: PositiveFloat = Field(default=60.0, description="Gördülő ablak hossza, amelyen a hibaarányt és a késleltetést mérjük.")
+    MIN_CALLS: PositiveInt = Field(default=8, description="Ennyi hívás kell az ablakban, mielőtt a breaker kinyithat.")
+    ERROR_RATE_THRESHOLD: float = Field(default=0.5, gt=0, le=1, description="Ekkora hibaaránynál nyit a breaker.")
+    SLOW_CALL_SECONDS: PositiveFloat = Field(default=8.0, description="Ennél lassabb hívás lassúnak számít.")
+    SLOW_RATE_THRESHOLD: float = Field(default=0.8, gt=0, le=1, description="A lassú hívások ekkora arányánál nyit a breaker.")
+    OPEN_SECONDS: PositiveFloat = Field(default=30.0, description="Nyitás után ennyi ideig nem megy élő kérés a szolgáltatóhoz.")
+    REDIS_SHARED: bool = Field(default=True, description="A nyitott állapot Redisben is megjelenik, így minden worker látja.")
+
+class HedgingSettings(BaseModel):
+    """Hedged lekérések a késleltetés-kritikus, egymással helyettesíthető forrásokhoz (OHLCV: EODHD <-> yfinance)."""
+    ENABLED: bool = Field(default=False, description="Hedged lekérések engedélyezése a prémium aggregáció core fetch fázisában.")
+    MAX_HEDGE_RATIO: float = Field(default=0.1, gt=0, lt=1, description="A hedge-ek legfeljebb ekkora részt tehetnek ki a hedge-elhető forgalomból (gördülő ablakban).")
+    BUDGET_WINDOW_SECONDS: PositiveFloat = Field(default=60.0, description="A hedge keret gördülő ablaka.")
+    LATENCY_QUANTILE: float = Field(default=0.9, gt=0, lt=1, description="Az elsődleges forrás megfigyelt késleltetésének ezen kvantilise után indul a hedge.")
+    DEFAULT_DELAY_SECONDS: PositiveFloat = Field(default=2.0, description="Hedge késleltetés, amíg nincs elég késleltetés minta.")
+    MIN_DELAY_SECONDS: PositiveFloat = Field(default=0.2, description="A hedge késleltetés alsó korlátja.")
+    MAX_DELAY_SECONDS: PositiveFloat = Field(default=10.0, description="A hedge késleltetés felső korlátja.")
+
 class EnvironmentSettings(BaseModel):
     """Futási környezet és fejlesztői beállítások."""
     NODE_ENV: str = Field(
@@ -444,8 +495,40 @@ class CacheSettings(BaseModel):
     EODHD_DAILY_OHLCV_TTL: PositiveInt = Field(default=4 * 3600, description="EODHD napi OHLCV cache TTL (4 óra).")
     EODHD_INTRADAY_OHLCV_TTL: PositiveInt = Field(default=5 * 60, description="EODHD intraday OHLCV cache TTL (5 perc).")
     AGGREGATED_TTL_SECONDS: PositiveInt = Field(default=15 * 60, description="Aggregált adatok cache TTL (15 perc).")
+    AGGREGATED_STALE_TTL_SECONDS: NonNegativeInt = Field(default=60 * 60, description="Ennyi ideig szolgálható ki az aggregátum elavultként (stale-while-revalidate) a friss TTL lejárta után; 0 = kikapcsolva.")
     FETCH_FAILURE_TTL_SECONDS: PositiveInt = Field(default=10 * 60, description="Sikertelen lekérdezések cache TTL (10 perc).")
 
+    # Folyamaton belüli L1 réteg a Redis előtt (opcionális)
+    L1_ENABLED: bool = Field(default=False, description="Folyamaton belüli L1 cache engedélyezése a Redis előtt.")
+    L1_MAX_ENTRIES: PositiveInt = Field(default=2048, description="L1 cache maximális elemszáma workerenként.")
+    L1_MAX_BYTES: PositiveInt = Field(default=64 * 1024 * 1024, description="L1 cache maximális mérete bájtban workerenként (64 MB).")
+    L1_MAX_TTL_SECONDS: PositiveInt = Field(default=30, description="L1 bejegyzések maximális élettartama (elveszett invalidáció esetére).")
+    L1_KEY_PREFIXES: List[str] = Field(
+        default=["ticker_tape_data", "stock_premium_v", "ai_summary:", "quote_snapshot:", "company_profile:"],
+        description="Csak az ezekkel kezdődő kulcsok kerülnek az L1-be (üres lista: minden kulcs)."
+    )
+    L1_INVALIDATION_CHANNEL: str = Field(default="fh:cache:l1:invalidate", description="Redis pub/sub csatorna az L1 invalidációhoz.")
+
+    # Fetcher hívások összevonása (single-flight)
+    SINGLE_FLIGHT_ENABLED: bool = Field(default=True, description="Azonos, párhuzamos fetcher hívások összevonása workeren belül.")
+    SINGLE_FLIGHT_CROSS_PROCESS: bool = Field(default=False, description="Összevonás workerek között is, Redis lockkal (minden hívás +2 Redis kör).")
+
+    # Inkrementális OHLCV frissítés (napi/heti/havi)
+    OHLCV_INCREMENTAL_ENABLED: bool = Field(default=True, description="Lejárt OHLCV cache esetén csak az utolsó tárolt bártól kérünk le adatot, teljes újratöltés csak új split/osztalék esetén.")
+    OHLCV_HISTORY_TTL_SECONDS: PositiveInt = Field(default=7 * 24 * 3600, description="A tárolt teljes OHLCV idősor (history kulcs) cache TTL-je (7 nap).")
+    QUOTE_SNAPSHOT_TTL_SECONDS: PositiveInt = Field(default=90, description="Per-szimbólum quote snapshot (ár, változás, napi tartomány, forgalom) cache TTL; a ticker szalag frissítése ennél gyakrabban írja.")
+    COMPANY_PROFILE_TTL_SECONDS: PositiveInt = Field(default=24 * 3600, description="A header / basic végpontok statikus cégprofiljának cache TTL-je (24 óra).")
+    CHAT_RESPONSE_CACHE_ENABLED: bool = Field(default=True, description="Kész chat válaszok gyorsítótárazása (ticker, kérdéstípus, normalizált kérdés, aggregátum verzió) kulcson.")
+    CHAT_RESPONSE_FUZZY_ENABLED: bool = Field(default=True, description="Közel azonos kérdések (token-halmaz Jaccard-hasonlóság) is a tárolt választ kapják.")
+    CHAT_RESPONSE_FUZZY_THRESHOLD: float = Field(default=0.8, ge=0.0, le=1.0, description="Minimális Jaccard-hasonlóság a fuzzy találathoz.")
+    CHAT_RESPONSE_FUZZY_INDEX_SIZE: PositiveInt = Field(default=32, description="Kulcs-prefixenként a fuzzy indexben tartott kérdések száma.")
+    CHAT_RESPONSE_MIN_TTL_SECONDS: NonNegativeInt = Field(default=30, description="Ennél rövidebb hátralévő aggregátum-élettartamnál nem tárolunk választ.")
+    CHAT_RESPONSE_NO_DATA_TTL_SECONDS: PositiveInt = Field(default=300, description="Részvényadat nélküli válaszok (pl. köszönés) TTL-je.")
+
+    # Indikátor eredmények cache-elése és inkrementális újraszámolása
+    INDICATOR_CACHE_ENABLED: bool = Field(default=True, description="Az indikátor keret (bemenet + eredmények + rekurzív állapot) cache-elése szimbólum, intervallum és paraméter hash szerint; új bároknál csak a folytatás számolódik.")
+    INDICATOR_STATE_TTL_SECONDS: PositiveInt = Field(default=7 * 24 * 3600, description="A tárolt indikátor keret cache TTL-je (7 nap).")
+
 class RedisSettings(BaseModel):
     """Redis szerver és adatbázis beállítások."""
     HOST: str = Field("localhost", description="Redis szerver hosztneve vagy IP címe.")
@@ -475,6 +558,8 @@ class TickerTapeSettings(BaseModel):
     UPDATE_INTERVAL_SECONDS: PositiveInt = Field(default=60, description="Frissítési intervallum másodpercben.")
     CACHE_KEY: str = Field(default="ticker_tape_data", description="Cache kulcs.")
     CACHE_TTL_SECONDS: PositiveInt = Field(default=30, description="Cache TTL másodpercben.")
+    BULK_ENABLED: bool = Field(default=True, description="Több szimbólum lekérése egy kérésben (EODHD real-time `s=`, FMP vesszős lista); a hiányzókra egyedi lekérés.")
+    BULK_CHUNK_SIZE: PositiveInt = Field(default=20, description="Egy bulk kérésben lekért szimbólumok maximális száma.")
 
     @validator('SYMBOLS', pre=True)
     @classmethod
@@ -523,6 +608,10 @@ class DataProcessingSettings(BaseModel):
         },
         description="Technikai indikátorok paraméterei."
     )
+    INDICATOR_PYDANTIC_POINTS: bool = Field(
+        default=False,
+        description="Kompatibilitási mód: az indikátor-történet pontonkénti Pydantic modellekből épül (lassú). Alapértelmezésben oszlopos szerializálás."
+    )
 
     @validator('INDICATOR_PARAMS', pre=True)
     @classmethod
@@ -572,6 +661,8 @@ class NewsProcessingSettings(BaseModel):
         description="Hírforrások prioritási sorrendje."
     )
     MIN_UNIQUE_TARGET: PositiveInt = Field(default=5, description="Minimális egyedi hírek célszáma.")
+    CONCURRENT_FETCH: bool = Field(default=True, description="Az engedélyezett hírforrások egyidejű lekérése (False: soros, prioritási sorrendben).")
+    FETCH_DEADLINE_SECONDS: PositiveFloat = Field(default=6.0, description="Egyidejű módban a teljes hírlekérés határideje másodpercben; a lassabb források kimaradnak.")
 
     @validator('ENABLED_SOURCES', 'SOURCE_PRIORITY', pre=True)
     @classmethod
@@ -782,6 +873,9 @@ class Settings(BaseSettings):
     REDIS: RedisSettings = Field(default_factory=RedisSettings)
     UVICORN: UvicornSettings = Field(default_factory=UvicornSettings)
     HTTP_CLIENT: HttpClientSettings = Field(default_factory=HttpClientSettings)
+    RATE_LIMIT: ProviderRateLimitSettings = Field(default_factory=ProviderRateLimitSettings)
+    CIRCUIT_BREAKER: CircuitBreakerSettings = Field(default_factory=CircuitBreakerSettings)
+    HEDGING: HedgingSettings = Field(default_factory=HedgingSettings)
     CACHE: CacheSettings = Field(default_factory=CacheSettings)
     DATA_SOURCE: DataSourceSettings = Field(default_factory=DataSourceSettings)
     EODHD_FEATURES: EODHDFeaturesSettings = Field(default_factory=EODHDFeaturesSettings)
@@ -24,6 +24,7 @@ try:
     # Import using absolute paths from backend directory
     from modules.financehub.backend.config import settings
     from modules.financehub.backend.utils.logger_config import get_logger
+    from modules.financehub.backend.core.ai.llm_http import get_llm_http_client
 except ImportError as e:
     # Fallback logger if core dependencies are missing
     logging.basicConfig(level=logging.ERROR)
@@ -59,7 +60,7 @@ async def _call_openrouter_api(
     Args:
         symbol: Stock symbol or identifier (for logging context).
         payload: The request payload for the API.
-        client: An active httpx.AsyncClient instance.
+        client: An active httpx.AsyncClient instance (used only if the pooled LLM client is disabled).
 
     Returns:
         Tuple: (response_json, error_message, status_code)
@@ -160,7 +161,8 @@ async def _call_openrouter_api(
 
     try:
         logger.debug(f"{log_prefix}: Sending request to OpenRouter. URL: {OPENROUTER_API_URL}, Model in Payload: {payload.get('model')}")
-        response: httpx.Response = await client.post( # Explicit típus a response-nak
+        # A közös, tartós OpenRouter kliens (a paraméterként kapott kliens csak kikapcsolt pool esetén)
+        response: httpx.Response = await get_llm_http_client(client).post( # Explicit típus a response-nak
             OPENROUTER_API_URL,
             headers=headers, # Győződj meg róla, hogy ez a helyes változónév
             json=payload,
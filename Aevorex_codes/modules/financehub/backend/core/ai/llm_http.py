@@ -0,0 +1,88 @@
+# backend/core/ai/llm_http.py
+"""
+A FinanceHub LLM hívásainak közös, tartós HTTP kliense.
+
+A `modules.shared.http_pool` upstreamenkénti poolját a FinanceHub
+beállításaiból konfigurálja (`settings.HTTP_CLIENT.LLM_*`, `settings.AI.TIMEOUT_SECONDS`),
+és a kapcsolat-újrahasznosítást a Prometheus exporterbe köti.
+A RapidRenderer, a chat LLM interfész és az AI összefoglaló API hívója is innen
+kapja a klienst, így az OpenRouter felé egyetlen bemelegített kapcsolatkészlet van.
+"""
+
+from typing import Optional
+
+import httpx
+
+from modules.financehub.backend.config import settings
+from modules.financehub.backend.utils.logger_config import get_logger
+from modules.shared.http_pool import (
+    OPENROUTER_BASE_URL,
+    OPENROUTER_UPSTREAM,
+    UpstreamClientPool,
+    UpstreamConfig,
+    get_upstream_pool,
+)
+
+logger = get_logger(__name__)
+
+_configured = False
+
+
+def _record_pool_metric(upstream: str, reused: bool) -> None:
+    try:
+        from modules.financehub.backend.core.metrics.prometheus_exporter import get_exporter
+        get_exporter().inc_http_pool_request(upstream, reused)
+    except Exception:  # pragma: no cover – a metrika opcionális
+        pass
+
+
+def openrouter_upstream_config() -> UpstreamConfig:
+    """Az OpenRouter upstream beállításai a központi konfigurációból."""
+    http_settings = settings.HTTP_CLIENT
+    return UpstreamConfig(
+        base_url=OPENROUTER_BASE_URL,
+        timeout_seconds=float(settings.AI.TIMEOUT_SECONDS),
+        connect_timeout_seconds=float(http_settings.CONNECT_TIMEOUT_SECONDS),
+        pool_timeout_seconds=float(http_settings.POOL_TIMEOUT_SECONDS),
+        max_connections=http_settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=http_settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry_seconds=float(http_settings.LLM_KEEPALIVE_EXPIRY_SECONDS),
+        headers={"User-Agent": http_settings.USER_AGENT},
+        warmup_path="/models",
+    )
+
+
+def configure_llm_http_pool() -> UpstreamClientPool:
+    """Az OpenRouter upstream regisztrálása a közös poolban (idempotens)."""
+    global _configured
+    pool = get_upstream_pool()
+    if not _configured:
+        pool.configure(OPENROUTER_UPSTREAM, openrouter_upstream_config())
+        pool.on_request = _record_pool_metric
+        _configured = True
+    return pool
+
+
+async def warm_up_llm_http_pool() -> bool:
+    """Induláskori bemelegítés, ha engedélyezett."""
+    if not settings.HTTP_CLIENT.LLM_SHARED_POOL_ENABLED or not settings.HTTP_CLIENT.LLM_WARMUP_ON_STARTUP:
+        return False
+    return await configure_llm_http_pool().warm_up(OPENROUTER_UPSTREAM)
+
+
+def get_llm_http_client(fallback: Optional[httpx.AsyncClient] = None) -> httpx.AsyncClient:
+    """
+    Az OpenRouter hívásokhoz használandó kliens.
+
+    Args:
+        fallback: A hívó saját kliense; csak akkor használjuk, ha a közös pool ki van kapcsolva.
+    """
+    if fallback is not None and not settings.HTTP_CLIENT.LLM_SHARED_POOL_ENABLED:
+        return fallback
+    return configure_llm_http_pool().client(OPENROUTER_UPSTREAM)
+
+
+async def close_llm_http_pool() -> None:
+    global _configured
+    await get_upstream_pool().aclose()
+    _configured = False
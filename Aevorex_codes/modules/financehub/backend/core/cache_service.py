@@ -15,6 +15,10 @@ Használat:
     await cache_service.set("my_key", {"data": 1}, timeout_seconds=60)
     data = await cache_service.get("my_key")
 
+    # Kötegelt műveletek (egy Redis kör: MGET / pipeline-olt SET EX)
+    await cache_service.set_many({"k1": 1, "k2": [2]}, timeout_seconds=60)
+    values = await cache_service.get_many(["k1", "k2", "k3"])  # {"k1": 1, "k2": [2], "k3": None}
+
     # Elosztott zár használata
     lock = cache_service.get_lock("FETCH_AAPL_DATA", timeout=120) # 120s lock TTL
     async with lock:
@@ -24,13 +28,16 @@ Használat:
 
 Megjegyzés:
     - Az adatok JSON formátumban szerializálódnak a Redisben tárolás előtt.
+    - Bináris payloadokhoz (pl. oszlopos DataFrame kodek) a `get_bytes` /
+      `set_bytes` metódusok egy külön, dekódolás nélküli kapcsolat poolt használnak.
     - A zárolás a redis-py beépített Lock implementációját használja.
 """
 
 import asyncio
 import json
 import sys
-from typing import Optional, Any, Final, Union
+import uuid
+from typing import Optional, Any, Dict, Final, Iterable, List, Set, Union
 
 # --- Redis és Asyncio Importok ---
 try:
@@ -48,6 +55,8 @@ except ImportError as e:
     print(f"FATAL ERROR: Could not import config/logger in cache_service: {e}. Check project structure.", file=sys.stderr)
     raise RuntimeError("CacheService failed to initialize due to missing config/logger.") from e
 
+from modules.financehub.backend.core.l1_cache import L1Cache
+
 logger = get_logger(__name__)
 MODULE_PREFIX = "[CacheService(Redis)]"
 
@@ -55,6 +64,8 @@ MODULE_PREFIX = "[CacheService(Redis)]"
 DEFAULT_TTL_FALLBACK: Final[int] = 900
 DEFAULT_LOCK_TTL_FALLBACK: Final[int] = 120
 DEFAULT_LOCK_RETRY_DELAY_FALLBACK: Final[float] = 0.5
+L1_INVALIDATE_ALL: Final[str] = "*"
+L1_LISTENER_RETRY_DELAY: Final[float] = 2.0
 # Max size itt már nem releváns, Redis kezeli a memóriát.
 
 class CacheService:
@@ -68,13 +79,24 @@ class CacheService:
                                   zár megszerzési kísérletek között.
         redis_client (aioredis.Redis): Aszinkron Redis kliens példány.
         _pool (aioredis.ConnectionPool): Redis kapcsolat pool.
+        l1 (Optional[L1Cache]): Opcionális folyamaton belüli L1 réteg
+                                (`settings.CACHE.L1_ENABLED`).
     """
 
     # __init__ privát, a példányosításhoz használd az `async def create()` metódust
-    def __init__(self, redis_client: aioredis.Redis, connection_pool: aioredis.ConnectionPool):
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        connection_pool: aioredis.ConnectionPool,
+        binary_client: Optional[aioredis.Redis] = None,
+        binary_pool: Optional[aioredis.ConnectionPool] = None,
+    ):
         """Privát inicializáló. Használd a `create` classmethod-ot."""
         self.redis_client = redis_client
         self._pool = connection_pool # Elmentjük a pool-t a későbbi bezáráshoz
+        # Bináris (decode_responses=False) kliens a nyers bájt payloadokhoz (pl. oszlopos DataFrame kodek)
+        self.binary_client = binary_client
+        self._binary_pool = binary_pool
 
         # TTL és Lock beállítások betöltése (a create már validálta)
         self.default_ttl: int = getattr(settings.CACHE, 'DEFAULT_TTL_SECONDS', DEFAULT_TTL_FALLBACK)
@@ -83,6 +105,20 @@ class CacheService:
         # Max size itt már nem releváns
         logger.info(f"{MODULE_PREFIX} Instance configured with Default TTL: {self.default_ttl}s, Lock TTL: {self.lock_ttl}s, Lock Retry Delay: {self.lock_retry_delay}s.")
 
+        # --- Opcionális L1 réteg + workerek közötti invalidáció ---
+        self.l1: Optional[L1Cache] = None
+        self._instance_id: str = uuid.uuid4().hex
+        self._l1_channel: str = getattr(settings.CACHE, 'L1_INVALIDATION_CHANNEL', "fh:cache:l1:invalidate")
+        self._l1_listener_task: Optional[asyncio.Task] = None
+        if getattr(settings.CACHE, 'L1_ENABLED', False):
+            self.l1 = L1Cache(
+                max_entries=settings.CACHE.L1_MAX_ENTRIES,
+                max_bytes=settings.CACHE.L1_MAX_BYTES,
+                max_ttl_seconds=settings.CACHE.L1_MAX_TTL_SECONDS,
+                key_prefixes=settings.CACHE.L1_KEY_PREFIXES,
+            )
+            logger.info(f"{MODULE_PREFIX} L1 cache enabled (max_entries={self.l1.max_entries}, max_bytes={self.l1.max_bytes}, max_ttl={self.l1.max_ttl_seconds}s, prefixes={list(self.l1.key_prefixes)}).")
+
     @classmethod
     async def create(cls) -> 'CacheService':
         """
@@ -118,12 +154,26 @@ class CacheService:
             )
             redis_client = aioredis.Redis(connection_pool=pool)
 
+            # Külön pool a bináris payloadokhoz: a decode_responses pool-szintű beállítás
+            binary_pool = aioredis.ConnectionPool(
+                host=redis_host,
+                port=redis_port,
+                db=redis_db,
+                decode_responses=False,
+                max_connections=20,
+                socket_connect_timeout=connect_timeout,
+                socket_timeout=socket_op_timeout
+            )
+            binary_client = aioredis.Redis(connection_pool=binary_pool)
+
             # Kapcsolat tesztelése PING paranccsal
             await redis_client.ping()
             logger.info(f"{MODULE_PREFIX} Redis connection successful to {redis_host}:{redis_port} (DB: {redis_db}).")
 
             # Példány létrehozása a klienssel és pool-lal
-            instance = cls(redis_client, pool)
+            instance = cls(redis_client, pool, binary_client, binary_pool)
+            if instance.l1 is not None:
+                instance._l1_listener_task = asyncio.create_task(instance._run_l1_invalidation_listener())
             return instance
 
         except RedisConnectionError as e:
@@ -142,8 +192,17 @@ class CacheService:
     async def close(self):
         """Bezárja a Redis kapcsolat pool-t."""
         logger.info(f"{MODULE_PREFIX} Closing Redis connection pool...")
+        if self._l1_listener_task is not None:
+            self._l1_listener_task.cancel()
+            try:
+                await self._l1_listener_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._l1_listener_task = None
         try:
             await self._pool.disconnect()
+            if self._binary_pool is not None:
+                await self._binary_pool.disconnect()
             logger.info(f"{MODULE_PREFIX} Redis connection pool closed successfully.")
         except Exception as e:
             logger.error(f"{MODULE_PREFIX} Error closing Redis connection pool: {e}", exc_info=True)
@@ -206,9 +265,29 @@ class CacheService:
         """
         log_prefix = f"{MODULE_PREFIX} [GET:{key}]"
         logger.debug(f"{log_prefix} Request received.")
+        use_l1 = self.l1 is not None and self.l1.accepts(key)
+        if use_l1:
+            l1_value = self.l1.get(key)
+            if l1_value is not None:
+                try:
+                    l1_decoded = json.loads(l1_value)
+                except (json.JSONDecodeError, TypeError) as e:
+                    logger.error(f"{log_prefix} Undecodable L1 entry dropped. Error: {e}.")
+                    self.l1.invalidate(key)
+                    return None
+                logger.debug(f"{log_prefix} L1 HIT.")
+                return l1_decoded
         try:
-            # A decode_responses=True miatt stringet kapunk vissza, vagy None-t
-            result_str: Optional[str] = await self.redis_client.get(key)
+            if use_l1:
+                # GET + PTTL egy körben, hogy az L1 bejegyzés ne éljen tovább a Redis-beli értéknél
+                l1_epoch = self.l1.epoch
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.get(key)
+                    pipe.pttl(key)
+                    result_str, remaining_ms = await pipe.execute()
+            else:
+                # A decode_responses=True miatt stringet kapunk vissza, vagy None-t
+                result_str: Optional[str] = await self.redis_client.get(key)
 
             if result_str is None:
                 logger.info(f"{log_prefix} Cache MISS.")
@@ -219,6 +298,10 @@ class CacheService:
                 try:
                     deserialized_value = json.loads(result_str)
                     logger.debug(f"{log_prefix} Successfully deserialized JSON data.")
+                    if use_l1:
+                        # Csak érvényes JSON kerül az L1-be
+                        ttl_seconds = remaining_ms / 1000 if remaining_ms is not None and remaining_ms > 0 else None
+                        self.l1.put(key, result_str, ttl_seconds, epoch=l1_epoch)
                     # Nincs szükség deepcopy-ra, a json.loads új objektumot hoz létre
                     return deserialized_value
                 except json.JSONDecodeError as e:
@@ -273,7 +356,17 @@ class CacheService:
 
         try:
             # Adat beállítása Redisben TTL-lel (`ex` paraméter)
-            result = await self.redis_client.set(key, serialized_value, ex=effective_ttl)
+            if self.l1 is not None and self.l1.accepts(key):
+                # SET + invalidációs PUBLISH egy körben; a saját L1 rögtön az új értéket kapja
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.set(key, serialized_value, ex=effective_ttl)
+                    pipe.publish(self._l1_channel, self._l1_message(key))
+                    result, _receivers = await pipe.execute()
+                self.l1.invalidate(key)
+                if result:
+                    self.l1.put(key, serialized_value, effective_ttl)
+            else:
+                result = await self.redis_client.set(key, serialized_value, ex=effective_ttl)
             if result: # Sikeres SET esetén általában True (vagy OK string) a válasz
                 logger.info(f"{log_prefix} Cache SET successful. TTL: {effective_ttl}s.")
                 return True
@@ -295,6 +388,265 @@ class CacheService:
             logger.exception(f"{log_prefix} Unexpected error during SET operation: {e}")
             return False
 
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Optional[Any]]:
+        """
+        Több kulcs lekérése egyetlen Redis körben (`MGET`), JSON deszerializálással.
+
+        Az L1 rétegben (ha engedélyezett) megtalált kulcsok nem kerülnek a
+        Redis kérésbe; a többi kulcs L1-be töltéséhez szükséges `PTTL`
+        lekérdezések ugyanabban a pipeline-ban futnak.
+
+        Args:
+            keys: A lekérendő cache kulcsok (a duplikátumok egyszer kerülnek lekérésre).
+
+        Returns:
+            Szótár minden kért kulccsal; a hiányzó, hibás vagy nem
+            deszerializálható bejegyzések értéke None. Redis hiba esetén
+            minden érték None (a `get` viselkedésével összhangban).
+        """
+        unique_keys: List[str] = list(dict.fromkeys(keys))
+        results: Dict[str, Optional[Any]] = dict.fromkeys(unique_keys)
+        if not unique_keys:
+            return results
+        log_prefix = f"{MODULE_PREFIX} [GET_MANY:{len(unique_keys)}]"
+
+        raw_values: Dict[str, Optional[str]] = {}
+        from_l1: Set[str] = set()
+        l1_fills: Dict[str, Optional[float]] = {}
+        l1_epoch = self.l1.epoch if self.l1 is not None else None
+        pending: List[str] = []
+        for key in unique_keys:
+            if self.l1 is not None and self.l1.accepts(key):
+                l1_value = self.l1.get(key)
+                if l1_value is not None:
+                    raw_values[key] = l1_value
+                    from_l1.add(key)
+                    continue
+            pending.append(key)
+
+        if pending:
+            l1_keys = [k for k in pending if self.l1 is not None and self.l1.accepts(k)]
+            try:
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    pipe.mget(pending)
+                    for key in l1_keys:
+                        pipe.pttl(key)
+                    replies = await pipe.execute()
+            except RedisTimeoutError:
+                logger.warning(f"{log_prefix} Redis command timed out.")
+                return results
+            except RedisError as e:
+                logger.error(f"{log_prefix} Redis error during MGET operation: {e}", exc_info=True)
+                return results
+            except Exception as e:
+                logger.exception(f"{log_prefix} Unexpected error during MGET operation: {e}")
+                return results
+
+            fetched = dict(zip(pending, replies[0]))
+            raw_values.update(fetched)
+            for key, remaining_ms in zip(l1_keys, replies[1:]):
+                if fetched.get(key) is not None:
+                    l1_fills[key] = remaining_ms / 1000 if remaining_ms is not None and remaining_ms > 0 else None
+
+        hit_count = 0
+        for key, raw in raw_values.items():
+            if raw is None:
+                continue
+            try:
+                results[key] = json.loads(raw)
+                hit_count += 1
+            except (json.JSONDecodeError, TypeError) as e:
+                logger.error(f"{log_prefix} Failed to deserialize JSON data for key '{key}'. Error: {e}.")
+                if key in from_l1:
+                    self.l1.invalidate(key)
+                continue
+            # Csak érvényes JSON kerül az L1-be
+            if key in l1_fills:
+                self.l1.put(key, raw, l1_fills[key], epoch=l1_epoch)
+        logger.info(f"{log_prefix} Cache HIT: {hit_count}, MISS: {len(unique_keys) - hit_count}.")
+        return results
+
+    async def set_many(self, mapping: Dict[str, Any], timeout_seconds: Optional[int] = None) -> bool:
+        """
+        Több kulcs tárolása egyetlen pipeline-olt Redis körben (`SET ... EX`).
+
+        A JSON-ba nem szerializálható értékek kimaradnak (hibalog mellett), a
+        többi kulcs írása ettől még megtörténik.
+
+        Args:
+            mapping: Kulcs -> tárolandó érték szótár.
+            timeout_seconds: Közös élettartam másodpercben (lásd `set`).
+
+        Returns:
+            True, ha minden kulcs sikeresen tárolódott, egyébként False.
+        """
+        if not mapping:
+            return True
+        log_prefix = f"{MODULE_PREFIX} [SET_MANY:{len(mapping)}]"
+        effective_ttl = self._resolve_ttl(timeout_seconds, f"<{len(mapping)} keys>")
+
+        serialized: Dict[str, str] = {}
+        for key, value in mapping.items():
+            try:
+                serialized[key] = json.dumps(value)
+            except (TypeError, ValueError) as e:
+                logger.error(f"{log_prefix} Failed to serialize value for key '{key}' to JSON. Skipping. Error: {e}. Value type: {type(value).__name__}")
+        if not serialized:
+            return False
+
+        l1_keys = [k for k in serialized if self.l1 is not None and self.l1.accepts(k)]
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, serialized_value in serialized.items():
+                    pipe.set(key, serialized_value, ex=effective_ttl)
+                for key in l1_keys:
+                    pipe.publish(self._l1_channel, self._l1_message(key))
+                replies = await pipe.execute()
+        except RedisTimeoutError:
+            logger.warning(f"{log_prefix} Redis command timed out.")
+            return False
+        except RedisError as e:
+            logger.error(f"{log_prefix} Redis error during pipelined SET operation: {e}", exc_info=True)
+            return False
+        except Exception as e:
+            logger.exception(f"{log_prefix} Unexpected error during pipelined SET operation: {e}")
+            return False
+
+        set_results = dict(zip(serialized, replies[:len(serialized)]))
+        for key in l1_keys:
+            self.l1.invalidate(key)
+            if set_results.get(key):
+                self.l1.put(key, serialized[key], effective_ttl)
+
+        failed = [k for k, ok in set_results.items() if not ok]
+        if failed:
+            logger.warning(f"{log_prefix} Redis SET returned a non-successful status for keys: {failed}")
+        else:
+            logger.info(f"{log_prefix} Cache SET successful for {len(serialized)} keys. TTL: {effective_ttl}s.")
+        return not failed and len(serialized) == len(mapping)
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Nyers bájtokat kér le a Redis cache-ből, JSON deszerializálás nélkül.
+
+        Bináris payloadokhoz (pl. `dataframe_codec.encode_dataframe` kimenete)
+        használatos. A `set`-tel írt JSON értékek is olvashatók, ekkor a JSON
+        szöveg UTF-8 bájtjait adja vissza.
+
+        Returns:
+            A tárolt bájtok, vagy None (MISS vagy hiba esetén).
+        """
+        log_prefix = f"{MODULE_PREFIX} [GET_BYTES:{key}]"
+        if self.binary_client is None:
+            logger.warning(f"{log_prefix} Binary Redis client not configured. Treating as MISS.")
+            return None
+        try:
+            result: Optional[bytes] = await self.binary_client.get(key)
+            if result is None:
+                logger.info(f"{log_prefix} Cache MISS.")
+            else:
+                logger.info(f"{log_prefix} Cache HIT ({len(result)} bytes).")
+            return result
+        except RedisTimeoutError:
+            logger.warning(f"{log_prefix} Redis command timed out.")
+            return None
+        except RedisError as e:
+            logger.error(f"{log_prefix} Redis error during GET operation: {e}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.exception(f"{log_prefix} Unexpected error during GET operation: {e}")
+            return None
+
+    async def get_many_bytes(self, keys: Iterable[str]) -> Dict[str, Optional[bytes]]:
+        """
+        Több kulcs nyers bájtjainak lekérése egyetlen Redis körben (`MGET`).
+
+        A `get_bytes` többkulcsos párja: a kimenet a `dataframe_codec.decode_cache_entry`
+        segítségével dekódolható (kódolt DataFrame és JSON bejegyzés egyaránt).
+
+        Returns:
+            Szótár minden kért kulccsal; MISS vagy Redis hiba esetén az érték None.
+        """
+        unique_keys: List[str] = list(dict.fromkeys(keys))
+        results: Dict[str, Optional[bytes]] = dict.fromkeys(unique_keys)
+        if not unique_keys:
+            return results
+        log_prefix = f"{MODULE_PREFIX} [GET_MANY_BYTES:{len(unique_keys)}]"
+        if self.binary_client is None:
+            logger.warning(f"{log_prefix} Binary Redis client not configured. Treating as MISS.")
+            return results
+        try:
+            values = await self.binary_client.mget(unique_keys)
+        except RedisTimeoutError:
+            logger.warning(f"{log_prefix} Redis command timed out.")
+            return results
+        except RedisError as e:
+            logger.error(f"{log_prefix} Redis error during MGET operation: {e}", exc_info=True)
+            return results
+        except Exception as e:
+            logger.exception(f"{log_prefix} Unexpected error during MGET operation: {e}")
+            return results
+        results.update(zip(unique_keys, values))
+        hit_count = sum(1 for value in values if value is not None)
+        logger.info(f"{log_prefix} Cache HIT: {hit_count}, MISS: {len(unique_keys) - hit_count}.")
+        return results
+
+    async def set_bytes(self, key: str, value: bytes, timeout_seconds: Optional[int] = None) -> bool:
+        """
+        Nyers bájtokat tárol a Redis cache-ben (JSON szerializálás nélkül).
+
+        Args:
+            key: A cache kulcs.
+            value: A tárolandó bájt payload.
+            timeout_seconds: Élettartam másodpercben (lásd `set`).
+
+        Returns:
+            True siker esetén, False egyébként.
+        """
+        log_prefix = f"{MODULE_PREFIX} [SET_BYTES:{key}]"
+        if self.binary_client is None:
+            logger.warning(f"{log_prefix} Binary Redis client not configured. Caching skipped.")
+            return False
+        if not isinstance(value, (bytes, bytearray, memoryview)):
+            logger.error(f"{log_prefix} Value must be bytes-like, got {type(value).__name__}. Caching skipped.")
+            return False
+        effective_ttl = self._resolve_ttl(timeout_seconds, key)
+        try:
+            result = await self.binary_client.set(key, bytes(value), ex=effective_ttl)
+            await self._l1_invalidate_everywhere(key)
+            if result:
+                logger.info(f"{log_prefix} Cache SET successful ({len(value)} bytes). TTL: {effective_ttl}s.")
+                return True
+            logger.warning(f"{log_prefix} Redis SET command returned a non-successful status (result: {result}).")
+            return False
+        except RedisTimeoutError:
+            logger.warning(f"{log_prefix} Redis command timed out.")
+            return False
+        except RedisError as e:
+            logger.error(f"{log_prefix} Redis error during SET operation: {e}", exc_info=True)
+            return False
+        except Exception as e:
+            logger.exception(f"{log_prefix} Unexpected error during SET operation: {e}")
+            return False
+
+    async def get_ttl(self, key: str) -> Optional[int]:
+        """
+        Visszaadja egy kulcs hátralévő élettartamát másodpercben.
+
+        Returns:
+            A hátralévő TTL; None, ha a kulcs nem létezik, nincs lejárata,
+            vagy hiba történt.
+        """
+        try:
+            ttl = await self.redis_client.ttl(key)
+            return ttl if ttl is not None and ttl >= 0 else None
+        except RedisError as e:
+            logger.error(f"{MODULE_PREFIX} [TTL:{key}] Redis error during TTL operation: {e}", exc_info=True)
+            return None
+        except Exception as e:
+            logger.exception(f"{MODULE_PREFIX} [TTL:{key}] Unexpected error during TTL operation: {e}")
+            return None
+
     def _resolve_ttl(self, timeout_seconds: Optional[int], key_for_log: str) -> int:
         """Belső segédfüggvény az effektív TTL meghatározására."""
         # Ez a függvény változatlan maradhat a memóriás verzióból
@@ -315,6 +667,7 @@ class CacheService:
         try:
             # A delete 0-t ad vissza, ha a kulcs nem létezett, 1-et (vagy többet, ha több kulcsot adunk meg), ha sikeresen törölt.
             deleted_count = await self.redis_client.delete(key)
+            await self._l1_invalidate_everywhere(key)
             if deleted_count > 0:
                 logger.info(f"{log_prefix} Successfully deleted key.")
                 return True
@@ -337,6 +690,7 @@ class CacheService:
         logger.warning(f"{MODULE_PREFIX} Attempting to CLEAR/FLUSH entire Redis database: {db_num}! This is irreversible.")
         try:
             result = await self.redis_client.flushdb()
+            await self._l1_invalidate_everywhere(L1_INVALIDATE_ALL)
             if result: # Általában True, ha sikeres
                 logger.info(f"{MODULE_PREFIX} Successfully flushed Redis database: {db_num}.")
                 return True
@@ -365,6 +719,60 @@ class CacheService:
             logger.exception(f"{MODULE_PREFIX} Unexpected error during DBSIZE operation for DB {db_num}: {e}")
             return None
 
+    # --- L1 INVALIDÁCIÓ (Redis pub/sub) ---
+    def _l1_message(self, key: str) -> str:
+        """Invalidációs üzenet: `<küldő példány azonosító>|<kulcs>`."""
+        return f"{self._instance_id}|{key}"
+
+    async def _l1_invalidate_everywhere(self, key: str) -> None:
+        """Törli a kulcsot a saját L1-ből és értesíti a többi workert."""
+        if self.l1 is None or (key != L1_INVALIDATE_ALL and not self.l1.accepts(key)):
+            return
+        if key == L1_INVALIDATE_ALL:
+            self.l1.clear()
+        else:
+            self.l1.invalidate(key)
+        try:
+            await self.redis_client.publish(self._l1_channel, self._l1_message(key))
+        except RedisError as e:
+            logger.warning(f"{MODULE_PREFIX} [L1] Failed to publish invalidation for '{key}': {e}")
+
+    async def _run_l1_invalidation_listener(self) -> None:
+        """
+        Háttér task: feliratkozik az invalidációs csatornára, és a más workerek
+        által módosított/törölt kulcsokat kiüríti a saját L1-ből. Kapcsolat
+        megszakadásakor az L1 teljesen ürül (kimaradhattak üzenetek), majd
+        újrapróbálkozik.
+        """
+        log_prefix = f"{MODULE_PREFIX} [L1-Listener]"
+        while True:
+            pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self._l1_channel)
+                logger.info(f"{log_prefix} Subscribed to '{self._l1_channel}'.")
+                async for message in pubsub.listen():
+                    data = message.get("data")
+                    if not isinstance(data, str) or "|" not in data:
+                        continue
+                    sender, key = data.split("|", 1)
+                    if sender == self._instance_id:
+                        continue
+                    if key == L1_INVALIDATE_ALL:
+                        self.l1.clear()
+                    else:
+                        self.l1.invalidate(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{log_prefix} Listener error: {e}. Clearing L1 and retrying in {L1_LISTENER_RETRY_DELAY}s.")
+                self.l1.clear()
+                await asyncio.sleep(L1_LISTENER_RETRY_DELAY)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
 
 # =============================================================================
 # Modul Betöltésének Jelzése
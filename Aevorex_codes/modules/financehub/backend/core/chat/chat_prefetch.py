@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""chat_prefetch.py – a streaming chat kérés előkészítő lépéseinek párhuzamosítása.
+
+Korábban a `/chat/{ticker}/stream` útvonal szigorúan egymás után futtatta az
+osztályozást, a teljes részvényadat-lekérést, a sablonválasztást és a
+prompt építést, és csak ezután kérte az első LLM byte-ot. Itt a kérés
+beérkezésekor azonnal elindul a részvényadat-lekérés és a session-modell
+lookup, a rendszerüzenet pedig a lefordított sablonból (`TemplateRouter`) azonnal
+elkészül; az osztályozás (olcsó regex) még előtte lefut, így
+ha a kérdéstípusnak nincs szüksége részvényadatra (pl. köszönés), a lekérés
+el sem indul. A részvényadatra legfeljebb `settings.AI.CHAT_CONTEXT_WAIT_SECONDS`
+ideig várunk; ha addig nem érkezik meg, a prompt nélküle készül, a lekérés
+pedig a háttérben befejeződik (és feltölti a cache-t a következő kérdéshez).
+Az elkészült adatból a prompt kontextus darabjai (`prompt_builder.get_context_fragments`)
+azonnal renderelődnek, így a prompt építése már csak összefűzés.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+
+import httpx
+
+from modules.financehub.backend.config import settings
+from modules.financehub.backend.core.cache_service import CacheService
+from modules.financehub.backend.core.chat import prompt_builder
+from modules.financehub.backend.core.chat.query_classifier import QueryClassifier, QueryType
+from modules.financehub.backend.core.chat.template_router import TemplateRouter
+from modules.financehub.backend.core.stock_data_service import process_premium_stock_data
+from modules.financehub.backend.models.stock import FinBotStockResponse
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ChatPrefetch", "start_chat_prefetch"]
+
+MODEL_CACHE_KEY = "sessmodel:"  # Redis kulcs prefix a felhasználó által választott modellhez
+
+
+def _consume_task_result(task: "asyncio.Task[Any]") -> None:
+    """A háttérben hagyott lekérés hibáját naplózzuk (ne legyen 'exception was never retrieved')."""
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is not None:
+        logger.warning("Background chat context fetch failed: %s", exc)
+
+
+@dataclass
+class ChatPrefetch:
+    """Egy chat kérés osztályozása és a párhuzamosan futó előkészítő lekérések."""
+
+    symbol: str
+    q_type: QueryType
+    language: str
+    is_valid: bool
+    sections: Tuple[str, ...]
+    token_budget: Optional[int]
+    stock_task: Optional["asyncio.Task[FinBotStockResponse]"]
+    system_message: Optional[str]
+    model_task: Optional["asyncio.Task[Optional[str]]"]
+
+    async def stock_data(self, wait_seconds: Optional[float] = None) -> Optional[FinBotStockResponse]:
+        """A részvényadat, ha `wait_seconds`-on belül elkészül (egyébként None, a lekérés fut tovább)."""
+        if self.stock_task is None:
+            return None
+        if wait_seconds is None:
+            wait_seconds = settings.AI.CHAT_CONTEXT_WAIT_SECONDS
+        done, _ = await asyncio.wait({self.stock_task}, timeout=wait_seconds)
+        if not done:
+            logger.warning(
+                "[chat_prefetch] Stock data for %s not ready after %.1fs – prompt built without it.", self.symbol, wait_seconds
+            )
+            return None
+        try:
+            return self.stock_task.result()
+        except Exception as fetch_err:
+            logger.error("[chat_prefetch] Failed to fetch stock data for %s: %s", self.symbol, fetch_err)
+            return None
+
+    async def session_model(self) -> Optional[str]:
+        if self.model_task is None:
+            return None
+        return await self.model_task
+
+    def release(self) -> None:
+        """
+        A kérés vége (vagy a kliens lekapcsolódása): a könnyű lookupokat leállítjuk,
+        a részvényadat-lekérést hagyjuk befejeződni, hogy a cache-be kerüljön.
+        """
+        if self.model_task is not None and not self.model_task.done():
+            self.model_task.cancel()
+        if self.stock_task is not None:
+            self.stock_task.add_done_callback(_consume_task_result)
+
+
+def _warm_context_fragments(task: "asyncio.Task[FinBotStockResponse]") -> None:
+    if task.cancelled() or task.exception() is not None or task.result() is None:
+        return
+    try:
+        prompt_builder.get_context_fragments(task.result())
+    except Exception as e:  # pragma: no cover – a prompt építés újra próbálja
+        logger.debug("[chat_prefetch] Context fragment warm-up failed: %s", e)
+
+
+async def _lookup_session_model(cache: CacheService, session_id: str) -> Optional[str]:
+    try:
+        return await cache.get(f"{MODEL_CACHE_KEY}{session_id}") or None
+    except Exception as e:
+        logger.debug("Session model fetch err: %s", e)
+        return None
+
+
+def start_chat_prefetch(
+    symbol: str,
+    message: str,
+    *,
+    client: httpx.AsyncClient,
+    cache: CacheService,
+    session_id: Optional[str] = None,
+) -> ChatPrefetch:
+    """
+    Osztályozza a kérdést és elindítja a szükséges előkészítő lekéréseket (futó event loopban hívandó).
+    """
+    q_type, lang, is_valid = QueryClassifier().classify(message)
+    sections = prompt_builder.sections_for_query_type(q_type)
+
+    stock_task = None
+    if sections:
+        stock_task = asyncio.create_task(
+            process_premium_stock_data(symbol=symbol, client=client, cache=cache, force_refresh=False)
+        )
+        # A kontextus darabok renderelése már a lekérés végén megtörténik, amíg a többi lookup fut
+        stock_task.add_done_callback(_warm_context_fragments)
+    system_message = TemplateRouter().render_system_message(q_type, ticker=symbol)
+    model_task = asyncio.create_task(_lookup_session_model(cache, session_id)) if session_id else None
+
+    logger.debug(
+        "[chat_prefetch] %s q_type=%s lang=%s valid=%s sections=%s", symbol, q_type, lang, is_valid, sections
+    )
+    return ChatPrefetch(
+        symbol=symbol,
+        q_type=q_type,
+        language=lang,
+        is_valid=is_valid,
+        sections=sections,
+        token_budget=prompt_builder.token_budget_for_query_type(q_type),
+        stock_task=stock_task,
+        system_message=system_message,
+        model_task=model_task,
+    )
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""context_fragments.py – előre renderelt, szimbólumonként cache-elt prompt kontextus darabok.
+
+A chat prompt részvény kontextusa szekciókból áll (áttekintés, árfolyam,
+pénzügyi mutatók, indikátorok, hírek, ...). A szekciók szövege egy adott
+adatverzióra (szimbólum + a prémium válasz időbélyege) állandó, ezért
+egyszer rendereljük és szimbólumonként eltároljuk; egy kérdéshez a
+kontextus összeállítása ezután csak a kért darabok összefűzése, a
+kérdéstípushoz tartozó token-kereten belül.
+
+A modul I/O- és modellfüggetlen: a darabokat a hívó (`prompt_builder`) rendereli.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional, Sequence, Tuple
+
+__all__ = ["ContextFragments", "ContextFragmentCache", "assemble_context", "estimate_tokens"]
+
+# Durva becslés: ~4 karakter / token (magyar és angol szövegre is elég pontos a kerethez)
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Tokenszám becslése tokenizer nélkül."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+@dataclass(frozen=True)
+class ContextFragments:
+    """Egy szimbólum adott adatverziójának renderelt szekciói."""
+
+    symbol: str
+    version: str
+    header: str
+    fragments: Mapping[str, str]
+    tokens: Mapping[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, symbol: str, version: str, header: str, fragments: Mapping[str, str]) -> "ContextFragments":
+        """Üres szekciók elhagyása és a token-becslések előszámítása."""
+        kept = {name: text for name, text in fragments.items() if text}
+        return cls(
+            symbol=symbol,
+            version=version,
+            header=header,
+            fragments=kept,
+            tokens={name: estimate_tokens(text) for name, text in kept.items()},
+        )
+
+
+def assemble_context(
+    fragments: ContextFragments,
+    sections: Sequence[str],
+    token_budget: Optional[int] = None,
+) -> Tuple[str, Tuple[str, ...]]:
+    """
+    A kért szekciók összefűzése prioritási sorrendben (a `sections` sorrendje).
+
+    Ha egy szekció már nem fér bele a keretbe, kimarad, de a kisebb, későbbi
+    szekciók még bekerülhetnek.
+
+    Returns:
+        (kontextus szöveg, a bekerült szekciók neve); üres szöveg, ha egy szekció sem került be.
+    """
+    remaining = None if token_budget is None else token_budget - estimate_tokens(fragments.header)
+    parts = [fragments.header]
+    included = []
+    for name in sections:
+        text = fragments.fragments.get(name)
+        if not text:
+            continue
+        cost = fragments.tokens.get(name) or estimate_tokens(text)
+        if remaining is not None:
+            if cost > remaining:
+                continue
+            remaining -= cost
+        parts.append(text)
+        included.append(name)
+    if not included:
+        return "", ()
+    return "\n".join(parts) + "\n\n", tuple(included)
+
+
+class ContextFragmentCache:
+    """
+    Szimbólumonként a legutóbbi adatverzió renderelt darabjai (korlátos LRU).
+
+    Args:
+        max_symbols: Legfeljebb ennyi szimbólum darabjait tartjuk meg.
+    """
+
+    def __init__(self, max_symbols: int = 256) -> None:
+        self.max_symbols = max(1, int(max_symbols))
+        self._entries: "OrderedDict[str, ContextFragments]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, symbol: str, version: str, render: Callable[[], ContextFragments]) -> ContextFragments:
+        """A cache-elt darabok, ha a verzió egyezik; különben `render()` eredménye (és eltároljuk)."""
+        key = symbol.upper()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+        built = render()
+        with self._lock:
+            self._entries[key] = built
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_symbols:
+                self._entries.popitem(last=False)
+        return built
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol.upper(), None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"symbols": len(self._entries), "hits": self.hits, "misses": self.misses}
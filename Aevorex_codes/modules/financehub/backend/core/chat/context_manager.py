@@ -10,9 +10,13 @@ Integrates with central configuration and dependency injection.
 
 import logging
 import asyncio
+import json
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any, Deque # Import Deque for internal type hint
-from collections import deque
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Callable, List, Dict, Optional, Any, Deque # Import Deque for internal type hint
+from collections import OrderedDict, deque
 from .exceptions import HistoryStorageError, HistoryNotFoundError # <<< Import
 
 # --- Central Configuration Import ---
@@ -112,28 +116,78 @@ class AbstractHistoryManager(ABC):
         """
         pass
 
+# --- Shared Runtime Validation ---
+
+def _validate_message(conversation_id: str, message: Any) -> None:
+    """
+    Runtime check that *message* structurally resembles ChatMessage.
+
+    Raises:
+        TypeError: If the message lacks 'role'/'content' or they have incorrect types.
+    """
+    is_valid_structure = False
+    if ChatMessage is not Any and isinstance(message, ChatMessage):
+         is_valid_structure = True # It's the correct Pydantic type
+    elif hasattr(message, 'role') and hasattr(message, 'content'):
+         # Duck typing: Check if essential attributes exist
+         role_val = getattr(message, 'role')
+         content_val = getattr(message, 'content')
+         # Basic check: role maybe enum or string, content should be string
+         if (isinstance(role_val, (str, ChatRole if ChatRole is not Any else str))) and \
+            isinstance(content_val, str):
+             is_valid_structure = True
+             # Log warning if it's not the exact type but structure is okay
+             if ChatMessage is not Any and not isinstance(message, ChatMessage):
+                  logger.warning(f"add_message: Message for {conversation_id} has correct attributes "
+                                 f"but is not a ChatMessage instance (Type: {type(message)}). Adding anyway.")
+         else:
+             logger.error(f"add_message failed for {conversation_id}: Message attributes have incorrect types "
+                          f"(role: {type(role_val)}, content: {type(content_val)}).")
+    else:
+         logger.error(f"add_message failed for {conversation_id}: Provided 'message' object (Type: {type(message)}) "
+                      f"lacks 'role' or 'content' attributes.")
+
+    if not is_valid_structure:
+         # Raise TypeError if the structure is fundamentally wrong
+         raise TypeError(f"Invalid message object provided. Expected object with 'role' and 'content', got {type(message)}.")
+
+    if not isinstance(conversation_id, str) or not conversation_id:
+        logger.error("add_message called with invalid conversation_id.")
+        raise ValueError("conversation_id must be a non-empty string.")
+
 # --- In-Memory Implementation (Using Any for Hints) ---
 
 class InMemoryHistoryManager(AbstractHistoryManager):
     """
-    Manages conversation history entirely in memory using Python dictionaries and deques.
+    Manages conversation history entirely in memory using an LRU-ordered dict of deques.
     Uses `Any` for ChatMessage hints in signatures and relies on runtime checks.
+
+    Bounded: at most `max_conversations` conversations are kept (the least recently
+    used one is evicted together with its lock), and conversations idle for longer
+    than `ttl_seconds` expire. History is per-process; use `RedisHistoryManager`
+    to share it across workers.
     """
     # Internal type hint for clarity, still uses Any in signatures
     _HistoryDeque = Deque[ChatMessage] # Requires ChatMessage import
 
     def __init__(self,
                  max_conversations: Optional[int] = None,
-                 max_messages_per_conversation: Optional[int] = None):
+                 max_messages_per_conversation: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
         """Initializes the InMemoryHistoryManager."""
         # Internal storage still aims to hold ChatMessage objects if possible
-        self.histories: Dict[str, InMemoryHistoryManager._HistoryDeque] = {}
+        self.histories: "OrderedDict[str, InMemoryHistoryManager._HistoryDeque]" = OrderedDict()
         self.locks: Dict[str, asyncio.Lock] = {}
+        self._last_access: Dict[str, float] = {}
+        self._clock = clock
         self.max_messages_per_conversation: Optional[int] = max_messages_per_conversation
-        self.max_conversations: Optional[int] = max_conversations # Note: Enforcement not implemented
-        if self.max_conversations is not None:
-             logger.warning("InMemoryHistoryManager: 'max_conversations' limit set but not actively enforced.")
-        logger.info(f"InMemoryHistoryManager initialized. Max messages/convo: {self.max_messages_per_conversation or 'Unlimited'}.")
+        self.max_conversations: Optional[int] = max_conversations
+        self.ttl_seconds: Optional[float] = ttl_seconds
+        self.evictions = 0
+        logger.info(f"InMemoryHistoryManager initialized. Max conversations: {self.max_conversations or 'Unlimited'}, "
+                    f"max messages/convo: {self.max_messages_per_conversation or 'Unlimited'}, "
+                    f"idle TTL: {self.ttl_seconds or 'None'}s.")
 
     async def _get_lock(self, conversation_id: str) -> asyncio.Lock:
         """Safely gets or creates the lock for a given conversation ID."""
@@ -144,6 +198,38 @@ class InMemoryHistoryManager(AbstractHistoryManager):
             logger.debug(f"Created new lock for conversation_id: {conversation_id}")
         return self.locks[conversation_id]
 
+    # --- Eviction helpers (synchronous: no await between check and removal) ---
+    def _drop(self, conversation_id: str, reason: str) -> None:
+        self.histories.pop(conversation_id, None)
+        self._last_access.pop(conversation_id, None)
+        lock = self.locks.get(conversation_id)
+        if lock is not None and not lock.locked():
+            del self.locks[conversation_id]
+        self.evictions += 1
+        logger.debug(f"Evicted conversation history {conversation_id} ({reason}).")
+
+    def _is_expired(self, conversation_id: str, now: float) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        last_access = self._last_access.get(conversation_id)
+        return last_access is not None and now - last_access > self.ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        """Drops expired conversations from the LRU end, then enforces `max_conversations`."""
+        while self.histories:
+            oldest_id = next(iter(self.histories))
+            if not self._is_expired(oldest_id, now):
+                break
+            self._drop(oldest_id, "expired")
+        if self.max_conversations is not None:
+            while len(self.histories) > self.max_conversations:
+                oldest_id = next(iter(self.histories))
+                self._drop(oldest_id, "max_conversations")
+
+    def _touch(self, conversation_id: str, now: float) -> None:
+        self.histories.move_to_end(conversation_id)
+        self._last_access[conversation_id] = now
+
     # Signature uses List[Any]
     async def get_history(self, conversation_id: str, limit: Optional[int] = None) -> List[Any]: # <-- JAVÍTVA: Any
         """Retrieves history, returning List[Any] to match abstract signature."""
@@ -154,69 +240,46 @@ class InMemoryHistoryManager(AbstractHistoryManager):
         lock = await self._get_lock(conversation_id)
         async with lock:
             logger.debug(f"Acquired lock for get_history: {conversation_id}")
+            now = self._clock()
+            if self._is_expired(conversation_id, now):
+                self._drop(conversation_id, "expired")
             history_deque = self.histories.get(conversation_id)
 
             if history_deque is None:
                 logger.info(f"No history found for conversation_id: {conversation_id}")
                 return []
-
-            # Convert deque (which might contain ChatMessage objects) to list
-            history_list = list(history_deque)
+            self._touch(conversation_id, now)
 
             if limit is not None and limit > 0:
-                limited_history = history_list[-limit:]
+                # Csak a kért utolsó elemeket másoljuk (a deque jobb végéről)
+                limited_history = list(islice(reversed(history_deque), limit))[::-1]
                 logger.debug(f"Returning last {len(limited_history)} messages (limit={limit}) for {conversation_id}.")
                 return limited_history # Returns List[Any] as per signature
             else:
+                history_list = list(history_deque)
                 logger.debug(f"Returning all {len(history_list)} messages for {conversation_id}.")
                 return history_list # Returns List[Any] as per signature
 
     # Signature uses message: Any
     async def add_message(self, conversation_id: str, message: Any) -> None: # <-- JAVÍTVA: Any
         """Adds a message (hinted as Any), performing runtime validation."""
-        # --- CRITICAL RUNTIME VALIDATION ---
-        # Check if it structurally resembles ChatMessage (even if ChatMessage type hint failed)
-        is_valid_structure = False
-        if ChatMessage is not Any and isinstance(message, ChatMessage):
-             is_valid_structure = True # It's the correct Pydantic type
-        elif hasattr(message, 'role') and hasattr(message, 'content'):
-             # Duck typing: Check if essential attributes exist
-             # Further checks on role/content types could be added here if needed
-             role_val = getattr(message, 'role')
-             content_val = getattr(message, 'content')
-             # Basic check: role maybe enum or string, content should be string
-             if (isinstance(role_val, (str, ChatRole if ChatRole is not Any else str))) and \
-                isinstance(content_val, str):
-                 is_valid_structure = True
-                 # Log warning if it's not the exact type but structure is okay
-                 if ChatMessage is not Any and not isinstance(message, ChatMessage):
-                      logger.warning(f"add_message: Message for {conversation_id} has correct attributes "
-                                     f"but is not a ChatMessage instance (Type: {type(message)}). Adding anyway.")
-             else:
-                 logger.error(f"add_message failed for {conversation_id}: Message attributes have incorrect types "
-                              f"(role: {type(role_val)}, content: {type(content_val)}).")
-        else:
-             logger.error(f"add_message failed for {conversation_id}: Provided 'message' object (Type: {type(message)}) "
-                          f"lacks 'role' or 'content' attributes.")
-
-        if not is_valid_structure:
-             # Raise TypeError if the structure is fundamentally wrong
-             raise TypeError(f"Invalid message object provided. Expected object with 'role' and 'content', got {type(message)}.")
-        # ------------------------------------
-
-        if not isinstance(conversation_id, str) or not conversation_id:
-            logger.error("add_message called with invalid conversation_id.")
-            raise ValueError("conversation_id must be a non-empty string.")
+        _validate_message(conversation_id, message)
 
         lock = await self._get_lock(conversation_id)
         async with lock:
             logger.debug(f"Acquired lock for add_message: {conversation_id}")
+            now = self._clock()
+            if self._is_expired(conversation_id, now):
+                self._drop(conversation_id, "expired")
 
             # Get or create the deque (stores the validated message object)
-            history_deque = self.histories.setdefault(
-                conversation_id,
-                deque(maxlen=self.max_messages_per_conversation)
-            )
+            history_deque = self.histories.get(conversation_id)
+            if history_deque is None:
+                history_deque = deque(maxlen=self.max_messages_per_conversation)
+                self.histories[conversation_id] = history_deque
+            self._touch(conversation_id, now)
+            # Az új beszélgetés után a legrégebbi / lejárt beszélgetések kiesnek
+            self._evict(now)
 
             history_deque.append(message) # Add the validated message
             # Log using getattr safely, as message type is Any in signature
@@ -234,6 +297,7 @@ class InMemoryHistoryManager(AbstractHistoryManager):
         lock = await self._get_lock(conversation_id)
         async with lock:
             logger.debug(f"Acquired lock for clear_history: {conversation_id}")
+            self._last_access.pop(conversation_id, None)
             if conversation_id in self.histories:
                 num_messages = len(self.histories[conversation_id])
                 del self.histories[conversation_id] # Remove history
@@ -248,23 +312,143 @@ class InMemoryHistoryManager(AbstractHistoryManager):
                     logger.warning(f"Removed orphaned lock for non-existent history: {conversation_id}")
 
 
-# --- Future Database Implementation Placeholder (Using Any for Hints) ---
-# class DatabaseHistoryManager(AbstractHistoryManager):
-#     # ... (init) ...
-#
-#     async def get_history(self, conversation_id: str, limit: Optional[int] = None) -> List[Any]: # <-- JAVÍTVA: Any
-#         # ... query logic ...
-#         # Return list of objects loaded from DB (which might be ORM models or dicts)
-#         # They should be structurally compatible with ChatMessage, but hinted as Any
-#         raise NotImplementedError("Database backend not implemented.")
-#
-#     async def add_message(self, conversation_id: str, message: Any) -> None: # <-- JAVÍTVA: Any
-#         # CRITICAL: Perform runtime validation on 'message' structure here before saving to DB
-#         if not hasattr(message, 'role') or not hasattr(message, 'content'):
-#              raise TypeError("Invalid message object structure for DB storage.")
-#         # ... DB insertion logic ...
-#         raise NotImplementedError("Database backend not implemented.")
-#
-#     async def clear_history(self, conversation_id: str) -> None:
-#         # ... DB deletion logic ...
-#         raise NotImplementedError("Database backend not implemented.")
\ No newline at end of file
+# --- Redis Implementation (shared across workers) ---
+
+# Tömör szerepkód-kódolás a tárolt üzenetekhez
+_ROLE_TO_CODE: Dict[str, str] = {"user": "u", "assistant": "a", "system": "s"}
+_CODE_TO_ROLE: Dict[str, str] = {code: role for role, code in _ROLE_TO_CODE.items()}
+
+
+def _encode_message(message: Any) -> str:
+    """Compact JSON array: [role_code, content, epoch_seconds|null(, metadata)]."""
+    role = getattr(message, 'role')
+    role_str = getattr(role, 'value', role)
+    timestamp = getattr(message, 'timestamp', None)
+    metadata = getattr(message, 'metadata', None)
+    encoded: List[Any] = [
+        _ROLE_TO_CODE.get(role_str, role_str),
+        getattr(message, 'content'),
+        round(timestamp.timestamp(), 3) if isinstance(timestamp, datetime) else None,
+    ]
+    if metadata:
+        encoded.append(metadata)
+    return json.dumps(encoded, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _decode_message(raw: str) -> Optional[Any]:
+    """Inverse of `_encode_message`; returns None for corrupt entries."""
+    try:
+        role_code, content, epoch, *rest = json.loads(raw)
+        fields: Dict[str, Any] = {
+            "role": _CODE_TO_ROLE.get(role_code, role_code),
+            "content": content,
+            "timestamp": datetime.fromtimestamp(epoch, tz=timezone.utc) if epoch is not None else None,
+            "metadata": rest[0] if rest else None,
+        }
+        if ChatMessage is Any:
+            return fields
+        return ChatMessage(**fields)
+    except Exception as e:
+        logger.warning(f"Skipping undecodable history entry: {e}")
+        return None
+
+
+class RedisHistoryManager(AbstractHistoryManager):
+    """
+    Conversation history in Redis, shared across uvicorn workers.
+
+    Each conversation is a capped list (newest first): `LPUSH` + `LTRIM` + `EXPIRE`
+    in one pipeline on write, `LRANGE 0 limit-1` + `EXPIRE` (sliding TTL) in one
+    pipeline on read. Messages are stored as compact JSON arrays.
+
+    Args:
+        redis_client: `redis.asyncio.Redis` client with `decode_responses=True` (e.g. `CacheService.redis_client`).
+        max_messages_per_conversation: List cap (LTRIM); None = unlimited.
+        ttl_seconds: Idle expiry of a conversation; None = no expiry.
+        key_prefix: Redis key prefix.
+    """
+
+    def __init__(self,
+                 redis_client: Any,
+                 max_messages_per_conversation: Optional[int] = None,
+                 ttl_seconds: Optional[int] = None,
+                 key_prefix: str = "chat:hist:"):
+        self.redis_client = redis_client
+        self.max_messages_per_conversation = max_messages_per_conversation
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        logger.info(f"RedisHistoryManager initialized. Max messages/convo: {self.max_messages_per_conversation or 'Unlimited'}, "
+                    f"idle TTL: {self.ttl_seconds or 'None'}s.")
+
+    def _key(self, conversation_id: str) -> str:
+        return f"{self.key_prefix}{conversation_id}"
+
+    async def get_history(self, conversation_id: str, limit: Optional[int] = None) -> List[Any]: # <-- JAVÍTVA: Any
+        if not isinstance(conversation_id, str) or not conversation_id:
+             logger.error("get_history called with invalid conversation_id.")
+             return []
+        key = self._key(conversation_id)
+        stop = limit - 1 if limit is not None and limit > 0 else -1
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.lrange(key, 0, stop)
+                if self.ttl_seconds:
+                    pipe.expire(key, self.ttl_seconds)
+                results = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis error reading history for {conversation_id}: {e}")
+            raise HistoryStorageError(f"Failed to read history for {conversation_id}") from e
+        raw_messages = results[0] or []
+        # A lista a legújabbal kezdődik; kronologikus sorrendben adjuk vissza
+        history = [msg for msg in (_decode_message(raw) for raw in reversed(raw_messages)) if msg is not None]
+        logger.debug(f"Returning {len(history)} messages (limit={limit}) for {conversation_id} from Redis.")
+        return history
+
+    async def add_message(self, conversation_id: str, message: Any) -> None: # <-- JAVÍTVA: Any
+        _validate_message(conversation_id, message)
+        key = self._key(conversation_id)
+        try:
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.lpush(key, _encode_message(message))
+                if self.max_messages_per_conversation:
+                    pipe.ltrim(key, 0, self.max_messages_per_conversation - 1)
+                if self.ttl_seconds:
+                    pipe.expire(key, self.ttl_seconds)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Redis error adding message for {conversation_id}: {e}")
+            raise HistoryStorageError(f"Failed to add message for {conversation_id}") from e
+        logger.info(f"Added message (Role: {getattr(message, 'role', 'N/A')}) to Redis history for {conversation_id}.")
+
+    async def clear_history(self, conversation_id: str) -> None:
+        if not isinstance(conversation_id, str) or not conversation_id:
+             logger.error("clear_history called with invalid conversation_id.")
+             return
+        try:
+            await self.redis_client.delete(self._key(conversation_id))
+        except Exception as e:
+            logger.error(f"Redis error clearing history for {conversation_id}: {e}")
+            raise HistoryStorageError(f"Failed to clear history for {conversation_id}") from e
+        logger.info(f"Cleared Redis history for conversation_id: {conversation_id}")
+
+
+def create_history_manager(cache_service: Optional[Any] = None) -> AbstractHistoryManager:
+    """
+    Builds the history manager configured in `settings.AI.CHAT_HISTORY_*`.
+    The Redis backend needs a CacheService (its Redis client); without one the in-memory manager is used.
+    """
+    ai_settings = settings.AI
+    redis_client = getattr(cache_service, 'redis_client', None)
+    if ai_settings.CHAT_HISTORY_BACKEND == "redis" and redis_client is not None:
+        return RedisHistoryManager(
+            redis_client,
+            max_messages_per_conversation=ai_settings.CHAT_HISTORY_MAX_MESSAGES,
+            ttl_seconds=ai_settings.CHAT_HISTORY_TTL_SECONDS,
+        )
+    if ai_settings.CHAT_HISTORY_BACKEND == "redis":
+        logger.warning("Redis history backend requested but no Redis client is available; using in-memory history.")
+    return InMemoryHistoryManager(
+        max_conversations=ai_settings.CHAT_HISTORY_MAX_CONVERSATIONS,
+        max_messages_per_conversation=ai_settings.CHAT_HISTORY_MAX_MESSAGES,
+        ttl_seconds=ai_settings.CHAT_HISTORY_TTL_SECONDS,
+    )
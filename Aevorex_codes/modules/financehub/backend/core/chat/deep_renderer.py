@@ -7,6 +7,7 @@ Tokenenként streameli a részletes („Deep”) választ a kiválasztott nagy m
 from __future__ import annotations
 
 import logging
+import time
 from typing import AsyncGenerator, Dict, Any
 
 from modules.financehub.backend.core.chat.model_selector import ModelSelector
@@ -25,16 +26,14 @@ class DeepRenderer:
 
     async def stream(self, prompt: str, metadata: Dict[str, Any] | None = None) -> AsyncGenerator[str, None]:
         client = await self.model_selector.get_client("deep", self.override_model)
-        first_at = None
+        start_ts = time.perf_counter()
+        first_token_ms: float | None = None
         async for token in client.stream(prompt, metadata or {}):
-            if first_at is None:
-                import time
-                first_at = time.perf_counter()
-                from .metrics_hook import record_first_token
-                record_first_token("deep", client.model_id, ms=0)
+            if first_token_ms is None:
+                first_token_ms = (time.perf_counter() - start_ts) * 1000
             yield token
-        if first_at is not None:
-            import time
-            latency_ms = (time.perf_counter() - first_at) * 1000
-            from .metrics_hook import record_first_token
-            record_first_token("deep", client.model_id, latency_ms) 
\ No newline at end of file
+        if first_token_ms is not None and not getattr(client, "degraded", False):
+            from .metrics_hook import record_first_token, record_response_time
+
+            record_first_token("deep", client.model_id, first_token_ms)
+            record_response_time("deep", client.model_id, time.perf_counter() - start_ts)
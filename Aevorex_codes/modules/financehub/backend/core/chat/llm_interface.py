@@ -42,8 +42,11 @@ from .exceptions import ( # <<< Import az új fájlból
     LLMError, LLMConfigurationError, LLMAPIError, LLMTimeoutError, LLMInvalidResponseError
 )
 
+from modules.financehub.backend.core.ai.llm_http import get_llm_http_client
+
 # Note: The http_client is NOT initialized here.
-# It MUST be passed as a dependency to the generate_chat_response function.
+# Calls go through the shared, pooled OpenRouter client; the passed-in client is only
+# used when HTTP_CLIENT.LLM_SHARED_POOL_ENABLED is False.
 
 # Get a logger instance
 logger = logging.getLogger(__name__)
@@ -112,7 +115,8 @@ async def generate_chat_response(
 
     Args:
         prompt: The fully constructed prompt string to send to the LLM.
-        http_client: The shared `httpx.AsyncClient` instance from FastAPI dependencies.
+        http_client: The shared `httpx.AsyncClient` instance from FastAPI dependencies
+                     (used only if the pooled LLM client is disabled).
         config_override: Optional dictionary to override default LLM parameters
                          (e.g., {'temperature': 0.5, 'model': 'openai/gpt-4o'}).
 
@@ -213,7 +217,7 @@ async def generate_chat_response(
 
     try:
         logger.info(f"Calling {provider} API endpoint: {request_url}. Model: {effective_model_name}")
-        response = await http_client.post(
+        response = await get_llm_http_client(http_client).post(
             request_url,
             headers=headers,
             json=payload,
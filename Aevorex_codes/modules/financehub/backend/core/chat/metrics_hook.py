@@ -14,9 +14,10 @@ from typing import Optional
 try:
     from modules.financehub.backend.core.metrics.prometheus_exporter import (
         PrometheusExporter,
+        get_exporter,
     )
 
-    _EXPORTER: Optional[PrometheusExporter] = PrometheusExporter()
+    _EXPORTER: Optional[PrometheusExporter] = get_exporter()
 except Exception:  # pragma: no cover – prom optional
     _EXPORTER = None  # type: ignore
 
@@ -50,4 +51,13 @@ def inc_deep_opt_in(ticker: str) -> None:  # noqa: D401
     try:
         _EXPORTER.inc_deep_opt_in(ticker=ticker)
     except Exception as exc:  # pragma: no cover
-        logger.debug("Prometheus inc_deep_opt_in error: %s", exc) 
\ No newline at end of file
+        logger.debug("Prometheus inc_deep_opt_in error: %s", exc) 
+
+def record_response_time(stage: str, model: str, seconds: float) -> None:
+    """Record end-to-end response time of a pipeline stage in seconds."""
+    if _EXPORTER is None:
+        return
+    try:
+        _EXPORTER.observe_response(stage=stage, model=model, seconds=seconds)
+    except Exception as exc:  # pragma: no cover
+        logger.debug("Prometheus observe_response error: %s", exc)
@@ -55,4 +55,14 @@ class ModelSelector:
                 return m["id"]
 
         # Theoretically unreachable – but keep mypy happy
-        raise RuntimeError("MODEL_CATALOGUE contains no enabled models") 
\ No newline at end of file
+        raise RuntimeError("MODEL_CATALOGUE contains no enabled models")
+
+    # ------------------------------------------------------------------
+    async def get_client(self, stage: str, model_id: Optional[str] = None):
+        """Return an OpenRouter chat client for *stage* ("rapid" / "deep") on the shared pooled connection."""
+        from modules.financehub.backend.core.chat.openrouter_client import OpenRouterChatClient
+
+        if not model_id or not self.is_valid(model_id):
+            model_id = self.select()
+        return OpenRouterChatClient(model_id=model_id, stage=stage)
+ 
\ No newline at end of file
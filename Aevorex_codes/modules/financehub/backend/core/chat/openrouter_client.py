@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""openrouter_client.py – vékony OpenRouter chat kliens a renderer-eknek.
+
+A `ModelSelector.get_client()` ezt adja vissza; a kérések a közös, tartós
+OpenRouter kliensen (`core.ai.llm_http`) mennek, így a Rapid és a Deep
+renderer ugyanazt a bemelegített kapcsolatkészletet használja. A válasz
+valódi SSE folyamként (`stream: true`) érkezik, és delta darabonként kerül
+tovább, így az első token ideje nem egyezik meg a teljes generálási idővel.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, AsyncGenerator, Dict
+
+import httpx
+
+from modules.financehub.backend.config import settings
+from modules.financehub.backend.core.ai.llm_http import get_llm_http_client
+from modules.financehub.backend.core.chat.sse_stream import SSEStreamError, iter_sse_deltas
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["OpenRouterChatClient"]
+
+OPENROUTER_CHAT_PATH = "/chat/completions"
+STAGE_MAX_TOKENS: Dict[str, int] = {"rapid": 600, "deep": 2048}
+DEFAULT_STAGE_MAX_TOKENS = 1024
+UNAVAILABLE_MESSAGE = "Az AI szolgáltatás nem elérhető."
+
+
+class OpenRouterChatClient:
+    """Egy modellhez és pipeline fázishoz ("rapid" / "deep") kötött chat kliens."""
+
+    def __init__(self, model_id: str, stage: str) -> None:
+        self.model_id = model_id
+        self.stage = stage
+        self._api_key = getattr(settings.API_KEYS, "OPENROUTER", None)
+        # Igaz, ha az utolsó `stream()` valódi modellválasz helyett tartalék üzenetet adott
+        self.degraded = False
+
+    @property
+    def available(self) -> bool:
+        return bool(self._api_key)
+
+    def _headers(self) -> Dict[str, str]:
+        api_key = self._api_key.get_secret_value() if hasattr(self._api_key, "get_secret_value") else self._api_key
+        return {
+            "Authorization": f"Bearer {api_key}",
+            "Accept": "text/event-stream",
+            "HTTP-Referer": str(settings.HTTP_CLIENT.DEFAULT_REFERER),
+            "X-Title": settings.APP_META.NAME,
+        }
+
+    def _payload(self, prompt: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "model": self.model_id,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": metadata.get("max_tokens", STAGE_MAX_TOKENS.get(self.stage, DEFAULT_STAGE_MAX_TOKENS)),
+            "temperature": metadata.get("temperature", settings.AI.TEMPERATURE),
+            "stream": True,
+        }
+
+    async def stream(self, prompt: str, metadata: Dict[str, Any] | None = None) -> AsyncGenerator[str, None]:
+        """
+        A válasz delta darabjai érkezési sorrendben. Hiba esetén, ha még nem
+        ment ki darab, egy rövid magyar üzenet; folyam közbeni hibánál a
+        válasz egyszerűen véget ér.
+        """
+        self.degraded = False
+        if not self.available:
+            self.degraded = True
+            yield "Sajnálom, az AI válasz jelenleg nem elérhető fejlesztői módban."
+            return
+        client = get_llm_http_client()
+        emitted = False
+        try:
+            async with client.stream(
+                "POST", OPENROUTER_CHAT_PATH, headers=self._headers(), json=self._payload(prompt, metadata or {})
+            ) as resp:
+                if resp.status_code != 200:
+                    body = (await resp.aread())[:300]
+                    logger.warning(
+                        "OpenRouter %s stream for %s failed with status %d: %r", self.stage, self.model_id, resp.status_code, body
+                    )
+                    self.degraded = True
+                    yield UNAVAILABLE_MESSAGE
+                    return
+                async for delta in iter_sse_deltas(resp.aiter_lines()):
+                    emitted = True
+                    yield delta
+        except (httpx.HTTPError, SSEStreamError) as exc:
+            logger.warning("OpenRouter %s stream for %s interrupted: %s", self.stage, self.model_id, exc)
+            self.degraded = True
+            if not emitted:
+                yield UNAVAILABLE_MESSAGE
@@ -2,8 +2,9 @@
 
 import logging
 import json
+import os
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 from pathlib import Path
 
 # --- Központi Konfiguráció és Modell Importok ---
@@ -42,6 +43,8 @@ except ImportError:
         ChatMessage = Any
         ChatRole = Any # Ez azt jelenti, hogy a ChatRole.USER.value stb. nem fog működni.
 
+from modules.financehub.backend.core.chat.context_fragments import ContextFragmentCache, ContextFragments, assemble_context
+from modules.financehub.backend.core.chat.query_classifier import QueryType
 from modules.financehub.backend.models.stock import FinBotStockResponse, NewsItem, CompanyOverview, FinancialsData, EarningsData, TechnicalAnalysis, IndicatorHistory, IndicatorPoint, LatestOHLCV
 
 # --- Logger Beállítása ---
@@ -86,11 +89,20 @@ FIGYELEM: A rendszerüzenet sablonfájlja nem volt betölthető, ez egy alapért
 
 # --- Segédfüggvények ---
 
+_TEMPLATE_TEXT_CACHE: Dict[Path, Tuple[int, str]] = {}
+
+
 def _load_prompt_template(file_path: Path, fallback_content: str = "") -> str:
-    """Biztonságosan betölt egy szöveges sablonfájlt."""
+    """Biztonságosan betölt egy szöveges sablonfájlt (mtime alapján cache-elve, így módosításkor újraolvassa)."""
     try:
+        mtime_ns = os.stat(file_path).st_mtime_ns
+        cached = _TEMPLATE_TEXT_CACHE.get(file_path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
         with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read().strip()
+            content = f.read().strip()
+        _TEMPLATE_TEXT_CACHE[file_path] = (mtime_ns, content)
+        return content
     except FileNotFoundError:
         logger.error(f"Prompt sablonfájl nem található: {file_path}. Fallback tartalom használata.")
         return fallback_content.strip()
@@ -515,14 +527,66 @@ def _format_history_for_prompt(history: List[Any]) -> str:
     return f"{HISTORY_HEADER}\n" + "\n".join(formatted_history_lines) + "\n\n"
 
 # === ÚJ, TÍPUSBIZTOS FORMÁZÓ ===
-def _format_stock_data_from_model(model: FinBotStockResponse) -> str:
-    """Formats the FinBotStockResponse model into a string for the prompt."""
-    lines = []
-    ticker = model.metadata.get("symbol", "N/A").upper() if model.metadata else "N/A"
-    lines.append(STOCK_CONTEXT_HEADER_TPL.format(ticker=ticker))
-
-    # Company Overview
-    lines.append("--- Céginformáció és Profil ---")
+# A kontextus szekciókra bontva: a chat pipeline a kérdés típusa (QueryType)
+# alapján csak a szükséges szekciókat teszi a promptba (pl. köszönésnél semmit,
+# RSI kérdésnél árfolyam + indikátorok).
+SECTION_OVERVIEW = "overview"
+SECTION_PRICE = "price"
+SECTION_FINANCIALS = "financials"
+SECTION_RATIOS = "ratios"
+SECTION_INDICATORS = "indicators"
+SECTION_NEWS = "news"
+SECTION_AI_SUMMARY = "ai_summary"
+
+ALL_CONTEXT_SECTIONS: Tuple[str, ...] = (
+    SECTION_OVERVIEW,
+    SECTION_PRICE,
+    SECTION_FINANCIALS,
+    SECTION_RATIOS,
+    SECTION_INDICATORS,
+    SECTION_NEWS,
+    SECTION_AI_SUMMARY,
+)
+
+# Prioritási sorrendben: szűk token-keretnél a lista végéről maradnak ki szekciók
+QUERY_TYPE_SECTIONS: Dict[QueryType, Tuple[str, ...]] = {
+    QueryType.greeting: (),
+    QueryType.summary: (SECTION_OVERVIEW, SECTION_PRICE, SECTION_RATIOS, SECTION_FINANCIALS, SECTION_AI_SUMMARY),
+    QueryType.indicator: (SECTION_INDICATORS, SECTION_PRICE, SECTION_RATIOS),
+    QueryType.news: (SECTION_NEWS, SECTION_PRICE),
+    QueryType.hybrid: ALL_CONTEXT_SECTIONS,
+    QueryType.unknown: ALL_CONTEXT_SECTIONS,
+}
+
+# Részvény kontextus token-kerete kérdéstípusonként (becsült tokenekben, lásd `context_fragments.estimate_tokens`)
+QUERY_TYPE_TOKEN_BUDGETS: Dict[QueryType, int] = {
+    QueryType.greeting: 0,
+    QueryType.summary: 600,
+    QueryType.indicator: 350,
+    QueryType.news: 400,
+    QueryType.hybrid: 1200,
+    QueryType.unknown: 1200,
+}
+
+CHAT_CONTEXT_NEWS_HEADLINES = 3  # A hír-szekcióba kerülő címek száma
+
+
+def sections_for_query_type(q_type: Optional[QueryType]) -> Tuple[str, ...]:
+    """A kérdéstípushoz szükséges kontextus szekciók (ismeretlen típusnál mind)."""
+    if q_type is None:
+        return ALL_CONTEXT_SECTIONS
+    return QUERY_TYPE_SECTIONS.get(q_type, ALL_CONTEXT_SECTIONS)
+
+
+def token_budget_for_query_type(q_type: Optional[QueryType]) -> Optional[int]:
+    """A kérdéstípus kontextus token-kerete (None: nincs korlát)."""
+    if q_type is None:
+        return None
+    return QUERY_TYPE_TOKEN_BUDGETS.get(q_type)
+
+
+def _format_overview_section(model: FinBotStockResponse) -> List[str]:
+    lines = ["--- Céginformáció és Profil ---"]
     if model.company_overview:
         co = model.company_overview
         lines.append(f"  Cég neve: {co.name} ({co.symbol})")
@@ -532,9 +596,11 @@ def _format_stock_data_from_model(model: FinBotStockResponse) -> str:
         if co.long_business_summary: lines.append(f"  Leírás: {co.long_business_summary[:500]}...")
     else:
         lines.append("  Nem elérhető")
+    return lines
 
-    # Latest Price
-    lines.append("--- Legutóbbi Árfolyamadatok ---")
+
+def _format_price_section(model: FinBotStockResponse) -> List[str]:
+    lines = ["--- Legutóbbi Árfolyamadatok ---"]
     if model.latest_ohlcv:
         lo = model.latest_ohlcv
         price_str = _safe_format_number(lo.close)
@@ -544,9 +610,11 @@ def _format_stock_data_from_model(model: FinBotStockResponse) -> str:
         if lo.volume: lines.append(f"  Forgalom: {_safe_format_number(lo.volume, 0)}")
     else:
         lines.append("  Nem elérhető")
+    return lines
+
 
-    # Financial Metrics
-    lines.append("--- Pénzügyi Mutatók ---")
+def _format_financials_section(model: FinBotStockResponse) -> List[str]:
+    lines = ["--- Pénzügyi Mutatók ---"]
     if model.financials or model.earnings:
         if model.financials:
             fin = model.financials
@@ -558,52 +626,159 @@ def _format_stock_data_from_model(model: FinBotStockResponse) -> str:
                 lines.append(f"  Legutóbbi Éves EPS ({latest_annual.date}): {_safe_format_number(latest_annual.reported_eps)}")
     else:
         lines.append("  Nem elérhető")
+    return lines
+
+
+_RATIO_FIELDS: Tuple[Tuple[str, str, bool], ...] = (
+    # (CompanyOverview mező, címke, százalék-e)
+    ("trailing_pe", "P/E (TTM)", False),
+    ("forward_pe", "Forward P/E", False),
+    ("peg_ratio", "PEG", False),
+    ("price_to_book_ratio", "P/B", False),
+    ("price_to_sales_ratio_ttm", "P/S (TTM)", False),
+    ("ev_to_ebitda", "EV/EBITDA", False),
+    ("trailing_eps", "EPS (TTM)", False),
+    ("profit_margin", "Profitmarzs", True),
+    ("return_on_equity_ttm", "ROE (TTM)", True),
+    ("dividend_yield", "Osztalékhozam", True),
+    ("beta", "Béta", False),
+)
+
+
+def _format_ratios_section(model: FinBotStockResponse) -> List[str]:
+    co = model.company_overview
+    if co is None:
+        return []
+    lines = []
+    for field_name, label, is_percent in _RATIO_FIELDS:
+        value = getattr(co, field_name, None)
+        if value is None:
+            continue
+        if is_percent:
+            lines.append(f"  {label}: {_safe_format_number(value * 100)}%")
+        else:
+            lines.append(f"  {label}: {_safe_format_number(value)}")
+    if co.fifty_two_week_low is not None and co.fifty_two_week_high is not None:
+        lines.append(f"  52 hetes tartomány: {_safe_format_number(co.fifty_two_week_low)} - {_safe_format_number(co.fifty_two_week_high)}")
+    if not lines:
+        return []
+    return ["--- Kulcs Mutatók ---", *lines]
+
 
-    # Technical Analysis
-    lines.append("--- Technikai Analízis (Legutóbbi Indikátorok) ---")
+def _format_indicators_section(model: FinBotStockResponse) -> List[str]:
+    lines = ["--- Technikai Analízis (Legutóbbi Indikátorok) ---"]
     if model.latest_indicators:
         for key, value in model.latest_indicators.items():
             if value is not None:
                 lines.append(f"  {key.upper()}: {_safe_format_number(value)}")
     else:
         lines.append("  Nem elérhető")
+    return lines
 
-    # News
-    lines.append("--- Friss Hírek ---")
+
+def _format_news_section(model: FinBotStockResponse) -> List[str]:
+    lines = ["--- Friss Hírek ---"]
     if model.news:
-        for i, news_item in enumerate(model.news[:3]):  # Maximum 3 hírt jelenítünk meg
+        for i, news_item in enumerate(model.news[:CHAT_CONTEXT_NEWS_HEADLINES]):
             lines.append(f"  {i+1}. {news_item.title} ({news_item.publisher}) - {_format_timestamp(news_item.published_at)}")
     else:
         lines.append("  Nincsenek friss hírek.")
+    return lines
+
+
+def _format_ai_summary_section(model: FinBotStockResponse) -> List[str]:
+    if not model.ai_summary_hu:
+        return []
+    summary = model.ai_summary_hu
+    truncated_summary = summary[:750] + ("..." if len(summary) > 750 else "")
+    return ["--- Korábbi AI Elemzés Összefoglaló ---", f"  {truncated_summary}"]
+
+
+_SECTION_FORMATTERS: Dict[str, Callable[[FinBotStockResponse], List[str]]] = {
+    SECTION_OVERVIEW: _format_overview_section,
+    SECTION_PRICE: _format_price_section,
+    SECTION_FINANCIALS: _format_financials_section,
+    SECTION_RATIOS: _format_ratios_section,
+    SECTION_INDICATORS: _format_indicators_section,
+    SECTION_NEWS: _format_news_section,
+    SECTION_AI_SUMMARY: _format_ai_summary_section,
+}
 
-    # AI Analysis
-    if model.ai_summary_hu:
-        lines.append("--- Korábbi AI Elemzés Összefoglaló ---")
-        summary = model.ai_summary_hu
-        truncated_summary = summary[:750] + ("..." if len(summary) > 750 else "")
-        lines.append(f"  {truncated_summary}")
 
-    return "\n".join(lines).strip() + "\n\n"
+_FRAGMENT_CACHE = ContextFragmentCache()
+
+
+def _context_version(model: FinBotStockResponse) -> str:
+    """Adatverzió a fragment cache-hez: a prémium válasz összeállításának ideje."""
+    timestamp = getattr(model, "request_timestamp_utc", None)
+    return timestamp.isoformat() if timestamp is not None else f"id:{id(model)}"
+
+
+def _render_context_fragments(model: FinBotStockResponse, ticker: str, version: str) -> ContextFragments:
+    fragments = {}
+    for section, formatter in _SECTION_FORMATTERS.items():
+        try:
+            fragments[section] = "\n".join(formatter(model))
+        except Exception as e:
+            logger.warning("Prompt context section '%s' could not be rendered for %s: %s", section, ticker, e)
+    return ContextFragments.build(ticker, version, STOCK_CONTEXT_HEADER_TPL.format(ticker=ticker), fragments)
+
+
+def get_context_fragments(model: FinBotStockResponse) -> ContextFragments:
+    """A modell renderelt kontextus szekciói (szimbólumonként cache-elve, amíg az adatverzió nem változik)."""
+    ticker = ((model.metadata or {}).get("symbol") or model.symbol or "N/A").upper()
+    version = _context_version(model)
+    return _FRAGMENT_CACHE.get_or_build(ticker, version, lambda: _render_context_fragments(model, ticker, version))
+
+
+def _format_stock_data_from_model(
+    model: FinBotStockResponse,
+    sections: Optional[Sequence[str]] = None,
+    token_budget: Optional[int] = None,
+) -> str:
+    """Formats the FinBotStockResponse model into a string for the prompt (only the requested *sections*, default: all)."""
+    context_str, _ = assemble_context(
+        get_context_fragments(model),
+        ALL_CONTEXT_SECTIONS if sections is None else sections,
+        token_budget,
+    )
+    return context_str
 
 # === FŐ PROMPT ÉPÍTŐ FÜGGVÉNYEK ===
 
 def build_chat_prompt_from_model(
-    stock_data_model: FinBotStockResponse,
+    stock_data_model: Optional[FinBotStockResponse],
     history: List[Any],
     question: str,
-    system_template_file: Path = DEFAULT_CHAT_TEMPLATE_FILE
+    system_template_file: Path = DEFAULT_CHAT_TEMPLATE_FILE,
+    sections: Optional[Sequence[str]] = None,
+    token_budget: Optional[int] = None,
+    system_message: Optional[str] = None,
 ) -> str:
     """
     Típusbiztos prompt építő, ami a FinBotStockResponse modellt használja.
+
+    Args:
+        sections: A promptba kerülő kontextus szekciók prioritási sorrendben (lásd
+            `sections_for_query_type`); None esetén mind, üres sorozatnál nincs részvény kontextus.
+        token_budget: A részvény kontextus becsült token-kerete (lásd `token_budget_for_query_type`).
+        system_message: Kész (pl. a `TemplateRegistry`-ből renderelt) rendszerüzenet;
+            megadásakor a `system_template_file` nem töltődik be.
     """
-    system_message = _load_prompt_template(system_template_file, FALLBACK_SYSTEM_MESSAGE)
+    if system_message is None:
+        system_message = _load_prompt_template(system_template_file, FALLBACK_SYSTEM_MESSAGE)
     
     # 1. Rendszerüzenet (utasítások)
     prompt_parts = [SYS_MSG_HEADER, system_message, "\n"]
     
     # 2. Részvényadat kontextus (az új, típusbiztos formázóval)
-    stock_context_str = _format_stock_data_from_model(stock_data_model)
-    prompt_parts.append(stock_context_str)
+    if sections is None or sections:
+        if stock_data_model is not None:
+            stock_context_str = _format_stock_data_from_model(stock_data_model, sections, token_budget)
+            if stock_context_str:
+                prompt_parts.append(stock_context_str)
+        else:
+            prompt_parts.append("--- Részvény Adat Kontextus ---\n  Nem elérhető\n\n")
     
     # 3. Beszélgetési előzmények
     history_str = _format_history_for_prompt(history)
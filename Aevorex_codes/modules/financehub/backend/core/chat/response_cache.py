@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""response_cache.py – válasz-gyorsítótár az ismétlődő chat kérdésekhez.
+
+Sok felhasználó percen belül szinte ugyanazt kérdezi („summary of AAPL”,
+„AAPL RSI?”), és mindegyik teljes LLM hívást indított. A kész választ itt
+eltároljuk a (ticker, QueryType, nyelv, modell-változat, aggregátum verzió,
+normalizált kérdés) kulcson. A normalizált kérdés a kisbetűs, írásjel nélküli,
+töltelékszó- és ticker-mentes tokenek rendezett halmaza, így a szórendben
+vagy töltelékszavakban eltérő kérdések pontos találatot adnak.
+
+Opcionális fuzzy egyezés: ugyanarra a kulcs-prefixre a legutóbbi kérdések
+token-halmazait egy kis indexben tartjuk, és a Jaccard-hasonlóság alapján
+(`fuzzy_threshold`) a legközelebbi tárolt választ adjuk vissza.
+
+Az aggregátum verzió a prémium válasz időbélyege; új aggregátum új kulcsot
+jelent, a régi bejegyzések pedig a TTL-lel (az aggregátum hátralévő friss
+élettartama) maguktól lejárnak. A találati arány az
+`fh_cache_hits_total{cache="chat_response"}` / `fh_cache_misses_total` számlálókon látszik.
+
+A modul a tárolót duck-typing-gal használja (`get_many(keys)` / `set(key, value, timeout_seconds=...)` /
+`set_many(mapping, timeout_seconds=...)`,
+pl. `CacheService`).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, FrozenSet, List, Optional
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ChatResponseCache", "CachedChatResponse", "aggregate_version", "normalize_question", "question_tokens"]
+
+CACHE_METRIC_LABEL = "chat_response"
+KEY_PREFIX = "chatresp:v1:"
+INDEX_KEY_PREFIX = "chatresp_idx:v1:"
+NO_DATA_VERSION = "nodata"
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_STOPWORDS: FrozenSet[str] = frozenset(
+    {
+        # angol
+        "a", "an", "the", "of", "for", "on", "in", "about", "is", "are", "what", "whats", "s",
+        "me", "please", "give", "show", "tell", "can", "you", "stock", "current", "currently",
+        # magyar
+        "az", "egy", "mi", "mit", "mennyi", "kérlek", "nekem", "van", "most", "jelenleg",
+        "részvény", "részvényről", "adj", "mondd", "milyen", "és",
+    }
+)
+
+
+def question_tokens(question: str, ticker: Optional[str] = None) -> FrozenSet[str]:
+    """A kérdés normalizált token-halmaza (a ticker és a töltelékszavak nélkül)."""
+    text = unicodedata.normalize("NFKC", question or "").lower()
+    ignored = set(_WORD_RE.findall(ticker.lower())) if ticker else set()
+    return frozenset(t for t in _WORD_RE.findall(text) if t not in _STOPWORDS and t not in ignored)
+
+
+def normalize_question(question: str, ticker: Optional[str] = None) -> str:
+    """Kanonikus kérdés-szöveg (rendezett tokenek); ebből képződik a pontos kulcs."""
+    return " ".join(sorted(question_tokens(question, ticker)))
+
+
+def _digest(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    if not left and not right:
+        return 1.0
+    union = len(left | right)
+    return len(left & right) / union if union else 0.0
+
+
+def _answer_from(cached: Any) -> Optional[str]:
+    if isinstance(cached, dict) and isinstance(cached.get("answer"), str):
+        return cached["answer"]
+    return None
+
+
+def _index_from(index: Any) -> List[dict]:
+    return [e for e in index if isinstance(e, dict)] if isinstance(index, list) else []
+
+
+def aggregate_version(stock_data_model: Any) -> str:
+    """Az aggregált részvényadat verziója (a prémium válasz időbélyege); adat nélkül `nodata`."""
+    timestamp = getattr(stock_data_model, "request_timestamp_utc", None) if stock_data_model is not None else None
+    if isinstance(timestamp, datetime):
+        return timestamp.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    return NO_DATA_VERSION
+
+
+def _record_metric(hit: bool) -> None:
+    try:
+        from modules.financehub.backend.core.metrics.prometheus_exporter import get_exporter
+
+        exporter = get_exporter()
+        if hit:
+            exporter.inc_hit(CACHE_METRIC_LABEL)
+        else:
+            exporter.inc_miss(CACHE_METRIC_LABEL)
+    except Exception:  # pragma: no cover – a metrika opcionális
+        pass
+
+
+@dataclass(frozen=True)
+class CachedChatResponse:
+    answer: str
+    fuzzy: bool = False
+    similarity: float = 1.0
+
+
+class ChatResponseCache:
+    """
+    Chat válaszok pontos és (opcionálisan) fuzzy gyorsítótára.
+
+    Args:
+        cache: Aszinkron kulcs-érték tároló (`CacheService`).
+        fuzzy_threshold: Minimális Jaccard-hasonlóság fuzzy találathoz; None: csak pontos egyezés.
+        max_index_entries: Kulcs-prefixenként ennyi kérdés token-halmazát tartjuk a fuzzy indexben.
+        min_ttl_seconds: Ennél rövidebb hátralévő élettartamnál nem tárolunk.
+        no_data_ttl_seconds: Aggregátum nélküli (pl. köszönés) válaszok TTL-je.
+    """
+
+    def __init__(
+        self,
+        cache: Any,
+        *,
+        fuzzy_threshold: Optional[float] = 0.8,
+        max_index_entries: int = 32,
+        min_ttl_seconds: int = 30,
+        no_data_ttl_seconds: int = 300,
+    ) -> None:
+        self.cache = cache
+        self.fuzzy_threshold = fuzzy_threshold
+        self.max_index_entries = max(1, int(max_index_entries))
+        self.min_ttl_seconds = int(min_ttl_seconds)
+        self.no_data_ttl_seconds = int(no_data_ttl_seconds)
+
+    @classmethod
+    def from_settings(cls, cache: Any) -> Optional["ChatResponseCache"]:
+        """A központi konfigurációból (`settings.CACHE.CHAT_RESPONSE_*`); kikapcsolt cache esetén None."""
+        from modules.financehub.backend.config import settings
+
+        cache_settings = settings.CACHE
+        if not cache_settings.ENABLED or not cache_settings.CHAT_RESPONSE_CACHE_ENABLED or cache is None:
+            return None
+        return cls(
+            cache,
+            fuzzy_threshold=cache_settings.CHAT_RESPONSE_FUZZY_THRESHOLD if cache_settings.CHAT_RESPONSE_FUZZY_ENABLED else None,
+            max_index_entries=cache_settings.CHAT_RESPONSE_FUZZY_INDEX_SIZE,
+            min_ttl_seconds=cache_settings.CHAT_RESPONSE_MIN_TTL_SECONDS,
+            no_data_ttl_seconds=cache_settings.CHAT_RESPONSE_NO_DATA_TTL_SECONDS,
+        )
+
+    # ------------------------------------------------------------------
+    # Kulcsok
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _scope(ticker: str, q_type: Any, language: str, variant: str, version: str) -> str:
+        q_type_value = getattr(q_type, "value", q_type)
+        return f"{ticker.upper()}:{q_type_value}:{language or 'unknown'}:{variant}:{version}"
+
+    def ttl_for(self, version: str, fresh_ttl_seconds: int, now: Optional[datetime] = None) -> int:
+        """
+        Az aggregátum hátralévő friss élettartama (a verzió időbélyegétől számítva);
+        adat nélküli válasznál `no_data_ttl_seconds`.
+        """
+        if version == NO_DATA_VERSION:
+            return self.no_data_ttl_seconds
+        try:
+            created = datetime.strptime(version, "%Y%m%dT%H%M%S").replace(tzinfo=timezone.utc)
+        except ValueError:
+            return 0
+        age = ((now or datetime.now(timezone.utc)) - created).total_seconds()
+        return max(0, int(fresh_ttl_seconds - age))
+
+    # ------------------------------------------------------------------
+    # Olvasás / írás
+    # ------------------------------------------------------------------
+    async def get(
+        self, ticker: str, q_type: Any, language: str, variant: str, version: str, question: str
+    ) -> Optional[CachedChatResponse]:
+        tokens = question_tokens(question, ticker)
+        if not tokens:
+            _record_metric(False)
+            return None
+        scope = self._scope(ticker, q_type, language, variant, version)
+        digest = _digest(" ".join(sorted(tokens)))
+
+        # A pontos bejegyzés és (fuzzy módban) az index egy körben
+        entry_key, index_key = f"{KEY_PREFIX}{scope}:{digest}", f"{INDEX_KEY_PREFIX}{scope}"
+        entries = await self._read_many([entry_key, index_key] if self.fuzzy_threshold is not None else [entry_key])
+        answer = _answer_from(entries.get(entry_key))
+        if answer is not None:
+            _record_metric(True)
+            return CachedChatResponse(answer=answer)
+
+        if self.fuzzy_threshold is not None:
+            best_digest, best_score = None, 0.0
+            for entry in _index_from(entries.get(index_key)):
+                score = _jaccard(tokens, frozenset(entry.get("t") or ()))
+                if score > best_score:
+                    best_digest, best_score = entry.get("k"), score
+            if best_digest and best_score >= self.fuzzy_threshold:
+                answer = await self._read_answer(scope, best_digest)
+                if answer is not None:
+                    logger.debug("Chat response fuzzy hit for %s (similarity %.2f).", scope, best_score)
+                    _record_metric(True)
+                    return CachedChatResponse(answer=answer, fuzzy=True, similarity=best_score)
+
+        _record_metric(False)
+        return None
+
+    async def set(
+        self,
+        ticker: str,
+        q_type: Any,
+        language: str,
+        variant: str,
+        version: str,
+        question: str,
+        answer: str,
+        fresh_ttl_seconds: int,
+    ) -> bool:
+        """A válasz tárolása; False, ha nem cache-elhető (üres kérdés/válasz, túl rövid élettartam)."""
+        tokens = question_tokens(question, ticker)
+        ttl = self.ttl_for(version, fresh_ttl_seconds)
+        if not tokens or not answer or not answer.strip() or ttl < self.min_ttl_seconds:
+            return False
+        scope = self._scope(ticker, q_type, language, variant, version)
+        sorted_tokens: List[str] = sorted(tokens)
+        digest = _digest(" ".join(sorted_tokens))
+        entry_key, index_key = f"{KEY_PREFIX}{scope}:{digest}", f"{INDEX_KEY_PREFIX}{scope}"
+        try:
+            if self.fuzzy_threshold is None:
+                stored = await self.cache.set(entry_key, {"answer": answer}, timeout_seconds=ttl)
+            else:
+                # A válasz és a frissített index egy pipeline-olt írásban
+                index = [e for e in _index_from((await self._read_many([index_key])).get(index_key)) if e.get("k") != digest]
+                index.append({"k": digest, "t": sorted_tokens})
+                stored = await self.cache.set_many(
+                    {entry_key: {"answer": answer}, index_key: index[-self.max_index_entries:]}, timeout_seconds=ttl
+                )
+            return bool(stored)
+        except Exception as e:
+            logger.debug("Chat response cache write failed for %s: %s", scope, e)
+            return False
+
+    async def _read_answer(self, scope: str, digest: str) -> Optional[str]:
+        key = f"{KEY_PREFIX}{scope}:{digest}"
+        return _answer_from((await self._read_many([key])).get(key))
+
+    async def _read_many(self, keys: List[str]) -> Dict[str, Any]:
+        try:
+            return await self.cache.get_many(keys)
+        except Exception as e:
+            logger.debug("Chat response cache read failed for %s: %s", keys, e)
+            return {}
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""sse_stream.py – OpenAI-kompatibilis (OpenRouter) SSE válaszfolyam feldolgozása.
+
+A `stream: true` kérések válasza `data: {...}` sorokból álló Server-Sent Events
+folyam; minden esemény egy `choices[0].delta.content` darabot hordoz, a végét
+`data: [DONE]` jelzi. A `:`-tal kezdődő sorok kommentek (az OpenRouter ezzel
+tartja életben a kapcsolatot). A modul I/O-mentes: sorokat kap, delta
+szövegeket ad vissza, így a hálózati rétegtől függetlenül tesztelhető.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
+
+__all__ = ["SSEStreamError", "iter_sse_deltas", "parse_sse_event"]
+
+DONE_MARKER = "[DONE]"
+
+
+class SSEStreamError(RuntimeError):
+    """Az upstream a folyamon belül hibát jelzett (`{"error": {...}}` esemény)."""
+
+
+def parse_sse_event(data: str) -> Optional[str]:
+    """
+    Egy esemény `data` tartalmából a delta szöveg (None, ha nincs benne tartalom).
+
+    Raises:
+        SSEStreamError: Ha az esemény upstream hibát hordoz.
+    """
+    try:
+        event: Dict[str, Any] = json.loads(data)
+    except ValueError:
+        return None
+    if not isinstance(event, dict):
+        return None
+    error = event.get("error")
+    if error:
+        message = error.get("message") if isinstance(error, dict) else str(error)
+        raise SSEStreamError(message or "Upstream stream error")
+    choices = event.get("choices")
+    if not choices or not isinstance(choices, list) or not isinstance(choices[0], dict):
+        return None
+    delta = choices[0].get("delta") or {}
+    content = delta.get("content") if isinstance(delta, dict) else None
+    return content or None
+
+
+async def iter_sse_deltas(lines: AsyncIterator[str]) -> AsyncGenerator[str, None]:
+    """Sorokból (pl. `httpx.Response.aiter_lines()`) a delta szövegek, érkezési sorrendben."""
+    data_lines: List[str] = []
+    async for raw_line in lines:
+        line = raw_line.rstrip("\r")
+        if not line:
+            # Üres sor: esemény vége
+            if data_lines:
+                data = "\n".join(data_lines)
+                data_lines = []
+                if data.strip() == DONE_MARKER:
+                    return
+                content = parse_sse_event(data)
+                if content:
+                    yield content
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data_lines.append(value[1:] if value.startswith(" ") else value)
+
+    # Lezáró üres sor nélkül véget ért folyam
+    if data_lines:
+        data = "\n".join(data_lines)
+        if data.strip() != DONE_MARKER:
+            content = parse_sse_event(data)
+            if content:
+                yield content
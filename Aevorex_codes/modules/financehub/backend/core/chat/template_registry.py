@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""template_registry.py – előfordított, folyamaton belüli Jinja2 prompt sablonok.
+
+Korábban a sablonfájlokat kérésenként olvastuk be, a `QueryType` -> fájlnév
+leképezés pedig Redis kört igényelt. Itt induláskor egyszer lefordítjuk a
+`prompt_templates/**/*.j2` sablonokat egy `jinja2.Environment`-be (bytecode
+cache-sel, így a workerek újraindításkor sem fordítanak újra változatlan
+forrást), a kérdéstípus -> lefordított sablon feloldás pedig dict lookup.
+
+Hot reload: a `watch()` task megadott időközönként összeveti a fájlok mtime-ját,
+és csak a megváltozott / új sablonokat fordítja újra (a törölteket eltávolítja),
+újraindítás nélkül.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import jinja2
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["TemplateRegistry", "get_template_registry", "TEMPLATE_ROOT"]
+
+# backend/prompt_templates/financehub
+TEMPLATE_ROOT = Path(__file__).resolve().parents[2] / "prompt_templates" / "financehub"
+TEMPLATE_SUFFIX = ".j2"
+DEFAULT_BYTECODE_CACHE_DIR = Path(tempfile.gettempdir()) / "financehub_jinja_bytecode"
+
+
+class TemplateRegistry:
+    """
+    Lefordított Jinja2 sablonok a `root` alatti relatív nevükön (pl. "rapid/summary_rapid.j2").
+
+    Args:
+        root: A sablonkönyvtár gyökere.
+        bytecode_cache_dir: A Jinja2 bytecode cache könyvtára; None esetén nincs lemezes cache.
+    """
+
+    def __init__(self, root: Path = TEMPLATE_ROOT, bytecode_cache_dir: Optional[Path] = None) -> None:
+        self.root = Path(root)
+        bytecode_cache = None
+        if bytecode_cache_dir is not None:
+            try:
+                Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+                bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_cache_dir))
+            except OSError as e:
+                logger.warning("Jinja2 bytecode cache dir '%s' unusable, compiling without it: %s", bytecode_cache_dir, e)
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(str(self.root)),
+            bytecode_cache=bytecode_cache,
+            auto_reload=False,  # a frissítést a mtime polling végzi, nem minden get_template hívás
+            keep_trailing_newline=True,
+        )
+        self._templates: Dict[str, jinja2.Template] = {}
+        self._mtimes: Dict[str, int] = {}
+        self._watch_task: Optional["asyncio.Task[None]"] = None
+
+    # ------------------------------------------------------------------
+    # Betöltés és frissítés
+    # ------------------------------------------------------------------
+    def _scan(self) -> Dict[str, int]:
+        """Relatív sablonnév -> mtime (ns) a könyvtár jelenlegi állapotában."""
+        found: Dict[str, int] = {}
+        if not self.root.is_dir():
+            return found
+        for path in self.root.rglob(f"*{TEMPLATE_SUFFIX}"):
+            try:
+                found[path.relative_to(self.root).as_posix()] = path.stat().st_mtime_ns
+            except OSError:
+                continue
+        return found
+
+    def _compile(self, name: str) -> bool:
+        try:
+            self._templates[name] = self.env.get_template(name)
+            return True
+        except jinja2.TemplateError as e:
+            # Hibás szerkesztésnél a korábbi (működő) változat marad érvényben
+            logger.error("Prompt template '%s' failed to compile: %s", name, e)
+            return False
+
+    def load_all(self) -> int:
+        """Minden sablon (újra)fordítása; visszaadja a sikeresen lefordítottak számát."""
+        if self.env.cache is not None:
+            self.env.cache.clear()
+        current = self._scan()
+        self._templates = {name: tpl for name, tpl in self._templates.items() if name in current}
+        compiled = sum(1 for name in current if self._compile(name))
+        self._mtimes = current
+        logger.info("Prompt template registry loaded %d/%d templates from %s.", compiled, len(current), self.root)
+        return compiled
+
+    def refresh(self) -> Tuple[List[str], List[str]]:
+        """
+        A megváltozott / új sablonok újrafordítása, a töröltek eltávolítása.
+
+        Returns:
+            (újrafordított nevek, eltávolított nevek)
+        """
+        current = self._scan()
+        changed = [name for name, mtime in current.items() if self._mtimes.get(name) != mtime]
+        removed = [name for name in self._mtimes if name not in current]
+        if not changed and not removed:
+            return [], []
+        if self.env.cache is not None:
+            self.env.cache.clear()
+        for name in removed:
+            self._templates.pop(name, None)
+        reloaded = [name for name in changed if self._compile(name)]
+        self._mtimes = current
+        logger.info("Prompt templates hot-reloaded: changed=%s removed=%s", reloaded, removed)
+        return reloaded, removed
+
+    # ------------------------------------------------------------------
+    # Lekérdezés
+    # ------------------------------------------------------------------
+    def get(self, name: str) -> Optional[jinja2.Template]:
+        return self._templates.get(name)
+
+    def render(self, name: str, **context: Any) -> Optional[str]:
+        """A sablon renderelt szövege, vagy None, ha nincs ilyen (lefordított) sablon."""
+        template = self._templates.get(name)
+        if template is None:
+            return None
+        try:
+            return template.render(**context).strip()
+        except jinja2.TemplateError as e:
+            logger.error("Prompt template '%s' failed to render: %s", name, e)
+            return None
+
+    def names(self) -> List[str]:
+        return sorted(self._templates)
+
+    # ------------------------------------------------------------------
+    # Hot reload
+    # ------------------------------------------------------------------
+    async def watch(self, interval_seconds: float) -> None:
+        """Végtelen mtime-polling ciklus (taskként futtatandó)."""
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                self.refresh()
+            except Exception as e:  # pragma: no cover – a polling nem állhat le egy hibán
+                logger.warning("Prompt template refresh failed: %s", e)
+
+    def start_watching(self, interval_seconds: float) -> None:
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.get_running_loop().create_task(self.watch(interval_seconds))
+
+    async def stop_watching(self) -> None:
+        task, self._watch_task = self._watch_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+
+_REGISTRY: Optional[TemplateRegistry] = None
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Folyamatszintű registry (első híváskor fordít mindent; a beállítások `settings.AI.PROMPT_TEMPLATE_*`)."""
+    global _REGISTRY
+    if _REGISTRY is None:
+        from modules.financehub.backend.config import settings
+
+        cache_dir = settings.AI.PROMPT_TEMPLATE_BYTECODE_CACHE_DIR
+        registry = TemplateRegistry(
+            TEMPLATE_ROOT,
+            bytecode_cache_dir=Path(cache_dir) if cache_dir else DEFAULT_BYTECODE_CACHE_DIR,
+        )
+        registry.load_all()
+        _REGISTRY = registry
+    return _REGISTRY
@@ -1,17 +1,20 @@
 # -*- coding: utf-8 -*-
 """template_router.py – FinanceHub Prompt-Pipeline Fázis 1
 
-Feladat: kérés‐típus (QueryType) → sablonfájl nevének meghatározása, 
- + Redis alapú 60 s TTL gyorsítótár.
+Feladat: kérés‐típus (QueryType) → lefordított sablon meghatározása.
+A leképezés egy dict lookup a folyamaton belüli `TemplateRegistry`-ben
+(korábban kérésenként Redis kör volt a fájlnév feloldásához).
 """
 
 from __future__ import annotations
 
 import logging
-from enum import Enum
-from typing import Optional
+from typing import Any, Optional
+
+import jinja2
 
 from modules.financehub.backend.core.chat.query_classifier import QueryType
+from modules.financehub.backend.core.chat.template_registry import TemplateRegistry, get_template_registry
 
 logger = logging.getLogger(__name__)
 
@@ -25,30 +28,33 @@ _TEMPLATE_MAP = {
     QueryType.unknown: "summary_rapid.j2",
 }
 
-CACHE_KEY_PREFIX = "tpl:"  # Redis kulcs prefix
-CACHE_TTL = 60  # másodperc
+RAPID_TEMPLATE_DIR = "rapid"
+DEFAULT_RAPID_TEMPLATE = "summary_rapid.j2"
+SYSTEM_TEMPLATE = "system/lite_system_prompt.j2"
+
 
 class TemplateRouter:
-    """Vékony absztrakció sablon‐névkéréshez."""
-
-    def __init__(self, cache):
-        """cache: CacheService példány (get/set/exists) interface"""
-        self.cache = cache
-
-    async def get_template(self, q_type: QueryType) -> str:
-        cache_key = f"{CACHE_KEY_PREFIX}{q_type.value}"
-        try:
-            cached: Optional[str] = await self.cache.get(cache_key)
-            if cached:
-                logger.debug("TemplateRouter cache hit -> %s", cached)
-                return cached
-        except Exception as e:  # noqa
-            logger.debug("TemplateRouter cache read err: %s", e)
-
-        tpl = _TEMPLATE_MAP.get(q_type, "summary_rapid.j2")
-
-        try:
-            await self.cache.set(cache_key, tpl, timeout_seconds=CACHE_TTL)
-        except Exception as e:  # noqa
-            logger.debug("TemplateRouter cache write err: %s", e)
-        return tpl 
\ No newline at end of file
+    """Vékony absztrakció sablon‐kéréshez."""
+
+    def __init__(self, registry: Optional[TemplateRegistry] = None):
+        self.registry = registry or get_template_registry()
+
+    @staticmethod
+    def template_name(q_type: QueryType) -> str:
+        """A kérdéstípus rapid sablonjának registry-beli neve (pl. "rapid/news_rapid.j2")."""
+        return f"{RAPID_TEMPLATE_DIR}/{_TEMPLATE_MAP.get(q_type, DEFAULT_RAPID_TEMPLATE)}"
+
+    def get_template(self, q_type: QueryType) -> Optional[jinja2.Template]:
+        return self.registry.get(self.template_name(q_type))
+
+    def render_system_message(self, q_type: QueryType, **context: Any) -> Optional[str]:
+        """
+        A rapid rendszerüzenet: a közös FinBot rendszerprompt + a kérdéstípus sablonja.
+        None, ha a típus sablonja nem érhető el (a hívó a default sablonra esik vissza).
+        """
+        instructions = self.registry.render(self.template_name(q_type), **context)
+        if instructions is None:
+            logger.warning("Rapid template for %s not available in registry.", q_type)
+            return None
+        system_prompt = self.registry.render(SYSTEM_TEMPLATE, **context)
+        return f"{system_prompt}\n\n{instructions}" if system_prompt else instructions
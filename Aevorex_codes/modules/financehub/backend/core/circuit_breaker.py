@@ -0,0 +1,271 @@
+# backend/core/circuit_breaker.py
+"""
+Szolgáltatónkénti circuit breaker a külső adatforrásokhoz.
+
+Minden szolgáltató (EODHD, FMP, MarketAux, NewsAPI, Alpha Vantage, yfinance)
+hívásainak kimenetét és késleltetését gördülő időablakban követjük. Ha az
+ablakban elég hívás volt, és a hibaarány vagy a lassú hívások aránya átlépi a
+küszöböt, a breaker `open_seconds` időre kinyit: ilyenkor a fetcherek élő
+kérés nélkül azonnal None-t adnak, az orchestrator pedig egyből a következő
+egészséges forrást választja, ahelyett hogy kivárná az időtúllépést.
+
+A nyitási idő lejárta után (half-open) egyetlen próba hívás mehet át
+(`try_acquire`); amíg az eredménye meg nem érkezik, a többi hívást a breaker
+elutasítja. A próba dönt: siker esetén a breaker zár, hiba esetén újra kinyit.
+Ha a próba végül el sem indul (pl. rate limit időtúllépés), a hívó
+`release`-szel azonnal visszaadja; ha az eredménye `open_seconds` alatt sem
+érkezik meg, a következő hívó kaphatja meg a próbát.
+
+A nyitott állapot (meddig, miért) Redisben is megjelenik
+(`<key_prefix><provider>`), így egy worker nyitása a többire is érvényes;
+a workerek legfeljebb `remote_refresh_seconds` késéssel látják egymás állapotát.
+"""
+
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from modules.financehub.backend.utils.logger_config import get_logger
+
+logger = get_logger(__name__)
+MODULE_PREFIX = "[CircuitBreaker]"
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class CircuitBreakerConfig:
+    """A breaker küszöbei (egy közös beállítás minden szolgáltatóra)."""
+
+    window_seconds: float = 60.0
+    min_calls: int = 8
+    error_rate_threshold: float = 0.5
+    slow_call_seconds: float = 8.0
+    slow_rate_threshold: float = 0.8
+    open_seconds: float = 30.0
+
+
+class ProviderCircuitBreaker:
+    """Egy szolgáltató gördülő ablakos breakere (folyamaton belüli állapot)."""
+
+    def __init__(self, provider: str, config: CircuitBreakerConfig, clock: Callable[[], float] = time.time):
+        self.provider = provider
+        self.config = config
+        self._clock = clock
+        self._calls: Deque[Tuple[float, bool, float]] = deque()  # (időpont, siker, késleltetés)
+        self.open_until = 0.0
+        self.open_reason: Optional[str] = None
+        self.times_opened = 0
+        self.probe_in_flight = False
+        self._probe_started_at = 0.0
+
+    @property
+    def state(self) -> str:
+        if not self.open_until:
+            return STATE_CLOSED
+        return STATE_OPEN if self._clock() < self.open_until else STATE_HALF_OPEN
+
+    def _probe_pending(self) -> bool:
+        return self.probe_in_flight and self._clock() - self._probe_started_at < self.config.open_seconds
+
+    def allows_calls(self) -> bool:
+        """Útválasztáshoz (nem foglal próbát): False nyitott állapotban és futó half-open próba alatt."""
+        state = self.state
+        if state == STATE_OPEN:
+            return False
+        return state == STATE_CLOSED or not self._probe_pending()
+
+    def try_acquire(self) -> bool:
+        """Híváskapu: zárt állapotban mindig átenged, half-openben csak egyetlen próbát (a `record`-ig)."""
+        if not self.allows_calls():
+            return False
+        if self.state == STATE_HALF_OPEN:
+            self.probe_in_flight = True
+            self._probe_started_at = self._clock()
+        return True
+
+    def release_probe(self) -> None:
+        """A `try_acquire` által foglalt próba visszaadása, ha a hívás végül el sem indult (nincs rögzítendő eredmény)."""
+        self.probe_in_flight = False
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.config.window_seconds
+        while self._calls and self._calls[0][0] < horizon:
+            self._calls.popleft()
+
+    def stats(self) -> Dict[str, Any]:
+        self._trim(self._clock())
+        total = len(self._calls)
+        errors = sum(1 for _ts, ok, _lat in self._calls if not ok)
+        slow = sum(1 for _ts, _ok, latency in self._calls if latency >= self.config.slow_call_seconds)
+        avg_latency = sum(latency for _ts, _ok, latency in self._calls) / total if total else 0.0
+        return {
+            "calls": total,
+            "error_rate": round(errors / total, 3) if total else 0.0,
+            "slow_rate": round(slow / total, 3) if total else 0.0,
+            "avg_latency_seconds": round(avg_latency, 3),
+        }
+
+    def open(self, until: float, reason: str) -> None:
+        if until <= self.open_until:
+            return
+        self.open_until = until
+        self.open_reason = reason
+        self.times_opened += 1
+        self.probe_in_flight = False
+
+    def record(self, success: bool, latency: float) -> bool:
+        """
+        Egy hívás eredményének rögzítése.
+
+        Returns:
+            True, ha ez a hívás nyitotta ki a breakert (a hívó ezt teszi közzé a többi workernek).
+        """
+        now = self._clock()
+        state = self.state
+        if state == STATE_HALF_OPEN:
+            self.probe_in_flight = False
+            if success:
+                logger.info(f"{MODULE_PREFIX} '{self.provider}' recovered; closing breaker.")
+                self.open_until = 0.0
+                self.open_reason = None
+                self._calls.clear()
+            else:
+                self.open(now + self.config.open_seconds, "half-open probe failed")
+                logger.warning(f"{MODULE_PREFIX} '{self.provider}' probe failed; breaker re-opened for {self.config.open_seconds:.0f}s.")
+                return True
+            return False
+
+        self._calls.append((now, success, latency))
+        if state == STATE_OPEN:
+            return False
+        stats = self.stats()
+        if stats["calls"] < self.config.min_calls:
+            return False
+        reason = None
+        if stats["error_rate"] >= self.config.error_rate_threshold:
+            reason = f"error rate {stats['error_rate']:.0%} over {stats['calls']} calls"
+        elif stats["slow_rate"] >= self.config.slow_rate_threshold:
+            reason = f"{stats['slow_rate']:.0%} of {stats['calls']} calls slower than {self.config.slow_call_seconds:.1f}s"
+        if reason is None:
+            return False
+        self.open(now + self.config.open_seconds, reason)
+        self._calls.clear()
+        logger.warning(f"{MODULE_PREFIX} '{self.provider}' breaker OPEN for {self.config.open_seconds:.0f}s: {reason}.")
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        snapshot: Dict[str, Any] = {"state": state, **self.stats(), "times_opened": self.times_opened}
+        if state != STATE_CLOSED:
+            snapshot["open_until"] = self.open_until
+            snapshot["reason"] = self.open_reason
+        if state == STATE_HALF_OPEN:
+            snapshot["probe_in_flight"] = self._probe_pending()
+        return snapshot
+
+
+class CircuitBreakerRegistry:
+    """
+    Szolgáltató -> breaker, opcionálisan Redisben megosztott nyitott állapottal.
+
+    Args:
+        config: A breakerek küszöbei.
+        redis_client: `redis.asyncio` kliens (decode_responses=True); None: csak folyamaton belül.
+        key_prefix: Redis kulcs prefix a nyitott állapothoz.
+        remote_refresh_seconds: Szolgáltatónként legfeljebb ilyen gyakran olvassuk a Redis állapotot.
+        clock: Falióra (a nyitási határidő workerek között is összevethető legyen).
+    """
+
+    def __init__(
+        self,
+        config: Optional[CircuitBreakerConfig] = None,
+        redis_client: Any = None,
+        key_prefix: str = "circuit:v1:",
+        remote_refresh_seconds: float = 2.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.config = config or CircuitBreakerConfig()
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.remote_refresh_seconds = remote_refresh_seconds
+        self._clock = clock
+        self._breakers: Dict[str, ProviderCircuitBreaker] = {}
+        self._remote_checked_at: Dict[str, float] = {}
+
+    def get(self, provider: str) -> ProviderCircuitBreaker:
+        breaker = self._breakers.get(provider)
+        if breaker is None:
+            breaker = self._breakers[provider] = ProviderCircuitBreaker(provider, self.config, clock=self._clock)
+        return breaker
+
+    async def _refresh_remote(self, provider: str) -> None:
+        if self.redis_client is None:
+            return
+        now = self._clock()
+        if now - self._remote_checked_at.get(provider, 0.0) < self.remote_refresh_seconds:
+            return
+        self._remote_checked_at[provider] = now
+        try:
+            raw = await self.redis_client.get(f"{self.key_prefix}{provider}")
+        except Exception as e:
+            logger.debug(f"{MODULE_PREFIX} Could not read shared breaker state for '{provider}': {e}")
+            return
+        if not raw:
+            return
+        try:
+            remote = json.loads(raw)
+            self.get(provider).open(float(remote["open_until"]), f"{remote.get('reason')} (shared)")
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug(f"{MODULE_PREFIX} Ignoring malformed shared breaker state for '{provider}': {e}")
+
+    async def _publish_open(self, breaker: ProviderCircuitBreaker) -> None:
+        if self.redis_client is None:
+            return
+        ttl_ms = max(1, int((breaker.open_until - self._clock()) * 1000))
+        payload = json.dumps({"open_until": breaker.open_until, "reason": breaker.open_reason})
+        try:
+            await self.redis_client.set(f"{self.key_prefix}{breaker.provider}", payload, px=ttl_ms)
+        except Exception as e:
+            logger.debug(f"{MODULE_PREFIX} Could not publish breaker state for '{breaker.provider}': {e}")
+
+    async def is_available(self, provider: Optional[str]) -> bool:
+        """False, ha a szolgáltató breakere (ebben vagy egy másik workerben) nyitva van; nem foglal próbát."""
+        if not provider:
+            return True
+        await self._refresh_remote(provider)
+        return self.get(provider).allows_calls()
+
+    async def acquire(self, provider: Optional[str]) -> bool:
+        """Mint `is_available`, de half-open állapotban ez a hívás kapja a próbát (a többi False-t kap)."""
+        if not provider:
+            return True
+        await self._refresh_remote(provider)
+        return self.get(provider).try_acquire()
+
+    def release(self, provider: Optional[str]) -> None:
+        """Az `acquire`-rel foglalt half-open próba visszaadása élő hívás nélkül."""
+        if provider and provider in self._breakers:
+            self._breakers[provider].release_probe()
+
+    async def record(self, provider: Optional[str], success: bool, latency: float) -> None:
+        if not provider:
+            return
+        breaker = self.get(provider)
+        if breaker.record(success, latency):
+            await self._publish_open(breaker)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Szolgáltatónkénti állapot a health végponthoz."""
+        return {provider: breaker.snapshot() for provider, breaker in sorted(self._breakers.items())}
+
+    async def shared_snapshot(self, providers: Iterable[str] = ()) -> Dict[str, Dict[str, Any]]:
+        """Mint `snapshot`, de előtte a megadott (és az eddig látott) szolgáltatók Redis állapotát is beolvassa."""
+        for provider in set(providers) | set(self._breakers):
+            await self._refresh_remote(provider)
+            self.get(provider)
+        return self.snapshot()
@@ -0,0 +1,333 @@
+# backend/core/dataframe_codec.py
+"""
+Oszlopos (columnar) bináris DataFrame kódoló a Redis cache-hez.
+
+A korábbi megoldás (`_serialize_dataframe_for_cache` a yfinance/eodhd
+fetcherekben) minden időbélyeget Python szinten ISO stringgé alakított, majd
+a `to_dict(orient='split')` eredményét `json.dumps`-olta. Hosszú napi és
+intraday OHLCV idősoroknál ez dominálta a CPU időt cache hit és miss esetén is.
+
+Ez a modul egy egyszerű, verziózott bináris formátumot ad:
+
+    MAGIC (4 bájt) | fejléc hossza (uint32, little-endian) | JSON fejléc | oszlop bufferek
+
+- Az index DatetimeIndex esetén int64 epoch nanoszekundumként tárolódik
+  (időzóna a fejlécben), egyébként JSON listaként.
+- A numerikus / bool / datetime oszlopok nyers NumPy bufferekként kerülnek
+  be (`tobytes` / `frombuffer`), a nullable pandas típusok külön maszkkal.
+- Minden más (object) oszlop JSON listaként kerül a bufferbe.
+- A `DataFrame.attrs` skalár értékei a fejlécben utaznak.
+
+Használat:
+    payload = encode_dataframe(df)
+    await cache.set_bytes(key, payload, timeout_seconds=ttl)
+    ...
+    entry = decode_cache_entry(await cache.get_bytes(key))
+    if isinstance(entry, pd.DataFrame): ...
+
+Megjegyzés:
+    - A modul szándékosan nem importálja a CacheService-t futásidőben
+      (a cache_service modul Redis nélkül kilép), csak típusellenőrzéshez.
+"""
+
+import json
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from modules.financehub.backend.utils.logger_config import get_logger
+
+if TYPE_CHECKING:
+    from modules.financehub.backend.core.cache_service import CacheService
+
+logger = get_logger(__name__)
+MODULE_PREFIX = "[DataFrameCodec]"
+
+# --- Formátum Konstansok ---
+CODEC_MAGIC: bytes = b"FHC1"
+CODEC_VERSION: int = 1
+# A cache kulcsokba ez a címke kerül, így formátumváltáskor a régi bejegyzések
+# automatikusan "elárvulnak" és migrálhatók.
+CODEC_CACHE_TAG: str = f"col{CODEC_VERSION}"
+
+_HEADER_LEN_STRUCT = struct.Struct("<I")
+_PREFIX_LEN = len(CODEC_MAGIC) + _HEADER_LEN_STRUCT.size
+
+# Nullable pandas kiterjesztett típusok -> (NumPy tároló típus, kitöltő érték)
+_NULLABLE_DTYPES: Dict[str, Tuple[str, Any]] = {
+    "Int8": ("int8", 0), "Int16": ("int16", 0), "Int32": ("int32", 0), "Int64": ("int64", 0),
+    "UInt8": ("uint8", 0), "UInt16": ("uint16", 0), "UInt32": ("uint32", 0), "UInt64": ("uint64", 0),
+    "Float32": ("float32", np.nan), "Float64": ("float64", np.nan),
+    "boolean": ("bool", False),
+}
+
+
+class DataFrameCodecError(ValueError):
+    """Érvénytelen vagy sérült kódolt DataFrame payload."""
+
+
+# =============================================================================
+# Kódolás
+# =============================================================================
+def _encode_axis(axis: pd.Index, buffers: List[bytes]) -> Dict[str, Any]:
+    """Egy index (vagy oszlopnevek) tengely leíróját állítja elő."""
+    meta: Dict[str, Any] = {"name": axis.name}
+    if isinstance(axis, pd.DatetimeIndex):
+        # asi8: tz-aware esetén is UTC epoch (az index egységében), NaT -> iNaT (int64 min)
+        values = np.ascontiguousarray(axis.asi8, dtype="<i8")
+        meta.update(kind="datetime", tz=str(axis.tz) if axis.tz is not None else None,
+                    unit=getattr(axis, "unit", "ns"), nbytes=values.nbytes)
+        buffers.append(values.tobytes())
+    else:
+        raw = _dump_json_list(axis.tolist())
+        meta.update(kind="json", dtype=str(axis.dtype), nbytes=len(raw))
+        buffers.append(raw)
+    return meta
+
+
+def _to_json_scalar(value: Any) -> Any:
+    """JSON-barát skalárrá alakít (NaN/NaT/NA -> None, Timestamp -> ISO)."""
+    if value is None:
+        return None
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return None if pd.isna(value) else pd.Timestamp(value).isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:  # NaN
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def _dump_json_list(values: List[Any]) -> bytes:
+    return json.dumps([_to_json_scalar(v) for v in values], default=str).encode("utf-8")
+
+
+def _encode_column(series: pd.Series, buffers: List[bytes]) -> Dict[str, Any]:
+    """Egy oszlop leíróját állítja elő és hozzáfűzi a buffer(eke)t."""
+    dtype = series.dtype
+    dtype_name = str(dtype)
+
+    if isinstance(dtype, pd.DatetimeTZDtype) or pd.api.types.is_datetime64_dtype(dtype):
+        idx = pd.DatetimeIndex(series)
+        values = np.ascontiguousarray(idx.asi8, dtype="<i8")
+        buffers.append(values.tobytes())
+        return {"kind": "datetime", "tz": str(idx.tz) if idx.tz is not None else None,
+                "unit": getattr(idx, "unit", "ns"), "nbytes": values.nbytes}
+
+    if dtype_name in _NULLABLE_DTYPES:
+        storage_dtype, fill_value = _NULLABLE_DTYPES[dtype_name]
+        mask = np.ascontiguousarray(series.isna().to_numpy(), dtype="bool")
+        values = np.ascontiguousarray(series.to_numpy(dtype=storage_dtype, na_value=fill_value))
+        buffers.append(values.tobytes())
+        buffers.append(mask.tobytes())
+        return {"kind": "masked", "dtype": dtype_name, "storage": values.dtype.str,
+                "nbytes": values.nbytes, "mask_nbytes": mask.nbytes}
+
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        values = np.ascontiguousarray(series.to_numpy())
+        buffers.append(values.tobytes())
+        return {"kind": "numpy", "dtype": values.dtype.str, "nbytes": values.nbytes}
+
+    # Fallback: object / string / category / vegyes -> JSON lista
+    raw = _dump_json_list(series.tolist())
+    buffers.append(raw)
+    return {"kind": "json", "dtype": dtype_name, "nbytes": len(raw)}
+
+
+def encode_dataframe(df: pd.DataFrame) -> bytes:
+    """
+    Bináris, oszlopos formátumba kódol egy DataFrame-et.
+
+    Args:
+        df: A kódolandó DataFrame. Egyszintű (nem MultiIndex) index és
+            oszlopnevek támogatottak.
+
+    Returns:
+        A kódolt payload bájtokként.
+
+    Raises:
+        DataFrameCodecError: Ha a DataFrame szerkezete nem támogatott.
+    """
+    if not isinstance(df, pd.DataFrame):
+        raise DataFrameCodecError(f"Expected DataFrame, got {type(df).__name__}.")
+    if isinstance(df.index, pd.MultiIndex) or isinstance(df.columns, pd.MultiIndex):
+        raise DataFrameCodecError("MultiIndex axes are not supported by the columnar codec.")
+    if not df.columns.is_unique:
+        raise DataFrameCodecError("Duplicate column names are not supported by the columnar codec.")
+
+    buffers: List[bytes] = []
+    header: Dict[str, Any] = {
+        "v": CODEC_VERSION,
+        "rows": int(len(df)),
+        "index": _encode_axis(df.index, buffers),
+        "columns_axis": _encode_axis(df.columns, buffers),
+        "columns": [],
+    }
+    for position in range(df.shape[1]):
+        header["columns"].append(_encode_column(df.iloc[:, position], buffers))
+    # Egyszerű (JSON skalár) metaadatok a `DataFrame.attrs`-ból, pl. OHLCV history lefedettség
+    attrs = {k: v for k, v in df.attrs.items() if isinstance(k, str) and isinstance(v, (str, int, float, bool))}
+    if attrs:
+        header["attrs"] = attrs
+
+    header_bytes = json.dumps(header, separators=(",", ":"), default=str).encode("utf-8")
+    return b"".join([CODEC_MAGIC, _HEADER_LEN_STRUCT.pack(len(header_bytes)), header_bytes, *buffers])
+
+
+# =============================================================================
+# Dekódolás
+# =============================================================================
+def is_encoded_dataframe(payload: Any) -> bool:
+    """True, ha a payload ennek a kodeknek a formátumában van."""
+    return isinstance(payload, (bytes, bytearray, memoryview)) and bytes(payload[:len(CODEC_MAGIC)]) == CODEC_MAGIC
+
+
+def _decode_datetime(values: np.ndarray, meta: Dict[str, Any]) -> pd.DatetimeIndex:
+    unit = meta.get("unit") or "ns"
+    result = pd.DatetimeIndex(values.view(f"M8[{unit}]"))
+    tz = meta.get("tz")
+    if tz:
+        result = result.tz_localize("UTC").tz_convert(tz)
+    return result
+
+
+def _decode_axis(meta: Dict[str, Any], view: memoryview, offset: int) -> Tuple[pd.Index, int]:
+    nbytes = meta["nbytes"]
+    chunk = view[offset:offset + nbytes]
+    if meta["kind"] == "datetime":
+        axis = _decode_datetime(np.frombuffer(chunk, dtype="<i8"), meta)
+    else:
+        values = json.loads(bytes(chunk).decode("utf-8"))
+        axis = pd.Index(values) if values else pd.Index([], dtype="object")
+    axis.name = meta.get("name")
+    return axis, offset + nbytes
+
+
+def _decode_column(meta: Dict[str, Any], view: memoryview, offset: int, index: pd.Index) -> Tuple[pd.Series, int]:
+    kind = meta["kind"]
+    nbytes = meta["nbytes"]
+    chunk = view[offset:offset + nbytes]
+    offset += nbytes
+
+    if kind == "numpy":
+        # copy(): a frombuffer csak olvasható nézetet ad, a hívók módosíthatják az adatot
+        values = np.frombuffer(chunk, dtype=np.dtype(meta["dtype"])).copy()
+        return pd.Series(values, index=index, copy=False), offset
+    if kind == "datetime":
+        values = _decode_datetime(np.frombuffer(chunk, dtype="<i8"), meta)
+        return pd.Series(values, index=index), offset
+    if kind == "masked":
+        mask_nbytes = meta["mask_nbytes"]
+        mask = np.frombuffer(view[offset:offset + mask_nbytes], dtype="bool").copy()
+        offset += mask_nbytes
+        values = np.frombuffer(chunk, dtype=np.dtype(meta["storage"])).copy()
+        array = pd.array(values, dtype=meta["dtype"])
+        array[mask] = pd.NA
+        return pd.Series(array, index=index), offset
+    if kind == "json":
+        values = json.loads(bytes(chunk).decode("utf-8"))
+        series = pd.Series(values, index=index, dtype="object")
+        return series, offset
+    raise DataFrameCodecError(f"Unknown column encoding '{kind}'.")
+
+
+def decode_dataframe(payload: bytes) -> pd.DataFrame:
+    """
+    Visszaalakít egy `encode_dataframe` által előállított payloadot.
+
+    Raises:
+        DataFrameCodecError: Ha a payload sérült vagy ismeretlen verziójú.
+    """
+    if not is_encoded_dataframe(payload):
+        raise DataFrameCodecError("Payload does not start with the columnar codec magic bytes.")
+    view = memoryview(payload)
+    try:
+        (header_len,) = _HEADER_LEN_STRUCT.unpack_from(view, len(CODEC_MAGIC))
+        header = json.loads(bytes(view[_PREFIX_LEN:_PREFIX_LEN + header_len]).decode("utf-8"))
+        if header.get("v") != CODEC_VERSION:
+            raise DataFrameCodecError(f"Unsupported codec version {header.get('v')} (expected {CODEC_VERSION}).")
+
+        offset = _PREFIX_LEN + header_len
+        index, offset = _decode_axis(header["index"], view, offset)
+        columns_axis, offset = _decode_axis(header["columns_axis"], view, offset)
+
+        data: Dict[int, pd.Series] = {}
+        for position, column_meta in enumerate(header["columns"]):
+            data[position], offset = _decode_column(column_meta, view, offset, index)
+
+        if offset != len(view):
+            raise DataFrameCodecError(f"Trailing or missing bytes in payload (consumed {offset} of {len(view)}).")
+
+        df = pd.DataFrame(data, index=index) if data else pd.DataFrame(index=index)
+        df.columns = columns_axis
+        if header.get("attrs"):
+            df.attrs.update(header["attrs"])
+        return df
+    except DataFrameCodecError:
+        raise
+    except (KeyError, ValueError, TypeError, struct.error) as e:
+        raise DataFrameCodecError(f"Corrupted columnar payload: {e}") from e
+
+
+def decode_cache_entry(raw: Optional[bytes]) -> Any:
+    """
+    Egy `CacheService.get_bytes` által visszaadott nyers értéket értelmez.
+
+    Returns:
+        DataFrame, ha a bejegyzés kódolt DataFrame; egyéb esetben a JSON
+        deszerializált érték (pl. `FETCH_FAILED_MARKER`), vagy None.
+
+    Raises:
+        DataFrameCodecError: Ha a bejegyzés se kódolt DataFrame, se érvényes JSON.
+    """
+    if raw is None:
+        return None
+    if is_encoded_dataframe(raw):
+        return decode_dataframe(raw)
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise DataFrameCodecError(f"Cache entry is neither a columnar frame nor JSON: {e}") from e
+
+
+# =============================================================================
+# Régi (split-dict JSON) bejegyzések egyszeri migrálása
+# =============================================================================
+async def migrate_legacy_frame_entry(
+    cache: "CacheService",
+    legacy_cache_key: str,
+    cache_key: str,
+    legacy_deserializer: Callable[[Dict[str, Any]], Optional[pd.DataFrame]],
+    fallback_ttl: int,
+    log_prefix: str,
+) -> Optional[pd.DataFrame]:
+    """
+    Beolvas egy régi, JSON split-dict formátumú cache bejegyzést, átírja az új
+    bináris kulcs alá (a hátralévő TTL megtartásával), majd törli a régit.
+
+    Returns:
+        A migrált DataFrame, vagy None, ha nem volt (érvényes) régi bejegyzés.
+    """
+    legacy_value = await cache.get(legacy_cache_key)
+    if not isinstance(legacy_value, dict):
+        return None
+
+    df = legacy_deserializer(legacy_value)
+    if df is None:
+        logger.warning(f"{MODULE_PREFIX}{log_prefix} Legacy entry '{legacy_cache_key}' could not be deserialized. Dropping it.")
+        await cache.delete(legacy_cache_key)
+        return None
+
+    remaining_ttl = await cache.get_ttl(legacy_cache_key)
+    ttl = remaining_ttl if remaining_ttl and remaining_ttl > 0 else fallback_ttl
+    try:
+        if await cache.set_bytes(cache_key, encode_dataframe(df), timeout_seconds=ttl):
+            await cache.delete(legacy_cache_key)
+            logger.info(f"{MODULE_PREFIX}{log_prefix} Migrated legacy JSON entry '{legacy_cache_key}' -> '{cache_key}' (TTL: {ttl}s).")
+    except DataFrameCodecError as e:
+        logger.warning(f"{MODULE_PREFIX}{log_prefix} Legacy frame could not be re-encoded: {e}. Keeping legacy entry.")
+    return df
@@ -19,10 +19,24 @@ import json
 import sys
 import logging
 import hashlib # Added for generate_cache_key
+import functools
+import inspect
 from typing import List, Optional, Dict, Any, Final, Union, Callable, Awaitable
 import httpx
 from pydantic import SecretStr, HttpUrl
 from ..cache_service import CacheService
+from ..single_flight import SingleFlight
+from ..circuit_breaker import CircuitBreakerConfig, CircuitBreakerRegistry
+from ..rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    ProviderLimit,
+    ProviderRateLimiter,
+    RateLimitTimeout,
+    RedisTokenBucketStore,
+    parse_retry_after,
+    provider_for_url,
+)
 import asyncio
 import aiohttp
 import pandas as pd
@@ -152,6 +166,200 @@ def generate_cache_key(
     else:
         return raw_key
 
+# ==============================================================================
+# === Request Coalescing (Single-Flight) for Fetchers ===
+# ==============================================================================
+# Nem-kulcs argumentumok: ezek nem befolyásolják a lekérdezés eredményét
+_SINGLE_FLIGHT_NON_KEY_ARGS: Final[frozenset] = frozenset({"client", "cache", "cache_service"})
+
+
+def _record_single_flight_metric(fetcher: str, role: str) -> None:
+    try:
+        from ..metrics.prometheus_exporter import get_exporter
+        get_exporter().inc_single_flight(fetcher, role)
+    except Exception:  # pragma: no cover – a metrika opcionális
+        pass
+
+
+FETCH_SINGLE_FLIGHT: Final[SingleFlight] = SingleFlight("fetchers", on_call=_record_single_flight_metric)
+
+# ==============================================================================
+# === Provider Rate Limiting for make_api_request ===
+# ==============================================================================
+def _record_rate_limit_wait(provider: str, priority: str, outcome: str, seconds: float) -> None:
+    try:
+        from ..metrics.prometheus_exporter import get_exporter
+        get_exporter().observe_rate_limit_wait(provider, priority, outcome, seconds)
+    except Exception:  # pragma: no cover – a metrika opcionális
+        pass
+
+
+def _record_rate_limit_queue_depth(provider: str, priority: str, depth: int) -> None:
+    try:
+        from ..metrics.prometheus_exporter import get_exporter
+        get_exporter().set_rate_limit_queue_depth(provider, priority, depth)
+    except Exception:  # pragma: no cover – a metrika opcionális
+        pass
+
+
+def _build_rate_limiter() -> ProviderRateLimiter:
+    rate_settings = settings.RATE_LIMIT
+    limits = {
+        provider: ProviderLimit.per_minute(requests, rate_settings.PROVIDER_BURST.get(provider))
+        for provider, requests in rate_settings.PROVIDER_REQUESTS_PER_MINUTE.items()
+    }
+    return ProviderRateLimiter(
+        limits,
+        max_wait_seconds={
+            PRIORITY_INTERACTIVE: rate_settings.INTERACTIVE_MAX_WAIT_SECONDS,
+            PRIORITY_BACKGROUND: rate_settings.BACKGROUND_MAX_WAIT_SECONDS,
+        },
+        on_wait=_record_rate_limit_wait,
+        on_queue_depth=_record_rate_limit_queue_depth,
+    )
+
+
+FETCH_RATE_LIMITER: Final[ProviderRateLimiter] = _build_rate_limiter()
+
+
+def _bind_rate_limiter_store(cache_service: Optional[CacheService]) -> None:
+    """A bucketokat a CacheService Redis kliensére köti (workerek közötti kvóta); Redis nélkül helyi bucket marad."""
+    if not settings.RATE_LIMIT.REDIS_SHARED:
+        return
+    redis_client = getattr(cache_service, "redis_client", None)
+    current_store = FETCH_RATE_LIMITER.store
+    if redis_client is None or getattr(current_store, "redis_client", None) is redis_client:
+        return
+    try:
+        fallback = current_store.fallback if isinstance(current_store, RedisTokenBucketStore) else current_store
+        FETCH_RATE_LIMITER.store = RedisTokenBucketStore(redis_client, fallback=fallback)
+        BASE_HELPER_LOGGER.info("Provider rate limiter buckets are now shared through Redis.")
+    except Exception as e_bind:
+        BASE_HELPER_LOGGER.warning(f"Could not bind provider rate limiter to Redis ({e_bind}); using in-process buckets.")
+
+
+# ==============================================================================
+# === Provider Circuit Breakers (make_api_request + yfinance) ===
+# ==============================================================================
+def _build_circuit_breakers() -> CircuitBreakerRegistry:
+    breaker_settings = settings.CIRCUIT_BREAKER
+    return CircuitBreakerRegistry(
+        CircuitBreakerConfig(
+            window_seconds=breaker_settings.WINDOW_SECONDS,
+            min_calls=breaker_settings.MIN_CALLS,
+            error_rate_threshold=breaker_settings.ERROR_RATE_THRESHOLD,
+            slow_call_seconds=breaker_settings.SLOW_CALL_SECONDS,
+            slow_rate_threshold=breaker_settings.SLOW_RATE_THRESHOLD,
+            open_seconds=breaker_settings.OPEN_SECONDS,
+        )
+    )
+
+
+FETCH_CIRCUIT_BREAKERS: Final[CircuitBreakerRegistry] = _build_circuit_breakers()
+
+
+def bind_circuit_breaker_redis(cache_service: Optional[CacheService]) -> None:
+    """A breakerek nyitott állapotát a CacheService Redis kliensén osztja meg a workerek között."""
+    if not settings.CIRCUIT_BREAKER.REDIS_SHARED:
+        return
+    redis_client = getattr(cache_service, "redis_client", None)
+    if redis_client is not None and FETCH_CIRCUIT_BREAKERS.redis_client is not redis_client:
+        FETCH_CIRCUIT_BREAKERS.redis_client = redis_client
+
+
+async def provider_available(provider: Optional[str], cache_service: Optional[CacheService] = None) -> bool:
+    """False, ha a szolgáltató circuit breakere nyitva van (a hívó ilyenkor a következő forrásra vált)."""
+    if not settings.CIRCUIT_BREAKER.ENABLED:
+        return True
+    bind_circuit_breaker_redis(cache_service)
+    return await FETCH_CIRCUIT_BREAKERS.is_available(provider)
+
+
+async def acquire_provider_call(provider: Optional[str], cache_service: Optional[CacheService] = None) -> bool:
+    """
+    Élő hívás előtti kapu: mint `provider_available`, de half-open breakernél
+    csak egyetlen próba hívás kap engedélyt, amíg az eredménye nincs rögzítve.
+    """
+    if not settings.CIRCUIT_BREAKER.ENABLED:
+        return True
+    bind_circuit_breaker_redis(cache_service)
+    return await FETCH_CIRCUIT_BREAKERS.acquire(provider)
+
+
+def release_provider_call(provider: Optional[str]) -> None:
+    """Az `acquire_provider_call` engedélyének visszaadása, ha az élő hívás végül nem indult el."""
+    if settings.CIRCUIT_BREAKER.ENABLED:
+        FETCH_CIRCUIT_BREAKERS.release(provider)
+
+
+async def record_provider_call(provider: Optional[str], success: bool, latency: float) -> None:
+    """Egy élő hívás kimenetének rögzítése a szolgáltató breakerében."""
+    if settings.CIRCUIT_BREAKER.ENABLED:
+        await FETCH_CIRCUIT_BREAKERS.record(provider, success, latency)
+
+
+
+def coalesce_fetch(fetcher_name: str, identifier_arg: str = "symbol") -> Callable:
+    """
+    Dekorátor: az azonos argumentumokkal párhuzamosan hívott fetcherek egyetlen
+    futó coroutine-t osztanak meg (`FETCH_SINGLE_FLIGHT`).
+
+    A kulcs a `generate_cache_key("singleflight", fetcher_name, <identifier>, <többi argumentum>)`
+    kimenete; a `client`/`cache` argumentumok nem részei. Ha
+    `settings.CACHE.SINGLE_FLIGHT_CROSS_PROCESS` be van kapcsolva, az originator
+    a CacheService Redis lockja alatt fut, így a többi worker a lock után már a
+    friss cache bejegyzést olvassa.
+
+    Args:
+        fetcher_name: A fetcher neve a kulcsban és a metrikákban (pl. "yfinance_ohlcv").
+        identifier_arg: Annak az argumentumnak a neve, ami a fő azonosító (ticker).
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not getattr(settings.CACHE, "SINGLE_FLIGHT_ENABLED", True):
+                return await func(*args, **kwargs)
+            try:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                call_args = dict(bound.arguments)
+                key_params = {k: v for k, v in call_args.items() if k not in _SINGLE_FLIGHT_NON_KEY_ARGS and k != identifier_arg}
+                flight_key = generate_cache_key("singleflight", fetcher_name, str(call_args[identifier_arg]), key_params)
+            except Exception as e_key:
+                BASE_HELPER_LOGGER.debug(f"[{fetcher_name}] Single-flight key could not be built ({e_key}). Calling without coalescing.")
+                return await func(*args, **kwargs)
+
+            cache_for_lock = call_args.get("cache") or call_args.get("cache_service")
+
+            async def _originate() -> Any:
+                if not (getattr(settings.CACHE, "SINGLE_FLIGHT_CROSS_PROCESS", False) and isinstance(cache_for_lock, CacheService)):
+                    return await func(*args, **kwargs)
+                lock = cache_for_lock.get_lock(
+                    f"singleflight:{flight_key}",
+                    timeout=settings.CACHE.LOCK_TTL_SECONDS,
+                    blocking_timeout=settings.CACHE.LOCK_BLOCKING_TIMEOUT_SECONDS,
+                )
+                try:
+                    acquired = await lock.acquire()
+                except Exception as e_lock:
+                    BASE_HELPER_LOGGER.warning(f"[{fetcher_name}] Cross-process single-flight lock error ({e_lock}). Fetching without lock.")
+                    acquired = False
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    if acquired:
+                        try:
+                            await lock.release()
+                        except Exception as e_release:
+                            BASE_HELPER_LOGGER.debug(f"[{fetcher_name}] Single-flight lock release failed: {e_release}")
+
+            return await FETCH_SINGLE_FLIGHT.do(flight_key, _originate, label=fetcher_name)
+
+        return wrapper
+    return decorator
+
 # ==============================================================================
 # === Common Helper Functions ===
 # ==============================================================================
@@ -219,18 +427,35 @@ async def make_api_request(
     headers: Optional[Dict[str, Any]] = None,
     cache_service: Optional[CacheService] = None,
     cache_key_for_failure: Optional[str] = None,
+    failure_marker_checked: bool = False,
+    provider: Optional[str] = None,
 ) -> Optional[Union[Dict, List, str]]:
     """
     Végrehajt egy aszinkron HTTP kérést robusztus hibakezeléssel és
     opcionálisan a tartós hibák cache-elésével.
 
+    A kérés előtt a szolgáltató (`provider`, alapértelmezés: az URL hosztjából
+    felismerve) rate limit tokenjére vár (`FETCH_RATE_LIMITER`, a hívó kontextus
+    prioritásával). Ha a határidőn belül nincs token, None-t ad vissza failure
+    marker nélkül; 429 válasznál a `Retry-After` idejére blokkolja a szolgáltatót.
+    Nyitott circuit breakernél (`FETCH_CIRCUIT_BREAKERS`) élő kérés nélkül,
+    failure marker nélkül ad None-t; a 429, 5xx és hálózati hibák, valamint a
+    késleltetés a breaker gördülő ablakába kerülnek.
+
     FONTOS: Ez a függvény a `FETCH_FAILED_MARKER`-t használja, amit a
     `_fetcher_constants`-ból importál (ha sikeres volt az import fentebb).
+
+    `failure_marker_checked=True` esetén a hívó már kiolvasta a
+    `cache_key_for_failure` kulcsot (a payload és a failure marker ugyanazon a
+    kulcson él), így a marker újbóli lekérése – egy extra Redis kör – elmarad.
+    Hiba esetén a marker írása változatlanul megtörténik.
     """
     logger = BASE_HELPER_LOGGER
     log_prefix = f"[{source_name_for_log}]"
 
-    can_check_cache_failure = CACHE_ENABLED and cache_service is not None and cache_key_for_failure is not None
+    # A marker írása a `failure_marker_checked`-től független; az csak az olvasást spórolja meg
+    can_write_failure_marker = CACHE_ENABLED and cache_service is not None and cache_key_for_failure is not None
+    can_check_cache_failure = can_write_failure_marker and not failure_marker_checked
     if can_check_cache_failure:
         try:
             cached_failure = await cache_service.get(cache_key_for_failure)
@@ -240,6 +465,23 @@ async def make_api_request(
         except Exception as e_cache_get:
              logger.error(f"{log_prefix} Error checking cache for failure marker (Key: {cache_key_for_failure}): {e_cache_get}", exc_info=False)
 
+    api_provider = provider or provider_for_url(url)
+    if not await acquire_provider_call(api_provider, cache_service):
+        logger.warning(f"{log_prefix} Circuit breaker for '{api_provider}' is open (or its half-open probe is in flight). Skipping live request. NOT caching failure.")
+        return None
+    if settings.RATE_LIMIT.ENABLED and api_provider:
+        _bind_rate_limiter_store(cache_service)
+        try:
+            await FETCH_RATE_LIMITER.acquire(api_provider)
+        except RateLimitTimeout as rate_err:
+            # Nem volt élő hívás: a half-open próbát nem tartjuk foglalva `open_seconds`-ig
+            release_provider_call(api_provider)
+            logger.warning(f"{log_prefix} {rate_err}. Skipping live request. NOT caching failure.")
+            return None
+        except BaseException:
+            release_provider_call(api_provider)  # pl. megszakított (hedge) várakozás
+            raise
+
     #request_headers = {"User-Agent": HTTP_USER_AGENT, "Referer": HTTP_REFERER}
     # request_headers = {"User-Agent": HTTP_USER_AGENT, "Referer": HTTP_REFERER}
 # if headers:
@@ -265,8 +507,9 @@ async def make_api_request(
     logger.debug(f"{log_prefix} Request Details - Params: {params}, Headers: {request_headers}")
 
     response: Optional[httpx.Response] = None
+    call_ok: Optional[bool] = None  # a breakernek: None = nem rögzítjük (pl. megszakított kérés)
+    start_time = time.monotonic()
     try:
-        start_time = time.monotonic()
         logger.critical(f"{log_prefix} === FINAL REQUEST DETAILS ===") # Használj CRITICAL szintet, hogy biztosan lásd
         logger.critical(f"{log_prefix} Method: {method.upper()}")
         logger.critical(f"{log_prefix} URL: {url}")
@@ -282,6 +525,7 @@ async def make_api_request(
             follow_redirects=True
         )
         duration = time.monotonic() - start_time
+        call_ok = response.status_code < 500 and response.status_code != 429
         effective_url = str(response.url) if response else url
         logger.debug(f"{log_prefix} API request completed in {duration:.4f}s. Status: {response.status_code if response else 'N/A'}, Effective URL: {effective_url}")
 
@@ -294,7 +538,7 @@ async def make_api_request(
         except json.JSONDecodeError as json_err:
             response_text_preview = str(response.text)[:250]
             logger.error(f"{log_prefix} Failed to decode JSON from successful response (Status: {response.status_code}). Invalid JSON format. Preview: '{response_text_preview}'... Error: {json_err}")
-            if can_check_cache_failure:
+            if can_write_failure_marker:
                 try:
                     await cache_service.set(cache_key_for_failure, FETCH_FAILED_MARKER, timeout_seconds=FETCH_FAILURE_CACHE_TTL)
                     logger.info(f"{log_prefix} Cached persistent failure marker (JSON Decode Error). Key: {cache_key_for_failure}")
@@ -303,7 +547,7 @@ async def make_api_request(
             return None
         except Exception as e_resp_proc:
             logger.error(f"{log_prefix} Unexpected error processing successful response (Status: {response.status_code}): {e_resp_proc}", exc_info=True)
-            if can_check_cache_failure:
+            if can_write_failure_marker:
                 try:
                     await cache_service.set(cache_key_for_failure, FETCH_FAILED_MARKER, timeout_seconds=FETCH_FAILURE_CACHE_TTL)
                     logger.info(f"{log_prefix} Cached persistent failure marker (Response Processing Error). Key: {cache_key_for_failure}")
@@ -326,7 +570,13 @@ async def make_api_request(
             else: log_message += f"Client error ({status_code}). "
             log_message += f"Preview: '{response_text_preview}'..."
             log_func(log_message)
-            if status_code != 429 and can_check_cache_failure:
+            if status_code == 429 and settings.RATE_LIMIT.ENABLED and api_provider:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                await FETCH_RATE_LIMITER.note_retry_after(
+                    api_provider,
+                    retry_after if retry_after is not None else settings.RATE_LIMIT.DEFAULT_RETRY_AFTER_SECONDS,
+                )
+            if status_code != 429 and can_write_failure_marker:
                  try:
                      await cache_service.set(cache_key_for_failure, FETCH_FAILED_MARKER, timeout_seconds=FETCH_FAILURE_CACHE_TTL)
                      logger.info(f"{log_prefix} Cached persistent failure marker (HTTP {status_code}). Key: {cache_key_for_failure}")
@@ -337,17 +587,25 @@ async def make_api_request(
              logger.error(f"{log_prefix} Server Error ({status_code}). Preview: '{response_text_preview}'... NOT caching failure.")
              return None
     except httpx.TimeoutException:
+        call_ok = False
         logger.error(f"{log_prefix} Request timed out after {HTTP_TIMEOUT}s. URL: {url}. NOT caching failure.")
         return None
     except httpx.ConnectError as conn_err:
+        call_ok = False
         logger.error(f"{log_prefix} Connection error to {url}: {conn_err}. NOT caching failure.")
         return None
     except httpx.RequestError as req_err:
+        call_ok = False
         logger.error(f"{log_prefix} Generic HTTP request error for {url}: {req_err}. NOT caching failure.")
         return None
     except Exception as e:
+        if call_ok is None:
+            call_ok = False
         logger.critical(f"{log_prefix} Unexpected critical error during API request for {url}: {e}", exc_info=True)
         return None
+    finally:
+        if call_ok is not None:
+            await record_provider_call(api_provider, call_ok, time.monotonic() - start_time)
 
 BASE_HELPER_LOGGER.info("--- Fetcher Base Helpers Module (v3.0) initialized successfully. ---")
 
@@ -20,6 +20,7 @@ try:
     from ._base_helpers import (
         generate_cache_key,
         make_api_request,
+        coalesce_fetch,
         get_api_key,
         FETCH_FAILURE_CACHE_TTL,
     )
@@ -133,6 +134,7 @@ AV_API_KEY_NAME = "ALPHAVANTAGE"
 # === Public Alpha Vantage Fetcher Functions ===
 # ==============================================================================
 
+@coalesce_fetch("alphavantage_news")
 async def fetch_alpha_vantage_news(
     symbol: str, client: httpx.AsyncClient, cache: CacheService, force_refresh: bool = False
 ) -> Optional[List[Dict[str, Any]]]:
@@ -249,6 +251,7 @@ async def fetch_alpha_vantage_news(
         params=api_params,
         cache_service=cache,
         cache_key_for_failure=cache_key,
+        failure_marker_checked=not force_refresh,
         source_name_for_log=f"{source_name}_{data_type} for {symbol_upper}",
     )
 
@@ -424,6 +427,7 @@ async def fetch_alpha_vantage_earnings(
         params=api_params,
         cache_service=cache,
         cache_key_for_failure=cache_key,
+        failure_marker_checked=not force_refresh,
         source_name_for_log=f"{source_name}_{data_type} for {symbol_upper}",
     )
 
@@ -17,10 +17,29 @@ try:
     from modules.financehub.backend.utils.logger_config import get_logger
     from ..cache_service import CacheService
     from ..constants import CacheStatus
+    from ..dataframe_codec import (
+        CODEC_CACHE_TAG,
+        DataFrameCodecError,
+        decode_cache_entry,
+        encode_dataframe,
+        migrate_legacy_frame_entry,
+    )
+    from ..ohlcv_history import (
+        HISTORY_ATTR_COVERED_FROM,
+        HISTORY_ATTR_FULL_REFRESH_AT,
+        HISTORY_CACHE_TAG,
+        has_new_corporate_action,
+        history_covers,
+        incremental_start,
+        mark_full_refresh,
+        merge_ohlcv_history,
+        slice_from,
+    )
 
     from ._base_helpers import (
         generate_cache_key,
         make_api_request,
+        coalesce_fetch,
         get_api_key,
         FETCH_FAILURE_CACHE_TTL
     )
@@ -70,12 +89,15 @@ _DEFAULT_EODHD_INTRADAY_TTL = 3600
 _DEFAULT_EODHD_SPLITS_DIVIDENDS_TTL = 86400 * 7
 _DEFAULT_EODHD_NEWS_TTL = 3600 * 4
 _DEFAULT_EODHD_FUNDAMENTALS_TTL = 86400 * 30
+_DEFAULT_EODHD_OHLCV_HISTORY_TTL = 86400 * 7
 
 EODHD_DAILY_TTL = _DEFAULT_EODHD_DAILY_TTL
 EODHD_INTRADAY_TTL = _DEFAULT_EODHD_INTRADAY_TTL
 EODHD_SPLITS_DIVIDENDS_TTL = _DEFAULT_EODHD_SPLITS_DIVIDENDS_TTL
 EODHD_NEWS_TTL = _DEFAULT_EODHD_NEWS_TTL
 EODHD_FUNDAMENTALS_TTL = _DEFAULT_EODHD_FUNDAMENTALS_TTL
+EODHD_OHLCV_HISTORY_TTL = _DEFAULT_EODHD_OHLCV_HISTORY_TTL
+EODHD_OHLCV_INCREMENTAL_ENABLED = True
 EODHD_BASE_URL_NEWS: Final[str] = "https://eodhistoricaldata.com/api/news"
 
 if _eodhd_dependencies_met and hasattr(settings, 'CACHE'):
@@ -86,6 +108,8 @@ if _eodhd_dependencies_met and hasattr(settings, 'CACHE'):
             EODHD_SPLITS_DIVIDENDS_TTL = getattr(settings.CACHE, 'EODHD_SPLITS_DIVIDENDS_TTL', _DEFAULT_EODHD_SPLITS_DIVIDENDS_TTL)
             EODHD_NEWS_TTL = getattr(settings.CACHE, 'EODHD_NEWS_TTL', _DEFAULT_EODHD_NEWS_TTL)
             EODHD_FUNDAMENTALS_TTL = getattr(settings.CACHE, 'EODHD_FUNDAMENTALS_TTL', _DEFAULT_EODHD_FUNDAMENTALS_TTL)
+            EODHD_OHLCV_HISTORY_TTL = getattr(settings.CACHE, 'OHLCV_HISTORY_TTL_SECONDS', _DEFAULT_EODHD_OHLCV_HISTORY_TTL)
+            EODHD_OHLCV_INCREMENTAL_ENABLED = getattr(settings.CACHE, 'OHLCV_INCREMENTAL_ENABLED', True)
             EODHD_FETCHER_LOGGER.debug("EODHD Cache TTLs initialized (from settings or defaults).")
         else:
             EODHD_FETCHER_LOGGER.warning("settings.CACHE is None. Using default EODHD TTL values.")
@@ -366,9 +390,165 @@ def _deserialize_dataframe_from_cache(
         except Exception as e_log_dd:
             EODHD_FETCHER_LOGGER.error(f"{log_prefix} Could not log data_dict details on error: {e_log_dd}")
         return None
+
+
+# ==============================================================================
+# === EODHD OHLCV Processing & Incremental History Helpers ===
+# ==============================================================================
+def _process_eodhd_ohlcv_records(raw_records: List[Dict[str, Any]], interval: str, log_prefix: str) -> pd.DataFrame:
+    """
+    Az EODHD EOD/intraday válasz rekordjait a standard OHLCV DataFrame-mé alakítja.
+
+    Raises:
+        ValueError: Hiányzó kritikus oszlopok esetén.
+    """
+    logger = EODHD_FETCHER_LOGGER
+    is_daily_or_longer = interval.lower() in ['d', 'w', 'm']
+    df_from_api = pd.DataFrame(raw_records)
+
+    if df_from_api.empty:
+        logger.info(f"{log_prefix} Live fetch: API returned empty list. Creating empty DataFrame with standard schema.")
+        target_cols_for_empty = TARGET_OHLCV_COLS if is_daily_or_longer else TARGET_OHLCV_COLS_INTRADAY
+        processed_df_temp = pd.DataFrame(columns=target_cols_for_empty)
+        empty_idx = pd.to_datetime([])
+        if not is_daily_or_longer: empty_idx = empty_idx.tz_localize('UTC') # Intraday is UTC
+        processed_df_temp.index = empty_idx
+        processed_df_temp.index.name = 'Date'
+        return processed_df_temp # Üres DF is érvényes, cache-elhető eredmény
+    else: 
+        datetime_col_src: str
+        target_cols_map_lower: List[str]
+        required_src_cols_map: Dict[str, str]
+
+        is_daily_like_for_proc = interval.lower() in ['d', 'w', 'm']
+
+        if is_daily_like_for_proc:
+            datetime_col_src = 'date'
+            required_src_cols_map = {'date': 'date', 'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'adjusted_close': 'adj_close', 'volume': 'volume'}
+            target_cols_map_lower = TARGET_OHLCV_COLS_LOWER
+            if 'adjusted_close' not in df_from_api.columns and 'close' in df_from_api.columns:
+                df_from_api['adjusted_close'] = df_from_api['close']
+                logger.debug(f"{log_prefix} 'adjusted_close' not in API response, using 'close' as fallback.")
+        else: # Intraday
+            datetime_col_src = 'timestamp' if 'timestamp' in df_from_api.columns else ('datetime' if 'datetime' in df_from_api.columns else '')
+            if not datetime_col_src: 
+                raise ValueError(f"{log_prefix} Intraday response missing 'timestamp' or 'datetime' column. Columns: {list(df_from_api.columns)}")
+            required_src_cols_map = {datetime_col_src: 'datetime_temp', 'gmtoffset':'gmtoffset', 'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'volume': 'volume'}
+            target_cols_map_lower = TARGET_OHLCV_COLS_INTRADAY_LOWER
+
+        missing_src_api_cols = [api_col for api_col in required_src_cols_map.keys() if api_col not in df_from_api.columns and api_col != 'gmtoffset'] # gmtoffset is optional
+        if missing_src_api_cols:
+            raise ValueError(f"{log_prefix} Missing critical source columns from API: {missing_src_api_cols}. Available: {list(df_from_api.columns)}")
+
+        df_renamed = df_from_api.rename(columns=required_src_cols_map)
+
+        if is_daily_like_for_proc:
+            df_renamed['datetime_index'] = pd.to_datetime(df_renamed['date'], errors='coerce')
+        else: # Intraday - timestamp is UTC seconds
+            df_renamed['datetime_index'] = pd.to_datetime(df_renamed['datetime_temp'], unit='s', utc=True, errors='coerce')
+
+        df_renamed.dropna(subset=['datetime_index'], inplace=True)
+        df_renamed = df_renamed.set_index('datetime_index')
+        df_renamed.index.name = 'Date'
+
+        actual_cols_present_lower = [std_col for std_col in target_cols_map_lower if std_col in df_renamed.columns]
+        df_processed_lower = df_renamed[actual_cols_present_lower].copy()
+
+        for col_name_lower in df_processed_lower.columns:
+            if col_name_lower == 'volume': 
+                df_processed_lower[col_name_lower] = pd.to_numeric(df_processed_lower[col_name_lower], errors='coerce').fillna(0).astype(int)
+            elif col_name_lower in ['open', 'high', 'low', 'close', 'adj_close']: 
+                df_processed_lower[col_name_lower] = pd.to_numeric(df_processed_lower[col_name_lower], errors='coerce')
+
+        df_processed_lower = df_processed_lower.sort_index()
+
+        final_rename_map_upper = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'adj_close': 'Adj Close', 'volume': 'Volume'}
+        processed_df_temp = df_processed_lower.rename(columns={k_lower: v_upper for k_lower,v_upper in final_rename_map_upper.items() if k_lower in df_processed_lower.columns})
+
+        final_target_cols_title = TARGET_OHLCV_COLS if is_daily_like_for_proc else TARGET_OHLCV_COLS_INTRADAY
+        for col_title in final_target_cols_title:
+            if col_title not in processed_df_temp.columns:
+                logger.warning(f"{log_prefix} Target column '{col_title}' missing after processing. Adding as NA.")
+                processed_df_temp[col_title] = pd.NA 
+
+        final_processed_df = processed_df_temp[final_target_cols_title].copy() 
+        if final_processed_df.isnull().values.any(): logger.warning(f"{log_prefix} Final DataFrame contains NaN/NA values.")
+        return final_processed_df
+
+
+async def _load_eodhd_ohlcv_history(
+    cache: CacheService, history_cache_key: str, log_prefix: str, prefetched: Optional[Dict[str, Optional[bytes]]] = None
+) -> Optional[pd.DataFrame]:
+    """Betölti a tárolt teljes idősort (a `prefetched` kötegből, ha már ott van); hibás/hiányzó bejegyzés esetén None."""
+    try:
+        raw_history = prefetched[history_cache_key] if prefetched and history_cache_key in prefetched else await cache.get_bytes(history_cache_key)
+        history = decode_cache_entry(raw_history)
+    except DataFrameCodecError as e_codec:
+        EODHD_FETCHER_LOGGER.warning(f"{log_prefix} History cache entry corrupted ({e_codec}). Deleting.")
+        await cache.delete(history_cache_key)
+        return None
+    except Exception as e_hist_get:
+        EODHD_FETCHER_LOGGER.error(f"{log_prefix} ERROR loading OHLCV history: {e_hist_get}", exc_info=True)
+        return None
+    return history if isinstance(history, pd.DataFrame) else None
+
+
+async def _fetch_eodhd_ohlcv_incremental(
+    symbol_with_exchange: str,
+    client: httpx.AsyncClient,
+    cache: CacheService,
+    history: pd.DataFrame,
+    base_url: str,
+    api_params: Dict[str, Any],
+    interval: str,
+    log_prefix: str,
+) -> Optional[pd.DataFrame]:
+    """
+    Csak az utolsó tárolt bártól kér le adatot, és összefésüli a history-val.
+
+    None-t ad vissza (a hívó ilyenkor teljes letöltést végez), ha a legutóbbi
+    teljes letöltés óta split/osztalék történt (az adjusztált árak elavultak),
+    ha a vállalati események nem kérdezhetők le, vagy ha a lekérés sikertelen.
+    """
+    logger = EODHD_FETCHER_LOGGER
+    last_bar = incremental_start(history)
+    if last_bar is None:
+        return None
+    last_bar_str = last_bar.strftime('%Y-%m-%d')
+
+    # Az utolsó bár óta történt eseményeket kérjük le: a korábbiakat a
+    # megelőző inkrementális frissítések már ellenőrizték.
+    events = await fetch_eodhd_splits_and_dividends(symbol_with_exchange, client, cache, start_date_str=last_bar_str)
+    if events is None:
+        logger.info(f"{log_prefix} Incremental: corporate actions unavailable. Falling back to full fetch.")
+        return None
+    action_dates: List[Any] = []
+    for events_df in events.values():
+        if isinstance(events_df, pd.DataFrame):
+            action_dates.extend(events_df.index)
+    if has_new_corporate_action(history, action_dates):
+        logger.info(f"{log_prefix} Incremental: new split/dividend since {history.attrs.get(HISTORY_ATTR_FULL_REFRESH_AT)}. Full refresh required.")
+        return None
+
+    incremental_params = {**api_params, "from": last_bar_str}
+    raw_records = await make_api_request(
+        client=client, method="GET", url=base_url, params=incremental_params,
+        source_name_for_log=f"eodhd_ohlcv_incremental for {symbol_with_exchange}"
+    )
+    if not isinstance(raw_records, list):
+        logger.warning(f"{log_prefix} Incremental: request failed or invalid response ({type(raw_records).__name__}). Falling back to full fetch.")
+        return None
+
+    new_bars = _process_eodhd_ohlcv_records(raw_records, interval, log_prefix)
+    merged = merge_ohlcv_history(history, new_bars)
+    logger.info(f"{log_prefix} Incremental: fetched {len(new_bars)} bar(s) from {last_bar_str}. History rows: {len(history)} -> {len(merged)}.")
+    return merged
+
+
 # ==============================================================================
 # === EODHD OHLCV Fetcher Function ===
 # ==============================================================================
+@coalesce_fetch("eodhd_ohlcv", identifier_arg="symbol_with_exchange")
 async def fetch_eodhd_ohlcv(
     symbol_with_exchange: str,
     client: httpx.AsyncClient,
@@ -392,6 +572,8 @@ async def fetch_eodhd_ohlcv(
     
     api_key: Optional[str] = None
     cache_key: Optional[str] = None
+    legacy_cache_key: Optional[str] = None
+    history_cache_key: Optional[str] = None
     cache_ttl: int = EODHD_DAILY_TTL 
     data_type_for_cache: str = ""
     base_url: str = ""
@@ -464,35 +646,52 @@ async def fetch_eodhd_ohlcv(
             
             if from_timestamp: api_params["from"] = from_timestamp; cache_key_params["from_ts_resolved"] = str(from_timestamp)
 
-        cache_key = generate_cache_key(data_type=data_type_for_cache, source="eodhd", identifier=symbol_with_exchange, params=cache_key_params)
+        # A régi (JSON split-dict) kulcs csak az egyszeri migrációhoz kell
+        legacy_cache_key = generate_cache_key(data_type=data_type_for_cache, source="eodhd", identifier=symbol_with_exchange, params=cache_key_params)
+        cache_key = generate_cache_key(data_type=data_type_for_cache, source="eodhd", identifier=symbol_with_exchange, params={**cache_key_params, "codec": CODEC_CACHE_TAG})
         logger.info(f"{log_prefix} Successfully generated cache key: {cache_key}")
+
+        # Tartomány-független kulcs a teljes idősornak (inkrementális frissítéshez)
+        if is_daily_or_longer and EODHD_OHLCV_INCREMENTAL_ENABLED and api_params.get("from"):
+            history_cache_key = generate_cache_key(data_type=data_type_for_cache, source="eodhd", identifier=symbol_with_exchange, params={"interval": interval.lower(), "history": HISTORY_CACHE_TAG, "codec": CODEC_CACHE_TAG})
     
     except Exception as e_init_params:
         logger.critical(f"{log_prefix} CRITICAL ERROR during API/Cache param setup: {e_init_params}", exc_info=True)
         return None 
 
     # --- Cache Check ---
+    prefetched_entries: Dict[str, Optional[bytes]] = {}
     if not force_refresh and cache and cache_key:
         try:
-            cached_item = await cache.get(cache_key)
+            # A payload és a teljes idősor egy Redis körben (az utóbbi az inkrementális úthoz kell)
+            prefetched_entries = await cache.get_many_bytes([key for key in (cache_key, history_cache_key) if key])
+            cached_item = decode_cache_entry(prefetched_entries.get(cache_key))
+            if cached_item is None and legacy_cache_key:
+                cached_item = await migrate_legacy_frame_entry(
+                    cache, legacy_cache_key, cache_key,
+                    lambda legacy: _deserialize_dataframe_from_cache(legacy, f"{log_prefix}[LegacyCacheRec]", index_is_datetime=True),
+                    cache_ttl, log_prefix,
+                )
             if cached_item is not None:
-                if cached_item == FETCH_FAILED_MARKER:
+                if isinstance(cached_item, pd.DataFrame):
+                    logger.info(f"{log_prefix} Cache HIT: DataFrame successfully reconstructed. Shape: {cached_item.shape}")
+                    cache_hit_status_enum = CacheStatus.HIT_VALID
+                    final_processed_df = cached_item
+                    # Fall through to final return, skipping live fetch and cache write
+                elif cached_item == FETCH_FAILED_MARKER:
                     logger.info(f"{log_prefix} Cache HIT: Failure marker found. Returning None.")
                     cache_hit_status_enum = CacheStatus.HIT_FAILED
                     return None # Explicitly return, no further processing
                 else: 
-                    reconstructed_df = _deserialize_dataframe_from_cache(cached_item, f"{log_prefix}[CacheRec]", index_is_datetime=True)
-                    if reconstructed_df is not None:
-                        logger.info(f"{log_prefix} Cache HIT: DataFrame successfully reconstructed. Shape: {reconstructed_df.shape}")
-                        cache_hit_status_enum = CacheStatus.HIT_VALID
-                        final_processed_df = reconstructed_df 
-                        # Fall through to final return, skipping live fetch and cache write
-                    else: 
-                        logger.warning(f"{log_prefix} Cache HIT: Invalid data structure. Deleting and treating as MISS.")
-                        await cache.delete(cache_key)
-                        cache_hit_status_enum = CacheStatus.HIT_INVALID 
+                    logger.warning(f"{log_prefix} Cache HIT: Invalid data structure. Deleting and treating as MISS.")
+                    await cache.delete(cache_key)
+                    cache_hit_status_enum = CacheStatus.HIT_INVALID 
             else: # cached_item is None
                 cache_hit_status_enum = CacheStatus.MISS
+        except DataFrameCodecError as e_codec:
+            logger.warning(f"{log_prefix} Cache HIT: Corrupted columnar payload ({e_codec}). Deleting and treating as MISS.")
+            await cache.delete(cache_key)
+            cache_hit_status_enum = CacheStatus.HIT_INVALID
         except Exception as e_cache_get:
             logger.error(f"{log_prefix} ERROR during cache.get: {e_cache_get}", exc_info=True)
             cache_hit_status_enum = CacheStatus.ERROR 
@@ -507,113 +706,74 @@ async def fetch_eodhd_ohlcv(
         
         raw_response_json: Optional[Union[List, Dict]] = None
         fetch_succeeded_for_cache_write = False
+        history_df: Optional[pd.DataFrame] = None
+        history_to_store: Optional[pd.DataFrame] = None
+        requested_from: Optional[str] = api_params.get("from")
+
+        # Inkrementális út: csak az utolsó tárolt bártól kérünk le adatot
+        if history_cache_key and not force_refresh and cache:
+            history_df = await _load_eodhd_ohlcv_history(cache, history_cache_key, log_prefix, prefetched_entries)
+            if history_df is not None and history_covers(history_df, requested_from):
+                try:
+                    merged_history = await _fetch_eodhd_ohlcv_incremental(
+                        symbol_with_exchange, client, cache, history_df, base_url, api_params, interval, log_prefix
+                    )
+                except Exception as e_incremental:
+                    logger.warning(f"{log_prefix} Incremental update FAILED ({e_incremental}). Falling back to full fetch.", exc_info=True)
+                    merged_history = None
+                if merged_history is not None:
+                    history_to_store = merged_history
+                    final_processed_df = slice_from(merged_history, requested_from)
+                    fetch_succeeded_for_cache_write = True
 
-        try:
-            params_for_log = api_params.copy()
-            if 'api_token' in params_for_log: params_for_log['api_token'] = "***MASKED***"
-            logger.info(f"{log_prefix} EODHD API Request: URL='{base_url}', Params={params_for_log}")
+        if final_processed_df is None:
+            # Teljes letöltés: a korábban tárolt hosszabb tartományt nem szűkítjük
+            if history_cache_key and history_df is not None:
+                covered_from = history_df.attrs.get(HISTORY_ATTR_COVERED_FROM)
+                if covered_from and requested_from and covered_from < requested_from:
+                    api_params = {**api_params, "from": covered_from}
 
-            raw_response_json = await make_api_request(
-                client=client, method="GET", url=base_url, params=api_params,
-                cache_service=cache, 
-                cache_key_for_failure=cache_key, # make_api_request handles caching failure marker
-                source_name_for_log=f"eodhd_{data_type_for_cache} for {symbol_with_exchange}"
-            )
+            try:
+                params_for_log = api_params.copy()
+                if 'api_token' in params_for_log: params_for_log['api_token'] = "***MASKED***"
+                logger.info(f"{log_prefix} EODHD API Request: URL='{base_url}', Params={params_for_log}")
+
+                raw_response_json = await make_api_request(
+                    client=client, method="GET", url=base_url, params=api_params,
+                    cache_service=cache, 
+                    cache_key_for_failure=cache_key, # make_api_request handles caching failure marker
+                    failure_marker_checked=not force_refresh,
+                    source_name_for_log=f"eodhd_{data_type_for_cache} for {symbol_with_exchange}"
+                )
 
-            if raw_response_json is None:
-                logger.error(f"{log_prefix} Live fetch: API request failed (make_api_request returned None, failure marker should be cached).")
-                # final_processed_df remains None
-            elif not isinstance(raw_response_json, list): 
-                logger.error(f"{log_prefix} Live fetch: Invalid API response format. Expected list, got {type(raw_response_json)}. Response: {str(raw_response_json)[:200]}")
-                # final_processed_df remains None; explicitly cache failure if make_api_request didn't
-                if cache and cache_key:
-                    # Check if make_api_request already cached it (it should have if it returned None)
-                    # This is a safeguard if make_api_request had an issue but didn't return None AND didn't cache.
-                    # However, current make_api_request logic should handle this.
-                    # For robustness, we can ensure it here if response is bad but not None.
-                    logger.warning(f"{log_prefix} Caching failure marker due to unexpected response format after live fetch.")
-                    await cache.set(cache_key, FETCH_FAILED_MARKER, timeout_seconds=FETCH_FAILURE_CACHE_TTL)
-            else: 
-                logger.debug(f"{log_prefix} Live fetch: Received {len(raw_response_json)} records from API. Processing...")
-                df_from_api = pd.DataFrame(raw_response_json)
-                
-                if df_from_api.empty:
-                    logger.info(f"{log_prefix} Live fetch: API returned empty list. Creating empty DataFrame with standard schema.")
-                    target_cols_for_empty = TARGET_OHLCV_COLS if is_daily_or_longer else TARGET_OHLCV_COLS_INTRADAY
-                    processed_df_temp = pd.DataFrame(columns=target_cols_for_empty)
-                    empty_idx = pd.to_datetime([])
-                    if not is_daily_or_longer: empty_idx = empty_idx.tz_localize('UTC') # Intraday is UTC
-                    processed_df_temp.index = empty_idx
-                    processed_df_temp.index.name = 'Date'
-                    final_processed_df = processed_df_temp
-                    fetch_succeeded_for_cache_write = True # Empty DF is a valid result to cache
+                if raw_response_json is None:
+                    logger.error(f"{log_prefix} Live fetch: API request failed (make_api_request returned None, failure marker should be cached).")
+                    # final_processed_df remains None
+                elif not isinstance(raw_response_json, list): 
+                    logger.error(f"{log_prefix} Live fetch: Invalid API response format. Expected list, got {type(raw_response_json)}. Response: {str(raw_response_json)[:200]}")
+                    # final_processed_df remains None; explicitly cache failure if make_api_request didn't
+                    if cache and cache_key:
+                        # Check if make_api_request already cached it (it should have if it returned None)
+                        # This is a safeguard if make_api_request had an issue but didn't return None AND didn't cache.
+                        # However, current make_api_request logic should handle this.
+                        # For robustness, we can ensure it here if response is bad but not None.
+                        logger.warning(f"{log_prefix} Caching failure marker due to unexpected response format after live fetch.")
+                        await cache.set(cache_key, FETCH_FAILED_MARKER, timeout_seconds=FETCH_FAILURE_CACHE_TTL)
                 else: 
-                    datetime_col_src: str
-                    target_cols_map_lower: List[str]
-                    required_src_cols_map: Dict[str, str]
-                    
-                    is_daily_like_for_proc = interval.lower() in ['d', 'w', 'm']
-
-                    if is_daily_like_for_proc:
-                        datetime_col_src = 'date'
-                        required_src_cols_map = {'date': 'date', 'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'adjusted_close': 'adj_close', 'volume': 'volume'}
-                        target_cols_map_lower = TARGET_OHLCV_COLS_LOWER
-                        if 'adjusted_close' not in df_from_api.columns and 'close' in df_from_api.columns:
-                            df_from_api['adjusted_close'] = df_from_api['close']
-                            logger.debug(f"{log_prefix} 'adjusted_close' not in API response, using 'close' as fallback.")
-                    else: # Intraday
-                        datetime_col_src = 'timestamp' if 'timestamp' in df_from_api.columns else ('datetime' if 'datetime' in df_from_api.columns else '')
-                        if not datetime_col_src: 
-                            raise ValueError(f"{log_prefix} Intraday response missing 'timestamp' or 'datetime' column. Columns: {list(df_from_api.columns)}")
-                        required_src_cols_map = {datetime_col_src: 'datetime_temp', 'gmtoffset':'gmtoffset', 'open': 'open', 'high': 'high', 'low': 'low', 'close': 'close', 'volume': 'volume'}
-                        target_cols_map_lower = TARGET_OHLCV_COLS_INTRADAY_LOWER
-
-                    missing_src_api_cols = [api_col for api_col in required_src_cols_map.keys() if api_col not in df_from_api.columns and api_col != 'gmtoffset'] # gmtoffset is optional
-                    if missing_src_api_cols:
-                        raise ValueError(f"{log_prefix} Missing critical source columns from API: {missing_src_api_cols}. Available: {list(df_from_api.columns)}")
-
-                    df_renamed = df_from_api.rename(columns=required_src_cols_map)
-
-                    if is_daily_like_for_proc:
-                        df_renamed['datetime_index'] = pd.to_datetime(df_renamed['date'], errors='coerce')
-                    else: # Intraday - timestamp is UTC seconds
-                        df_renamed['datetime_index'] = pd.to_datetime(df_renamed['datetime_temp'], unit='s', utc=True, errors='coerce')
-                    
-                    df_renamed.dropna(subset=['datetime_index'], inplace=True)
-                    df_renamed = df_renamed.set_index('datetime_index')
-                    df_renamed.index.name = 'Date'
-                    
-                    actual_cols_present_lower = [std_col for std_col in target_cols_map_lower if std_col in df_renamed.columns]
-                    df_processed_lower = df_renamed[actual_cols_present_lower].copy()
-
-                    for col_name_lower in df_processed_lower.columns:
-                        if col_name_lower == 'volume': 
-                            df_processed_lower[col_name_lower] = pd.to_numeric(df_processed_lower[col_name_lower], errors='coerce').fillna(0).astype(int)
-                        elif col_name_lower in ['open', 'high', 'low', 'close', 'adj_close']: 
-                            df_processed_lower[col_name_lower] = pd.to_numeric(df_processed_lower[col_name_lower], errors='coerce')
-                    
-                    df_processed_lower = df_processed_lower.sort_index()
-                    
-                    final_rename_map_upper = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'adj_close': 'Adj Close', 'volume': 'Volume'}
-                    processed_df_temp = df_processed_lower.rename(columns={k_lower: v_upper for k_lower,v_upper in final_rename_map_upper.items() if k_lower in df_processed_lower.columns})
-                    
-                    final_target_cols_title = TARGET_OHLCV_COLS if is_daily_like_for_proc else TARGET_OHLCV_COLS_INTRADAY
-                    for col_title in final_target_cols_title:
-                        if col_title not in processed_df_temp.columns:
-                            logger.warning(f"{log_prefix} Target column '{col_title}' missing after processing. Adding as NA.")
-                            processed_df_temp[col_title] = pd.NA 
-                    
-                    final_processed_df = processed_df_temp[final_target_cols_title].copy() 
-                    if final_processed_df.isnull().values.any(): logger.warning(f"{log_prefix} Final DataFrame contains NaN/NA values.")
+                    logger.debug(f"{log_prefix} Live fetch: Received {len(raw_response_json)} records from API. Processing...")
+                    final_processed_df = _process_eodhd_ohlcv_records(raw_response_json, interval, log_prefix)
+                    if history_cache_key:
+                        history_to_store = mark_full_refresh(final_processed_df, api_params["from"])
+                        final_processed_df = slice_from(history_to_store, requested_from)
                     logger.info(f"{log_prefix} Live fetch: Data processing SUCCEEDED. Final Shape: {final_processed_df.shape}.")
                     fetch_succeeded_for_cache_write = True
 
-        except Exception as e_fetch_or_proc:
-            logger.error(f"{log_prefix} Live fetch or processing FAILED: {e_fetch_or_proc}. Raw data sample: {str(raw_response_json)[:300] if raw_response_json else 'N/A'}", exc_info=True)
-            final_processed_df = None # Ensure None on error
-            fetch_succeeded_for_cache_write = False
-            # No need to cache failure marker here if make_api_request handled it or if error is post-API call
-            # Cache write block below will handle it based on fetch_succeeded_for_cache_write
+            except Exception as e_fetch_or_proc:
+                logger.error(f"{log_prefix} Live fetch or processing FAILED: {e_fetch_or_proc}. Raw data sample: {str(raw_response_json)[:300] if raw_response_json else 'N/A'}", exc_info=True)
+                final_processed_df = None # Ensure None on error
+                fetch_succeeded_for_cache_write = False
+                # No need to cache failure marker here if make_api_request handled it or if error is post-API call
+                # Cache write block below will handle it based on fetch_succeeded_for_cache_write
 
     # --- Cache Write (if live fetch was attempted) ---
     if live_fetch_attempted and cache and cache_key:
@@ -621,12 +781,14 @@ async def fetch_eodhd_ohlcv(
             log_msg_suffix = "empty DataFrame" if final_processed_df.empty else f"DataFrame with shape {final_processed_df.shape}"
             logger.info(f"{log_prefix} Live fetch resulted in a {log_msg_suffix}. Caching this result...")
             try:
-                serialized_data = _serialize_dataframe_for_cache(final_processed_df, log_prefix)
-                if serialized_data:
-                    await cache.set(cache_key, serialized_data, timeout_seconds=cache_ttl)
-                    logger.info(f"{log_prefix} Cache SET successful for {log_msg_suffix}.")
-                else:
-                    logger.error(f"{log_prefix} Failed to serialize DataFrame for cache. Not caching valid data.")
+                serialized_data = encode_dataframe(final_processed_df)
+                await cache.set_bytes(cache_key, serialized_data, timeout_seconds=cache_ttl)
+                logger.info(f"{log_prefix} Cache SET successful for {log_msg_suffix}.")
+                if history_cache_key and history_to_store is not None:
+                    await cache.set_bytes(history_cache_key, encode_dataframe(history_to_store), timeout_seconds=EODHD_OHLCV_HISTORY_TTL)
+                    logger.debug(f"{log_prefix} OHLCV history stored ({len(history_to_store)} rows).")
+            except DataFrameCodecError as e_codec:
+                logger.error(f"{log_prefix} Failed to encode DataFrame for cache ({e_codec}). Not caching valid data.")
             except Exception as e_cache_set:
                 logger.error(f"{log_prefix} Cache SET FAILED for live data. Error: {e_cache_set}", exc_info=True)
         elif not fetch_succeeded_for_cache_write: # Live fetch attempted but failed or resulted in None
@@ -744,6 +906,7 @@ async def fetch_eodhd_splits_and_dividends(
             api_response_dividends = await make_api_request(
                 client=client, method="GET", url=dividends_url, params=common_params,
                 cache_service=cache, cache_key_for_failure=cache_key, # Failure on this sub-request marks the main key
+                failure_marker_checked=not force_refresh,
                 source_name_for_log=f"{source_name}_dividends for {symbol_with_exchange}"
             )
 
@@ -763,6 +926,7 @@ async def fetch_eodhd_splits_and_dividends(
                 api_response_splits = await make_api_request(
                     client=client, method="GET", url=splits_url, params=common_params,
                     cache_service=cache, cache_key_for_failure=cache_key,
+                    failure_marker_checked=not force_refresh,
                     source_name_for_log=f"{source_name}_splits for {symbol_with_exchange}"
                 )
 
@@ -874,6 +1038,7 @@ async def fetch_eodhd_splits_and_dividends(
 # ==============================================================================
 # === EODHD News Fetcher Function (Javított Verzió) ===
 # ==============================================================================
+@coalesce_fetch("eodhd_news", identifier_arg="symbol")
 async def fetch_eodhd_news(
     symbol: str,                 # A ticker szimbólum (pl. "NVDA.US") - Kötelezővé tettük
     client: httpx.AsyncClient,   # HTTP kliens
@@ -1026,6 +1191,7 @@ async def fetch_eodhd_news(
                 params=api_params,
                 cache_service=cache, # Átadjuk a cache service-t
                 cache_key_for_failure=cache_key, # Megadjuk a kulcsot a failure markerhez
+                failure_marker_checked=not force_refresh,
                 source_name_for_log=f"eodhd_news for {symbol}"
             )
 
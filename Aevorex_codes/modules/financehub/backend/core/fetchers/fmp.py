@@ -25,6 +25,7 @@ try:
     from ._base_helpers import (
         generate_cache_key,
         make_api_request,
+        coalesce_fetch,
         get_api_key,
         FETCH_FAILURE_CACHE_TTL # Szükséges a hibás lekérések cache-eléséhez
     )
@@ -217,6 +218,7 @@ async def fetch_fmp_historical_ratings(
         params=api_params,
         cache_service=cache,
         cache_key_for_failure=cache_key, # Allow helper to cache critical failures early
+        failure_marker_checked=not force_refresh,
         source_name_for_log=f"FMP Historical Ratings for {symbol_upper}"
     )
 
@@ -251,6 +253,7 @@ async def fetch_fmp_historical_ratings(
     return ratings_to_return
 
 
+@coalesce_fetch("fmp_stock_news")
 async def fetch_fmp_stock_news(
     symbol: str, client: httpx.AsyncClient, cache: CacheService, force_refresh: bool = False
 ) -> Optional[List[Dict[str, Any]]]:
@@ -337,6 +340,7 @@ async def fetch_fmp_stock_news(
         params=api_params,
         cache_service=cache,
         cache_key_for_failure=cache_key,
+        failure_marker_checked=not force_refresh,
         source_name_for_log=f"FMP Stock News for {symbol_upper}"
     )
 
@@ -368,6 +372,7 @@ async def fetch_fmp_stock_news(
     return news_to_return
 
 
+@coalesce_fetch("fmp_press_releases")
 async def fetch_fmp_press_releases(
     symbol: str, client: httpx.AsyncClient, cache: CacheService, force_refresh: bool = False
 ) -> Optional[List[Dict[str, Any]]]:
@@ -443,6 +448,7 @@ async def fetch_fmp_press_releases(
         params=api_params,
         cache_service=cache,
         cache_key_for_failure=cache_key,
+        failure_marker_checked=not force_refresh,
         source_name_for_log=f"FMP Press Releases for {symbol_upper}"
     )
 
@@ -21,6 +21,7 @@ try:
     from ._base_helpers import (
         generate_cache_key,
         make_api_request,
+        coalesce_fetch,
         get_api_key,
         FETCH_FAILURE_CACHE_TTL,
     )
@@ -133,6 +134,7 @@ else:
         f"Using default MarketAux config values (TTL: {NEWS_RAW_FETCH_TTL}s, Limit: {NEWS_FETCH_LIMIT}) due to core dependency import errors."
     )
 
+@coalesce_fetch("marketaux_news")
 async def fetch_marketaux_news(
     symbol: str, client: httpx.AsyncClient, cache: CacheService, force_refresh: bool = False
 ) -> Optional[List[Dict[str, Any]]]:
@@ -239,6 +241,7 @@ async def fetch_marketaux_news(
         params=api_params,
         cache_service=cache,
         cache_key_for_failure=cache_key, # make_api_request will use this to cache FETCH_FAILED_MARKER on direct comms failure
+        failure_marker_checked=not force_refresh,
         source_name_for_log=f"{source_name}_{data_type} for {symbol_upper}",
     )
 
@@ -16,6 +16,7 @@ try:
     from ._base_helpers import (
         generate_cache_key,
         make_api_request,
+        coalesce_fetch,
         get_api_key,
         FETCH_FAILURE_CACHE_TTL # <<< HOZZÁADVA EZ AZ IMPORT
     )
@@ -75,6 +76,7 @@ else:
 # === Public NewsAPI Fetcher Function ===
 # ==============================================================================
 
+@coalesce_fetch("newsapi_news")
 async def fetch_newsapi_news(
     symbol: str, client: httpx.AsyncClient, cache: CacheService, force_refresh: bool = False
 ) -> Optional[List[Dict[str, Any]]]:
@@ -186,6 +188,7 @@ async def fetch_newsapi_news(
         params=api_params,
         cache_service=cache,
         cache_key_for_failure=cache_key, # make_api_request will cache failure on HTTP errors
+        failure_marker_checked=not force_refresh,
         source_name_for_log=f"{source_name}_{data_type} for {symbol_upper}"
     )
 
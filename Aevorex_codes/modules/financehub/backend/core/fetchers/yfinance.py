@@ -1,6 +1,8 @@
 # backend/core/fetchers/yfinance.py
 import asyncio
+import threading
 import time
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Union, cast, TypeAlias, TYPE_CHECKING
 import pandas as pd # type: ignore
 # import importlib.util # Erre már nem lesz szükség az egyszerűsített importtal
@@ -16,6 +18,23 @@ import importlib
 import json
 from pprint import pformat
 from ..cache_service import CacheService
+from ._base_helpers import acquire_provider_call, coalesce_fetch, record_provider_call
+from ..dataframe_codec import (
+    CODEC_CACHE_TAG,
+    DataFrameCodecError,
+    decode_cache_entry,
+    encode_dataframe,
+    migrate_legacy_frame_entry,
+)
+from ..ohlcv_history import (
+    HISTORY_CACHE_TAG,
+    has_new_corporate_action,
+    history_covers,
+    incremental_start,
+    mark_full_refresh,
+    merge_ohlcv_history,
+    slice_from,
+)
 from modules.financehub.backend.utils.logger_config import get_logger
 from modules.financehub.backend.utils.helpers import (
     generate_cache_key,
@@ -131,8 +150,14 @@ YFINANCE_OHLCV_TTL = settings.CACHE.DEFAULT_TTL_SECONDS
 YFINANCE_COMPANY_INFO_TTL = settings.CACHE.DEFAULT_TTL_SECONDS * 24
 YFINANCE_FINANCIAL_DATA_TTL = settings.CACHE.DEFAULT_TTL_SECONDS * 24 * 7
 YFINANCE_NEWS_TTL = settings.CACHE.DEFAULT_TTL_SECONDS
+YFINANCE_OHLCV_HISTORY_TTL = getattr(settings.CACHE, 'OHLCV_HISTORY_TTL_SECONDS', 7 * 24 * 3600)
+YFINANCE_OHLCV_INCREMENTAL_ENABLED = getattr(settings.CACHE, 'OHLCV_INCREMENTAL_ENABLED', True)
 
 OHLCV_REQUIRED_COLS = ['open', 'high', 'low', 'close', 'adj_close', 'volume']
+# Inkrementálisan frissíthető intervallumok; intraday-nél a teljes lekérés marad
+YF_INCREMENTAL_INTERVALS = ('1d', '5d', '1wk', '1mo', '3mo')
+# A ticker.history nyers oszlopai, amelyek vállalati eseményt jeleznek
+YF_CORPORATE_ACTION_COLS = ('Dividends', 'Stock Splits')
 
 
 # --- DataFrame Szerializálás/Deserializálás Cache-hez ---
@@ -440,6 +465,36 @@ def _deserialize_dataframe_from_cache(
 
 
 # --- yfinance Szinkron Hívás Wrapperek ---
+# A wrapperek minden hibánál None-t adnak; a szálon futó hívás itt jelzi, ha a hiba
+# szállítási (hálózat, időtúllépés, 429/5xx) volt. Csak ez számít a breakerben
+# hibának, a "nincs adat ehhez a szimbólumhoz" None nem (mint a 404 a make_api_request-ben).
+_YF_CALL_STATE = threading.local()
+_YF_TRANSPORT_ERROR_NAMES = frozenset({
+    "RequestException", "ConnectionError", "Timeout", "ConnectTimeout", "ReadTimeout",
+    "ProxyError", "SSLError", "ChunkedEncodingError", "CurlError", "YFRateLimitError",
+})
+
+
+def _is_yf_transport_error(exc: BaseException) -> bool:
+    status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status_code, int):
+        return status_code >= 500 or status_code == 429
+    if isinstance(exc, (TimeoutError, OSError)):
+        return True
+    return any(cls.__name__ in _YF_TRANSPORT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+def _note_yf_exception(exc: BaseException) -> None:
+    if _is_yf_transport_error(exc):
+        _YF_CALL_STATE.transport_failed = True
+
+
+def _run_yf_call(sync_func, *args) -> "tuple[Any, bool]":
+    """A szálon fut: (eredmény, volt-e szállítási hiba)."""
+    _YF_CALL_STATE.transport_failed = False
+    result = sync_func(*args)
+    return result, _YF_CALL_STATE.transport_failed
+
 def _get_yfinance_ticker_sync(symbol: str) -> Optional[YFinanceTickerType]:
     if not _YFINANCE_DEPENDENCIES_MET or yf is None:
         YF_FETCHER_LOGGER.error(f"Cannot get yf.Ticker for {symbol}: yfinance library not available.")
@@ -468,9 +523,27 @@ def _get_yf_history_sync(ticker: YFinanceTickerType, period: str, interval: str)
             return None
         return df
     except Exception as e:
+        _note_yf_exception(e)
         YF_FETCHER_LOGGER.error(f"Exception in ticker.history for {ticker_name} ({period}, {interval}): {e}", exc_info=True)
         return None
 
+def _get_yf_history_range_sync(ticker: YFinanceTickerType, start: str, interval: str) -> Optional[pd.DataFrame]:
+    """Mint `_get_yf_history_sync`, de `period` helyett `start` dátumtól kér le (inkrementális frissítés)."""
+    ticker_name = getattr(ticker, 'ticker', 'unknown_ticker_object')
+    if ticker is None or not _YFINANCE_DEPENDENCIES_MET:
+        YF_FETCHER_LOGGER.error(f"Cannot get history range for {ticker_name}: ticker object or yfinance dependency missing.")
+        return None
+    try:
+        df = ticker.history(start=start, interval=interval)
+        if not isinstance(df, pd.DataFrame):
+            YF_FETCHER_LOGGER.error(f"ticker.history for {ticker_name} did not return DataFrame (got {type(df)}).")
+            return None
+        return df
+    except Exception as e:
+        _note_yf_exception(e)
+        YF_FETCHER_LOGGER.error(f"Exception in ticker.history for {ticker_name} (start={start}, {interval}): {e}", exc_info=True)
+        return None
+
 def _get_yf_info_sync(ticker: YFinanceTickerType) -> Optional[Dict[str, Any]]:
     ticker_name = getattr(ticker, 'ticker', 'unknown_ticker_object')
     if ticker is None:
@@ -488,6 +561,7 @@ def _get_yf_info_sync(ticker: YFinanceTickerType) -> Optional[Dict[str, Any]]:
             YF_FETCHER_LOGGER.warning(f"ticker.info for {ticker_name} returned an empty dictionary.")
         return info_dict
     except Exception as e:
+        _note_yf_exception(e)
         YF_FETCHER_LOGGER.error(f"Exception in ticker.info for {ticker_name}: {e}", exc_info=True)
         return None
 
@@ -521,6 +595,7 @@ def _get_yf_financial_statement_sync(ticker: YFinanceTickerType, statement_type:
         # Az üres DataFrame valid lehet, ha nincs adat. Ezt a hívó kezeli.
         return df
     except Exception as e:
+        _note_yf_exception(e)
         YF_FETCHER_LOGGER.error(f"Exception fetching financial statement '{statement_type}' for {ticker_name}: {e}", exc_info=True)
         return None
 
@@ -545,9 +620,32 @@ def _get_yf_news_sync(ticker: YFinanceTickerType) -> Optional[List[Dict[str, Any
             return None
         return news_list # Üres lista is valid válasz
     except Exception as e:
+        _note_yf_exception(e)
         YF_FETCHER_LOGGER.error(f"Exception in ticker.news for {ticker_name}: {e}", exc_info=False)
         return None
 
+async def _yf_to_thread(sync_func, *args) -> Any:
+    """
+    `asyncio.to_thread` a yfinance hívásokhoz, a kimenet és a késleltetés rögzítésével
+    a "yfinance" circuit breakerben. Hibának csak a szállítási hibák (hálózat,
+    időtúllépés, 429/5xx) számítanak; egy ismeretlen tickerre adott None nem.
+    """
+    start = time.monotonic()
+    try:
+        result, transport_failed = await asyncio.to_thread(_run_yf_call, sync_func, *args)
+    except Exception:
+        await record_provider_call("yfinance", False, time.monotonic() - start)
+        raise
+    await record_provider_call("yfinance", not transport_failed, time.monotonic() - start)
+    return result
+
+
+async def _yfinance_available(log_prefix: str) -> bool:
+    if await acquire_provider_call("yfinance"):
+        return True
+    YF_FETCHER_LOGGER.warning(f"{log_prefix} Circuit breaker for 'yfinance' is open (or its half-open probe is in flight). Skipping live fetch. NOT caching failure.")
+    return False
+
 # --- Helper a DatetimeIndex konzisztenciájának biztosítására ---
 def _ensure_datetime_index(df: pd.DataFrame, log_prefix: str) -> Optional[pd.DataFrame]:
     """
@@ -588,8 +686,118 @@ def _ensure_datetime_index(df: pd.DataFrame, log_prefix: str) -> Optional[pd.Dat
     # Ha már UTC, akkor nincs teendő
     return df_copy
 
+# --- Élő OHLCV feldolgozás és inkrementális frissítés ---
+def _process_yf_history_df(history_df_raw: pd.DataFrame, log_prefix: str) -> Optional[pd.DataFrame]:
+    """
+    A nyers `ticker.history` kimenetet a standard (kisbetűs, UTC indexű) OHLCV formára hozza.
+    None-t ad vissza, ha a kötelező oszlopok hiányoznak vagy az index nem konvertálható.
+    """
+    if history_df_raw.empty:
+        YF_FETCHER_LOGGER.info(f"{log_prefix} Fetched EMPTY OHLCV DataFrame live.")
+        empty_df_processed = _ensure_datetime_index(history_df_raw, f"{log_prefix}[empty_df_process]")
+        if empty_df_processed is None:
+            YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to process index for empty live DataFrame. This is unexpected.")
+        return empty_df_processed
+
+    cleaned_df = history_df_raw.copy() # Másolaton dolgozunk
+    original_columns = list(cleaned_df.columns)
+    cleaned_df.columns = [str(col).lower().replace(' ', '_') for col in cleaned_df.columns]
+    YF_FETCHER_LOGGER.debug(f"{log_prefix} Normalized column names from {original_columns} to {list(cleaned_df.columns)}.")
+
+    if 'adj_close' not in cleaned_df.columns:
+        for potential_name in ('adjusted_close', 'adjclose'):
+            if potential_name in cleaned_df.columns:
+                cleaned_df.rename(columns={potential_name: 'adj_close'}, inplace=True)
+                YF_FETCHER_LOGGER.info(f"{log_prefix} Renamed column '{potential_name}' to 'adj_close'.")
+                break
+        else:
+            # auto_adjust=True (alapértelmezett) mellett a 'close' már adjusztált
+            if 'close' in cleaned_df.columns:
+                YF_FETCHER_LOGGER.info(f"{log_prefix} 'adj_close' column not found. Using 'close' column as 'adj_close'. (Assumes yfinance auto_adjust=True)")
+                cleaned_df['adj_close'] = cleaned_df['close']
+            else:
+                YF_FETCHER_LOGGER.warning(f"{log_prefix} 'adj_close' column not found and 'close' column also missing. Available: {list(cleaned_df.columns)}")
+
+    missing_cols = [col for col in OHLCV_REQUIRED_COLS if col not in cleaned_df.columns]
+    if missing_cols:
+        YF_FETCHER_LOGGER.error(f"{log_prefix} Live data MISSING required OHLCV columns: {missing_cols} even after normalization. Available columns: {list(cleaned_df.columns)}. Cannot proceed with this data.")
+        return None
+
+    processed_df = _ensure_datetime_index(cleaned_df, f"{log_prefix}[live_df_process]")
+    if processed_df is None:
+        YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to ensure DatetimeIndex for live OHLCV data.")
+        return None
+
+    final_df = processed_df[OHLCV_REQUIRED_COLS].copy()
+    # Volume explicit int konverzió, NaN -> 0; a többi numerikus oszlop float
+    for col in OHLCV_REQUIRED_COLS:
+        if col == 'volume':
+            final_df[col] = pd.to_numeric(final_df[col], errors='coerce').fillna(0).astype(int)
+        else:
+            final_df[col] = pd.to_numeric(final_df[col], errors='coerce').astype(float)
+
+    cols_to_check_for_nan = ['open', 'high', 'low', 'close', 'adj_close']
+    if final_df[cols_to_check_for_nan].isnull().values.any():
+        nan_counts = final_df[cols_to_check_for_nan].isnull().sum()
+        YF_FETCHER_LOGGER.warning(f"{log_prefix} NaN values found in critical OHLC/adj_close data after processing. Counts: {nan_counts[nan_counts > 0].to_dict()}. This may indicate data quality issues from source or conversion problems.")
+    return final_df
+
+
+async def _load_yf_ohlcv_history(
+    cache: CacheService, history_cache_key: str, log_prefix: str, prefetched: Optional[Dict[str, Optional[bytes]]] = None
+) -> Optional[pd.DataFrame]:
+    """Betölti a tárolt teljes idősort (a `prefetched` kötegből, ha már ott van); hibás/hiányzó bejegyzés esetén None."""
+    try:
+        raw_history = prefetched[history_cache_key] if prefetched and history_cache_key in prefetched else await cache.get_bytes(history_cache_key)
+        history = decode_cache_entry(raw_history)
+    except DataFrameCodecError as e_codec:
+        YF_FETCHER_LOGGER.warning(f"{log_prefix} History cache entry corrupted ({e_codec}). Deleting.")
+        await cache.delete(history_cache_key)
+        return None
+    except Exception as e_hist_get:
+        YF_FETCHER_LOGGER.error(f"{log_prefix} ERROR loading OHLCV history: {e_hist_get}", exc_info=True)
+        return None
+    return history if isinstance(history, pd.DataFrame) else None
+
+
+async def _fetch_yf_ohlcv_incremental(
+    yf_ticker_obj: YFinanceTickerType, history: pd.DataFrame, interval: str, log_prefix: str
+) -> Optional[pd.DataFrame]:
+    """
+    Az utolsó tárolt bártól kér le adatot, és összefésüli a history-val.
+
+    None-t ad vissza (a hívó ilyenkor teljes letöltést végez), ha az új
+    bárok között a legutóbbi teljes letöltés utáni osztalék/split van
+    (auto_adjust miatt ilyenkor a korábbi árak is változnak), vagy ha a
+    lekérés sikertelen.
+    """
+    last_bar = incremental_start(history)
+    if last_bar is None:
+        return None
+    start_str = last_bar.strftime('%Y-%m-%d')
+    raw_df = await _yf_to_thread(_get_yf_history_range_sync, yf_ticker_obj, start_str, interval)
+    if raw_df is None:
+        return None
+
+    action_dates: List[Any] = []
+    for action_col in YF_CORPORATE_ACTION_COLS:
+        if action_col in raw_df.columns:
+            action_values = pd.to_numeric(raw_df[action_col], errors='coerce').fillna(0)
+            action_dates.extend(raw_df.index[action_values != 0])
+    if has_new_corporate_action(history, action_dates):
+        YF_FETCHER_LOGGER.info(f"{log_prefix} Incremental: new split/dividend in bars since {start_str}. Full refresh required.")
+        return None
+
+    new_bars = _process_yf_history_df(raw_df, f"{log_prefix}[incremental]")
+    if new_bars is None:
+        return None
+    merged = merge_ohlcv_history(history, new_bars)
+    YF_FETCHER_LOGGER.info(f"{log_prefix} Incremental: fetched {len(new_bars)} bar(s) from {start_str}. History rows: {len(history)} -> {len(merged)}.")
+    return merged
+
 # --- Fetcher Függvények ---
 
+@coalesce_fetch("yfinance_ohlcv", identifier_arg="symbol")
 async def fetch_ohlcv(
     symbol: str, years: int, cache: CacheService, interval: str = "1d", force_refresh: bool = False
 ) -> Optional[pd.DataFrame]:
@@ -607,43 +815,62 @@ async def fetch_ohlcv(
     source, data_type_name = "yfinance", "ohlcv_v2" # v2 a jobb szerializálás/deszerializálás miatt
     log_prefix = f"[{symbol_upper}][{source}_{data_type_name}][{period_str}:{interval}]"
     cache_key: Optional[str] = None
+    legacy_cache_key: Optional[str] = None
+    history_cache_key: Optional[str] = None
+    requested_from = (datetime.now(timezone.utc) - timedelta(days=int(max(1, int(years)) * 365.25))).strftime('%Y-%m-%d')
 
     try:
-        cache_key_params = {"years": years, "interval": interval, "v": "2.0"} # Verziózás a cache key-ben
+        # A "codec" paraméter a bináris oszlopos formátum verziója; a régi (v2.0, JSON split-dict)
+        # kulcs csak az egyszeri migrációhoz kell.
+        legacy_cache_key_params = {"years": years, "interval": interval, "v": "2.0"}
+        cache_key_params = {**legacy_cache_key_params, "codec": CODEC_CACHE_TAG}
         cache_key = generate_cache_key(data_type_name, source, symbol_upper, params=cache_key_params)
+        legacy_cache_key = generate_cache_key(data_type_name, source, symbol_upper, params=legacy_cache_key_params)
         YF_FETCHER_LOGGER.debug(f"{log_prefix} Generated cache key: {cache_key}")
+        # Tartomány-független kulcs a teljes idősornak (inkrementális frissítéshez)
+        if YFINANCE_OHLCV_INCREMENTAL_ENABLED and interval in YF_INCREMENTAL_INTERVALS:
+            history_cache_key = generate_cache_key("ohlcv_history", source, symbol_upper, params={"interval": interval, "history": HISTORY_CACHE_TAG, "codec": CODEC_CACHE_TAG})
     except ValueError as e: # generate_cache_key dobhatja ezt
         YF_FETCHER_LOGGER.error(f"{log_prefix} Cache key generation error: {e}", exc_info=True)
         return None # Cache kulcs nélkül nem tudunk továbbmenni
 
     # 1. Cache olvasási kísérlet
+    prefetched_entries: Dict[str, Optional[bytes]] = {}
     if not force_refresh and cache_key: # Csak ha van cache és nem kényszerített a frissítés
         YF_FETCHER_LOGGER.debug(f"{log_prefix} Attempting to read from cache.")
         try:
-            cached_val = await cache.get(cache_key)
+            # A payload és a teljes idősor egy Redis körben (az utóbbi az inkrementális úthoz kell)
+            prefetched_entries = await cache.get_many_bytes([key for key in (cache_key, history_cache_key) if key])
+            cached_val = decode_cache_entry(prefetched_entries.get(cache_key))
+            if cached_val is None and legacy_cache_key:
+                # Régi JSON bejegyzés egyszeri beolvasása és átírása az új formátumba
+                cached_val = await migrate_legacy_frame_entry(
+                    cache, legacy_cache_key, cache_key,
+                    lambda legacy: _deserialize_dataframe_from_cache(legacy, f"{log_prefix}[legacy]"),
+                    YFINANCE_OHLCV_TTL, log_prefix,
+                )
             if cached_val is not None:
-                if cached_val == FETCH_FAILED_MARKER:
-                    YF_FETCHER_LOGGER.info(f"{log_prefix} Cache HIT (failure marker). Returning None.")
-                    return None
-                if isinstance(cached_val, dict): # Feltételezzük, hogy a szerializált DataFrame dict
-                    YF_FETCHER_LOGGER.info(f"{log_prefix} Cache HIT (data). Deserializing DataFrame.")
-                    df_from_cache = _deserialize_dataframe_from_cache(cached_val, log_prefix, index_is_datetime=True)
-                    if df_from_cache is not None:
-                        # Itt már a _deserialize_dataframe_from_cache kezeli az indexet, de egy _ensure_datetime_index
-                        # még egy utolsó ellenőrzést és UTC konverziót végezhet, ha szükséges.
-                        df_processed = _ensure_datetime_index(df_from_cache, f"{log_prefix}[cache_reprocess]")
-                        if df_processed is not None:
-                            YF_FETCHER_LOGGER.info(f"{log_prefix} Successfully deserialized and processed OHLCV from cache. Shape: {df_processed.shape}. Returning cached data.")
-                            return df_processed
-                        else:
-                            YF_FETCHER_LOGGER.warning(f"{log_prefix} Failed to ensure DatetimeIndex for cached OHLCV. Invalidating cache entry.")
-                            await cache.delete(cache_key) # Hibás adat, töröljük
+                # A DataFrame ellenőrzés legyen az első: egy DataFrame == str összehasonlítás elemenkénti
+                if isinstance(cached_val, pd.DataFrame):
+                    YF_FETCHER_LOGGER.info(f"{log_prefix} Cache HIT (columnar data).")
+                    # A kodek visszaállítja a DatetimeIndex-et és az időzónát, de egy _ensure_datetime_index
+                    # még egy utolsó ellenőrzést és UTC konverziót végezhet, ha szükséges.
+                    df_processed = _ensure_datetime_index(cached_val, f"{log_prefix}[cache_reprocess]")
+                    if df_processed is not None:
+                        YF_FETCHER_LOGGER.info(f"{log_prefix} Successfully deserialized and processed OHLCV from cache. Shape: {df_processed.shape}. Returning cached data.")
+                        return df_processed
                     else:
-                        YF_FETCHER_LOGGER.warning(f"{log_prefix} Failed to deserialize OHLCV from cache. Invalidating cache entry.")
+                        YF_FETCHER_LOGGER.warning(f"{log_prefix} Failed to ensure DatetimeIndex for cached OHLCV. Invalidating cache entry.")
                         await cache.delete(cache_key) # Hibás adat, töröljük
+                elif cached_val == FETCH_FAILED_MARKER:
+                    YF_FETCHER_LOGGER.info(f"{log_prefix} Cache HIT (failure marker). Returning None.")
+                    return None
                 else: # Váratlan típus a cache-ben
-                    YF_FETCHER_LOGGER.warning(f"{log_prefix} Invalid data type found in cache for OHLCV (expected dict, got {type(cached_val)}). Invalidating.")
+                    YF_FETCHER_LOGGER.warning(f"{log_prefix} Invalid data type found in cache for OHLCV (expected DataFrame, got {type(cached_val)}). Invalidating.")
                     await cache.delete(cache_key)
+        except DataFrameCodecError as e_codec:
+            YF_FETCHER_LOGGER.warning(f"{log_prefix} Corrupted columnar cache entry: {e_codec}. Invalidating.")
+            await cache.delete(cache_key)
         except Exception as e: # Bármilyen hiba a cache olvasásakor
             YF_FETCHER_LOGGER.error(f"{log_prefix} Cache GET error: {e}", exc_info=True)
             # Hiba esetén folytatjuk a live fetch-csel, mintha cache miss lenne
@@ -651,9 +878,12 @@ async def fetch_ohlcv(
         YF_FETCHER_LOGGER.info(f"{log_prefix} Force refresh requested. Skipping cache read for key '{cache_key}'.")
 
     # 2. Live adatlekérés (ha cache miss, invalid cache, vagy force_refresh)
+    if not await _yfinance_available(log_prefix):
+        return None
     YF_FETCHER_LOGGER.info(f"{log_prefix} Proceeding with LIVE data fetch attempt.")
     live_fetch_attempted = True
     fetch_start_time = time.monotonic()
+    history_to_store: Optional[pd.DataFrame] = None
 
     try:
         yf_ticker_obj = await asyncio.to_thread(_get_yfinance_ticker_sync, symbol_upper)
@@ -661,103 +891,52 @@ async def fetch_ohlcv(
             YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to obtain yfinance ticker object for '{symbol_upper}'.")
             # df_to_return marad None
         else:
-            history_df_raw = await asyncio.to_thread(_get_yf_history_sync, yf_ticker_obj, period_str, interval)
-            fetch_duration = time.monotonic() - fetch_start_time
-            YF_FETCHER_LOGGER.info(f"{log_prefix} Live fetch attempt completed in {fetch_duration:.4f}s.")
-
-            if history_df_raw is None: # Ha a _get_yf_history_sync None-t ad vissza
-                YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to fetch live OHLCV data (history_df_raw is None).")
-                # df_to_return marad None
-            elif history_df_raw.empty:
-                YF_FETCHER_LOGGER.info(f"{log_prefix} Fetched EMPTY OHLCV DataFrame live.")
-                empty_df_processed = _ensure_datetime_index(history_df_raw, f"{log_prefix}[empty_df_process]")
-                if empty_df_processed is None:
-                     YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to process index for empty live DataFrame. This is unexpected.")
-                     # df_to_return marad None # Marad None, mert a hibaüzenet erre utal
+            # 2a. Inkrementális út: csak az utolsó tárolt bártól kérünk le adatot
+            if history_cache_key and not force_refresh:
+                history_df = await _load_yf_ohlcv_history(cache, history_cache_key, log_prefix, prefetched_entries)
+                if history_df is not None and history_covers(history_df, requested_from):
+                    merged_history = await _fetch_yf_ohlcv_incremental(yf_ticker_obj, history_df, interval, log_prefix)
+                    if merged_history is not None:
+                        history_to_store = merged_history
+                        df_to_return = slice_from(merged_history, requested_from)
+
+            # 2b. Teljes letöltés
+            if df_to_return is None:
+                history_df_raw = await _yf_to_thread(_get_yf_history_sync, yf_ticker_obj, period_str, interval)
+                fetch_duration = time.monotonic() - fetch_start_time
+                YF_FETCHER_LOGGER.info(f"{log_prefix} Live fetch attempt completed in {fetch_duration:.4f}s.")
+
+                if history_df_raw is None: # Ha a _get_yf_history_sync None-t ad vissza
+                    YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to fetch live OHLCV data (history_df_raw is None).")
+                    # df_to_return marad None
                 else:
-                    df_to_return = empty_df_processed
-            else: # Van adat a history_df_raw-ban
-                YF_FETCHER_LOGGER.info(f"{log_prefix} Fetched {len(history_df_raw)} raw data points live. Processing...")
-                
-                cleaned_df = history_df_raw.copy() # Másolaton dolgozunk
-
-                            # === JAVÍTOTT OSZLOPNÉV NORMALIZÁLÁS ===
-            original_columns = list(cleaned_df.columns)
-            cleaned_df.columns = [str(col).lower().replace(' ', '_') for col in cleaned_df.columns]
-            YF_FETCHER_LOGGER.debug(f"{log_prefix} Normalized column names from {original_columns} to {list(cleaned_df.columns)}.")
-
-            if 'adj_close' not in cleaned_df.columns:
-                potential_adj_names = ['adjusted_close', 'adjclose', 'adj close'] # Az 'adj close' hozzáadva
-                found_and_renamed = False
-                for potential_name in potential_adj_names:
-                    if potential_name in cleaned_df.columns: # Itt is a normalizált oszlopnevek között kell keresni
-                        cleaned_df.rename(columns={potential_name: 'adj_close'}, inplace=True)
-                        YF_FETCHER_LOGGER.info(f"{log_prefix} Renamed column '{potential_name}' to 'adj_close'.")
-                        found_and_renamed = True
-                        break
-                if not found_and_renamed:
-                    YF_FETCHER_LOGGER.warning(f"{log_prefix} 'adj_close' column not found and could not be renamed from potential alternatives. Available after normalization: {list(cleaned_df.columns)}")
-            # === VÉGE JAVÍTOTT OSZLOPNÉV NORMALIZÁLÁS ===
-
-                # Kötelező oszlopok ellenőrzése (OHLCV_REQUIRED_COLS-t feltételezve)
-               # Ez az if blokk már megvolt az átnevezéshez...
-                    if not found_and_renamed: # Ez a feltétel fontos! Csak akkor fussunk le, ha az átnevezés nem sikerült.
-                        # Ha továbbra sincs 'adj_close', de van 'close', akkor használjuk azt 'adj_close'-ként
-                        # Ez feltételezi, hogy a yfinance auto_adjust=True (alapértelmezett)
-                        if 'close' in cleaned_df.columns:
-                            YF_FETCHER_LOGGER.info(f"{log_prefix} 'adj_close' column not found after attempting rename. Using 'close' column as 'adj_close'. (Assumes yfinance auto_adjust=True)")
-                            cleaned_df['adj_close'] = cleaned_df['close'] # << A LÉNYEG!
-                        else:
-                            # Ha 'close' sincs, akkor tényleg baj van, de ez ritka.
-                            YF_FETCHER_LOGGER.warning(f"{log_prefix} 'adj_close' column not found and 'close' column also missing. Cannot create 'adj_close'. Available: {list(cleaned_df.columns)}")
-                    # Az if not found_and_renamed blokk vége
-                    # Itt jön a KÖVETKEZŐ lépés, a missing_cols ellenőrzése:
-                    missing_cols = [col for col in OHLCV_REQUIRED_COLS if col not in cleaned_df.columns]
-                    if missing_cols:
-                        YF_FETCHER_LOGGER.error(f"{log_prefix} Live data MIssiNG required OHLCV columns: {missing_cols} even after normalization. Available columns: {list(cleaned_df.columns)}. Cannot proceed with this data.")
-                        # df_to_return marad None
-                    else:
-                        # Index biztosítása (DatetimeIndex, UTC)
-                        processed_df = _ensure_datetime_index(cleaned_df, f"{log_prefix}[live_df_process]")
-                        if processed_df is None:
-                            YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to ensure DatetimeIndex for live OHLCV data.")
-                            # df_to_return marad None
-                        else:
-                            # Csak a szükséges oszlopok kiválasztása és típuskonverzió
-                            final_df = processed_df[OHLCV_REQUIRED_COLS].copy()
-                            
-                            # Volume explicit int konverzió, NaN -> 0 (és egyéb numerikus oszlopok float-ra)
-                            for col in OHLCV_REQUIRED_COLS:
-                                if col == 'volume':
-                                    final_df[col] = pd.to_numeric(final_df[col], errors='coerce').fillna(0).astype(int)
-                                else: # open, high, low, close, adj_close
-                                    final_df[col] = pd.to_numeric(final_df[col], errors='coerce').astype(float) # Legyen float
-
-                            # Ellenőrizzük a NaN értékeket az OHLC és adj_close oszlopokban
-                            # A volume már kezelt (fillna(0))
-                            cols_to_check_for_nan = ['open', 'high', 'low', 'close', 'adj_close']
-                            if final_df[cols_to_check_for_nan].isnull().values.any():
-                                nan_counts = final_df[cols_to_check_for_nan].isnull().sum()
-                                YF_FETCHER_LOGGER.warning(f"{log_prefix} NaN values found in critical OHLC/adj_close data after processing. Counts: {nan_counts[nan_counts > 0].to_dict()}. This may indicate data quality issues from source or conversion problems.")
-                                # Itt dönthetsz úgy, hogy hibát dobsz, vagy folytatod NaN értékekkel
-                                # Jelenleg a kód folytatódik. Ha nem akarod, hogy folytatódjon:
-                                # df_to_return = None # És a log üzenet is kritikusabb lehet
-                            
-                            df_to_return = final_df
-                            YF_FETCHER_LOGGER.info(f"{log_prefix} Successfully processed live OHLCV data. Shape: {df_to_return.shape}.")
+                    YF_FETCHER_LOGGER.info(f"{log_prefix} Fetched {len(history_df_raw)} raw data points live. Processing...")
+                    df_to_return = _process_yf_history_df(history_df_raw, log_prefix)
+                    if df_to_return is not None:
+                        if history_cache_key and not df_to_return.empty:
+                            history_to_store = mark_full_refresh(df_to_return.copy(), requested_from)
+                        YF_FETCHER_LOGGER.info(f"{log_prefix} Successfully processed live OHLCV data. Shape: {df_to_return.shape}.")
     except Exception as e: # Váratlan hiba a live fetch vagy feldolgozás során
         YF_FETCHER_LOGGER.critical(f"{log_prefix} Unexpected critical error during live OHLCV fetch or processing: {e}", exc_info=True)
         df_to_return = None # Biztosítjuk, hogy None legyen a visszatérési érték
+        history_to_store = None
 
     # 3. Cache írása (ha történt live fetch kísérlet és van cache)
     if live_fetch_attempted and cache_key: # cache_key itt már biztosan nem None
         if df_to_return is not None and not df_to_return.empty and df_to_return[OHLCV_REQUIRED_COLS[:-1]].notna().values.any(): # Legalább egy érték nem NaN a fő oszlopokban (volume kivételével)
             YF_FETCHER_LOGGER.debug(f"{log_prefix} Attempting to serialize and cache successful OHLCV data (shape: {df_to_return.shape}).")
-            serialized_df = _serialize_dataframe_for_cache(df_to_return, log_prefix)
+            try:
+                serialized_df: Optional[bytes] = encode_dataframe(df_to_return)
+            except DataFrameCodecError as e_codec:
+                YF_FETCHER_LOGGER.error(f"{log_prefix} Columnar encoding failed: {e_codec}")
+                serialized_df = None
             if serialized_df:
                 try:
-                    await cache.set(cache_key, serialized_df, YFINANCE_OHLCV_TTL)
+                    await cache.set_bytes(cache_key, serialized_df, YFINANCE_OHLCV_TTL)
                     YF_FETCHER_LOGGER.info(f"{log_prefix} Successfully cached live OHLCV data.")
+                    if history_cache_key and history_to_store is not None:
+                        await cache.set_bytes(history_cache_key, encode_dataframe(history_to_store), YFINANCE_OHLCV_HISTORY_TTL)
+                        YF_FETCHER_LOGGER.debug(f"{log_prefix} OHLCV history stored ({len(history_to_store)} rows).")
                 except Exception as e_cache_set:
                     YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to cache successfully fetched/processed OHLCV data: {e_cache_set}", exc_info=True)
                     # Opcionális: itt is cache-elhetnénk FETCH_FAILED_MARKER-t, de ez azt jelentené, hogy a következő kérés is sikertelen lesz,
@@ -779,6 +958,7 @@ async def fetch_ohlcv(
     return df_to_return
 
 
+@coalesce_fetch("yfinance_company_info", identifier_arg="ticker_symbol")
 async def fetch_company_info_dict(
     ticker_symbol: str, cache: CacheService, force_refresh: bool = False
 ) -> Optional[Dict[str, Any]]:
@@ -823,6 +1003,8 @@ async def fetch_company_info_dict(
         YF_FETCHER_LOGGER.info(f"{log_prefix} Force refresh requested. Skipping cache read.")
 
     # Live Fetch
+    if not await _yfinance_available(log_prefix):
+        return None
     YF_FETCHER_LOGGER.info(f"{log_prefix} Proceeding with LIVE data fetch attempt.")
     live_fetch_attempted = True
     fetch_start_time = time.monotonic()
@@ -832,7 +1014,7 @@ async def fetch_company_info_dict(
         if not yf_ticker_obj:
             YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to obtain yfinance ticker object for '{symbol_upper}'.")
         else:
-            info_dict_raw = await asyncio.to_thread(_get_yf_info_sync, yf_ticker_obj)
+            info_dict_raw = await _yf_to_thread(_get_yf_info_sync, yf_ticker_obj)
             fetch_duration = time.monotonic() - fetch_start_time
             YF_FETCHER_LOGGER.info(f"{log_prefix} Live fetch attempt completed in {fetch_duration:.4f}s.")
 
@@ -993,6 +1175,8 @@ async def fetch_financial_data_dfs(
         YF_FETCHER_LOGGER.info(f"{log_prefix} Force refresh requested for financials. Skipping cache read.")
 
     # Live Fetch
+    if not await _yfinance_available(log_prefix):
+        return None
     YF_FETCHER_LOGGER.info(f"{log_prefix} Proceeding with LIVE data fetch for all financial statements.")
     live_fetch_attempted = True
     fetch_start_time = time.monotonic()
@@ -1005,7 +1189,7 @@ async def fetch_financial_data_dfs(
         else:
             # Párhuzamos lekérések asyncio.gather-rel
             tasks = {
-                key_clean: asyncio.to_thread(_get_yf_financial_statement_sync, yf_ticker_obj, yf_property_name)
+                key_clean: _yf_to_thread(_get_yf_financial_statement_sync, yf_ticker_obj, yf_property_name)
                 for key_clean, yf_property_name in statement_map.items()
             }
             # A tasks.values() sorrendje megmarad a gather eredményében
@@ -1122,6 +1306,7 @@ async def fetch_financial_data_dfs(
     return financials_to_return
 
 
+@coalesce_fetch("yfinance_news", identifier_arg="symbol")
 async def fetch_yfinance_news(
     symbol: str, cache: CacheService, force_refresh: bool = False
 ) -> Optional[List[Dict[str, Any]]]:
@@ -1171,6 +1356,8 @@ async def fetch_yfinance_news(
         YF_FETCHER_LOGGER.info(f"{log_prefix} Force refresh requested for news. Skipping cache read.")
 
     # Live Fetch
+    if not await _yfinance_available(log_prefix):
+        return None
     YF_FETCHER_LOGGER.info(f"{log_prefix} Proceeding with LIVE data fetch for news.")
     live_fetch_attempted = True
     fetch_start_time = time.monotonic()
@@ -1180,7 +1367,7 @@ async def fetch_yfinance_news(
         if not yf_ticker_obj:
             YF_FETCHER_LOGGER.error(f"{log_prefix} Failed to obtain yfinance ticker object for '{symbol_upper}' for news fetch.")
         else:
-            news_list_raw = await asyncio.to_thread(_get_yf_news_sync, yf_ticker_obj)
+            news_list_raw = await _yf_to_thread(_get_yf_news_sync, yf_ticker_obj)
             fetch_duration = time.monotonic() - fetch_start_time
             YF_FETCHER_LOGGER.info(f"{log_prefix} Live news fetch attempt completed in {fetch_duration:.4f}s.")
 
@@ -0,0 +1,201 @@
+# backend/core/hedging.py
+"""
+Hedged (redundáns) lekérések idempotens, egymással helyettesíthető forrásokhoz.
+
+Az elsődleges forrás indul el először. Ha a megfigyelt p90 késleltetésén belül
+nem válaszol, ugyanaz a lekérés az alternatív forráshoz is elindul (pl. EODHD
+OHLCV mellé a yfinance `fetch_ohlcv`), és az első validált eredmény nyer; a
+vesztes taszkot megszakítjuk.
+
+A hedge-ek keretét (`HedgeBudget`) a gördülő ablakban indított összes
+hedge-elhető kérés arányában korlátozzuk, így a redundáns forgalom soha nem
+lépi túl a beállított részesedést.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from modules.financehub.backend.utils.logger_config import get_logger
+
+logger = get_logger(__name__)
+MODULE_PREFIX = "[Hedging]"
+
+# Kimenetek (metrika címkék)
+OUTCOME_NOT_NEEDED = "not_needed"
+OUTCOME_BUDGET_EXHAUSTED = "budget_exhausted"
+OUTCOME_PRIMARY_WON = "primary_won"
+OUTCOME_HEDGE_WON = "hedge_won"
+OUTCOME_BOTH_FAILED = "both_failed"
+
+
+class LatencyTracker:
+    """Forrásonkénti késleltetés minták (utolsó `max_samples`) és kvantilis becslés."""
+
+    def __init__(self, max_samples: int = 200, min_samples: int = 10):
+        self.max_samples = max_samples
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, source: str, seconds: float) -> None:
+        samples = self._samples.get(source)
+        if samples is None:
+            samples = self._samples[source] = deque(maxlen=self.max_samples)
+        samples.append(seconds)
+
+    def quantile(self, source: str, q: float) -> Optional[float]:
+        """A `q` kvantilis (nearest-rank), vagy None, ha még kevés a minta."""
+        samples = self._samples.get(source)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class HedgeBudget:
+    """
+    A hedge-ek aránya a gördülő ablak összes hedge-elhető kéréséhez képest
+    (elsődleges + hedge) legfeljebb `max_ratio` lehet.
+    """
+
+    def __init__(self, max_ratio: float, window_seconds: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        self.max_ratio = max_ratio
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._hedges: Deque[float] = deque()
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window_seconds
+        for events in (self._requests, self._hedges):
+            while events and events[0] < horizon:
+                events.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(self._clock())
+
+    def try_acquire(self) -> bool:
+        """Hedge engedélyezése (és elszámolása), ha belefér a keretbe."""
+        now = self._clock()
+        self._trim(now)
+        total_after = len(self._requests) + len(self._hedges) + 1
+        if len(self._hedges) + 1 > self.max_ratio * total_after:
+            return False
+        self._hedges.append(now)
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        self._trim(self._clock())
+        return {"requests": len(self._requests), "hedges": len(self._hedges)}
+
+
+class HedgedRequester:
+    """
+    Args:
+        budget: A hedge keret.
+        latency: Forrásonkénti késleltetés minták (a hedge késleltetéshez).
+        quantile: A hedge indításának küszöbe az elsődleges forrás késleltetés eloszlásában.
+        default_delay_seconds: Hedge késleltetés, amíg nincs elég minta.
+        min_delay_seconds / max_delay_seconds: A késleltetés korlátai.
+        on_outcome: Callback(primary, alternate, outcome) – metrikákhoz.
+    """
+
+    def __init__(
+        self,
+        budget: HedgeBudget,
+        latency: Optional[LatencyTracker] = None,
+        quantile: float = 0.9,
+        default_delay_seconds: float = 2.0,
+        min_delay_seconds: float = 0.2,
+        max_delay_seconds: float = 10.0,
+        on_outcome: Optional[Callable[[str, str, str], None]] = None,
+    ):
+        self.budget = budget
+        self.latency = latency or LatencyTracker()
+        self.quantile = quantile
+        self.default_delay_seconds = default_delay_seconds
+        self.min_delay_seconds = min_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._on_outcome = on_outcome
+
+    def hedge_delay(self, source: str) -> float:
+        observed = self.latency.quantile(source, self.quantile)
+        delay = self.default_delay_seconds if observed is None else observed
+        return min(self.max_delay_seconds, max(self.min_delay_seconds, delay))
+
+    def _start(self, source: str, factory: Callable[[], Awaitable[Any]]) -> "asyncio.Task[Any]":
+        started = time.monotonic()
+
+        async def timed() -> Any:
+            try:
+                return await factory()
+            finally:
+                # A megszakított (vesztes) hívás eltelt ideje alsó becslés, de enélkül a p90 lefelé torzulna
+                self.latency.observe(source, time.monotonic() - started)
+
+        return asyncio.create_task(timed())
+
+    def _report(self, primary: str, alternate: str, outcome: str) -> None:
+        if self._on_outcome is not None:
+            try:
+                self._on_outcome(primary, alternate, outcome)
+            except Exception:  # pragma: no cover – a metrika opcionális
+                pass
+
+    async def run(
+        self,
+        primary: Tuple[str, Callable[[], Awaitable[Any]]],
+        alternate: Tuple[str, Callable[[], Awaitable[Any]]],
+        is_valid: Callable[[str, Any], bool],
+    ) -> Tuple[str, Any]:
+        """
+        Elsődleges lekérés, késleltetett hedge-dzsel.
+
+        Args:
+            primary / alternate: (forrás neve, coroutine factory); a factory csak induláskor hívódik.
+            is_valid: (forrás, eredmény) -> elfogadható-e az eredmény.
+
+        Returns:
+            (nyertes forrás, eredmény). Ha egyik sem validált, az elsődleges eredménye
+            (vagy kivétele) jön vissza, így a hívó meglévő tartalék útjai érvényesek maradnak.
+        """
+        primary_source, primary_factory = primary
+        alternate_source, alternate_factory = alternate
+        self.budget.record_request()
+        primary_task = self._start(primary_source, primary_factory)
+
+        delay = self.hedge_delay(primary_source)
+        try:
+            done, _pending = await asyncio.wait({primary_task}, timeout=delay)
+        except asyncio.CancelledError:
+            primary_task.cancel()
+            raise
+        if done:
+            self._report(primary_source, alternate_source, OUTCOME_NOT_NEEDED)
+            return primary_source, primary_task.result()
+        if not self.budget.try_acquire():
+            self._report(primary_source, alternate_source, OUTCOME_BUDGET_EXHAUSTED)
+            return primary_source, await primary_task
+
+        logger.info(f"{MODULE_PREFIX} '{primary_source}' slower than {delay:.2f}s; hedging with '{alternate_source}'.")
+        tasks = {primary_task: primary_source, self._start(alternate_source, alternate_factory): alternate_source}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    source = tasks[task]
+                    if task.exception() is None and is_valid(source, task.result()):
+                        self._report(
+                            primary_source, alternate_source,
+                            OUTCOME_PRIMARY_WON if source == primary_source else OUTCOME_HEDGE_WON,
+                        )
+                        return source, task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self._report(primary_source, alternate_source, OUTCOME_BOTH_FAILED)
+        return primary_source, primary_task.result()
@@ -0,0 +1,156 @@
+# backend/core/indicator_columnar.py
+"""
+Oszlopos (columnar) indikátor-történet és gyors JSON szerializáló.
+
+A TA-Lib tömbjeit eddig pontonként Pydantic objektumokká (`IndicatorPoint`,
+`VolumePoint`, ...) alakítottuk, ami hosszú idősoroknál a teljes futásidő
+nagy részét adta. Itt egyetlen közös időtengely (`t`, unix másodperc) és
+sorozatonként egy float64 tömb (NaN = hiányzó érték) tárolódik; a
+`to_payload()` ugyanazt a JSON alakot állítja elő, mint az
+`IndicatorHistory.model_dump(mode="json")`, tömbszintű maszkolással.
+
+A modul tisztán NumPy/pandas alapú, I/O-mentes.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+VOLUME_UP_COLOR = '#26A69A'
+VOLUME_DOWN_COLOR = '#EF5350'
+MACD_HIST_UP_COLOR = '#26A69A'
+MACD_HIST_DOWN_COLOR = '#EF5350'
+
+SERIES_SIMPLE = "simple"
+SERIES_VOLUME = "volume"
+SERIES_MACD_HIST = "macd_hist"
+SERIES_STOCH = "stoch"
+
+# Az IndicatorHistory mezői: csoport -> (sorozat név, sorozat típus) párok, a modell sorrendjében.
+INDICATOR_LAYOUT: Tuple[Tuple[str, Tuple[Tuple[str, str], ...]], ...] = (
+    ("sma", (("SMA_SHORT", SERIES_SIMPLE), ("SMA_LONG", SERIES_SIMPLE))),
+    ("ema", (("EMA_SHORT", SERIES_SIMPLE), ("EMA_LONG", SERIES_SIMPLE))),
+    ("bbands", (("BBANDS_LOWER", SERIES_SIMPLE), ("BBANDS_MIDDLE", SERIES_SIMPLE), ("BBANDS_UPPER", SERIES_SIMPLE))),
+    ("rsi", (("RSI", SERIES_SIMPLE),)),
+    ("volume", (("VOLUME", SERIES_VOLUME),)),
+    ("volume_sma", (("VOLUME_SMA", SERIES_SIMPLE),)),
+    ("macd", (("MACD_LINE", SERIES_SIMPLE), ("MACD_SIGNAL", SERIES_SIMPLE), ("MACD_HIST", SERIES_MACD_HIST))),
+    ("stoch", (("STOCH", SERIES_STOCH),)),
+)
+
+# Az IndicatorHistory ezeket a csoportokat nem tölti ki; hiányzó forrástömböknél a csoport None
+OPTIONAL_GROUPS = frozenset({"ema"})
+
+# A VOLUME sorozat színezéséhez és a STOCH két vonalához használt segédtömbök nevei
+VOLUME_OPEN_KEY = "OPEN"
+VOLUME_CLOSE_KEY = "CLOSE"
+STOCH_K_KEY = "STOCH_K"
+STOCH_D_KEY = "STOCH_D"
+
+
+def unix_seconds(index: pd.DatetimeIndex) -> np.ndarray:
+    """UTC unix másodpercek (naiv index UTC-ként értelmezve, mint `Timestamp.timestamp()`)."""
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.values.astype("datetime64[ns]").astype(np.int64) // 1_000_000_000
+
+
+@dataclass
+class ColumnarIndicatorHistory:
+    """
+    Indikátor-történet közös időtengellyel.
+
+    Attributes:
+        t (np.ndarray): int64 unix másodpercek, minden sorozathoz közös.
+        series (Dict[str, np.ndarray]): Sorozat név -> float64 tömb (`len(t)` hosszú, NaN = hiányzó).
+    """
+
+    t: np.ndarray
+    series: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    @classmethod
+    def empty(cls) -> "ColumnarIndicatorHistory":
+        return cls(t=np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def from_index(cls, index: pd.DatetimeIndex, series: Mapping[str, Any]) -> "ColumnarIndicatorHistory":
+        t = unix_seconds(index)
+        arrays = {name: np.asarray(values, dtype=np.float64) for name, values in series.items() if values is not None}
+        for name, values in arrays.items():
+            if values.shape != t.shape:
+                raise ValueError(f"Series '{name}' length {values.shape} does not match time axis {t.shape}.")
+        return cls(t=t, series=arrays)
+
+    # ------------------------------------------------------------------
+    # Szerializálás
+    # ------------------------------------------------------------------
+    def to_payload(self) -> Dict[str, Any]:
+        """Az `IndicatorHistory.model_dump(mode="json")`-nal azonos alakú dict."""
+        payload: Dict[str, Any] = {}
+        for group, members in INDICATOR_LAYOUT:
+            if group in OPTIONAL_GROUPS and not any(name in self.series for name, _ in members):
+                payload[group] = None
+                continue
+            payload[group] = {name: self._format_series(name, kind) for name, kind in members}
+        return payload
+
+    def _format_series(self, name: str, kind: str) -> Optional[List[Dict[str, Any]]]:
+        if kind == SERIES_SIMPLE:
+            return self._format_simple(name)
+        if kind == SERIES_VOLUME:
+            return self._format_volume(name)
+        if kind == SERIES_MACD_HIST:
+            return self._format_macd_hist(name)
+        if kind == SERIES_STOCH:
+            return self._format_stoch()
+        raise ValueError(f"Unknown indicator series kind: {kind}")
+
+    def _format_simple(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        values = self.series.get(name)
+        if values is None:
+            return None
+        mask = np.isfinite(values)
+        if not mask.any():
+            return None
+        return [{"t": t, "value": v} for t, v in zip(self.t[mask].tolist(), values[mask].tolist())]
+
+    def _format_volume(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        volume = self.series.get(name)
+        open_ = self.series.get(VOLUME_OPEN_KEY)
+        close = self.series.get(VOLUME_CLOSE_KEY)
+        if volume is None or open_ is None or close is None:
+            return None
+        mask = np.isfinite(volume) & np.isfinite(open_) & np.isfinite(close)
+        volume_int = np.rint(np.where(mask, volume, 0)).astype(np.int64)
+        mask &= volume_int >= 0
+        if not mask.any():
+            return None
+        colors = np.where(close[mask] >= open_[mask], VOLUME_UP_COLOR, VOLUME_DOWN_COLOR).tolist()
+        return [
+            {"t": t, "value": v, "color": c}
+            for t, v, c in zip(self.t[mask].tolist(), volume_int[mask].tolist(), colors)
+        ]
+
+    def _format_macd_hist(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        values = self.series.get(name)
+        if values is None:
+            return None
+        mask = np.isfinite(values)
+        if not mask.any():
+            return None
+        valid = values[mask]
+        colors = np.where(valid >= 0, MACD_HIST_UP_COLOR, MACD_HIST_DOWN_COLOR).tolist()
+        return [{"t": t, "value": v, "color": c} for t, v, c in zip(self.t[mask].tolist(), valid.tolist(), colors)]
+
+    def _format_stoch(self) -> Optional[List[Dict[str, Any]]]:
+        k = self.series.get(STOCH_K_KEY)
+        d = self.series.get(STOCH_D_KEY)
+        if k is None or d is None:
+            return None
+        # A STOCHPoint modell 0..100 tartományt vár; az ezen kívüli pontok a régi úton is kimaradtak
+        mask = np.isfinite(k) & np.isfinite(d) & (k >= 0) & (k <= 100) & (d >= 0) & (d <= 100)
+        if not mask.any():
+            return None
+        return [{"t": t, "k": kv, "d": dv} for t, kv, dv in zip(self.t[mask].tolist(), k[mask].tolist(), d[mask].tolist())]
@@ -0,0 +1,328 @@
+# backend/core/indicator_incremental.py
+"""
+Paraméter-kulcsolt, inkrementálisan bővíthető indikátor állapot.
+
+Az indikátorokat eddig minden `_calculate_indicators` hívás (prémium
+aggregátum, technikai analízis) nulláról számolta, akkor is, ha az OHLCV
+bemenet nem változott, vagy csak új bárok kerültek a végére.
+
+Ez a modul egy "indikátor keretet" (DataFrame) tart fenn:
+    - bemeneti oszlopok: OPEN, HIGH, LOW, CLOSE, VOLUME
+    - kimeneti oszlopok: SMA, BBANDS, RSI, VOLUME_SMA, MACD, STOCH
+    - rekurzív állapot oszlopok: a MACD gyors/lassú EMA-ja és az RSI
+      átlagos nyeresége/vesztesége minden bárra
+
+Új bárok esetén az ablakos indikátorok (SMA, BBANDS, STOCH) csak a tárolt
+farok + új bárok szakaszon, a rekurzív indikátorok (EMA/MACD, RSI) pedig az
+utolsó egyező bár állapotából folytatva számolódnak. Mivel az állapot minden
+bárra megvan, a módosult utolsó bár (napközbeni napi gyertya) is kezelhető:
+a számítás az első eltérő bártól folytatódik.
+
+A képletek a TA-Lib alapértelmezéseit követik (SMA-val indított EMA, Wilder
+RSI, populációs szórás, lassú STOCH SMA simítással), így a kimenet a TA-Lib
+útéval megegyezik, amíg a keret ugyanattól a bártól indul.
+
+A modul tisztán NumPy/pandas alapú, I/O-mentes; a cache kezelése a
+`stock_data_service`-ben történik.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from modules.financehub.backend.core.indicator_columnar import (
+    ColumnarIndicatorHistory,
+    STOCH_D_KEY,
+    STOCH_K_KEY,
+    VOLUME_CLOSE_KEY,
+    VOLUME_OPEN_KEY,
+)
+
+INPUT_COLUMNS: Tuple[str, ...] = (VOLUME_OPEN_KEY, "HIGH", "LOW", VOLUME_CLOSE_KEY, "VOLUME")
+OUTPUT_COLUMNS: Tuple[str, ...] = (
+    "SMA_SHORT", "SMA_LONG",
+    "BBANDS_LOWER", "BBANDS_MIDDLE", "BBANDS_UPPER",
+    "RSI", "VOLUME_SMA",
+    "MACD_LINE", "MACD_SIGNAL", "MACD_HIST",
+    STOCH_K_KEY, STOCH_D_KEY,
+)
+STATE_COLUMNS: Tuple[str, ...] = ("MACD_FAST_EMA", "MACD_SLOW_EMA", "RSI_AVG_GAIN", "RSI_AVG_LOSS")
+FRAME_COLUMNS: Tuple[str, ...] = INPUT_COLUMNS + OUTPUT_COLUMNS + STATE_COLUMNS
+
+ATTR_PARAMS_HASH = "indicator_params_hash"
+
+MODE_HIT = "hit"
+MODE_INCREMENTAL = "incremental"
+MODE_FULL = "full"
+
+# A TA-Lib TA_IS_ZERO küszöbe (RSI: nulla összes mozgás -> 0)
+_ZERO_EPSILON = 1e-14
+_MATCH_RTOL = 1e-9
+
+
+@dataclass(frozen=True)
+class IndicatorParams:
+    """A számításhoz ténylegesen használt indikátor paraméterek."""
+
+    sma_short: int = 9
+    sma_long: int = 20
+    bb_period: int = 20
+    bb_stddev: float = 2.0
+    rsi_period: int = 14
+    volume_sma_period: int = 20
+    macd_fast: int = 12
+    macd_slow: int = 26
+    macd_signal: int = 9
+    stoch_k: int = 14
+    stoch_d: int = 3
+
+    @classmethod
+    def from_mapping(cls, params: Mapping[str, Any]) -> "IndicatorParams":
+        """`settings.DATA_PROCESSING.INDICATOR_PARAMS` értelmezése; hibás értéknél ValueError/TypeError."""
+        return cls(
+            sma_short=int(params.get("SMA_SHORT_PERIOD", 9)),
+            sma_long=int(params.get("SMA_LONG_PERIOD", 20)),
+            bb_period=int(params.get("BBANDS_PERIOD", 20)),
+            bb_stddev=float(params.get("BBANDS_STDDEV", 2.0)),
+            rsi_period=int(params.get("RSI_PERIOD", 14)),
+            volume_sma_period=int(params.get("VOLUME_SMA_PERIOD", 20)),
+            macd_fast=int(params.get("MACD_FAST_PERIOD", 12)),
+            macd_slow=int(params.get("MACD_SLOW_PERIOD", 26)),
+            macd_signal=int(params.get("MACD_SIGNAL_PERIOD", 9)),
+            stoch_k=int(params.get("STOCH_K", 14)),
+            stoch_d=int(params.get("STOCH_D", 3)),
+        )
+
+    def fingerprint(self) -> str:
+        """Rövid, stabil hash a cache kulcshoz."""
+        encoded = json.dumps(asdict(self), sort_keys=True).encode("utf-8")
+        return hashlib.sha1(encoded).hexdigest()[:16]
+
+    @property
+    def window_lookback(self) -> int:
+        """Az ablakos indikátorokhoz szükséges korábbi bárok száma."""
+        return max(
+            self.sma_short, self.sma_long, self.bb_period, self.volume_sma_period,
+            self.stoch_k + 2 * (self.stoch_d - 1),
+        ) - 1
+
+    @property
+    def warmup_bars(self) -> int:
+        """Ennyi bár után minden indikátor (és rekurzív állapot) definiált."""
+        return max(self.window_lookback, self.rsi_period, self.macd_slow + self.macd_signal - 2)
+
+
+# ------------------------------------------------------------------
+# Indikátor primitívek (TA-Lib kompatibilis)
+# ------------------------------------------------------------------
+def _sma(values: np.ndarray, period: int) -> np.ndarray:
+    return pd.Series(values).rolling(period).mean().to_numpy()
+
+
+def _ema_continue(seed: float, values: np.ndarray, alpha: float) -> np.ndarray:
+    """`seed` után folytatott EMA: y_t = y_{t-1} + alpha * (x_t - y_{t-1})."""
+    if values.size == 0:
+        return np.empty(0, dtype=np.float64)
+    series = pd.Series(np.concatenate(([seed], values)))
+    return series.ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+
+
+def _seeded_ema(values: np.ndarray, period: int, seed_end: int) -> np.ndarray:
+    """TA-Lib EMA: a `seed_end` indexen a megelőző `period` érték átlaga, utána rekurzió."""
+    out = np.full(values.size, np.nan)
+    if values.size > seed_end >= period - 1:
+        seed = float(values[seed_end - period + 1:seed_end + 1].mean())
+        out[seed_end] = seed
+        out[seed_end + 1:] = _ema_continue(seed, values[seed_end + 1:], 2.0 / (period + 1))
+    return out
+
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    total = avg_gain + avg_loss
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 * avg_gain / total
+    return np.where(np.abs(total) < _ZERO_EPSILON, 0.0, rsi)
+
+
+def _windowed_columns(inputs: Mapping[str, np.ndarray], params: IndicatorParams) -> Dict[str, np.ndarray]:
+    """SMA, BBANDS, VOLUME_SMA és STOCH a teljes átadott szakaszra."""
+    close = inputs[VOLUME_CLOSE_KEY]
+    bb_middle = _sma(close, params.bb_period)
+    bb_std = pd.Series(close).rolling(params.bb_period).std(ddof=0).to_numpy()
+
+    highest = pd.Series(inputs["HIGH"]).rolling(params.stoch_k).max().to_numpy()
+    lowest = pd.Series(inputs["LOW"]).rolling(params.stoch_k).min().to_numpy()
+    price_range = highest - lowest
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fast_k = np.where(price_range != 0, (close - lowest) / price_range * 100.0, 0.0)
+    fast_k[np.isnan(price_range)] = np.nan
+    slow_k = _sma(fast_k, params.stoch_d)
+    slow_d = _sma(slow_k, params.stoch_d)
+    # TA-Lib a %K-t is a %D kezdetéig vágja
+    slow_k[:min(slow_k.size, params.stoch_k + 2 * (params.stoch_d - 1) - 1)] = np.nan
+
+    return {
+        "SMA_SHORT": _sma(close, params.sma_short),
+        "SMA_LONG": _sma(close, params.sma_long),
+        "BBANDS_LOWER": bb_middle - params.bb_stddev * bb_std,
+        "BBANDS_MIDDLE": bb_middle,
+        "BBANDS_UPPER": bb_middle + params.bb_stddev * bb_std,
+        "VOLUME_SMA": _sma(inputs["VOLUME"], params.volume_sma_period),
+        STOCH_K_KEY: slow_k,
+        STOCH_D_KEY: slow_d,
+    }
+
+
+def _macd_full(close: np.ndarray, params: IndicatorParams) -> Dict[str, np.ndarray]:
+    start = params.macd_slow - 1
+    fast_ema = _seeded_ema(close, params.macd_fast, start)
+    slow_ema = _seeded_ema(close, params.macd_slow, start)
+    raw_line = fast_ema - slow_ema
+    signal = np.full(close.size, np.nan)
+    signal_start = start + params.macd_signal - 1
+    if close.size > signal_start:
+        signal[signal_start:] = _seeded_ema(raw_line[start:], params.macd_signal, params.macd_signal - 1)[params.macd_signal - 1:]
+    line = np.where(np.isnan(signal), np.nan, raw_line)
+    return {
+        "MACD_LINE": line, "MACD_SIGNAL": signal, "MACD_HIST": line - signal,
+        "MACD_FAST_EMA": fast_ema, "MACD_SLOW_EMA": slow_ema,
+    }
+
+
+def _rsi_full(close: np.ndarray, period: int) -> Dict[str, np.ndarray]:
+    avg_gain = np.full(close.size, np.nan)
+    avg_loss = np.full(close.size, np.nan)
+    if close.size > period:
+        diff = np.diff(close)
+        gain, loss = np.clip(diff, 0, None), np.clip(-diff, 0, None)
+        seed_gain, seed_loss = float(gain[:period].mean()), float(loss[:period].mean())
+        avg_gain[period], avg_loss[period] = seed_gain, seed_loss
+        avg_gain[period + 1:] = _ema_continue(seed_gain, gain[period:], 1.0 / period)
+        avg_loss[period + 1:] = _ema_continue(seed_loss, loss[period:], 1.0 / period)
+    return {"RSI": _rsi_from_averages(avg_gain, avg_loss), "RSI_AVG_GAIN": avg_gain, "RSI_AVG_LOSS": avg_loss}
+
+
+# ------------------------------------------------------------------
+# Keret kezelés
+# ------------------------------------------------------------------
+def _input_frame(ohlcv_df: pd.DataFrame) -> pd.DataFrame:
+    """Kisbetűs OHLCV oszlopok -> float64 bemeneti oszlopok (INPUT_COLUMNS)."""
+    return pd.DataFrame(
+        {column: pd.to_numeric(ohlcv_df[column.lower()], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+         for column in INPUT_COLUMNS},
+        index=ohlcv_df.index,
+    )
+
+
+def _finalize(frame: pd.DataFrame, params: IndicatorParams) -> pd.DataFrame:
+    frame.attrs = {ATTR_PARAMS_HASH: params.fingerprint()}
+    return frame
+
+
+def compute_indicator_frame(ohlcv_df: pd.DataFrame, params: IndicatorParams) -> pd.DataFrame:
+    """Teljes számítás. `ohlcv_df`: DatetimeIndex, kisbetűs open/high/low/close/volume oszlopok."""
+    inputs = _input_frame(ohlcv_df)
+    arrays = {column: inputs[column].to_numpy() for column in INPUT_COLUMNS}
+    close = arrays[VOLUME_CLOSE_KEY]
+    columns = {
+        **arrays,
+        **_windowed_columns(arrays, params),
+        **_rsi_full(close, params.rsi_period),
+        **_macd_full(close, params),
+    }
+    return _finalize(pd.DataFrame({column: columns[column] for column in FRAME_COLUMNS}, index=inputs.index), params)
+
+
+def _extend_frame(kept: pd.DataFrame, new_inputs: pd.DataFrame, params: IndicatorParams) -> pd.DataFrame:
+    """Az új bárok indikátorai a megtartott keret utolsó állapotából folytatva."""
+    count = len(new_inputs)
+    tail = kept.iloc[len(kept) - params.window_lookback:] if params.window_lookback else kept.iloc[:0]
+    combined = {
+        column: np.concatenate((tail[column].to_numpy(), new_inputs[column].to_numpy()))
+        for column in INPUT_COLUMNS
+    }
+    columns: Dict[str, np.ndarray] = {column: new_inputs[column].to_numpy() for column in INPUT_COLUMNS}
+    columns.update({name: values[-count:] for name, values in _windowed_columns(combined, params).items()})
+
+    last = kept.iloc[-1]
+    close = columns[VOLUME_CLOSE_KEY]
+
+    diff = np.diff(np.concatenate(([last[VOLUME_CLOSE_KEY]], close)))
+    avg_gain = _ema_continue(last["RSI_AVG_GAIN"], np.clip(diff, 0, None), 1.0 / params.rsi_period)
+    avg_loss = _ema_continue(last["RSI_AVG_LOSS"], np.clip(-diff, 0, None), 1.0 / params.rsi_period)
+    columns.update({"RSI": _rsi_from_averages(avg_gain, avg_loss), "RSI_AVG_GAIN": avg_gain, "RSI_AVG_LOSS": avg_loss})
+
+    fast_ema = _ema_continue(last["MACD_FAST_EMA"], close, 2.0 / (params.macd_fast + 1))
+    slow_ema = _ema_continue(last["MACD_SLOW_EMA"], close, 2.0 / (params.macd_slow + 1))
+    line = fast_ema - slow_ema
+    signal = _ema_continue(last["MACD_SIGNAL"], line, 2.0 / (params.macd_signal + 1))
+    columns.update({
+        "MACD_LINE": line, "MACD_SIGNAL": signal, "MACD_HIST": line - signal,
+        "MACD_FAST_EMA": fast_ema, "MACD_SLOW_EMA": slow_ema,
+    })
+    return pd.DataFrame({column: columns[column] for column in FRAME_COLUMNS}, index=new_inputs.index)
+
+
+def _is_compatible(previous: Optional[pd.DataFrame], params: IndicatorParams) -> bool:
+    return (
+        isinstance(previous, pd.DataFrame)
+        and not previous.empty
+        and isinstance(previous.index, pd.DatetimeIndex)
+        and previous.attrs.get(ATTR_PARAMS_HASH) == params.fingerprint()
+        and all(column in previous.columns for column in FRAME_COLUMNS)
+    )
+
+
+def extend_indicator_frame(
+    previous: Optional[pd.DataFrame],
+    ohlcv_df: pd.DataFrame,
+    params: IndicatorParams,
+) -> Tuple[pd.DataFrame, str]:
+    """
+    A tárolt keret frissítése az aktuális OHLCV bemenettel.
+
+    Returns:
+        (keret, mód), ahol a mód:
+            - MODE_HIT: a bemenet a tárolt keret része, nincs számítás
+            - MODE_INCREMENTAL: az első eltérő / új bártól folytatott számítás
+            - MODE_FULL: teljes újraszámolás (nincs/inkompatibilis keret,
+              korábbi kezdet, vagy az eltérés a bemelegedési szakaszba esik)
+    """
+    if not _is_compatible(previous, params) or ohlcv_df.empty:
+        return compute_indicator_frame(ohlcv_df, params), MODE_FULL
+
+    inputs = _input_frame(ohlcv_df)
+    start_pos = int(previous.index.searchsorted(inputs.index[0]))
+    if start_pos >= len(previous) or previous.index[start_pos] != inputs.index[0]:
+        return compute_indicator_frame(ohlcv_df, params), MODE_FULL
+
+    overlap = min(len(previous) - start_pos, len(inputs))
+    stored = previous.iloc[start_pos:start_pos + overlap]
+    matches = stored.index.asi8 == inputs.index[:overlap].asi8
+    matches &= np.isclose(
+        stored[list(INPUT_COLUMNS)].to_numpy(), inputs.iloc[:overlap].to_numpy(),
+        rtol=_MATCH_RTOL, atol=0.0, equal_nan=True,
+    ).all(axis=1)
+    matched = int(np.argmin(matches)) if not matches.all() else overlap
+
+    kept_rows = start_pos + matched
+    if matched == len(inputs):
+        return previous.iloc[:kept_rows], MODE_HIT
+    if kept_rows <= params.warmup_bars:
+        return compute_indicator_frame(ohlcv_df, params), MODE_FULL
+
+    kept = previous.iloc[:kept_rows]
+    frame = pd.concat([kept, _extend_frame(kept, inputs.iloc[matched:], params)])
+    return _finalize(frame, params), MODE_INCREMENTAL
+
+
+def indicator_frame_payload(frame: pd.DataFrame, start: Optional[pd.Timestamp] = None) -> Dict[str, Any]:
+    """A keret (opcionálisan `start`-tól) oszlopos JSON payloadja (`IndicatorHistory` alak)."""
+    if start is not None:
+        frame = frame.iloc[int(frame.index.searchsorted(start)):]
+    series = {column: frame[column].to_numpy() for column in OUTPUT_COLUMNS + (VOLUME_OPEN_KEY, VOLUME_CLOSE_KEY, "VOLUME")}
+    return ColumnarIndicatorHistory.from_index(frame.index, series).to_payload()
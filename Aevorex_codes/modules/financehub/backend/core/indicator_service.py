@@ -8,7 +8,8 @@
 # Responsibilities:
 # - Calculates various technical indicators based on OHLCV data.
 # - Uses pandas_ta library for calculations.
-# - Formats calculated indicator data into Pydantic models for API response.
+# - Formats calculated indicator data into a columnar JSON payload (Pydantic
+#   per-point models only behind the INDICATOR_PYDANTIC_POINTS compat flag).
 # - Handles potential errors during calculation and formatting gracefully.
 # ==============================================================================
 
@@ -16,7 +17,7 @@ import pandas as pd
 import numpy as np # Might be implicitly used by pandas_ta, good to have if needed
 import math
 import time
-from typing import List, Optional, Dict, Any, Tuple, Final # Add Tuple, Final
+from typing import List, Optional, Dict, Any, Tuple, Final, Union # Add Tuple, Final
 from datetime import timezone # <<<--- IMPORTED timezone
 
 
@@ -45,6 +46,20 @@ try:
         MACDHistPoint,
         STOCHPoint
     )
+    from modules.financehub.backend.core import indicator_columnar
+    from modules.financehub.backend.core.indicator_columnar import (
+        ColumnarIndicatorHistory,
+        STOCH_D_KEY,
+        STOCH_K_KEY,
+        VOLUME_CLOSE_KEY,
+        VOLUME_OPEN_KEY,
+    )
+    from modules.financehub.backend.core.indicator_incremental import (
+        IndicatorParams,
+        MODE_FULL,
+        extend_indicator_frame,
+        indicator_frame_payload,
+    )
     from pydantic import ValidationError
 
     try:
@@ -84,10 +99,10 @@ logger.info(f"[{__name__}] Module imports successful.")
 SERVICE_NAME: Final[str] = "IndicatorService"
 __version__: Final[str] = "1.2.2" # Updated version with fixes
 
-VOLUME_UP_COLOR: Final[str] = '#26A69A'
-VOLUME_DOWN_COLOR: Final[str] = '#EF5350'
-MACD_HIST_UP_COLOR: Final[str] = '#26A69A'
-MACD_HIST_DOWN_COLOR: Final[str] = '#EF5350'
+VOLUME_UP_COLOR: Final[str] = indicator_columnar.VOLUME_UP_COLOR
+VOLUME_DOWN_COLOR: Final[str] = indicator_columnar.VOLUME_DOWN_COLOR
+MACD_HIST_UP_COLOR: Final[str] = indicator_columnar.MACD_HIST_UP_COLOR
+MACD_HIST_DOWN_COLOR: Final[str] = indicator_columnar.MACD_HIST_DOWN_COLOR
 
 def _ensure_datetime_index(df: pd.DataFrame, function_name: str = "caller") -> Optional[pd.DataFrame]:
     if not isinstance(df, pd.DataFrame):
@@ -437,10 +452,159 @@ def _format_stoch_series(df: pd.DataFrame, k_col: str, d_col: str) -> Optional[L
         logger.info(f"Formatted {valid_count} valid points for Stochastic (Invalid/NaN/Inf/Errors: {nan_inf_error_count}, Time: {duration:.4f}s).")
         return points
 
+
+IndicatorHistoryResult = Union[IndicatorHistory, Dict[str, Any]]
+
+
+def _use_pydantic_points() -> bool:
+    return bool(getattr(settings.DATA_PROCESSING, "INDICATOR_PYDANTIC_POINTS", False))
+
+
+def _build_pydantic_indicator_history(index: pd.DatetimeIndex, series: Dict[str, np.ndarray]) -> IndicatorHistory:
+    """Kompatibilitási út: pontonkénti Pydantic modellek (INDICATOR_PYDANTIC_POINTS=True)."""
+    def as_series(name: str) -> Optional[pd.Series]:
+        values = series.get(name)
+        return None if values is None else pd.Series(values, index=index)
+
+    volume_df = pd.DataFrame(
+        {'volume': series.get('VOLUME'), 'open': series.get(VOLUME_OPEN_KEY), 'close': series.get(VOLUME_CLOSE_KEY)},
+        index=index,
+    )
+    stoch_points = None
+    if STOCH_K_KEY in series and STOCH_D_KEY in series:
+        stoch_points = _format_stoch_series(
+            pd.DataFrame({'k': series[STOCH_K_KEY], 'd': series[STOCH_D_KEY]}, index=index), 'k', 'd'
+        )
+
+    return IndicatorHistory(
+        sma=SMASet(
+            SMA_SHORT=_format_simple_series(as_series("SMA_SHORT"), "SMA_SHORT"),
+            SMA_LONG=_format_simple_series(as_series("SMA_LONG"), "SMA_LONG")
+        ),
+        bbands=BBandsSet(
+            BBANDS_LOWER=_format_simple_series(as_series("BBANDS_LOWER"), "BBANDS_LOWER"),
+            BBANDS_MIDDLE=_format_simple_series(as_series("BBANDS_MIDDLE"), "BBANDS_MIDDLE"),
+            BBANDS_UPPER=_format_simple_series(as_series("BBANDS_UPPER"), "BBANDS_UPPER")
+        ),
+        rsi=RSISeries(RSI=_format_simple_series(as_series("RSI"), "RSI")),
+        volume=VolumeSeries(VOLUME=_format_volume_series(volume_df, 'volume', 'open', 'close')),
+        volume_sma=VolumeSMASeries(VOLUME_SMA=_format_simple_series(as_series("VOLUME_SMA"), "VOLUME_SMA")),
+        macd=MACDSeries(
+            MACD_LINE=_format_simple_series(as_series("MACD_LINE"), "MACD_LINE"),
+            MACD_SIGNAL=_format_simple_series(as_series("MACD_SIGNAL"), "MACD_SIGNAL"),
+            MACD_HIST=_format_macd_hist_series(as_series("MACD_HIST"), "MACD_HIST")
+        ),
+        stoch=STOCHSeries(STOCH=stoch_points)
+    )
+
+
+def _build_indicator_history(
+    index: pd.DatetimeIndex,
+    series: Dict[str, np.ndarray],
+    symbol_upper: str,
+    function_name: str
+) -> IndicatorHistoryResult:
+    """
+    A kiszámolt tömbökből az API kimenet előállítása.
+
+    Alapértelmezésben oszlopos úton (`ColumnarIndicatorHistory.to_payload()`),
+    ami az `IndicatorHistory.model_dump(mode="json")`-nal azonos alakú dict-et ad.
+    """
+    format_start_time = time.monotonic()
+    if _use_pydantic_points():
+        result: IndicatorHistoryResult = _build_pydantic_indicator_history(index, series)
+        mode = "pydantic"
+    else:
+        result = ColumnarIndicatorHistory.from_index(index, series).to_payload()
+        mode = "columnar"
+    format_duration = time.monotonic() - format_start_time
+    logger.info(f"[{symbol_upper}] [{function_name}] Indicator formatting ({mode}) complete for {len(index)} bars in {format_duration:.4f}s.")
+    return result
+
+
+def _empty_indicator_history() -> IndicatorHistoryResult:
+    if _use_pydantic_points():
+        return IndicatorHistory(
+            sma=SMASet(SMA_SHORT=None, SMA_LONG=None),
+            bbands=BBandsSet(BBANDS_LOWER=None, BBANDS_MIDDLE=None, BBANDS_UPPER=None),
+            rsi=RSISeries(RSI=None),
+            volume=VolumeSeries(VOLUME=None),
+            volume_sma=VolumeSMASeries(VOLUME_SMA=None),
+            macd=MACDSeries(MACD_LINE=None, MACD_SIGNAL=None, MACD_HIST=None),
+            stoch=STOCHSeries(STOCH=None)
+        )
+    return ColumnarIndicatorHistory.empty().to_payload()
+
+
+def _load_indicator_params(symbol_upper: str, function_name: str) -> IndicatorParams:
+    logger.debug(f"[{symbol_upper}] [{function_name}] Loading indicator parameters from settings...")
+    try:
+        indicator_params: Dict[str, Any] = settings.DATA_PROCESSING.INDICATOR_PARAMS
+        if not isinstance(indicator_params, dict):
+             logger.error(f"[{symbol_upper}] [{function_name}] Settings error: INDICATOR_PARAMS is not a dict. Using empty params.")
+             indicator_params = {}
+        logger.debug(f"[{symbol_upper}] [{function_name}] Using indicator parameters: {indicator_params}")
+    except AttributeError as ae:
+         logger.error(f"[{symbol_upper}] [{function_name}] Settings error accessing INDICATOR_PARAMS: {ae}. Calculation might use defaults or fail.", exc_info=False)
+         indicator_params = {}
+    except Exception as e_params:
+        logger.error(f"[{symbol_upper}] [{function_name}] Unexpected error loading indicator parameters: {e_params}. Using empty params.", exc_info=True)
+        indicator_params = {}
+
+    logger.debug(f"[{symbol_upper}] [{function_name}] Extracting specific parameters...")
+    try:
+        params = IndicatorParams.from_mapping(indicator_params)
+    except (ValueError, TypeError) as e_parse:
+        logger.error(f"[{symbol_upper}] [{function_name}] Invalid indicator parameter format in settings: {e_parse}. Using hardcoded defaults.", exc_info=True)
+        params = IndicatorParams()
+    logger.debug(f"[{symbol_upper}] [{function_name}] Effective params: SMA({params.sma_short},{params.sma_long}), BB({params.bb_period},{params.bb_stddev}), RSI({params.rsi_period}), VOL_SMA({params.volume_sma_period}), MACD({params.macd_fast},{params.macd_slow},{params.macd_signal}), STOCH({params.stoch_k},{params.stoch_d})")
+    return params
+
+
+def load_indicator_params(symbol: str) -> IndicatorParams:
+    """A beállításokból értelmezett indikátor paraméterek (a cache kulcshoz is)."""
+    return _load_indicator_params(symbol.upper(), "load_indicator_params")
+
+
+def calculate_indicators_incremental(
+    ohlcv_df: pd.DataFrame,
+    symbol: str,
+    previous_frame: Optional[pd.DataFrame],
+    params: Optional[IndicatorParams] = None
+) -> Tuple[Optional[Dict[str, Any]], Optional[pd.DataFrame], str]:
+    """
+    Indikátorok a tárolt indikátor keret folytatásával (lásd `indicator_incremental`).
+
+    Returns:
+        (oszlopos payload, frissített keret, mód). Hibás bemenetnél (None, None, MODE_FULL).
+    """
+    function_name = "calculate_indicators_incremental"
+    symbol_upper = symbol.upper()
+    df_indexed = _ensure_datetime_index(ohlcv_df, function_name)
+    if df_indexed is None or df_indexed.empty:
+        logger.error(f"[{symbol_upper}] [{function_name}] Input DataFrame preparation failed or resulted in empty DF. Cannot proceed.")
+        return None, None, MODE_FULL
+
+    df_indexed.columns = [str(col).lower() for col in df_indexed.columns]
+    required_cols = {'open', 'high', 'low', 'close', 'volume'}
+    if not required_cols.issubset(df_indexed.columns):
+        missing_cols = required_cols - set(df_indexed.columns)
+        logger.error(f"[{symbol_upper}] [{function_name}] Missing required OHLCV columns (lowercase): {missing_cols}. Found: {df_indexed.columns.tolist()}")
+        return None, None, MODE_FULL
+
+    if params is None:
+        params = _load_indicator_params(symbol_upper, function_name)
+    calc_start_time = time.monotonic()
+    frame, mode = extend_indicator_frame(previous_frame, df_indexed, params)
+    payload = indicator_frame_payload(frame, df_indexed.index[0])
+    logger.info(f"[{symbol_upper}] [{function_name}] Indicators ready (mode={mode}, bars={len(df_indexed)}) in {time.monotonic() - calc_start_time:.4f}s.")
+    return payload, frame, mode
+
+
 def calculate_and_format_indicators(
     ohlcv_df: pd.DataFrame,
     symbol: str
-) -> Optional[IndicatorHistory]:
+) -> Optional[IndicatorHistoryResult]:
     function_name = "calculate_and_format_indicators_talib"
     symbol_upper = symbol.upper()
     logger.info(f"[{symbol_upper}] [{function_name}] Received request. Version: {__version__}")
@@ -452,15 +616,7 @@ def calculate_and_format_indicators(
 
             df_indexed = _ensure_datetime_index(ohlcv_df, function_name)
             if df_indexed is None or df_indexed.empty:
-                return IndicatorHistory(
-                    sma=SMASet(SMA_SHORT=None, SMA_LONG=None),
-                    bbands=BBandsSet(BBANDS_LOWER=None, BBANDS_MIDDLE=None, BBANDS_UPPER=None),
-                    rsi=RSISeries(RSI=None),
-                    volume=VolumeSeries(VOLUME=None),
-                    volume_sma=VolumeSMASeries(VOLUME_SMA=None),
-                    macd=MACDSeries(MACD_LINE=None, MACD_SIGNAL=None, MACD_HIST=None),
-                    stoch=STOCHSeries(STOCH=None)
-                )
+                return _empty_indicator_history()
 
             df_indexed.columns = [c.lower() for c in df_indexed.columns]
             close = df_indexed['close']
@@ -483,33 +639,21 @@ def calculate_and_format_indicators(
 
             vol_sma = volume.rolling(window=20, min_periods=1).mean()
 
-            indicator_history = IndicatorHistory(
-                sma=SMASet(SMA_SHORT=_format_simple_series(sma_short, "SMA_SHORT"), SMA_LONG=_format_simple_series(sma_long, "SMA_LONG")),
-                bbands=BBandsSet(
-                    BBANDS_LOWER=_format_simple_series(bb_lower, "BBANDS_LOWER"),
-                    BBANDS_MIDDLE=_format_simple_series(bb_middle, "BBANDS_MIDDLE"),
-                    BBANDS_UPPER=_format_simple_series(bb_upper, "BBANDS_UPPER")
-                ),
-                rsi=RSISeries(RSI=_format_simple_series(rsi, "RSI")),
-                volume=VolumeSeries(VOLUME=_format_volume_series(df_indexed, 'volume', 'open', 'close')),
-                volume_sma=VolumeSMASeries(VOLUME_SMA=_format_simple_series(vol_sma, "VOLUME_SMA")),
-                macd=MACDSeries(MACD_LINE=_format_simple_series(macd_line, "MACD_LINE"), MACD_SIGNAL=_format_simple_series(macd_signal, "MACD_SIGNAL"), MACD_HIST=_format_macd_hist_series(macd_hist, "MACD_HIST")),
-                stoch=STOCHSeries(STOCH=None)
-            )
-            return indicator_history
+            return _build_indicator_history(df_indexed.index, {
+                "SMA_SHORT": sma_short.values, "SMA_LONG": sma_long.values,
+                "BBANDS_LOWER": bb_lower.values, "BBANDS_MIDDLE": bb_middle.values, "BBANDS_UPPER": bb_upper.values,
+                "RSI": rsi.values,
+                "VOLUME": pd.to_numeric(volume, errors='coerce').values,
+                VOLUME_OPEN_KEY: pd.to_numeric(df_indexed['open'], errors='coerce').values,
+                VOLUME_CLOSE_KEY: pd.to_numeric(close, errors='coerce').values,
+                "VOLUME_SMA": vol_sma.values,
+                "MACD_LINE": macd_line.values, "MACD_SIGNAL": macd_signal.values, "MACD_HIST": macd_hist.values,
+            }, symbol_upper, function_name)
         except Exception as e_fallback:
             logger.error(f"[{symbol_upper}] [{function_name}] pandas_ta fallback failed: {e_fallback}")
 
         # If fallback failed, return empty
-        return IndicatorHistory(
-            sma=SMASet(SMA_SHORT=None, SMA_LONG=None),
-            bbands=BBandsSet(BBANDS_LOWER=None, BBANDS_MIDDLE=None, BBANDS_UPPER=None),
-            rsi=RSISeries(RSI=None),
-            volume=VolumeSeries(VOLUME=None),
-            volume_sma=VolumeSMASeries(VOLUME_SMA=None),
-            macd=MACDSeries(MACD_LINE=None, MACD_SIGNAL=None, MACD_HIST=None),
-            stoch=STOCHSeries(STOCH=None)
-        )
+        return _empty_indicator_history()
 
     prep_start_time = time.monotonic()
     df_indexed = _ensure_datetime_index(ohlcv_df, function_name)
@@ -528,41 +672,12 @@ def calculate_and_format_indicators(
     prep_duration = time.monotonic() - prep_start_time
     logger.info(f"[{symbol_upper}] [{function_name}] Prepared DataFrame shape {df_ta.shape} in {prep_duration:.4f}s.")
 
-    logger.debug(f"[{symbol_upper}] [{function_name}] Loading indicator parameters from settings...")
-    try:
-        indicator_params: Dict[str, Any] = settings.DATA_PROCESSING.INDICATOR_PARAMS
-        if not isinstance(indicator_params, dict):
-             logger.error(f"[{symbol_upper}] [{function_name}] Settings error: INDICATOR_PARAMS is not a dict. Using empty params.")
-             indicator_params = {}
-        logger.debug(f"[{symbol_upper}] [{function_name}] Using indicator parameters: {indicator_params}")
-    except AttributeError as ae:
-         logger.error(f"[{symbol_upper}] [{function_name}] Settings error accessing INDICATOR_PARAMS: {ae}. Calculation might use defaults or fail.", exc_info=False)
-         indicator_params = {}
-    except Exception as e_params:
-        logger.error(f"[{symbol_upper}] [{function_name}] Unexpected error loading indicator parameters: {e_params}. Using empty params.", exc_info=True)
-        indicator_params = {}
-
-    logger.debug(f"[{symbol_upper}] [{function_name}] Extracting specific parameters...")
-    try:
-        sma_s_len = int(indicator_params.get("SMA_SHORT_PERIOD", 9))
-        sma_l_len = int(indicator_params.get("SMA_LONG_PERIOD", 20))
-        bb_len = int(indicator_params.get("BBANDS_PERIOD", 20))
-        bb_std = float(indicator_params.get("BBANDS_STDDEV", 2.0))
-        rsi_len = int(indicator_params.get("RSI_PERIOD", 14))
-        vol_sma_len = int(indicator_params.get("VOLUME_SMA_PERIOD", 20))
-        macd_f = int(indicator_params.get("MACD_FAST_PERIOD", 12))
-        macd_s = int(indicator_params.get("MACD_SLOW_PERIOD", 26))
-        macd_sig = int(indicator_params.get("MACD_SIGNAL_PERIOD", 9))
-        stoch_k = int(indicator_params.get("STOCH_K", 14))
-        stoch_d = int(indicator_params.get("STOCH_D", 3))
-
-        logger.debug(f"[{symbol_upper}] [{function_name}] Effective params: SMA({sma_s_len},{sma_l_len}), BB({bb_len},{bb_std}), RSI({rsi_len}), VOL_SMA({vol_sma_len}), MACD({macd_f},{macd_s},{macd_sig}), STOCH({stoch_k},{stoch_d})")
-
-    except (ValueError, TypeError) as e_parse:
-        logger.error(f"[{symbol_upper}] [{function_name}] Invalid indicator parameter format in settings: {e_parse}. Using hardcoded defaults.", exc_info=True)
-        sma_s_len, sma_l_len, bb_len, bb_std, rsi_len, vol_sma_len = 9, 20, 20, 2.0, 14, 20
-        macd_f, macd_s, macd_sig = 12, 26, 9
-        stoch_k, stoch_d = 14, 3
+    params = _load_indicator_params(symbol_upper, function_name)
+    sma_s_len, sma_l_len = params.sma_short, params.sma_long
+    bb_len, bb_std = params.bb_period, params.bb_stddev
+    rsi_len, vol_sma_len = params.rsi_period, params.volume_sma_period
+    macd_f, macd_s, macd_sig = params.macd_fast, params.macd_slow, params.macd_signal
+    stoch_k, stoch_d = params.stoch_k, params.stoch_d
 
     logger.info(f"[{symbol_upper}] [{function_name}] Starting TA-Lib calculations...")
     calc_start_time = time.monotonic()
@@ -591,56 +706,17 @@ def calculate_and_format_indicators(
         calc_duration = time.monotonic() - calc_start_time
         logger.info(f"[{symbol_upper}] [{function_name}] TA-Lib calculations finished in {calc_duration:.4f}s.")
         
-        # Convert back to pandas Series with original index
-        sma_short_series = pd.Series(sma_short, index=df_ta.index)
-        sma_long_series = pd.Series(sma_long, index=df_ta.index)
-        bb_upper_series = pd.Series(bb_upper, index=df_ta.index)
-        bb_middle_series = pd.Series(bb_middle, index=df_ta.index)
-        bb_lower_series = pd.Series(bb_lower, index=df_ta.index)
-        rsi_series = pd.Series(rsi, index=df_ta.index)
-        volume_sma_series = pd.Series(volume_sma, index=df_ta.index)
-        macd_line_series = pd.Series(macd_line, index=df_ta.index)
-        macd_signal_series = pd.Series(macd_signal, index=df_ta.index)
-        macd_hist_series = pd.Series(macd_hist, index=df_ta.index)
-        stoch_k_series = pd.Series(stoch_k_vals, index=df_ta.index)
-        stoch_d_series = pd.Series(stoch_d_vals, index=df_ta.index)
-
-        # Format into Pydantic models
-        logger.info(f"[{symbol_upper}] [{function_name}] Formatting calculated indicators into Pydantic models...")
-        format_start_time = time.monotonic()
-        
-        indicator_history = IndicatorHistory(
-            sma=SMASet(
-                SMA_SHORT=_format_simple_series(sma_short_series, "SMA_SHORT"),
-                SMA_LONG=_format_simple_series(sma_long_series, "SMA_LONG")
-            ),
-            bbands=BBandsSet(
-                BBANDS_LOWER=_format_simple_series(bb_lower_series, "BBANDS_LOWER"),
-                BBANDS_MIDDLE=_format_simple_series(bb_middle_series, "BBANDS_MIDDLE"),
-                BBANDS_UPPER=_format_simple_series(bb_upper_series, "BBANDS_UPPER")
-            ),
-            rsi=RSISeries(
-                RSI=_format_simple_series(rsi_series, f"RSI_{rsi_len}")
-            ),
-            volume=VolumeSeries(
-                VOLUME=_format_volume_series(df_ta, 'volume', 'open', 'close')
-            ),
-            volume_sma=VolumeSMASeries(
-                VOLUME_SMA=_format_simple_series(volume_sma_series, "VOLUME_SMA")
-            ),
-            macd=MACDSeries(
-                MACD_LINE=_format_simple_series(macd_line_series, "MACD_LINE"),
-                MACD_SIGNAL=_format_simple_series(macd_signal_series, "MACD_SIGNAL"),
-                MACD_HIST=_format_macd_hist_series(macd_hist_series, "MACD_HIST")
-            ),
-                         stoch=STOCHSeries(
-                 STOCH=_format_stoch_series(pd.DataFrame({'k': stoch_k_series, 'd': stoch_d_series}), 'k', 'd')
-             )
-        )
-        
-        format_duration = time.monotonic() - format_start_time
-        logger.info(f"[{symbol_upper}] [{function_name}] Indicator formatting complete in {format_duration:.4f}s. Returning IndicatorHistory.")
-        return indicator_history
+        return _build_indicator_history(df_ta.index, {
+            "SMA_SHORT": sma_short, "SMA_LONG": sma_long,
+            "BBANDS_LOWER": bb_lower, "BBANDS_MIDDLE": bb_middle, "BBANDS_UPPER": bb_upper,
+            "RSI": rsi,
+            "VOLUME": volume,
+            VOLUME_OPEN_KEY: df_ta['open'].values.astype(np.float64),
+            VOLUME_CLOSE_KEY: close,
+            "VOLUME_SMA": volume_sma,
+            "MACD_LINE": macd_line, "MACD_SIGNAL": macd_signal, "MACD_HIST": macd_hist,
+            STOCH_K_KEY: stoch_k_vals, STOCH_D_KEY: stoch_d_vals,
+        }, symbol_upper, function_name)
 
     except Exception as e:
         calc_duration = time.monotonic() - calc_start_time
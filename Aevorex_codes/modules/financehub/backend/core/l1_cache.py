@@ -0,0 +1,197 @@
+# backend/core/l1_cache.py
+"""
+Folyamaton belüli (L1) gyorsítótár a Redis-alapú CacheService előtt.
+
+A forró kulcsokat (pl. `ticker_tape_data`, `stock_premium_v*:AAPL.US`,
+`ai_summary:{symbol}`) minden kérés minden workeren olvassa; az L1 réteg
+ezeknél megspórolja a Redis hálózati kört.
+
+Jellemzők:
+    - Korlátos LRU: maximális elemszám és bájtméret (a szerializált érték UTF-8
+      kódolt hossza, így az ékezetes szöveg is valós méretével számít).
+    - TTL: a Redisben hátralévő TTL és egy felső korlát (`max_ttl_seconds`)
+      közül a kisebbik, így elveszett invalidációs üzenet esetén is korlátos
+      az elavultság.
+    - Az értékeket szerializált (JSON string) formában tárolja, így a hívók
+      nem tudják egymás példányait módosítani, és a méret mérhető.
+    - Invalidációs "epoch": a Redisből való feltöltés csak akkor kerül be, ha
+      közben nem érkezett invalidáció (versenyhelyzet elleni védelem).
+
+A workerek közötti invalidációt a CacheService végzi Redis pub/sub-on
+keresztül; ez a modul tisztán szinkron, I/O-mentes adatszerkezet.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from modules.financehub.backend.utils.logger_config import get_logger
+
+logger = get_logger(__name__)
+MODULE_PREFIX = "[L1Cache]"
+
+
+class _L1Entry(NamedTuple):
+    value: str
+    expires_at: float
+    size: int
+
+
+_EXPORTER = None
+_EXPORTER_RESOLVED = False
+
+
+def _record_metric(event: str, reason: Optional[str] = None) -> None:
+    """Prometheus számláló növelése, ha az exporter elérhető (különben no-op)."""
+    global _EXPORTER, _EXPORTER_RESOLVED
+    if not _EXPORTER_RESOLVED:
+        _EXPORTER_RESOLVED = True
+        try:
+            from modules.financehub.backend.core.metrics.prometheus_exporter import get_exporter
+            _EXPORTER = get_exporter()
+        except Exception:  # pragma: no cover – a metrika opcionális
+            _EXPORTER = None
+    if _EXPORTER is None:
+        return
+    try:
+        _EXPORTER.inc_l1_event(event, reason)
+    except Exception as exc:  # pragma: no cover
+        logger.debug(f"{MODULE_PREFIX} Prometheus inc_l1_event error: {exc}")
+
+
+class L1Cache:
+    """
+    Korlátos, TTL-es LRU gyorsítótár szerializált értékekhez.
+
+    Attributes:
+        max_entries (int): Maximális bejegyzésszám.
+        max_bytes (int): A tárolt értékek összméretének felső korlátja.
+        max_ttl_seconds (float): Egy bejegyzés maximális élettartama.
+        key_prefixes (Tuple[str, ...]): Csak az ezekkel kezdődő kulcsok kerülnek
+            az L1-be; üres esetén minden kulcs.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        max_ttl_seconds: float,
+        key_prefixes: Iterable[str] = (),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.max_ttl_seconds = float(max_ttl_seconds)
+        self.key_prefixes: Tuple[str, ...] = tuple(key_prefixes)
+        self._clock = clock
+        self._entries: "OrderedDict[str, _L1Entry]" = OrderedDict()
+        self._total_bytes = 0
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- Lekérdezés ---
+    def accepts(self, key: str) -> bool:
+        """True, ha a kulcs az L1 hatókörébe tartozik."""
+        return not self.key_prefixes or key.startswith(self.key_prefixes)
+
+    @property
+    def epoch(self) -> int:
+        """Invalidációs számláló; a feltöltés előtt elmentve `put(..., epoch=...)`-nak adható."""
+        return self._epoch
+
+    def get(self, key: str) -> Optional[str]:
+        """Visszaadja a szerializált értéket, vagy None-t (MISS / lejárt)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            _record_metric("miss")
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.misses += 1
+            self.evictions += 1
+            _record_metric("miss")
+            _record_metric("eviction", "expired")
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        _record_metric("hit")
+        return entry.value
+
+    # --- Írás ---
+    def put(self, key: str, value: str, ttl_seconds: Optional[float], epoch: Optional[int] = None) -> bool:
+        """
+        Eltárol egy szerializált értéket.
+
+        Args:
+            key: A cache kulcs.
+            value: Szerializált (JSON) érték.
+            ttl_seconds: A Redisben hátralévő TTL; None esetén `max_ttl_seconds`.
+            epoch: Ha meg van adva és azóta invalidáció történt, a feltöltés
+                   elmarad (a Redisből olvasott érték már elavult lehet).
+
+        Returns:
+            True, ha az érték bekerült az L1-be.
+        """
+        if not self.accepts(key):
+            return False
+        if epoch is not None and epoch != self._epoch:
+            logger.debug(f"{MODULE_PREFIX} [PUT:{key}] Skipped: invalidated while the value was being read.")
+            return False
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            logger.debug(f"{MODULE_PREFIX} [PUT:{key}] Skipped: value ({size} bytes) exceeds L1 byte cap.")
+            return False
+        ttl = self.max_ttl_seconds if ttl_seconds is None else min(float(ttl_seconds), self.max_ttl_seconds)
+        if ttl <= 0:
+            return False
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _L1Entry(value, self._clock() + ttl, size)
+        self._total_bytes += size
+        self._enforce_limits()
+        return True
+
+    def invalidate(self, key: str) -> bool:
+        """Eltávolít egy kulcsot (pl. másik workertől érkező invalidáció után)."""
+        self._epoch += 1
+        if key in self._entries:
+            self._remove(key)
+            self.evictions += 1
+            _record_metric("eviction", "invalidated")
+            return True
+        return False
+
+    def clear(self) -> None:
+        """Az összes bejegyzés törlése."""
+        self._epoch += 1
+        if self._entries:
+            self.evictions += len(self._entries)
+            _record_metric("eviction", "cleared")
+        self._entries.clear()
+        self._total_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Egyszerű statisztika a health/debug végpontokhoz."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    # --- Belső segédfüggvények ---
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._total_bytes -= entry.size
+
+    def _enforce_limits(self) -> None:
+        while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+            _record_metric("eviction", "capacity")
@@ -57,6 +57,7 @@ class StandardNewsDict(TypedDict, total=False):
     title: str                      # Generally expected
     url: Union[HttpUrl, str]        # Generally expected (allow str during processing)
     published_utc: Optional[str]    # ISO 8601 string or None
+    published_ts: Optional[int]     # Epoch milliseconds for published_utc (set by the batch stage)
     source_name: Optional[str]      # Publisher/Source name
     snippet: Optional[str]          # Summary/Description
     image_url: Optional[Union[HttpUrl, str]] # URL string or HttpUrl
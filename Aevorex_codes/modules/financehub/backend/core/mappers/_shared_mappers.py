@@ -31,6 +31,7 @@ try:
         normalize_url,
         parse_timestamp_to_iso_utc
     )
+    from modules.financehub.backend.utils.timestamps import normalize_timestamp_field
 except ImportError as e_helpers:
     import logging; logging.basicConfig(level="CRITICAL"); 
     logger = logging.getLogger(__name__)
@@ -120,6 +121,9 @@ def map_raw_news_to_standard_dicts( raw_news_list: Optional[List[Dict[str, Any]]
             if std_dict: std_dicts.append(std_dict); processed += 1
             else: skipped += 1
         except Exception as e: logger.error(f"{log_prefix} Error mapping item #{i+1}: {e}", exc_info=True); skipped += 1; continue
+    # Batch stage: epoch ms next to the ISO string, in one vectorized parse, so sorting never re-parses
+    unparsed = normalize_timestamp_field(std_dicts, "published_utc", epoch_key="published_ts")
+    if unparsed: logger.debug(f"{log_prefix} {unparsed} item(s) without a parseable published_utc.")
     t_end = time.monotonic(); logger.info(f"{log_prefix} Mapping done. Proc: {processed}, Skip: {skipped}. Took: {t_end - t_start:.4f}s"); 
     return std_dicts
 
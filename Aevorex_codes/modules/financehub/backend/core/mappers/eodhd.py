@@ -26,6 +26,8 @@ except ImportError as e_helpers:
     critical_logger.critical(f"FATAL ERROR: Cannot import helpers: {e_helpers}", exc_info=True)
     raise RuntimeError(f"EODHD mapper failed initialization due to missing helpers: {e_helpers}") from e_helpers
 
+from ..ohlcv_payload import COMPACT_RECORD_KEYS, columns_to_records, ohlcv_to_columns
+
 # --- Base Mapper Imports (e.g., Logger) ---
 try:
     from ._mapper_base import logger
@@ -334,9 +336,6 @@ def map_eodhd_ohlcv_df_to_frontend_list( # Renamed for clarity, underscore prefi
         logger.info(f"{log_prefix} DataFrame is empty after preprocessing. Returning empty list.")
         return []
 
-    mapped_list: List[Dict[str, Any]] = []
-    skipped_count = 0
-    processed_count = 0
     map_loop_start_time = time.monotonic()
 
     # Volume should exist due to preprocessing
@@ -345,47 +344,16 @@ def map_eodhd_ohlcv_df_to_frontend_list( # Renamed for clarity, underscore prefi
         # Handle this case - maybe return None or empty list depending on requirements
         return [] # Return empty list for safety
 
-    # Iterate and create the dictionary in the TARGET format
-    for row in processed_df.itertuples(index=True, name='OHLCVRow'):
-        point_log_prefix = f"{log_prefix}[Date:{row.Index.strftime('%Y-%m-%d %H:%M:%S%Z')}]"
-        try:
-            # Timestamp in MILLISECONDS for 't' field
-            unix_ts_milliseconds = int(row.Index.timestamp() * 1000)
-            if unix_ts_milliseconds <= 0:
-                logger.warning(f"{point_log_prefix} Skipping: Invalid UNIX timestamp {unix_ts_milliseconds} ms.")
-                skipped_count += 1
-                continue
-
-            # Extract data using getattr for safety, parse using helpers
-            o = parse_optional_float(getattr(row, 'Open', None), context=f"{point_log_prefix}:Open")
-            h = parse_optional_float(getattr(row, 'High', None), context=f"{point_log_prefix}:High")
-            l = parse_optional_float(getattr(row, 'Low', None), context=f"{point_log_prefix}:Low")
-            c = parse_optional_float(getattr(row, 'Close', None), context=f"{point_log_prefix}:Close")
-            v = parse_optional_int(getattr(row, 'Volume', 0), context=f"{point_log_prefix}:Volume")
-
-            # Check essential OHLC
-            if o is None or h is None or l is None or c is None:
-                logger.warning(f"{point_log_prefix} Skipping: Missing essential OHLC float data after parsing.")
-                skipped_count += 1
-                continue
-
-            # Create the dictionary in the frontend format ('t', 'o', 'h', 'l', 'c', 'v')
-            mapped_point = {
-                't': unix_ts_milliseconds,
-                'o': o,
-                'h': h,
-                'l': l,
-                'c': c,
-                'v': v
-            }
-            mapped_list.append(mapped_point)
-            processed_count += 1
-        except AttributeError as e_attr:
-            logger.error(f"{point_log_prefix} Skipping row due to AttributeError accessing row data: {e_attr}.", exc_info=False)
-            skipped_count += 1
-        except Exception as e_point:
-            logger.error(f"{point_log_prefix} Skipping row due to unexpected error during dict creation: {e_point}.", exc_info=True)
-            skipped_count += 1
+    # Vektorizált konverzió: a hiányos OHLC és az 1970 előtti (t <= 0) bárok kimaradnak
+    columns = ohlcv_to_columns(processed_df, time_unit="ms", drop_incomplete=True, drop_pre_epoch=True)
+    if columns is None:
+        logger.error(f"{log_prefix} Vectorized conversion failed (missing OHLC columns or non-datetime index).")
+        return None
+    mapped_list: List[Dict[str, Any]] = columns_to_records(columns, COMPACT_RECORD_KEYS)
+    processed_count = len(mapped_list)
+    skipped_count = len(processed_df) - processed_count
+    if skipped_count:
+        logger.warning(f"{log_prefix} Skipped {skipped_count} row(s) with missing OHLC data or invalid timestamp.")
 
     map_loop_duration = time.monotonic() - map_loop_start_time
     logger.info(
@@ -122,7 +122,7 @@ def _map_fmp_item_to_standard(raw_item: Dict[str, Any], api_source: str) -> Opti
         # --- Timestamp Parsing ---
         # parse_timestamp_to_iso_utc is expected to be robust and log its own parsing failures if context is provided.
         published_utc: Optional[str] = parse_timestamp_to_iso_utc(
-            timestamp_str=published_str,
+            published_str,
             context=f"{log_prefix} Field: 'publishedDate', URL: {str(url)}" # Pass str(url) for logging
         )
         if not published_utc:
@@ -40,6 +40,8 @@ except ImportError as e_helpers:
     cl_helpers.critical(f"FATAL ERROR: Failed importing CORE helper functions from utils.helpers: {e_helpers}", exc_info=True)
     raise RuntimeError(f"YFinance mapper failed initialization due to missing helpers: {e_helpers}") from e_helpers
 
+from ..ohlcv_payload import COMPACT_RECORD_KEYS, columns_to_records, normalize_ohlcv_columns, ohlcv_to_columns
+
 # --- Base Mapper Imports ---
 try:
     from ._mapper_base import logger, StandardNewsDict, safe_get, YFINANCE_NEWS_DEFAULT_SOURCE_NAME
@@ -89,13 +91,6 @@ _YFINANCE_NET_INCOME_KEYS: List[str] = ['Net Income', 'Net Income Common Stockho
 _YFINANCE_ASSETS_KEYS: List[str] = ['Total Assets']
 _YFINANCE_LIABILITIES_KEYS: List[str] = ['Total Liabilities Net Minority Interest', 'Total Liabilities', 'Total Liabilities Net Minority']
 
-_OHLCV_COLUMN_MAP: Dict[str, str] = {
-    'open': 'o',
-    'high': 'h',
-    'low': 'l',
-    'close': 'c',
-    'volume': 'v',
-}
 # Original yfinance column names, used for initial check before normalization in map_yfinance_ohlcv_df_to_chart_list
 # _EXPECTED_YFINANCE_OHLCV_COLUMNS: List[str] = ['Open', 'High', 'Low', 'Close', 'Volume'] # Not strictly needed if normalization is robust
 
@@ -772,7 +767,7 @@ def map_yfinance_ohlcv_df_to_chart_list(
 ) -> Optional[List[Dict[str, Any]]]:
     """
     Maps a yfinance OHLCV DataFrame to a list of dictionaries for charting.
-    Ensures DateTimeIndex is UTC and converts timestamps to milliseconds.
+    Vectorized (see core.ohlcv_payload); timestamps are UTC epoch milliseconds.
 
     Args:
         ohlcv_df: DataFrame with OHLCV data. Index should be DatetimeIndex.
@@ -797,80 +792,29 @@ def map_yfinance_ohlcv_df_to_chart_list(
 
     logger.debug(f"{log_prefix} Starting mapping of yfinance OHLCV DataFrame. Shape: {ohlcv_df.shape}, Columns: {list(ohlcv_df.columns)}")
 
-    df = ohlcv_df.copy()
-
-    if not isinstance(df.index, pd.DatetimeIndex):
-        logger.error(f"{log_prefix} DataFrame index is not a DatetimeIndex (Type: {type(df.index)}). Aborting mapping.")
+    if not isinstance(ohlcv_df.index, pd.DatetimeIndex):
+        logger.error(f"{log_prefix} DataFrame index is not a DatetimeIndex (Type: {type(ohlcv_df.index)}). Aborting mapping.")
         return None
 
-    # Normalize column names (lowercase, no spaces, handle potential multi-index if any)
-    if isinstance(df.columns, pd.MultiIndex):
-        logger.warning(f"{log_prefix} DataFrame has a MultiIndex for columns. Flattening to level 0.")
-        df.columns = df.columns.get_level_values(0) # Take the first level
-    df.columns = [str(col).lower().replace(' ', '_') for col in df.columns]
-    
-    # Verify required columns after normalization using _OHLCV_COLUMN_MAP keys
-    # These keys are already the normalized yfinance column names (e.g., 'open')
+    # Egyszeri oszlopnév-normalizálás (kisbetű, szóköz -> '_', MultiIndex első szintje), másolás nélkül
+    df = normalize_ohlcv_columns(ohlcv_df)
     missing_core_cols = [yf_col for yf_col in ['open', 'high', 'low', 'close'] if yf_col not in df.columns]
     if missing_core_cols:
         logger.error(f"{log_prefix} DataFrame is missing one or more core OHLC columns {missing_core_cols} after normalization. "
                      f"Available columns: {list(df.columns)}. Aborting.")
         return None
     if 'volume' not in df.columns:
-        logger.info(f"{log_prefix} 'volume' column is missing. Volume data will be None or 0 in chart output.")
-        df['volume'] = 0 # Add a dummy volume column with 0s if missing, so row processing doesn't fail
+        logger.info(f"{log_prefix} 'volume' column is missing. Volume will be 0 in chart output.")
 
-    # Ensure index is UTC
-    try:
-        if df.index.tz is None:
-            logger.debug(f"{log_prefix} DataFrame index is timezone-naive. Attempting to localize to UTC.")
-            df.index = df.index.tz_localize('UTC', ambiguous='infer', nonexistent='shift_forward')
-        elif str(df.index.tz).upper() != 'UTC':
-            logger.debug(f"{log_prefix} DataFrame index is localized to {df.index.tz}. Converting to UTC.")
-            df.index = df.index.tz_convert('UTC')
-    except Exception as e_tz: # Catches both tz_localize and tz_convert errors
-        logger.error(f"{log_prefix} Failed to set DataFrame index to UTC: {e_tz}. Aborting.", exc_info=True)
+    # Az epoch konverzió UTC-ben történik (naiv index UTC-ként értelmezve), külön tz_convert nem kell
+    # Vektorizált konverzió; a hiányos OHLC bárok kimaradnak, hiányzó volumen -> 0
+    columns = ohlcv_to_columns(df, time_unit="ms", drop_incomplete=True, volume_fill=0)
+    if columns is None:
+        logger.error(f"{log_prefix} Vectorized OHLCV conversion failed. Aborting.")
         return None
-
-    chart_data_list: List[Dict[str, Any]] = []
-    processed_rows = 0
-    skipped_rows = 0
-
-    for timestamp, row_data in df.iterrows():
-        # timestamp is pd.Timestamp (UTC), row_data is pd.Series
-        ts_log_str = timestamp.isoformat() # For logging context
-
-        try:
-            ts_ms = int(timestamp.timestamp() * 1000)
-            chart_item: Dict[str, Any] = {"t": ts_ms}
-            valid_row = True
-
-            for yf_col_lower, target_key in _OHLCV_COLUMN_MAP.items():
-                raw_value = row_data.get(yf_col_lower) # Use .get() for safety, esp. for 'volume' if added manually
-                
-                if target_key == 'v': # Volume
-                    # parse_optional_int will handle None if .get returned None
-                    parsed_value = parse_optional_int(raw_value, context=f"{log_prefix}:Vol_T={ts_log_str}")
-                    # Volume can be None (or 0 if we defaulted it), that's acceptable.
-                    chart_item[target_key] = parsed_value if parsed_value is not None else 0 # Default to 0 if None
-                else: # o, h, l, c are floats
-                    parsed_value = parse_optional_float(raw_value, context=f"{log_prefix}:{target_key.upper()}_T={ts_log_str}")
-                    if parsed_value is None: # Core OHLC values are mandatory
-                        logger.warning(f"{log_prefix} Skipping row for T={ts_log_str}: Mandatory value '{target_key}' is None after parsing (Raw: '{raw_value}').")
-                        valid_row = False
-                        break
-                    chart_item[target_key] = parsed_value
-            
-            if valid_row:
-                chart_data_list.append(chart_item)
-                processed_rows += 1
-            else:
-                skipped_rows += 1
-
-        except Exception as e_row:
-            logger.error(f"{log_prefix} Error processing OHLCV row for timestamp '{ts_log_str}': {e_row}. Skipping row.", exc_info=False) # exc_info=False to reduce log spam for many bad rows
-            skipped_rows += 1
-            continue
+    chart_data_list: List[Dict[str, Any]] = columns_to_records(columns, COMPACT_RECORD_KEYS)
+    processed_rows = len(chart_data_list)
+    skipped_rows = len(df) - processed_rows
 
     if skipped_rows > 0:
         logger.warning(f"{log_prefix} Skipped {skipped_rows} of {len(df)} rows due to parsing errors or missing mandatory OHLC values.")
@@ -20,7 +20,7 @@ Használat a FastAPI `main.py`-ban:
     app.include_router(get_metrics_router(exporter), tags=["Metrics"])
 
 Ez a fájl kicsi marad (<200 LOC).  @Team: ha bővítitek, inkább osszátok
-külön fájlokba.
+külön fájlokba (pl. a szolgáltatói sorozatok: `provider_metrics.py`).
 """
 
 from __future__ import annotations
@@ -37,10 +37,12 @@ except ImportError:  # pragma: no cover – optional dep
 
 from fastapi import APIRouter, Response
 
+from .provider_metrics import ProviderMetricsMixin
+
 logger = logging.getLogger(__name__)
 
 
-class PrometheusExporter:
+class PrometheusExporter(ProviderMetricsMixin):
     """Wrapper around prometheus_client with graceful degrade."""
 
     def __init__(self):
@@ -79,11 +81,25 @@ class PrometheusExporter:
                 registry=self.registry,
                 buckets=(50,100,200,300,500,800,1200,2000,4000,8000),
             )
+            self.l1_events = Counter(
+                "fh_l1_cache_events_total",
+                "In-process L1 cache hits, misses and evictions",
+                ["event", "reason"],
+                registry=self.registry,
+            )
+            self.single_flight_calls = Counter(
+                "fh_fetch_single_flight_total",
+                "Fetcher calls that originated a live fetch vs. joined an in-flight one",
+                ["fetcher", "role"],
+                registry=self.registry,
+            )
         else:
             # Dummy placeholders so calling code won't break
             self.registry = None
             self.response_time = self.first_token_ms = self.cache_hits = self.cache_misses = self.deep_opt_in = self.rapid_latency_ms = _NoOpMetric()
+            self.l1_events = self.single_flight_calls = _NoOpMetric()
             logger.warning("prometheus_client not installed – metrics disabled")
+        self._init_provider_metrics(self.registry)
 
     # ---------------------------------------------------------------------
     # Helper methods – these no-op automatically if prom not available
@@ -107,6 +123,12 @@ class PrometheusExporter:
     def inc_deep_opt_in(self, ticker: str):
         self.deep_opt_in.labels(ticker=ticker.upper()).inc()
 
+    def inc_l1_event(self, event: str, reason: Optional[str] = None):
+        self.l1_events.labels(event=event, reason=reason or "").inc()
+
+    def inc_single_flight(self, fetcher: str, role: str):
+        self.single_flight_calls.labels(fetcher=fetcher, role=role).inc()
+
     # ------------------------------------------------------------------
     # FastAPI router
     # ------------------------------------------------------------------
@@ -127,6 +149,25 @@ class _NoOpMetric:  # pylint: disable=too-few-public-methods
     def inc(self, *_args, **_kwargs):
         return None
 
+    def set(self, *_args, **_kwargs):
+        return None
+
+
+# -------------------------------------------------------------------------
+# Process-wide singleton – so every module records into the registry that
+# the /metrics router actually exposes.
+# -------------------------------------------------------------------------
+
+_DEFAULT_EXPORTER: Optional[PrometheusExporter] = None
+
+
+def get_exporter() -> PrometheusExporter:
+    """Return the shared exporter instance (created lazily)."""
+    global _DEFAULT_EXPORTER
+    if _DEFAULT_EXPORTER is None:
+        _DEFAULT_EXPORTER = PrometheusExporter()
+    return _DEFAULT_EXPORTER
+
 
 # -------------------------------------------------------------------------
 # FastAPI router factory
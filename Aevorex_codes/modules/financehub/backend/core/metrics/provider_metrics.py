@@ -0,0 +1,84 @@
+"""provider_metrics.py – Upstream-szolgáltatói metrikák a FinanceHub exporteréhez.
+
+A hírforrások, a poolozott HTTP kliensek, a szolgáltatónkénti rate limiter és
+a hedged lekérések sorozatai. A `PrometheusExporter` ezt a mixint örökli, és
+ugyanarra a registryre regisztrálja őket, így a hívók továbbra is a
+`get_exporter().<metódus>(...)` formát használják.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+except ImportError:  # pragma: no cover – optional dep
+    pass
+
+
+class ProviderMetricsMixin:
+    """Szolgáltatói sorozatok + helper metódusok (registry nélkül no-op)."""
+
+    def _init_provider_metrics(self, registry: Optional[Any]) -> None:
+        if registry is None:
+            from .prometheus_exporter import _NoOpMetric
+
+            self.news_source_latency_ms = self.news_source_items = self.http_pool_requests = _NoOpMetric()
+            self.rate_limit_wait_seconds = self.rate_limit_queue_depth = self.hedged_requests = _NoOpMetric()
+            return
+        self.news_source_latency_ms = Histogram(
+            "fh_news_source_latency_ms",
+            "Per-source news fetch latency (ms)",
+            ["source", "status"],
+            registry=registry,
+            buckets=(100, 250, 500, 1000, 2000, 4000, 8000),
+        )
+        self.news_source_items = Counter(
+            "fh_news_source_items_total",
+            "Unique news items contributed per source",
+            ["source"],
+            registry=registry,
+        )
+        self.http_pool_requests = Counter(
+            "fh_http_pool_requests_total",
+            "Requests on pooled upstream HTTP clients by new vs. reused connection",
+            ["upstream", "connection"],
+            registry=registry,
+        )
+        self.rate_limit_wait_seconds = Histogram(
+            "fh_rate_limit_wait_seconds",
+            "Time upstream API requests waited for a provider rate-limit token",
+            ["provider", "priority", "outcome"],
+            registry=registry,
+            buckets=(0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60),
+        )
+        self.rate_limit_queue_depth = Gauge(
+            "fh_rate_limit_queue_depth",
+            "Upstream API requests queued for a provider rate-limit token (per worker)",
+            ["provider", "priority"],
+            registry=registry,
+        )
+        self.hedged_requests = Counter(
+            "fh_hedged_requests_total",
+            "Hedged fetch outcomes per primary/alternate source pair",
+            ["primary", "alternate", "outcome"],
+            registry=registry,
+        )
+
+    def observe_news_source(self, source: str, status: str, seconds: Optional[float], contributed: int = 0):
+        if seconds is not None:
+            self.news_source_latency_ms.labels(source=source, status=status).observe(seconds * 1000)
+        if contributed:
+            self.news_source_items.labels(source=source).inc(contributed)
+
+    def inc_http_pool_request(self, upstream: str, reused: bool):
+        self.http_pool_requests.labels(upstream=upstream, connection="reused" if reused else "new").inc()
+
+    def observe_rate_limit_wait(self, provider: str, priority: str, outcome: str, seconds: float):
+        self.rate_limit_wait_seconds.labels(provider=provider, priority=priority, outcome=outcome).observe(seconds)
+
+    def set_rate_limit_queue_depth(self, provider: str, priority: str, depth: int):
+        self.rate_limit_queue_depth.labels(provider=provider, priority=priority).set(depth)
+
+    def inc_hedged_request(self, primary: str, alternate: str, outcome: str):
+        self.hedged_requests.labels(primary=primary, alternate=alternate, outcome=outcome).inc()
@@ -0,0 +1,211 @@
+# backend/core/news_dedup.py
+"""
+Hír-deduplikáció kanonikus URL hash-sel és SimHash alapú címegyezéssel.
+
+A korábbi megoldás minden elemre `normalize_url`-t hívott és Pydantic
+`HttpUrl` objektumokat tartott egy halmazban; ez lassú, és a szindikált
+(más URL-en megjelenő, de azonos) cikkeket nem szűrte ki. Itt:
+
+    - a URL kanonizálása tisztán string műveletekkel történik (séma/host
+      kisbetű, `www.` és követő paraméterek (utm_*, fbclid, ...) elhagyása,
+      rendezett query, záró perjel nélkül), a kulcs egy 64 bites blake2b hash;
+    - a normalizált címekből 64 bites SimHash készül (szó unigramok és
+      bigramok); két cím közel-duplikátum, ha a Hamming-távolság legfeljebb
+      `max_distance`. A keresés a SimHash `max_distance + 1` sávra bontott
+      indexén fut (skatulya-elv: két közeli ujjlenyomat legalább egy sávban
+      megegyezik), így az összköltség közel lineáris az elemszámban.
+
+A modul I/O-mentes; a `stock_data_service` hírgyűjtése és az
+`api/market_data.py` egyaránt használja.
+"""
+
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+
+SIMHASH_BITS = 64
+DEFAULT_MAX_DISTANCE = 3
+# Ennél kevesebb szóból álló címeknél a SimHash túl zajos ("Stock market today"), ott csak a URL dönt
+DEFAULT_MIN_TITLE_TOKENS = 4
+
+TRACKING_QUERY_PREFIXES: Tuple[str, ...] = ("utm_", "mc_", "ga_")
+TRACKING_QUERY_KEYS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "guccounter", "guce_referrer", "guce_referrer_sig",
+    "ncid", "cmpid", "src", "ref", "referrer", "yptr", "soc_src", "soc_trk", "ocid", "taid", "siteid",
+})
+
+_SCHEME_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Hírügynökségi előtagok/utótagok, amelyek ugyanazon cikk szindikált példányain eltérnek
+_TITLE_NOISE_RE = re.compile(r"^(update \d+|exclusive|breaking|analysis)\s*[:\-]\s*|\s+[\-|]\s+[^\-|]{2,40}$")
+_BIT_WEIGHTS = (np.uint64(1) << np.arange(SIMHASH_BITS, dtype=np.uint64))
+
+
+def _hash64(text: str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+# A szavak és bigramok erősen ismétlődnek a címek között; a hash-eket érdemes megjegyezni
+_feature_hash = lru_cache(maxsize=65536)(_hash64)
+
+
+def canonical_url(url: Any) -> Optional[str]:
+    """
+    Kanonikus URL string (str vagy HttpUrl bemenetből), vagy None, ha a bemenet
+    nem értelmezhető http(s) URL-ként.
+    """
+    if url is None:
+        return None
+    text = str(url).strip()
+    if not text:
+        return None
+    if text.startswith("//"):
+        text = "https:" + text
+    elif not _SCHEME_RE.match(text):
+        text = "https://" + text
+    try:
+        parts = urlsplit(text)
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if scheme not in ("http", "https") or "." not in host:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_QUERY_KEYS and not key.lower().startswith(TRACKING_QUERY_PREFIXES)
+    )
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    # A séma nem része a kulcsnak: http és https változat ugyanaz a cikk
+    return urlunsplit(("", host, path, urlencode(query), "")).lstrip("/")
+
+
+def url_key(url: Any) -> Optional[int]:
+    """64 bites hash a kanonikus URL-ből (None, ha a URL érvénytelen)."""
+    canonical = canonical_url(url)
+    return None if canonical is None else _hash64(canonical)
+
+
+def title_tokens(title: Any) -> List[str]:
+    """Kisbetűs, ékezet- és írásjelmentes szavak; a hírügynökségi elő-/utótagok nélkül."""
+    if not title:
+        return []
+    text = unicodedata.normalize("NFKD", str(title)).encode("ascii", "ignore").decode("ascii").lower().strip()
+    text = _TITLE_NOISE_RE.sub("", text)
+    return _TOKEN_RE.findall(text)
+
+
+def simhash(tokens: Sequence[str]) -> int:
+    """64 bites SimHash szó unigramokból és bigramokból (egyenlő súllyal)."""
+    features = list(tokens) + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    hashes = np.fromiter((_feature_hash(feature) for feature in features), dtype=np.uint64, count=len(features))
+    bits = ((hashes[:, None] & _BIT_WEIGHTS) != 0)
+    votes = bits.sum(axis=0) * 2 > len(features)
+    return int(_BIT_WEIGHTS[votes].sum(dtype=np.uint64))
+
+
+class NewsDeduplicator:
+    """
+    Inkrementális deduplikációs index: `add()` True-t ad, ha az elem új.
+
+    Args:
+        max_distance: Legnagyobb Hamming-távolság, amelynél két cím még azonosnak számít.
+        min_title_tokens: Ennél rövidebb címekre nincs címalapú összevonás.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE, min_title_tokens: int = DEFAULT_MIN_TITLE_TOKENS):
+        if not 0 <= max_distance < SIMHASH_BITS // 2:
+            raise ValueError(f"max_distance must be in [0, {SIMHASH_BITS // 2}), got {max_distance}.")
+        self.max_distance = max_distance
+        self.min_title_tokens = min_title_tokens
+        self._band_count = max_distance + 1
+        band_width = SIMHASH_BITS // self._band_count
+        self._bands: List[Tuple[int, int]] = [
+            (i * band_width, band_width if i < self._band_count - 1 else SIMHASH_BITS - i * band_width)
+            for i in range(self._band_count)
+        ]
+        self._url_keys: Set[int] = set()
+        self._band_index: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+        self.stats: Dict[str, int] = {"added": 0, "invalid_url": 0, "duplicate_url": 0, "duplicate_title": 0}
+
+    def __len__(self) -> int:
+        return self.stats["added"]
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        return [(fingerprint >> shift) & ((1 << width) - 1) for shift, width in self._bands]
+
+    def _find_near_duplicate(self, fingerprint: int, band_values: List[int]) -> bool:
+        for band, value in enumerate(band_values):
+            for candidate in self._band_index[band].get(value, ()):
+                if bin(candidate ^ fingerprint).count("1") <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, url: Any, title: Any = None) -> bool:
+        """Felveszi az elemet, ha sem a URL-je, sem a címe nem ismert. Érvénytelen URL: False."""
+        key = url_key(url)
+        if key is None:
+            self.stats["invalid_url"] += 1
+            return False
+        if key in self._url_keys:
+            self.stats["duplicate_url"] += 1
+            return False
+
+        tokens = title_tokens(title)
+        fingerprint: Optional[int] = None
+        band_values: List[int] = []
+        if len(tokens) >= self.min_title_tokens:
+            fingerprint = simhash(tokens)
+            band_values = self._band_values(fingerprint)
+            if self._find_near_duplicate(fingerprint, band_values):
+                self.stats["duplicate_title"] += 1
+                return False
+
+        self._url_keys.add(key)
+        if fingerprint is not None:
+            for band, value in enumerate(band_values):
+                self._band_index[band].setdefault(value, []).append(fingerprint)
+        self.stats["added"] += 1
+        return True
+
+
+def dedupe_news_dicts(
+    items: Iterable[Mapping[str, Any]],
+    *,
+    limit: Optional[int] = None,
+    url_keys: Sequence[str] = ("url", "link"),
+    title_keys: Sequence[str] = ("title", "headline"),
+    deduplicator: Optional[NewsDeduplicator] = None,
+) -> List[Mapping[str, Any]]:
+    """
+    Sorrendtartó deduplikáció hír dict-ekre (az első előfordulás marad).
+
+    Args:
+        items: Hír dict-ek (pl. `StandardNewsDict`), prioritási sorrendben.
+        limit: Legfeljebb ennyi egyedi elem (None: mind).
+        url_keys / title_keys: Az első kitöltött kulcs adja a URL-t / címet.
+        deduplicator: Meglévő index (több forrás egymás utáni összefésüléséhez).
+    """
+    dedup = deduplicator if deduplicator is not None else NewsDeduplicator()
+    unique: List[Mapping[str, Any]] = []
+    for item in items:
+        if limit is not None and len(unique) >= limit:
+            break
+        if not isinstance(item, Mapping):
+            continue
+        url = next((item.get(k) for k in url_keys if item.get(k)), None)
+        title = next((item.get(k) for k in title_keys if item.get(k)), None)
+        if dedup.add(url, title):
+            unique.append(item)
+    return unique
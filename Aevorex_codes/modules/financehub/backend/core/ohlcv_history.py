@@ -0,0 +1,133 @@
+# backend/core/ohlcv_history.py
+"""
+Inkrementális OHLCV frissítés segédfüggvényei.
+
+A fetcherek (EODHD, yfinance) a teljes letöltött idősort egy stabil
+"history" cache kulcson is tárolják. Amikor a kérés-specifikus cache
+bejegyzés lejár, nem a teljes több éves tartományt töltik le újra, hanem
+csak az utolsó tárolt bártól kezdődő szakaszt (`from=` / `start=`), majd
+összefésülik a meglévő idősorral.
+
+A history metaadatai a DataFrame `attrs`-ában utaznak (a columnar kodek
+ezeket is tárolja):
+    - `HISTORY_ATTR_COVERED_FROM`: a legutóbbi teljes letöltés kezdő dátuma.
+    - `HISTORY_ATTR_FULL_REFRESH_AT`: a legutóbbi teljes letöltés napja; az
+      ennél későbbi vállalati események (split/osztalék) miatt a korábbi
+      (adjusztált) árak elavulnak, ezért teljes újratöltés kell.
+
+A modul tisztán pandas alapú, I/O-mentes.
+"""
+
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+import pandas as pd
+
+HISTORY_ATTR_COVERED_FROM: str = "fh_covered_from"
+HISTORY_ATTR_FULL_REFRESH_AT: str = "fh_full_refresh_at"
+# A history kulcsok címkéje (formátumváltáskor emelendő)
+HISTORY_CACHE_TAG: str = "hist1"
+
+
+def _to_utc_timestamp(value) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _normalize_to_index_tz(value, index: pd.DatetimeIndex) -> pd.Timestamp:
+    """Az időpontot az index időzónájához igazítja (naiv index -> naiv UTC)."""
+    ts = _to_utc_timestamp(value)
+    return ts.tz_convert(index.tz) if index.tz is not None else ts.tz_localize(None)
+
+
+def mark_full_refresh(df: pd.DataFrame, covered_from: str, as_of: Optional[datetime] = None) -> pd.DataFrame:
+    """Beállítja a history metaadatait egy teljes letöltés után (helyben, és vissza is adja)."""
+    as_of = as_of or datetime.now(timezone.utc)
+    df.attrs[HISTORY_ATTR_COVERED_FROM] = str(pd.Timestamp(covered_from).date())
+    df.attrs[HISTORY_ATTR_FULL_REFRESH_AT] = as_of.strftime("%Y-%m-%d")
+    return df
+
+
+def history_covers(history: pd.DataFrame, start_date: str) -> bool:
+    """True, ha a history teljes letöltése legalább `start_date`-től indult."""
+    covered_from = history.attrs.get(HISTORY_ATTR_COVERED_FROM)
+    if not covered_from or not isinstance(history.index, pd.DatetimeIndex) or history.empty:
+        return False
+    return pd.Timestamp(covered_from) <= pd.Timestamp(start_date)
+
+
+def incremental_start(history: pd.DataFrame) -> Optional[pd.Timestamp]:
+    """
+    Az inkrementális lekérés kezdőpontja: az utolsó tárolt bár.
+
+    Az utolsó bárt is újra lekérjük, mert az (napközben vagy hét/hónap
+    közben) még változhatott; az összefésülés az új értéket tartja meg.
+    """
+    if history.empty or not isinstance(history.index, pd.DatetimeIndex):
+        return None
+    return history.index.max()
+
+
+def merge_ohlcv_history(history: pd.DataFrame, new_bars: Optional[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Összefésüli a tárolt idősort az újonnan lekért bárokkal.
+
+    Azonos indexnél az új bár nyer; az eredmény index szerint rendezett és
+    megőrzi a history `attrs`-át.
+    """
+    attrs = dict(history.attrs)
+    if new_bars is None or new_bars.empty:
+        merged = history.copy()
+    else:
+        new_aligned = new_bars.reindex(columns=history.columns)
+        if isinstance(history.index, pd.DatetimeIndex) and isinstance(new_aligned.index, pd.DatetimeIndex):
+            if history.index.tz is not None and new_aligned.index.tz is None:
+                new_aligned.index = new_aligned.index.tz_localize("UTC").tz_convert(history.index.tz)
+            elif history.index.tz is None and new_aligned.index.tz is not None:
+                new_aligned.index = new_aligned.index.tz_convert("UTC").tz_localize(None)
+            elif history.index.tz is not None:
+                new_aligned.index = new_aligned.index.tz_convert(history.index.tz)
+        new_aligned = new_aligned.astype(history.dtypes.to_dict(), errors="ignore")
+        merged = pd.concat([history, new_aligned])
+        merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+        merged.index.name = history.index.name
+    merged.attrs = attrs
+    return merged
+
+
+def slice_from(history: pd.DataFrame, start_date: Optional[str]) -> pd.DataFrame:
+    """A history `start_date`-től kezdődő szelete (másolat, attrs nélkül)."""
+    if not start_date or history.empty or not isinstance(history.index, pd.DatetimeIndex):
+        result = history.copy()
+    else:
+        result = history.loc[history.index >= _normalize_to_index_tz(start_date, history.index)].copy()
+    result.attrs = {}
+    return result
+
+
+def has_new_corporate_action(history: pd.DataFrame, action_dates: Iterable, until=None) -> bool:
+    """
+    True, ha van olyan split/osztalék, ami a legutóbbi teljes letöltés napja
+    után, de legkésőbb `until`-ig (alapértelmezés: ma) történt.
+
+    Naptári napokat hasonlítunk (az esemény a saját időzónájában értendő),
+    így a teljes letöltés napján esedékes esemény már benne van a letöltött
+    adatban. A jövőbeli (bejelentett, de még nem esedékes) események nem
+    váltanak ki újratöltést, különben minden frissítés teljes letöltés lenne.
+    """
+    full_refresh_at = history.attrs.get(HISTORY_ATTR_FULL_REFRESH_AT)
+    if not full_refresh_at:
+        return True
+    lower = pd.Timestamp(full_refresh_at).date()
+    upper = pd.Timestamp(until if until is not None else datetime.now(timezone.utc)).date()
+    for action_date in action_dates:
+        try:
+            action_ts = pd.Timestamp(action_date)
+        except (ValueError, TypeError):
+            continue
+        if pd.isna(action_ts):
+            continue
+        action_day = action_ts.date()
+        if lower < action_day <= upper:
+            return True
+    return False
@@ -0,0 +1,146 @@
+# backend/core/ohlcv_payload.py
+"""
+Vektorizált OHLCV -> chart payload konverzió.
+
+Az `iterrows()`/`itertuples()` alapú soronkénti feldolgozás (oszlopnév
+keresés, `strftime`, `float()` minden cellára) hosszú idősoroknál
+tíz-milliszekundumos nagyságrendű. Ez a modul egyszer normalizálja az
+oszlopneveket, az időbélyegeket NumPy-jal konvertálja epoch értékre, a
+NaN -> None maszkolást pedig tömbszinten végzi.
+
+Két kimeneti alak:
+    - oszlopos (kompakt): `{"t": [...], "o": [...], "h": [...], "l": [...], "c": [...], "v": [...]}`
+    - rekord lista: `columns_to_records()` az oszlopokból, tetszőleges kulcsnevekkel.
+
+A modul tisztán pandas/NumPy alapú, I/O-mentes; a mapperek és a
+`stock_data_service.get_chart_data` közösen használják.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+# Standard (normalizált) oszlopnév -> kompakt kulcs
+COMPACT_KEYS: Dict[str, str] = {"open": "o", "high": "h", "low": "l", "close": "c", "volume": "v"}
+# A mapperek `{t, o, h, l, c, v}` rekord formátuma
+COMPACT_RECORD_KEYS: Dict[str, str] = {key: key for key in ("t", "o", "h", "l", "c", "v")}
+# A get_chart_data rekord formátuma (kompakt kulcs -> rekord kulcs)
+CHART_RECORD_KEYS: Dict[str, str] = {
+    "date": "date", "t": "timestamp",
+    "o": "open", "h": "high", "l": "low", "c": "close", "v": "volume",
+}
+
+_ADJ_CLOSE_ALIASES = ("adjusted_close", "adjclose")
+_TIME_UNIT_DIVISORS = {"ns": 1, "ms": 1_000_000, "s": 1_000_000_000}
+
+
+def normalize_ohlcv_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Egyszeri oszlopnév-normalizálás (kisbetű, szóköz -> `_`), MultiIndex
+    oszlopoknál az első szinttel. Az adatot nem másolja.
+    """
+    columns = df.columns.get_level_values(0) if isinstance(df.columns, pd.MultiIndex) else df.columns
+    normalized = [str(col).lower().replace(" ", "_") for col in columns]
+    if "adj_close" not in normalized:
+        normalized = ["adj_close" if col in _ADJ_CLOSE_ALIASES else col for col in normalized]
+    result = df.copy(deep=False)
+    result.columns = normalized
+    return result
+
+
+def _epoch_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """UTC epoch nanoszekundumok (naiv index UTC-ként értelmezve, mint `Timestamp.timestamp()`)."""
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    return index.values.astype("datetime64[ns]").astype(np.int64)
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def _float_list(values: np.ndarray, missing: np.ndarray) -> List[Optional[float]]:
+    result: List[Optional[float]] = values.tolist()
+    for pos in np.flatnonzero(missing):
+        result[pos] = None
+    return result
+
+
+def _int_list(values: np.ndarray, missing: np.ndarray, fill: Optional[int]) -> List[Optional[int]]:
+    result: List[Optional[int]] = np.where(missing, 0, values).astype(np.int64).tolist()
+    if fill != 0:
+        for pos in np.flatnonzero(missing):
+            result[pos] = fill
+    return result
+
+
+def ohlcv_to_columns(
+    df: pd.DataFrame,
+    *,
+    time_unit: str = "ms",
+    drop_incomplete: bool = False,
+    drop_pre_epoch: bool = False,
+    volume_fill: Optional[int] = None,
+    with_dates: bool = False,
+) -> Optional[Dict[str, List[Any]]]:
+    """
+    OHLCV DataFrame -> oszlopos payload (`t`, `o`, `h`, `l`, `c`, `v`).
+
+    Args:
+        df: DatetimeIndex-es OHLCV DataFrame (oszlopnevek kis/nagybetűtől függetlenül).
+        time_unit: A `t` egysége: "ms" (alapértelmezés), "s" vagy "ns".
+        drop_incomplete: Elhagyja azokat a bárokat, ahol bármely OHLC érték hiányzik.
+        drop_pre_epoch: Elhagyja a `t <= 0` (1970 előtti) bárokat.
+        volume_fill: Hiányzó volumen helyettesítője (None: a kimenetben None).
+        with_dates: `date` oszlop ("YYYY-MM-DD", az index saját időzónájában).
+
+    Returns:
+        Az oszlopok dict-je, vagy None, ha az index nem DatetimeIndex vagy
+        hiányzik valamelyik OHLC oszlop.
+    """
+    if not isinstance(df.index, pd.DatetimeIndex):
+        return None
+    normalized = normalize_ohlcv_columns(df)
+    if any(col not in normalized.columns for col in PRICE_COLUMNS):
+        return None
+
+    times = _epoch_ns(normalized.index) // _TIME_UNIT_DIVISORS[time_unit]
+    prices = {col: _numeric(normalized, col) for col in PRICE_COLUMNS}
+    volume = _numeric(normalized, "volume")
+    price_missing = {col: ~np.isfinite(values) for col, values in prices.items()}
+
+    keep: Optional[np.ndarray] = None
+    if drop_incomplete:
+        keep = ~np.logical_or.reduce(list(price_missing.values()))
+    if drop_pre_epoch:
+        keep = (times > 0) if keep is None else (keep & (times > 0))
+    index = normalized.index
+    if keep is not None and not keep.all():
+        times, volume, index = times[keep], volume[keep], index[keep]
+        prices = {col: values[keep] for col, values in prices.items()}
+        price_missing = {col: missing[keep] for col, missing in price_missing.items()}
+
+    columns: Dict[str, List[Any]] = {}
+    if with_dates:
+        columns["date"] = index.strftime("%Y-%m-%d").tolist()
+    columns["t"] = times.tolist()
+    for col in PRICE_COLUMNS:
+        columns[COMPACT_KEYS[col]] = _float_list(prices[col], price_missing[col])
+    columns["v"] = _int_list(volume, ~np.isfinite(volume), volume_fill)
+    return columns
+
+
+def columns_to_records(columns: Mapping[str, List[Any]], key_map: Optional[Mapping[str, str]] = None) -> List[Dict[str, Any]]:
+    """
+    Oszlopos payload -> rekord lista. A `key_map` (oszlop -> rekord kulcs)
+    egyben kiválasztja és sorba rendezi a kimeneti mezőket.
+    """
+    if key_map is None:
+        key_map = {key: key for key in columns}
+    source_keys = [key for key in key_map if key in columns]
+    record_keys = [key_map[key] for key in source_keys]
+    return [dict(zip(record_keys, row)) for row in zip(*(columns[key] for key in source_keys))]
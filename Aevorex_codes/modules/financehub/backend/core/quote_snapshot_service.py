@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""quote_snapshot_service.py – könnyű quote snapshot a header / basic végpontokhoz.
+
+A `/header/{ticker}` és a `/basic/{ticker}` csak árat, változást, napi
+tartományt, forgalmat és néhány statikus cégadatot jelenít meg. Ezeket két
+kis cache bejegyzésből szolgáljuk ki:
+
+* quote snapshot (`quote_snapshot:v1:<SYMBOL>`, rövid TTL): a ticker szalag
+  frissítése minden futáskor beírja a parsolt quote-okat (`store_quote_snapshots`),
+  a többi szimbólumra cache-hiánykor egyetlen real-time kérés tölti fel;
+* cégprofil (`company_profile:v1:<SYMBOL>`, hosszú TTL): a yfinance `info`
+  szótárból kivonatolt néhány statikus mező.
+
+Többéves OHLCV letöltés ezen az úton nincs. Ha real-time quote nem érhető el
+(nincs API kulcs, hiba), az ár a (cache-elt) yfinance `info` mezőiből jön.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import httpx
+
+from modules.financehub.backend.config import settings
+from modules.financehub.backend.utils.logger_config import get_logger
+from .cache_service import CacheService
+from .fetchers._base_helpers import coalesce_fetch
+from .fetchers.yfinance import fetch_company_info_dict
+
+logger = get_logger(__name__)
+
+__all__ = [
+    "get_quote_snapshot",
+    "get_company_profile",
+    "get_basic_snapshot",
+    "store_quote_snapshots",
+    "quote_from_company_info",
+]
+
+QUOTE_CACHE_PREFIX = "quote_snapshot:v1:"
+PROFILE_CACHE_PREFIX = "company_profile:v1:"
+
+# yfinance `info` kulcs(ok) -> profil mező; az első nem üres érték nyer
+_PROFILE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "company_name": ("longName", "shortName"),
+    "currency": ("currency",),
+    "exchange": ("exchange",),
+    "market_cap": ("marketCap",),
+    "sector": ("sector",),
+    "industry": ("industry",),
+}
+_INFO_QUOTE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "price": ("currentPrice", "regularMarketPrice"),
+    "previous_close": ("previousClose", "regularMarketPreviousClose"),
+    "day_high": ("dayHigh", "regularMarketDayHigh"),
+    "day_low": ("dayLow", "regularMarketDayLow"),
+    "volume": ("volume", "regularMarketVolume"),
+}
+
+
+def _first_present(info: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for key in keys:
+        value = info.get(key)
+        if value is not None and value != "":
+            return value
+    return None
+
+
+def _quote_key(symbol: str) -> str:
+    return f"{QUOTE_CACHE_PREFIX}{symbol.upper()}"
+
+
+def _profile_key(symbol: str) -> str:
+    return f"{PROFILE_CACHE_PREFIX}{symbol.upper()}"
+
+
+def _normalize_quote(quote: Dict[str, Any], source: str) -> Optional[Dict[str, Any]]:
+    """Egységes snapshot (a hiányzó `previous_close` a változásból visszaszámolva)."""
+    price = quote.get("price")
+    if not isinstance(price, (int, float)):
+        return None
+    snapshot = {
+        "price": price,
+        "change": quote.get("change"),
+        "change_percent": quote.get("change_percent"),
+        "previous_close": quote.get("previous_close"),
+        "day_high": quote.get("day_high"),
+        "day_low": quote.get("day_low"),
+        "volume": quote.get("volume"),
+        "quote_timestamp": quote.get("timestamp"),
+        "source": source,
+        "fetched_at": time.time(),
+    }
+    change = snapshot["change"]
+    if snapshot["previous_close"] is None and isinstance(change, (int, float)):
+        snapshot["previous_close"] = round(price - change, 4)
+    return snapshot
+
+
+def quote_from_company_info(info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Quote snapshot a yfinance `info` szótárból (tartalék, ha nincs real-time quote)."""
+    fields = {name: _first_present(info, keys) for name, keys in _INFO_QUOTE_FIELDS.items()}
+    price, previous_close = fields["price"], fields["previous_close"]
+    if isinstance(price, (int, float)) and isinstance(previous_close, (int, float)) and previous_close:
+        fields["change"] = price - previous_close
+        fields["change_percent"] = fields["change"] / previous_close * 100
+    return _normalize_quote(fields, source="yfinance_info")
+
+
+async def store_quote_snapshots(
+    cache: CacheService, quotes: Iterable[Dict[str, Any]], source: str, ttl_seconds: Optional[int] = None
+) -> int:
+    """
+    Parsolt quote-ok (pl. a ticker szalag eredményei) tárolása per-szimbólum snapshotként, egy körben.
+    Visszaadja a tárolt snapshotok számát; hiba esetén 0 (a hívó folyamatát nem szakítja meg).
+    """
+    mapping: Dict[str, Any] = {}
+    for quote in quotes:
+        symbol = quote.get("symbol") if isinstance(quote, dict) else None
+        snapshot = _normalize_quote(quote, source) if symbol else None
+        if snapshot is not None:
+            mapping[_quote_key(symbol)] = snapshot
+    if not mapping:
+        return 0
+    try:
+        stored = await cache.set_many(mapping, timeout_seconds=ttl_seconds or settings.CACHE.QUOTE_SNAPSHOT_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Failed to store {len(mapping)} quote snapshots: {e}")
+        return 0
+    return len(mapping) if stored else 0
+
+
+async def _fetch_realtime_quote(symbol: str, client: httpx.AsyncClient) -> Optional[Dict[str, Any]]:
+    # Késleltetett import: a ticker_tape_service maga is ezt a modult importálja
+    from .ticker_tape_service import API_CONFIG, SELECTED_API_PROVIDER, fetch_single_ticker_quote
+
+    provider_config = API_CONFIG.get(SELECTED_API_PROVIDER)
+    if not provider_config or not provider_config["api_key_getter"]():
+        return None
+    quote = await fetch_single_ticker_quote(symbol, client, provider_config)
+    return _normalize_quote(quote, source=SELECTED_API_PROVIDER.lower()) if quote else None
+
+
+@coalesce_fetch("quote_snapshot", identifier_arg="symbol")
+async def get_quote_snapshot(
+    symbol: str, client: httpx.AsyncClient, cache: CacheService, force_refresh: bool = False
+) -> Optional[Dict[str, Any]]:
+    """A szimbólum quote snapshotja a cache-ből, hiány esetén egy real-time kérésből (None, ha nem elérhető)."""
+    key = _quote_key(symbol)
+    if not force_refresh:
+        try:
+            cached = await cache.get(key)
+            if isinstance(cached, dict):
+                return cached
+        except Exception as e:
+            logger.debug(f"[{symbol}] Quote snapshot cache read failed: {e}")
+
+    snapshot = await _fetch_realtime_quote(symbol, client)
+    if snapshot is not None:
+        try:
+            await cache.set(key, snapshot, timeout_seconds=settings.CACHE.QUOTE_SNAPSHOT_TTL_SECONDS)
+        except Exception as e:
+            logger.debug(f"[{symbol}] Quote snapshot cache write failed: {e}")
+    return snapshot
+
+
+@coalesce_fetch("company_profile", identifier_arg="symbol")
+async def get_company_profile(symbol: str, cache: CacheService, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+    """A statikus cégadatok (név, tőzsde, deviza, szektor, ...) hosszú TTL-lel cache-elve."""
+    key = _profile_key(symbol)
+    if not force_refresh:
+        try:
+            cached = await cache.get(key)
+            if isinstance(cached, dict):
+                return cached
+        except Exception as e:
+            logger.debug(f"[{symbol}] Company profile cache read failed: {e}")
+
+    info = await fetch_company_info_dict(symbol, cache)
+    if not info:
+        return None
+    profile = {name: _first_present(info, keys) for name, keys in _PROFILE_FIELDS.items()}
+    # Az első lekérésből a tartalék quote is megmarad, így a real-time forrás nélküli
+    # szimbólumoknál sem kell újra a teljes `info` szótárt olvasni
+    profile["fallback_quote"] = quote_from_company_info(info)
+    try:
+        await cache.set(key, profile, timeout_seconds=settings.CACHE.COMPANY_PROFILE_TTL_SECONDS)
+    except Exception as e:
+        logger.debug(f"[{symbol}] Company profile cache write failed: {e}")
+    return profile
+
+
+async def _resolved(value: Any) -> Any:
+    return value
+
+
+async def get_basic_snapshot(
+    symbol: str, client: httpx.AsyncClient, cache: CacheService
+) -> Optional[Dict[str, Any]]:
+    """
+    Quote snapshot + cégprofil párhuzamosan; a `get_basic_stock_data` által
+    visszaadott alakban (current_price, previous_close, change, ... , sector, industry).
+    """
+    # Meleg úton a quote és a profil egyetlen Redis körben jön; csak a hiányzók mennek a lekérő útra
+    quote_key, profile_key = _quote_key(symbol), _profile_key(symbol)
+    try:
+        cached = await cache.get_many([quote_key, profile_key])
+    except Exception as e:
+        logger.debug(f"[{symbol}] Basic snapshot cache read failed: {e}")
+        cached = {}
+    quote = cached.get(quote_key) if isinstance(cached.get(quote_key), dict) else None
+    profile = cached.get(profile_key) if isinstance(cached.get(profile_key), dict) else None
+    if quote is None or profile is None:
+        quote, profile = await asyncio.gather(
+            _resolved(quote) if quote is not None else get_quote_snapshot(symbol, client, cache),
+            _resolved(profile) if profile is not None else get_company_profile(symbol, cache),
+        )
+    if quote is None and profile is not None:
+        quote = profile.get("fallback_quote")
+    if quote is None and profile is None:
+        return None
+    quote = quote or {}
+    profile = profile or {}
+    return {
+        "symbol": symbol,
+        "company_name": profile.get("company_name"),
+        "current_price": quote.get("price"),
+        "previous_close": quote.get("previous_close"),
+        "change": quote.get("change"),
+        "change_percent": quote.get("change_percent"),
+        "currency": profile.get("currency") or "USD",
+        "exchange": profile.get("exchange"),
+        "market_cap": profile.get("market_cap"),
+        "volume": quote.get("volume"),
+        "day_high": quote.get("day_high"),
+        "day_low": quote.get("day_low"),
+        "sector": profile.get("sector"),
+        "industry": profile.get("industry"),
+        "quote_source": quote.get("source"),
+    }
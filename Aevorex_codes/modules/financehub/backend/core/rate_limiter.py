@@ -0,0 +1,344 @@
+# backend/core/rate_limiter.py
+"""
+Szolgáltatónkénti token-bucket rate limiter prioritásos várakozási sorral.
+
+A külső adatszolgáltatók (Alpha Vantage, FMP, MarketAux, NewsAPI, EODHD)
+percenkénti kvótáit a `make_api_request` minden kérés előtt itt "foglalja le":
+
+* a bucket állapota Redisben él (atomikus Lua szkript, a Redis óráját
+  használja), így a workerek közösen fogyasztják a kvótát; Redis nélkül
+  (vagy Redis hibánál) folyamaton belüli bucket a tartalék;
+* ha nincs szabad token, a kérés sorba áll – szolgáltatónként egy sor, ahol
+  az interaktív kérések a háttérfrissítések elé kerülnek – és legfeljebb a
+  prioritásához tartozó határidőig vár (`RateLimitTimeout`);
+* 429 válasznál a `Retry-After` idejére a szolgáltató bucketje blokkolt.
+
+A prioritást a hívó kontextusa adja (`request_priority`), így a fetcherek
+szignatúrája nem változik.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from modules.financehub.backend.utils.logger_config import get_logger
+
+logger = get_logger(__name__)
+MODULE_PREFIX = "[RateLimiter]"
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_NAMES: Dict[int, str] = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+# Host részlet -> szolgáltató azonosító (a `make_api_request` az URL-ből ismeri fel)
+PROVIDER_HOSTS: Dict[str, str] = {
+    "alphavantage.co": "alphavantage",
+    "financialmodelingprep.com": "fmp",
+    "marketaux.com": "marketaux",
+    "newsapi.org": "newsapi",
+    "eodhistoricaldata.com": "eodhd",
+    "eodhd.com": "eodhd",
+}
+
+_REQUEST_PRIORITY: contextvars.ContextVar[int] = contextvars.ContextVar("fh_request_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """A blokkon belül (és az onnan indított taskokban) induló kérések prioritása."""
+    token = _REQUEST_PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _REQUEST_PRIORITY.reset(token)
+
+
+def current_priority() -> int:
+    return _REQUEST_PRIORITY.get()
+
+
+def provider_for_url(url: str) -> Optional[str]:
+    """A kérés URL-jéhez tartozó szolgáltató, vagy None, ha nem korlátozott."""
+    host = (urlsplit(url).hostname or "").lower()
+    for suffix, provider in PROVIDER_HOSTS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return provider
+    return None
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """A `Retry-After` fejléc másodpercben (delta-seconds vagy HTTP-dátum alak); érvénytelen értéknél None."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - (now or datetime.now(timezone.utc))).total_seconds())
+
+
+class RateLimitTimeout(Exception):
+    """A kérés a határidőn belül nem kapott tokent."""
+
+    def __init__(self, provider: str, waited: float):
+        super().__init__(f"Rate limit wait for provider '{provider}' exceeded its deadline after {waited:.2f}s")
+        self.provider = provider
+        self.waited = waited
+
+
+@dataclass(frozen=True)
+class ProviderLimit:
+    """Egy szolgáltató kvótája: `rate_per_second` utántöltés, legfeljebb `burst` token."""
+
+    rate_per_second: float
+    burst: int = 1
+
+    @classmethod
+    def per_minute(cls, requests: int, burst: Optional[int] = None) -> "ProviderLimit":
+        # Alapértelmezett burst: ~10 másodpercnyi kvóta, hogy egy perc alatt se menjen ki a kvóta kétszerese
+        return cls(rate_per_second=requests / 60.0, burst=max(1, burst if burst is not None else requests // 6))
+
+
+# ==============================================================================
+# Bucket tárolók
+# ==============================================================================
+
+class LocalTokenBucketStore:
+    """Folyamaton belüli bucketok (Redis nélkül vagy Redis hiba esetén)."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # provider -> (tokens, last refill)
+        self._blocked_until: Dict[str, float] = {}
+
+    async def take(self, provider: str, limit: ProviderLimit) -> float:
+        """Egy token elvétele; 0.0, ha sikerült, különben a következő tokenig hátralévő másodperc."""
+        now = self._clock()
+        blocked_until = self._blocked_until.get(provider, 0.0)
+        if blocked_until > now:
+            return blocked_until - now
+        tokens, last = self._buckets.get(provider, (float(limit.burst), now))
+        tokens = min(float(limit.burst), tokens + (now - last) * limit.rate_per_second)
+        if tokens >= 1.0:
+            self._buckets[provider] = (tokens - 1.0, now)
+            return 0.0
+        self._buckets[provider] = (tokens, now)
+        return (1.0 - tokens) / limit.rate_per_second
+
+    async def block(self, provider: str, seconds: float) -> None:
+        until = self._clock() + seconds
+        self._blocked_until[provider] = max(until, self._blocked_until.get(provider, 0.0))
+
+
+_TAKE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts', 'blocked_until')
+local blocked_until = tonumber(state[3]) or 0
+if blocked_until > now then
+    return blocked_until - now
+end
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) * 1000 / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+local ttl = math.ceil(burst * 1000 / rate) + 60000
+if redis.call('PTTL', KEYS[1]) < ttl then
+    redis.call('PEXPIRE', KEYS[1], ttl)
+end
+return wait
+"""
+
+_BLOCK_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local block_ms = tonumber(ARGV[1])
+local until_ms = now + block_ms
+local current = tonumber(redis.call('HGET', KEYS[1], 'blocked_until')) or 0
+if until_ms > current then
+    redis.call('HSET', KEYS[1], 'blocked_until', until_ms)
+end
+if redis.call('PTTL', KEYS[1]) < block_ms + 60000 then
+    redis.call('PEXPIRE', KEYS[1], block_ms + 60000)
+end
+return until_ms
+"""
+
+
+class RedisTokenBucketStore:
+    """
+    Workerek között közös bucketok Redis hash-ben (`<key_prefix><provider>`), atomikus Lua szkriptekkel.
+    Redis hiba esetén a `fallback` (folyamaton belüli) tárolóra esik vissza.
+    """
+
+    def __init__(self, redis_client: Any, key_prefix: str = "ratelimit:v1:", fallback: Optional[LocalTokenBucketStore] = None):
+        self.redis_client = redis_client
+        self.key_prefix = key_prefix
+        self.fallback = fallback or LocalTokenBucketStore()
+        self._take = redis_client.register_script(_TAKE_SCRIPT)
+        self._block = redis_client.register_script(_BLOCK_SCRIPT)
+
+    async def take(self, provider: str, limit: ProviderLimit) -> float:
+        try:
+            wait_ms = await self._take(keys=[f"{self.key_prefix}{provider}"], args=[limit.rate_per_second, limit.burst])
+            return int(wait_ms) / 1000.0
+        except Exception as e:
+            logger.warning(f"{MODULE_PREFIX} Redis bucket for '{provider}' unavailable ({e}); using in-process bucket.")
+            return await self.fallback.take(provider, limit)
+
+    async def block(self, provider: str, seconds: float) -> None:
+        await self.fallback.block(provider, seconds)
+        try:
+            await self._block(keys=[f"{self.key_prefix}{provider}"], args=[int(math.ceil(seconds * 1000))])
+        except Exception as e:
+            logger.warning(f"{MODULE_PREFIX} Could not record Retry-After for '{provider}' in Redis: {e}")
+
+
+# ==============================================================================
+# Prioritásos ütemező
+# ==============================================================================
+
+class ProviderRateLimiter:
+    """
+    Szolgáltatónként egy prioritásos várakozási sor a token-bucket előtt.
+
+    Mindig csak a sor eleje (legkisebb prioritás-érték, azon belül érkezési
+    sorrend) próbál tokent venni; a később érkező interaktív kérés a már
+    várakozó háttérkérés elé kerül.
+
+    Args:
+        limits: Szolgáltató -> kvóta; a nem szereplő szolgáltatók korlátlanok.
+        store: Bucket tároló (alapértelmezés: folyamaton belüli).
+        max_wait_seconds: Prioritás -> maximális várakozás (határidő).
+        on_wait: Callback (provider, priority név, kimenet, várakozás mp) minden lefoglalás után.
+        on_queue_depth: Callback (provider, priority név, sorhossz) a sor változásakor.
+    """
+
+    def __init__(
+        self,
+        limits: Mapping[str, ProviderLimit],
+        store: Optional[Any] = None,
+        max_wait_seconds: Optional[Mapping[int, float]] = None,
+        on_wait: Optional[Callable[[str, str, str, float], None]] = None,
+        on_queue_depth: Optional[Callable[[str, str, int], None]] = None,
+    ):
+        self.limits: Dict[str, ProviderLimit] = dict(limits)
+        self.store = store or LocalTokenBucketStore()
+        self.max_wait_seconds: Dict[int, float] = dict(max_wait_seconds or {PRIORITY_INTERACTIVE: 5.0, PRIORITY_BACKGROUND: 60.0})
+        self._on_wait = on_wait
+        self._on_queue_depth = on_queue_depth
+        self._queues: Dict[str, List[List[Any]]] = {}
+        self._sequence = itertools.count()
+
+    def queue_depth(self, provider: str) -> Dict[str, int]:
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _seq, _event in self._queues.get(provider, []):
+            depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+        return depth
+
+    def _report_depth(self, provider: str) -> None:
+        if self._on_queue_depth is None:
+            return
+        for name, depth in self.queue_depth(provider).items():
+            self._on_queue_depth(provider, name, depth)
+
+    def _report_wait(self, provider: str, priority: int, outcome: str, waited: float) -> None:
+        if self._on_wait is not None:
+            self._on_wait(provider, PRIORITY_NAMES.get(priority, str(priority)), outcome, waited)
+
+    async def acquire(self, provider: Optional[str], priority: Optional[int] = None, max_wait: Optional[float] = None) -> float:
+        """
+        Vár, amíg a szolgáltatónak van szabad tokenje.
+
+        Returns:
+            A várakozással töltött idő másodpercben (korlátlan szolgáltatónál 0).
+
+        Raises:
+            RateLimitTimeout: Ha a token a határidőn belül nem szerezhető meg.
+        """
+        limit = self.limits.get(provider) if provider else None
+        if limit is None:
+            return 0.0
+        if priority is None:
+            priority = current_priority()
+        if max_wait is None:
+            max_wait = self.max_wait_seconds.get(priority, max(self.max_wait_seconds.values()))
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        deadline = start + max_wait
+        queue = self._queues.setdefault(provider, [])
+        entry = [priority, next(self._sequence), asyncio.Event()]
+        heapq.heappush(queue, entry)
+        self._report_depth(provider)
+        outcome = "timeout"
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if queue[0] is not entry:
+                    # Nem mi vagyunk soron: az előttünk állók felébresztenek
+                    if remaining <= 0:
+                        raise RateLimitTimeout(provider, loop.time() - start)
+                    entry[2].clear()
+                    try:
+                        await asyncio.wait_for(entry[2].wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        raise RateLimitTimeout(provider, loop.time() - start) from None
+                    continue
+                wait = await self.store.take(provider, limit)
+                if wait <= 0:
+                    outcome = "granted"
+                    return loop.time() - start
+                if wait > remaining:
+                    raise RateLimitTimeout(provider, loop.time() - start)
+                await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            waited = loop.time() - start
+            queue.remove(entry)
+            heapq.heapify(queue)
+            if queue:
+                queue[0][2].set()
+            else:
+                self._queues.pop(provider, None)
+            self._report_depth(provider)
+            self._report_wait(provider, priority, outcome, waited)
+            if outcome == "timeout":
+                logger.warning(
+                    f"{MODULE_PREFIX} {PRIORITY_NAMES.get(priority, priority)} request to '{provider}' gave up after {waited:.2f}s (deadline {max_wait:.1f}s)."
+                )
+            elif outcome == "granted" and waited >= 0.5:
+                logger.info(f"{MODULE_PREFIX} {PRIORITY_NAMES.get(priority, priority)} request to '{provider}' waited {waited:.2f}s for a token.")
+
+    async def note_retry_after(self, provider: Optional[str], seconds: float) -> None:
+        """429 válasz után a szolgáltató bucketjének blokkolása `seconds` másodpercre (minden workerben)."""
+        if not provider or provider not in self.limits or seconds <= 0:
+            return
+        logger.warning(f"{MODULE_PREFIX} Provider '{provider}' asked to back off for {seconds:.1f}s (Retry-After).")
+        await self.store.block(provider, seconds)
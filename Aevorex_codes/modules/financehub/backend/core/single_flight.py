@@ -0,0 +1,119 @@
+# backend/core/single_flight.py
+"""
+Kérés-összevonás (single-flight) aszinkron hívásokhoz.
+
+Ha ugyanarra a kulcsra több párhuzamos hívás érkezik (pl. 50 felhasználó
+nyitja meg ugyanazt a tickert), csak az első ("originator") futtatja a
+tényleges coroutine-t; a többiek ("coalesced") ugyanannak az eredményére
+várnak. A várakozók az eredmény mély másolatát kapják, amely még azelőtt
+készül, hogy az originator visszatérne, így egyik hívó DataFrame/dict
+módosítása sem hat a többiekre (az originatorét is beleértve).
+
+A modul tisztán folyamaton belüli; a workerek közötti összevonást a
+fetcher réteg (`_base_helpers.coalesce_fetch`) a CacheService Redis lockjával
+oldja meg.
+"""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from modules.financehub.backend.utils.logger_config import get_logger
+
+logger = get_logger(__name__)
+MODULE_PREFIX = "[SingleFlight]"
+
+ROLE_ORIGINATED = "originated"
+ROLE_COALESCED = "coalesced"
+
+
+class SingleFlight:
+    """
+    Kulcsonként legfeljebb egy futó coroutine; a párhuzamos hívók megosztják az eredményt.
+
+    Attributes:
+        name (str): Azonosító a logokhoz és metrikákhoz.
+        originated (int): Tényleges végrehajtások száma.
+        coalesced (int): Folyamatban lévő híváshoz csatlakozott hívások száma.
+    """
+
+    def __init__(self, name: str, on_call: Optional[Callable[[str, str], None]] = None):
+        self.name = name
+        self._in_flight: Dict[str, "asyncio.Future[Any]"] = {}
+        self._waiters: Dict[str, int] = {}
+        self._on_call = on_call
+        self.originated = 0
+        self.coalesced = 0
+
+    def in_flight(self, key: str) -> bool:
+        """True, ha a kulcsra éppen fut egy hívás."""
+        return key in self._in_flight
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]], label: Optional[str] = None) -> Any:
+        """
+        Végrehajtja a `func`-ot, vagy csatlakozik egy azonos kulcsú futó híváshoz.
+
+        Args:
+            key: Az összevonás kulcsa (pl. `generate_cache_key` kimenete).
+            func: Paraméter nélküli coroutine factory; csak az originator hívja.
+            label: Metrika címke (alapértelmezés: `name`).
+
+        Returns:
+            A coroutine eredménye (várakozóknak mély másolat).
+
+        Raises:
+            Az originator kivételét minden várakozó megkapja.
+        """
+        label = label or self.name
+        pending = self._in_flight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+            self._record(label, ROLE_COALESCED)
+            logger.debug(f"{MODULE_PREFIX} [{label}] Joining in-flight call for key '{key}'.")
+            try:
+                result = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # Az originatort törölték: újrapróbálkozunk (akár mi leszünk az originator)
+                if pending.cancelled():
+                    return await self.do(key, func, label)
+                raise
+            return copy.deepcopy(result)
+
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.originated += 1
+        self._record(label, ROLE_ORIGINATED)
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # "exception was never retrieved" figyelmeztetés elkerülése várakozók nélkül
+            raise
+        else:
+            # A várakozók pillanatképe most készül: az originator hívója utána már módosíthatja az eredményt
+            future.set_result(copy.deepcopy(result) if self._waiters.get(key) else result)
+            return result
+        finally:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+                self._waiters.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Egyszerű statisztika a health/debug végpontokhoz."""
+        return {
+            "in_flight": len(self._in_flight),
+            "originated": self.originated,
+            "coalesced": self.coalesced,
+        }
+
+    def _record(self, label: str, role: str) -> None:
+        if self._on_call is None:
+            return
+        try:
+            self._on_call(label, role)
+        except Exception as exc:  # pragma: no cover – a metrika opcionális
+            logger.debug(f"{MODULE_PREFIX} Metric callback error: {exc}")
@@ -21,12 +21,12 @@ import math
 import json # For parsing settings strings
 # --- Explicit Typing Imports ---
 from typing import (
-    List, Optional, Dict, Any, Tuple, Final, Union, Set, TypeAlias, Callable
+    List, Optional, Dict, Any, Tuple, Final, Union, TypeAlias, Callable
 )
 # -----------------------------
 import pandas as pd
 import httpx
-from pydantic import BaseModel, ValidationError, HttpUrl, Field # Field importálva
+from pydantic import BaseModel, ValidationError, Field # Field importálva
 from datetime import datetime, timezone, timedelta, date as Date # Ensure datetime imports
 import uuid
 import sys
@@ -55,7 +55,20 @@ try:
         StockSplitData, DividendData
     )
     from .cache_service import CacheService
-    from modules.financehub.backend.core.indicator_service import calculate_and_format_indicators
+    from .news_dedup import NewsDeduplicator, dedupe_news_dicts
+    from modules.financehub.backend.utils.timestamps import normalize_timestamp_field
+    from .ohlcv_payload import CHART_RECORD_KEYS, COMPACT_RECORD_KEYS, columns_to_records, ohlcv_to_columns
+    from .quote_snapshot_service import get_basic_snapshot
+    from .rate_limiter import PRIORITY_BACKGROUND, request_priority
+    from .fetchers._base_helpers import provider_available
+    from .hedging import HedgeBudget, HedgedRequester, LatencyTracker
+    from modules.financehub.backend.core.indicator_service import (
+        calculate_and_format_indicators,
+        calculate_indicators_incremental,
+        load_indicator_params,
+    )
+    from modules.financehub.backend.core.indicator_incremental import MODE_HIT
+    from .dataframe_codec import CODEC_CACHE_TAG, DataFrameCodecError, decode_cache_entry, encode_dataframe
     from modules.financehub.backend.core.ai.ai_service import generate_ai_summary
     from modules.financehub.backend.core.ai import prompt_generators
     from modules.financehub.backend.core import fetchers
@@ -113,7 +126,7 @@ try:
     # --- Utility and Framework Imports ---
     from modules.financehub.backend.utils.helpers import (
         parse_optional_float, parse_optional_int, parse_timestamp_to_iso_utc,
-        _clean_value, normalize_url, _validate_date_string
+        _clean_value, _validate_date_string
     )
     from fastapi import HTTPException, status
     # -----------------------------------
@@ -168,6 +181,9 @@ def _load_config_value(attr_path: str, expected_type: Union[type, Tuple[type, ..
 
 # === GLOBAL CONSTANTS (using _load_config_value) ===
 AGGREGATED_RESPONSE_TTL: Final[int] = _load_config_value("CACHE.AGGREGATED_TTL_SECONDS", int, lambda v: v > 0, 900, "Aggregate Response TTL")
+AGGREGATED_STALE_TTL: Final[int] = _load_config_value("CACHE.AGGREGATED_STALE_TTL_SECONDS", int, lambda v: v >= 0, 3600, "Aggregate Response Stale-While-Revalidate Window")
+INDICATOR_CACHE_ENABLED: Final[bool] = _load_config_value("CACHE.INDICATOR_CACHE_ENABLED", bool, lambda v: isinstance(v, bool), True, "Indicator State Cache Enabled")
+INDICATOR_STATE_TTL: Final[int] = _load_config_value("CACHE.INDICATOR_STATE_TTL_SECONDS", int, lambda v: v > 0, 7 * 24 * 3600, "Indicator State TTL")
 OHLCV_YEARS: Final[int] = _load_config_value("DATA_PROCESSING.OHLCV_YEARS_TO_FETCH", int, lambda v: v > 0, 5, "OHLCV Years to fetch (yfinance)")
 CHART_YEARS: Final[float] = _load_config_value("DATA_PROCESSING.CHART_HISTORY_YEARS", float, lambda v: v > 0, 1.0, "Chart History Years")
 LOCK_TTL_SECONDS: Final[int] = _load_config_value("CACHE.LOCK_TTL_SECONDS", int, lambda v: v > 0, 60, "Redis Lock TTL")
@@ -187,6 +203,11 @@ NODE_ENV: Final[str] = _load_config_value("ENVIRONMENT.NODE_ENV", str, lambda v:
 USE_EODHD_FOR_COMPANY_INFO: Final[bool] = _load_config_value("EODHD_FEATURES.USE_FOR_COMPANY_INFO", bool, lambda v: isinstance(v, bool), False, "Use EODHD for Company Info")
 USE_EODHD_FOR_FINANCIALS: Final[bool] = _load_config_value("EODHD_FEATURES.USE_FOR_FINANCIALS", bool, lambda v: isinstance(v, bool), False, "Use EODHD for Financials")
 
+# Stale-while-revalidate: a friss élettartam vége (epoch mp) az aggregált cache bejegyzésben
+AGGREGATED_SOFT_EXPIRY_FIELD: Final[str] = "_cache_soft_expires_at"
+# Folyamatban lévő háttérfrissítések (aggregate cache kulcs -> task); workerenként legfeljebb egy kulcsonként
+_AGGREGATE_REVALIDATION_TASKS: Dict[str, "asyncio.Task[Any]"] = {}
+
 
 # === UTILITY FUNCTIONS ===
 def _period_to_years(period: str) -> int:
@@ -219,6 +240,10 @@ ENABLED_SOURCES_KEY: Final[str] = "ENABLED_SOURCES"
 PRIORITY_KEY: Final[str] = "SOURCE_PRIORITY"
 MIN_TARGET_KEY: Final[str] = "MIN_UNIQUE_TARGET"
 DEFAULT_MIN_TARGET: Final[int] = 5
+CONCURRENT_FETCH_KEY: Final[str] = "CONCURRENT_FETCH"
+FETCH_DEADLINE_KEY: Final[str] = "FETCH_DEADLINE_SECONDS"
+DEFAULT_FETCH_DEADLINE_SECONDS: Final[float] = 6.0
+NEWS_SORT_FALLBACK_TS: Final[int] = -(2**63) # Parse-olhatatlan dátumú hírek a lista végére
 
 # Fetcher function mapping (using getattr for safety)
 # Ensure 'fetchers' is imported correctly above
@@ -233,14 +258,51 @@ NEWS_FETCHER_MAPPING: Dict[str, Optional[Callable]] = {
 }
 # Filter out any fetchers that were not found (returned None)
 NEWS_FETCHER_MAPPING = {k: v for k, v in NEWS_FETCHER_MAPPING.items() if v is not None and callable(v)}
+# Hírforrás -> circuit breaker szolgáltató (ahol eltér a forrás nevétől)
+NEWS_SOURCE_PROVIDERS: Dict[str, str] = {"fmp_stock": "fmp", "fmp_press": "fmp"}
 logger.debug(f"Initialized NEWS_FETCHER_MAPPING with available fetchers: {list(NEWS_FETCHER_MAPPING.keys())}")
 # ======================================================
 
+# === OHLCV hedging (EODHD <-> yfinance, core fetch fázis) ===
+# Forrás -> core_fetch_tasks kulcs
+OHLCV_SOURCE_TASK_KEYS: Final[Dict[str, str]] = {"eodhd": "eodhd_combined_data", "yfinance": "ohlcv_raw_df_yf"}
+
+
+def _record_hedge_outcome(primary: str, alternate: str, outcome: str) -> None:
+    try:
+        from modules.financehub.backend.core.metrics.prometheus_exporter import get_exporter
+        get_exporter().inc_hedged_request(primary, alternate, outcome)
+    except Exception:  # pragma: no cover – a metrika opcionális
+        pass
+
+
+def _is_valid_ohlcv_result(source: str, result: Any) -> bool:
+    """Hedge validáció: nem üres OHLCV DataFrame (EODHD-nél a (ohlcv, splits, dividends) tuple első eleme)."""
+    ohlcv_df = result[0] if source == "eodhd" and isinstance(result, tuple) and result else result
+    return isinstance(ohlcv_df, pd.DataFrame) and not ohlcv_df.empty
+
+
+OHLCV_HEDGER: Final[HedgedRequester] = HedgedRequester(
+    HedgeBudget(settings.HEDGING.MAX_HEDGE_RATIO, window_seconds=settings.HEDGING.BUDGET_WINDOW_SECONDS),
+    LatencyTracker(),
+    quantile=settings.HEDGING.LATENCY_QUANTILE,
+    default_delay_seconds=settings.HEDGING.DEFAULT_DELAY_SECONDS,
+    min_delay_seconds=settings.HEDGING.MIN_DELAY_SECONDS,
+    max_delay_seconds=settings.HEDGING.MAX_DELAY_SECONDS,
+    on_outcome=_record_hedge_outcome,
+)
+
 # --- Függvények definíciói innen kezdődnek ---
 
 # Például: async def _check_aggregate_cache(...)
 async def _check_aggregate_cache(cache_key: str, request_id: str, cache: CacheService) -> Optional[FinBotStockResponse]:
-    # ... (a függvény törzse változatlan)
+    """
+    Aggregált válasz kiolvasása a cache-ből.
+
+    A visszaadott modell `is_data_stale` mezője True, ha a bejegyzés túllépte
+    a friss élettartamát (`AGGREGATED_SOFT_EXPIRY_FIELD`), de a hard TTL-en
+    belül van – ilyenkor a hívó kiszolgálhatja és háttérben frissíthet.
+    """
     if not settings.CACHE.ENABLED: return None
     cached_data_dict = await cache.get(cache_key)
     if cached_data_dict is not None:
@@ -249,9 +311,13 @@ async def _check_aggregate_cache(cache_key: str, request_id: str, cache: CacheSe
         try:
             if not isinstance(cached_data_dict, dict):
                 raise TypeError(f"Expected dict from cache, got {type(cached_data_dict).__name__}")
+            # A soft expiry mezőt a modell (extra='ignore') figyelmen kívül hagyja; régi bejegyzéseknél hiányzik -> friss.
+            soft_expires_at = cached_data_dict.get(AGGREGATED_SOFT_EXPIRY_FIELD)
+            is_soft_expired = isinstance(soft_expires_at, (int, float)) and time.time() >= soft_expires_at
             response_model = FinBotStockResponse.model_validate(cached_data_dict)
-            response_model.is_data_stale = True # Mark as stale since it came from cache
-            
+            response_model.is_data_stale = is_soft_expired
+            validation_duration = time.monotonic() - validation_start
+
             # === METADATA FRISSÍTÉSE CACHE HIT ESETÉN ===
             if not hasattr(response_model, 'metadata') or response_model.metadata is None:
                 response_model.metadata = {}
@@ -259,10 +325,10 @@ async def _check_aggregate_cache(cache_key: str, request_id: str, cache: CacheSe
                 "cache_hit": True,
                 "data_quality": response_model.metadata.get("data_quality", "cached"),
                 "processing_duration_seconds": validation_duration,
-                "cached_at": datetime.now(timezone.utc).isoformat()
+                "cached_at": datetime.now(timezone.utc).isoformat(),
+                "soft_expired": is_soft_expired,
             })
             # ============================================
-            validation_duration = time.monotonic() - validation_start
             try:
                 # Safely access the timestamp attribute, converting to datetime if possible
                 ts_aware = getattr(response_model, 'request_timestamp_utc', None)
@@ -301,6 +367,35 @@ async def _check_aggregate_cache(cache_key: str, request_id: str, cache: CacheSe
         logger.debug(f"[{request_id}] Aggregate Cache MISS ('{cache_key}').")
     return None
 
+def _schedule_aggregate_revalidation(
+    symbol: str, client: httpx.AsyncClient, cache: CacheService, aggregate_cache_key: str, request_id: str
+) -> None:
+    """
+    Háttérfrissítést indít egy soft-expired aggregált bejegyzéshez.
+
+    Workerenként kulcsonként egy task fut; a workerek közötti egyediséget a
+    `process_premium_stock_data` orchestration lockja, valamint a lock
+    megszerzése utáni friss cache ellenőrzés biztosítja.
+    """
+    existing_task = _AGGREGATE_REVALIDATION_TASKS.get(aggregate_cache_key)
+    if existing_task is not None and not existing_task.done():
+        logger.debug(f"[{request_id}] Background revalidation already running for '{aggregate_cache_key}'.")
+        return
+
+    async def _revalidate() -> None:
+        try:
+            # Háttérfrissítés: a szolgáltatói kvótánál az interaktív kérések elsőbbséget kapnak
+            with request_priority(PRIORITY_BACKGROUND):
+                await process_premium_stock_data(symbol, client, cache, serve_stale=False)
+            logger.info(f"[{request_id}] Background revalidation finished for '{aggregate_cache_key}'.")
+        except Exception as e_revalidate:
+            logger.warning(f"[{request_id}] Background revalidation failed for '{aggregate_cache_key}': {e_revalidate}", exc_info=False)
+        finally:
+            _AGGREGATE_REVALIDATION_TASKS.pop(aggregate_cache_key, None)
+
+    logger.info(f"[{request_id}] Scheduling background revalidation for '{aggregate_cache_key}'.")
+    _AGGREGATE_REVALIDATION_TASKS[aggregate_cache_key] = asyncio.create_task(_revalidate())
+
 async def _cache_final_response(cache_key: str, response_model: FinBotStockResponse, request_id: str, cache: CacheService):
     log_prefix = f"[{request_id}][_cache_final_response]"
     if not settings.CACHE.ENABLED:
@@ -312,10 +407,13 @@ async def _cache_final_response(cache_key: str, response_model: FinBotStockRespo
         logger.debug(f"{log_prefix} Attempting model_dump for cache (key: '{cache_key}')...")
         # Ensure model_dump uses mode='json' for proper serialization of complex types like datetime
         data_to_cache = response_model.model_dump(mode='json', exclude_none=False)
+        # Friss élettartam (soft) a bejegyzésben, a Redis TTL (hard) ennél a stale ablakkal hosszabb
+        data_to_cache[AGGREGATED_SOFT_EXPIRY_FIELD] = time.time() + AGGREGATED_RESPONSE_TTL
+        hard_ttl = AGGREGATED_RESPONSE_TTL + AGGREGATED_STALE_TTL
         logger.debug(f"{log_prefix} model_dump successful. Type: {type(data_to_cache)}. Attempting cache.set...")
-        await cache.set(cache_key, data_to_cache, timeout_seconds=AGGREGATED_RESPONSE_TTL)
+        await cache.set(cache_key, data_to_cache, timeout_seconds=hard_ttl)
         cache_save_duration = time.monotonic() - cache_save_start
-        logger.info(f"[{request_id}] Saved final response to cache '{cache_key}' (TTL: {AGGREGATED_RESPONSE_TTL}s) in {cache_save_duration:.4f}s.")
+        logger.info(f"[{request_id}] Saved final response to cache '{cache_key}' (Soft TTL: {AGGREGATED_RESPONSE_TTL}s, Hard TTL: {hard_ttl}s) in {cache_save_duration:.4f}s.")
     except (ValidationError, TypeError) as e_dump:
         cache_save_duration = time.monotonic() - cache_save_start
         logger.error(f"{log_prefix} DUMP ERROR during model_dump for cache '{cache_key}' after {cache_save_duration:.4f}s: {e_dump}. Check model serialization.", exc_info=True)
@@ -1057,7 +1155,49 @@ async def _prepare_ohlcv_for_response(
     return history_list_validated, latest_point_validated, final_last_date_str, change_pct
 
 # ... (A fájl többi része, pl. _calculate_indicators, process_premium_stock_data stb.) ...
-async def _calculate_indicators(ohlcv_df: pd.DataFrame, symbol: str, request_id: str) -> Optional[IndicatorHistory]:
+def _indicator_state_cache_key(symbol: str, interval: str, params_hash: str) -> str:
+    """Az indikátor keret kulcsa; az utolsó bár időbélyege a keretben van, azt a frissítés ellenőrzi."""
+    return f"indicator_state:{symbol.upper()}:{interval.lower()}:{params_hash}:{CODEC_CACHE_TAG}"
+
+
+async def _calculate_indicators_cached(
+    ohlcv_df: pd.DataFrame, symbol: str, request_id: str, cache: CacheService, interval: str
+) -> Optional[Dict[str, Any]]:
+    """
+    Indikátorok a cache-elt indikátor keretből: változatlan bemenetnél nincs
+    számítás, új (vagy módosult utolsó) bároknál csak a folytatás számolódik.
+    """
+    log_prefix = f"[{request_id}][CalcIndicatorsCached:{symbol}:{interval}]"
+    params = load_indicator_params(symbol)
+    cache_key = _indicator_state_cache_key(symbol, interval, params.fingerprint())
+
+    previous_frame: Optional[pd.DataFrame] = None
+    try:
+        entry = decode_cache_entry(await cache.get_bytes(cache_key))
+        previous_frame = entry if isinstance(entry, pd.DataFrame) else None
+    except DataFrameCodecError as e_codec:
+        logger.warning(f"{log_prefix} Indicator state entry corrupted ({e_codec}). Deleting.")
+        await cache.delete(cache_key)
+    except Exception as e_get:
+        logger.error(f"{log_prefix} Error loading indicator state: {e_get}", exc_info=True)
+
+    payload, frame, mode = calculate_indicators_incremental(ohlcv_df, symbol, previous_frame, params)
+    if frame is not None and mode != MODE_HIT:
+        try:
+            await cache.set_bytes(cache_key, encode_dataframe(frame), timeout_seconds=INDICATOR_STATE_TTL)
+        except Exception as e_set:
+            logger.error(f"{log_prefix} Error storing indicator state: {e_set}", exc_info=True)
+    logger.info(f"{log_prefix} Indicator state {mode} (stored bars: {0 if frame is None else len(frame)}).")
+    return payload
+
+
+async def _calculate_indicators(
+    ohlcv_df: pd.DataFrame,
+    symbol: str,
+    request_id: str,
+    cache: Optional[CacheService] = None,
+    interval: str = "d",
+) -> Optional[Union[IndicatorHistory, Dict[str, Any]]]:
     log_prefix = f"[{request_id}][CalcIndicators:{symbol}]"
     required_cols = ['open', 'high', 'low', 'close', 'volume']
     if ohlcv_df is None:
@@ -1074,6 +1214,19 @@ async def _calculate_indicators(ohlcv_df: pd.DataFrame, symbol: str, request_id:
         logger.error(f"{log_prefix} Skipping indicator calculation: DF missing cols: {missing_cols}. Has: {list(ohlcv_df.columns)}")
         return None
 
+    # Cache-elt/inkrementális út (a Pydantic kompatibilitási mód mindig a teljes számítást használja)
+    use_state_cache = (
+        cache is not None and settings.CACHE.ENABLED and INDICATOR_CACHE_ENABLED
+        and not settings.DATA_PROCESSING.INDICATOR_PYDANTIC_POINTS
+    )
+    if use_state_cache:
+        try:
+            cached_payload = await _calculate_indicators_cached(ohlcv_df, symbol, request_id, cache, interval)  # type: ignore[arg-type]
+            if cached_payload is not None:
+                return cached_payload
+        except Exception as e_cached:
+            logger.error(f"{log_prefix} Cached indicator path failed, falling back to full calculation: {e_cached}", exc_info=True)
+
     try:
         logger.info(f"{log_prefix} Calling indicator service with DF shape {ohlcv_df.shape}...")
         indic_start = time.monotonic()
@@ -1083,17 +1236,19 @@ async def _calculate_indicators(ohlcv_df: pd.DataFrame, symbol: str, request_id:
         if indicator_model is None:
              logger.warning(f"{log_prefix} Indicator service returned None after {indic_duration:.4f}s.")
              return None
-        elif isinstance(indicator_model, IndicatorHistory):
+        elif isinstance(indicator_model, (IndicatorHistory, dict)):
+             # Oszlopos payload (dict) vagy kompatibilitási módban IndicatorHistory modell
              has_data = False
-             for field_name in indicator_model.model_fields:
-                 field_value = getattr(indicator_model, field_name, None)
+             field_names = indicator_model.keys() if isinstance(indicator_model, dict) else indicator_model.model_fields
+             for field_name in field_names:
+                 field_value = _indicator_attr(indicator_model, field_name)
                  if isinstance(field_value, (list, dict)) and field_value: has_data = True; break
                  elif field_value is not None and not isinstance(field_value, (list, dict)): has_data = True; break
              if has_data: logger.info(f"{log_prefix} Indicator calculation successful, model has data. Time: {indic_duration:.4f}s.")
              else: logger.warning(f"{log_prefix} Indicator calculation returned model, but appears empty after {indic_duration:.4f}s.")
              return indicator_model
         else:
-             logger.error(f"{log_prefix} Indicator service returned unexpected type: {type(indicator_model)}. Expected IndicatorHistory. Time: {indic_duration:.4f}s.")
+             logger.error(f"{log_prefix} Indicator service returned unexpected type: {type(indicator_model)}. Expected IndicatorHistory or dict payload. Time: {indic_duration:.4f}s.")
              return None
     except NotImplementedError:
         logger.error(f"{log_prefix} Indicator calculation failed: Service 'calculate_and_format_indicators' not implemented.", exc_info=False)
@@ -1104,14 +1259,21 @@ async def _calculate_indicators(ohlcv_df: pd.DataFrame, symbol: str, request_id:
 
 # backend/core/stock_data_service.py
 
-def _extract_latest_indicators(indicator_model: Optional[IndicatorHistory], request_id: str) -> Dict[str, Optional[float]]:
+def _indicator_attr(container: Any, name: str) -> Any:
+    """Mező elérés IndicatorHistory modellen és az oszlopos (dict) payloadon egyaránt."""
+    if isinstance(container, dict):
+        return container.get(name)
+    return getattr(container, name, None)
+
+
+def _extract_latest_indicators(indicator_model: Optional[Union[IndicatorHistory, Dict[str, Any]]], request_id: str) -> Dict[str, Optional[float]]:
     log_prefix = f"[{request_id}][ExtractLatestIndic]"
     latest_values: Dict[str, Optional[float]] = {}
     if not indicator_model:
         logger.debug(f"{log_prefix} Input indicator model is None, returning empty dict.")
         return latest_values
-    if not isinstance(indicator_model, IndicatorHistory):
-        logger.error(f"{log_prefix} Input not IndicatorHistory model (Type: {type(indicator_model)}).")
+    if not isinstance(indicator_model, (IndicatorHistory, dict)):
+        logger.error(f"{log_prefix} Input not IndicatorHistory model or dict payload (Type: {type(indicator_model)}).")
         return latest_values
 
     def get_last_valid_float(points: Optional[List[Any]], value_attr_name: str = 'value') -> Optional[float]:
@@ -1162,12 +1324,12 @@ def _extract_latest_indicators(indicator_model: Optional[IndicatorHistory], requ
     for output_key, (group_name, series_name, value_attr) in indicator_map_config.items():
         latest_val = None
         try:
-            indicator_group = getattr(indicator_model, group_name, None)
+            indicator_group = _indicator_attr(indicator_model, group_name)
             if indicator_group is None:
                 # logger.debug(f"{log_prefix} Indicator group '{group_name}' not found in model.")
                 continue
 
-            indicator_series_list = getattr(indicator_group, series_name, None)
+            indicator_series_list = _indicator_attr(indicator_group, series_name)
             if indicator_series_list is None:
                 # logger.debug(f"{log_prefix} Indicator series '{series_name}' not found in group '{group_name}'.")
                 continue
@@ -1193,6 +1355,260 @@ def _extract_latest_indicators(indicator_model: Optional[IndicatorHistory], requ
     return latest_values
 
 
+async def _fetch_news_source_standard_dicts(
+    source_name: str,
+    fetcher_function: Callable,
+    symbol: str,
+    client: httpx.AsyncClient,
+    cache: CacheService,
+    log_prefix: str,
+) -> Tuple[Optional[List[StandardNewsDict]], Optional[str]]:
+    """
+    Egy hírforrás lekérése és standard dict-ekre mappelése (deduplikáció nélkül).
+
+    Returns:
+        (standard dict lista vagy None, hibaüzenet vagy None). Üres lista: a forrás
+        válaszolt, de nem adott feldolgozható hírt.
+    """
+    source_log_prefix = f"{log_prefix}[Source:{source_name}]"
+    logger.info(f"{source_log_prefix} Attempting news fetch...")
+    fetch_start = time.monotonic()
+
+    try:
+        # Determine symbol and arguments for the specific fetcher
+        symbol_for_fetcher = _get_eodhd_symbol(symbol, log_prefix) if source_name == "eodhd" else symbol
+        args_to_pass = {"symbol": symbol_for_fetcher, "cache": cache}
+        # *** JAVÍTÁS: Csak akkor adjuk át a 'client'-et, ha nem yfinance ***
+        if source_name != "yfinance":
+            args_to_pass["client"] = client
+            logger.debug(f"{source_log_prefix} Calling fetcher: {fetcher_function.__name__} with symbol, client, cache.")
+        else:
+            logger.debug(f"{source_log_prefix} Calling fetcher: {fetcher_function.__name__} with symbol, cache (NO client).")
+
+        # Call the fetcher function
+        fetcher_result = await fetcher_function(**args_to_pass)
+
+        fetch_duration = time.monotonic() - fetch_start
+        logger.debug(f"{source_log_prefix} Fetcher call completed in {fetch_duration:.3f}s. Result type: {type(fetcher_result).__name__}")
+
+    # --- Catch Fetcher-Specific Errors ---
+    except TypeError as e_type:
+        fetch_duration = time.monotonic() - fetch_start
+        logger.error(f"{source_log_prefix} Fetch failed due to TypeError (likely wrong arguments) after {fetch_duration:.3f}s: {e_type}", exc_info=False)
+        return None, f"TypeError: {e_type}"
+    except NotImplementedError: # If the fetcher itself is missing/not implemented
+        logger.error(f"{source_log_prefix} Fetch failed: Fetcher function '{fetcher_function.__name__}' not implemented correctly.", exc_info=False)
+        return None, "Fetcher not implemented"
+    except httpx.RequestError as e_http:
+        fetch_duration = time.monotonic() - fetch_start
+        logger.error(f"{source_log_prefix} Fetch failed due to HTTP request error after {fetch_duration:.3f}s: {e_http}", exc_info=True)
+        return None, f"HTTP RequestError: {e_http}"
+    except Exception as e_fetch_general: # Catch other potential exceptions during fetch
+        fetch_duration = time.monotonic() - fetch_start
+        logger.error(f"{source_log_prefix} Unexpected fetch error after {fetch_duration:.3f}s: {e_fetch_general}", exc_info=True)
+        return None, f"Unexpected fetch error: {e_fetch_general}"
+
+    # Process the result
+    processed_raw_list: Optional[List[Dict[str, Any]]] = None
+    if fetcher_result is None:
+        logger.info(f"{source_log_prefix} Fetcher returned None.")
+        return None, "Fetcher returned None"
+
+    elif isinstance(fetcher_result, pd.DataFrame):
+        logger.info(f"{source_log_prefix} Fetcher returned DataFrame (Shape: {fetcher_result.shape}). Converting...")
+        if not fetcher_result.empty:
+            try:
+                # Handle potential Timestamp columns before converting
+                for col in fetcher_result.select_dtypes(include=['datetime64[ns]', 'datetime64[ns, UTC]']).columns:
+                    logger.debug(f"{source_log_prefix} Converting Timestamp column '{col}' to ISO string for DataFrame conversion.")
+                    # Naive check for timezone, convert to UTC if naive or different
+                    if fetcher_result[col].dt.tz is None:
+                        fetcher_result[col] = fetcher_result[col].dt.tz_localize('UTC')
+                    else:
+                        fetcher_result[col] = fetcher_result[col].dt.tz_convert('UTC')
+                    fetcher_result[col] = fetcher_result[col].dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+                processed_raw_list = fetcher_result.to_dict(orient='records')
+                logger.debug(f"{source_log_prefix} DataFrame converted to {len(processed_raw_list)} dicts.")
+            except Exception as e_conv:
+                logger.error(f"{source_log_prefix} Failed to convert DataFrame to List[Dict]: {e_conv}", exc_info=True)
+                return None, f"DataFrame conversion error: {e_conv}"
+        else:
+            logger.info(f"{source_log_prefix} Fetcher returned an empty DataFrame.")
+            processed_raw_list = []
+
+    elif isinstance(fetcher_result, list):
+        # Basic validation: check if list contains dictionaries
+        if all(isinstance(item, dict) for item in fetcher_result):
+            logger.info(f"{source_log_prefix} Fetcher returned List with {len(fetcher_result)} items (assumed dicts).")
+            processed_raw_list = fetcher_result
+        else:
+            num_non_dicts = sum(1 for item in fetcher_result if not isinstance(item, dict))
+            logger.warning(f"{source_log_prefix} Fetcher returned List, but it contains {num_non_dicts} non-dictionary items. Skipping source.")
+            return None, "List contains non-dict items"
+
+    else: # Unexpected type
+        logger.warning(f"{source_log_prefix} Fetcher returned unexpected type: {type(fetcher_result)}. Skipping source.")
+        return None, f"Unexpected return type: {type(fetcher_result).__name__}"
+
+    if not processed_raw_list:
+        logger.info(f"{source_log_prefix} No raw items to map after fetch/conversion.")
+        return [], None
+
+    # --- Map to Standard Dictionaries ---
+    map_std_start = time.monotonic()
+    try:
+        logger.debug(f"{source_log_prefix} Mapping {len(processed_raw_list)} raw items to standard format...")
+        standard_dicts_from_source: List[StandardNewsDict] = mappers.map_raw_news_to_standard_dicts(
+            processed_raw_list, source_name # Pass source_name for context
+        )
+        logger.debug(f"{source_log_prefix} Mapping to standard format took {time.monotonic() - map_std_start:.4f}s.")
+    except NotImplementedError:
+        logger.error(f"{source_log_prefix} Standard news mapping failed: 'map_raw_news_to_standard_dicts' not implemented.", exc_info=False)
+        return None, "Standard mapper not implemented"
+    except Exception as e_map_std:
+        logger.error(f"{source_log_prefix} Unexpected error during standard mapping: {e_map_std}", exc_info=True)
+        return None, f"Standard map error: {e_map_std}"
+
+    if not standard_dicts_from_source:
+        logger.info(f"{source_log_prefix} Mapping resulted in an empty list of standard dicts.")
+        return [], None
+    if not isinstance(standard_dicts_from_source, list):
+        logger.error(f"{source_log_prefix} Mapper 'map_raw_news_to_standard_dicts' returned non-list type: {type(standard_dicts_from_source)}. Skipping source.")
+        return None, f"Standard mapper returned wrong type: {type(standard_dicts_from_source).__name__}"
+    return standard_dicts_from_source, None
+
+
+def _merge_news_source_dicts(
+    standard_dicts_from_source: List[StandardNewsDict],
+    deduplicator: NewsDeduplicator,
+    all_standard_news_dicts: List[StandardNewsDict],
+    min_unique_target: int,
+    source_name: str,
+    log_prefix: str,
+) -> int:
+    """
+    Kanonikus URL és közel-azonos cím alapú deduplikáció, hozzáfűzés a célszám
+    eléréséig. Visszaadja a hozzáadott elemek számát.
+    """
+    source_log_prefix = f"{log_prefix}[Source:{source_name}]"
+    stats_before = dict(deduplicator.stats)
+    logger.debug(f"{source_log_prefix} Deduplicating {len(standard_dicts_from_source)} standard items...")
+    remaining = max(min_unique_target - len(all_standard_news_dicts), 0)
+    unique_items = dedupe_news_dicts(standard_dicts_from_source, limit=remaining, deduplicator=deduplicator)
+    all_standard_news_dicts.extend(unique_items)
+
+    skipped = {key: deduplicator.stats[key] - stats_before[key] for key in ("invalid_url", "duplicate_url", "duplicate_title")}
+    logger.info(f"{source_log_prefix} Finished processing. Added {len(unique_items)} unique items. Skipped: {skipped}. Total unique: {len(all_standard_news_dicts)}.")
+    return len(unique_items)
+
+
+def _record_news_source_stat(
+    source_stats: Dict[str, Dict[str, Any]], source_name: str, status: str, latency_s: Optional[float], contributed: int = 0
+) -> None:
+    """Forrásonkénti késleltetés és hozzájárulás rögzítése (log összegzéshez és Prometheus metrikához)."""
+    source_stats[source_name] = {
+        "status": status,
+        "latency_ms": None if latency_s is None else round(latency_s * 1000, 1),
+        "contributed": contributed,
+    }
+    try:
+        from modules.financehub.backend.core.metrics.prometheus_exporter import get_exporter
+        get_exporter().observe_news_source(source_name, status, latency_s, contributed)
+    except Exception:  # pragma: no cover – a metrika opcionális
+        pass
+
+
+async def _collect_news_concurrently(
+    fetchers_in_priority_order: List[str],
+    active_fetchers: Dict[str, Callable],
+    symbol: str,
+    client: httpx.AsyncClient,
+    cache: CacheService,
+    min_unique_target: int,
+    deadline_seconds: float,
+    log_prefix: str,
+) -> Tuple[List[StandardNewsDict], Dict[str, str], Dict[str, Dict[str, Any]]]:
+    """
+    Minden aktív hírforrás egyidejű indítása egy közös határidővel.
+
+    Az eredmények prioritási sorrendben olvadnak össze: egy forrás csak akkor
+    kerül összefésülésre, ha minden nála magasabb prioritású forrás már
+    végzett, így a kimenet ugyanaz, mint a soros útnál, ha mind időben válaszol.
+    A célszám elérésekor, illetve a határidő lejártakor a még futó lekérések
+    megszakadnak; határidőnél a már kész források prioritási sorrendben
+    olvadnak össze, a lassúak kimaradnak.
+    """
+    all_standard_news_dicts: List[StandardNewsDict] = []
+    deduplicator = NewsDeduplicator()
+    fetch_errors: Dict[str, str] = {}
+    source_stats: Dict[str, Dict[str, Any]] = {}
+
+    started_at = time.monotonic()
+    tasks: Dict[asyncio.Task, str] = {}
+    finish_times: Dict[str, float] = {}
+    results: Dict[str, Tuple[Optional[List[StandardNewsDict]], Optional[str]]] = {}
+    for source_name in fetchers_in_priority_order:
+        task = asyncio.create_task(
+            _fetch_news_source_standard_dicts(source_name, active_fetchers[source_name], symbol, client, cache, log_prefix),
+            name=f"news:{source_name}:{symbol}",
+        )
+        tasks[task] = source_name
+
+    merge_cursor = 0
+
+    def merge_source(source_name: str) -> None:
+        standard_dicts, error = results[source_name]
+        latency = finish_times[source_name] - started_at
+        if len(all_standard_news_dicts) >= min_unique_target:
+            _record_news_source_stat(source_stats, source_name, "unused", latency)
+        elif error is not None:
+            fetch_errors[source_name] = error
+            _record_news_source_stat(source_stats, source_name, "error", latency)
+        elif not standard_dicts:
+            _record_news_source_stat(source_stats, source_name, "empty", latency)
+        else:
+            added = _merge_news_source_dicts(
+                standard_dicts, deduplicator, all_standard_news_dicts, min_unique_target, source_name, log_prefix
+            )
+            _record_news_source_stat(source_stats, source_name, "ok", latency, added)
+
+    pending = set(tasks)
+    deadline_at = started_at + deadline_seconds
+    try:
+        while pending and len(all_standard_news_dicts) < min_unique_target:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"{log_prefix} News fetch deadline of {deadline_seconds:.2f}s reached with {len(pending)} source(s) still pending.")
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                source_name = tasks[task]
+                finish_times[source_name] = time.monotonic()
+                try:
+                    results[source_name] = task.result()
+                except Exception as e_task:  # a fetcher hibáit a helper elkapja; ez csak tartalék
+                    results[source_name] = (None, f"Unexpected task error: {e_task}")
+            # Prioritási sorrend: csak a folytonosan kész előtagot fésüljük össze
+            while merge_cursor < len(fetchers_in_priority_order) and fetchers_in_priority_order[merge_cursor] in results:
+                merge_source(fetchers_in_priority_order[merge_cursor])
+                merge_cursor += 1
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # Célszám vagy határidő után: a kész források még prioritási sorrendben jönnek, a lassúak kimaradnak
+    for source_name in fetchers_in_priority_order[merge_cursor:]:
+        if source_name in results:
+            merge_source(source_name)
+        else:
+            _record_news_source_stat(source_stats, source_name, "cancelled", None)
+
+    return all_standard_news_dicts, fetch_errors, source_stats
+
+
 async def _fetch_and_process_news_dynamically(
     symbol: str,
     client: httpx.AsyncClient,
@@ -1290,6 +1706,10 @@ async def _fetch_and_process_news_dynamically(
             logger.info(f"{log_prefix} Skipping source 'eodhd': EODHD API key not available.")
             skipped_fetchers.append("eodhd (Key Missing)")
             continue
+        if not await provider_available(NEWS_SOURCE_PROVIDERS.get(source_name, source_name), cache):
+            logger.info(f"{log_prefix} Skipping source '{source_name}': circuit breaker is open.")
+            skipped_fetchers.append(f"{source_name} (Circuit Open)")
+            continue
 
         fetcher_func = NEWS_FETCHER_MAPPING[source_name]
         if callable(fetcher_func):
@@ -1316,206 +1736,44 @@ async def _fetch_and_process_news_dynamically(
     logger.info(f"{log_prefix} Fetch priority order: {fetchers_in_priority_order}")
 
     # --- 3. Fetch, Process, and Deduplicate News ---
-    final_news_items: List[NewsItem] = []
-    all_standard_news_dicts: List[StandardNewsDict] = []
-    seen_urls: Set[HttpUrl] = set()
-    processed_sources_count = 0
-    fetch_errors: Dict[str, str] = {} # Store fetch errors per source
-
-    for source_name in fetchers_in_priority_order:
-        source_log_prefix = f"{log_prefix}[Source:{source_name}]"
-        logger.debug(f"{source_log_prefix} --- Processing source ---")
-
-        if len(all_standard_news_dicts) >= min_unique_target:
-            logger.info(f"{log_prefix} Reached target of {min_unique_target} unique news items. Stopping further fetches.")
-            break
-
-        logger.info(f"{source_log_prefix} Attempting news fetch...")
-        fetch_start = time.monotonic()
-        fetcher_function = active_fetchers[source_name]
-        fetcher_result: Any = None
-        processed_sources_count += 1
-
-        try:
-            # Determine symbol and arguments for the specific fetcher
-            symbol_for_fetcher = _get_eodhd_symbol(symbol, log_prefix) if source_name == "eodhd" else symbol
-            args_to_pass = {"symbol": symbol_for_fetcher, "cache": cache}
-            # *** JAVÍTÁS: Csak akkor adjuk át a 'client'-et, ha nem yfinance ***
-            if source_name != "yfinance":
-                args_to_pass["client"] = client
-                logger.debug(f"{source_log_prefix} Calling fetcher: {fetcher_function.__name__} with symbol, client, cache.")
+    settings_news = getattr(settings, NEWS_CONFIG_SECTION, None)
+    concurrent_fetch = bool(getattr(settings_news, CONCURRENT_FETCH_KEY, True))
+    deadline_seconds = getattr(settings_news, FETCH_DEADLINE_KEY, DEFAULT_FETCH_DEADLINE_SECONDS)
+    if not isinstance(deadline_seconds, (int, float)) or deadline_seconds <= 0:
+        deadline_seconds = DEFAULT_FETCH_DEADLINE_SECONDS
+
+    if concurrent_fetch and len(fetchers_in_priority_order) > 1:
+        logger.info(f"{log_prefix} Fetching {len(fetchers_in_priority_order)} news sources concurrently (deadline: {deadline_seconds:.2f}s).")
+        all_standard_news_dicts, fetch_errors, source_stats = await _collect_news_concurrently(
+            fetchers_in_priority_order, active_fetchers, symbol, client, cache,
+            min_unique_target, float(deadline_seconds), log_prefix,
+        )
+    else:
+        all_standard_news_dicts = []
+        deduplicator = NewsDeduplicator()
+        fetch_errors: Dict[str, str] = {} # Store fetch errors per source
+        source_stats: Dict[str, Dict[str, Any]] = {}
+        for source_name in fetchers_in_priority_order:
+            if len(all_standard_news_dicts) >= min_unique_target:
+                logger.info(f"{log_prefix} Reached target of {min_unique_target} unique news items. Stopping further fetches.")
+                break
+            source_start = time.monotonic()
+            standard_dicts, error = await _fetch_news_source_standard_dicts(
+                source_name, active_fetchers[source_name], symbol, client, cache, log_prefix
+            )
+            latency = time.monotonic() - source_start
+            if error is not None:
+                fetch_errors[source_name] = error
+                _record_news_source_stat(source_stats, source_name, "error", latency)
+            elif not standard_dicts:
+                _record_news_source_stat(source_stats, source_name, "empty", latency)
             else:
-                logger.debug(f"{source_log_prefix} Calling fetcher: {fetcher_function.__name__} with symbol, cache (NO client).")
-
-            # Call the fetcher function
-            fetcher_result = await fetcher_function(**args_to_pass)
-
-            fetch_duration = time.monotonic() - fetch_start
-            logger.debug(f"{source_log_prefix} Fetcher call completed in {fetch_duration:.3f}s. Result type: {type(fetcher_result).__name__}")
-
-            # Process the result
-            processed_raw_list: Optional[List[Dict[str, Any]]] = None
-            if fetcher_result is None:
-                logger.info(f"{source_log_prefix} Fetcher returned None.")
-                fetch_errors[source_name] = "Fetcher returned None"
-                continue # Try next source
-
-            elif isinstance(fetcher_result, pd.DataFrame):
-                logger.info(f"{source_log_prefix} Fetcher returned DataFrame (Shape: {fetcher_result.shape}). Converting...")
-                if not fetcher_result.empty:
-                    try:
-                        # Handle potential Timestamp columns before converting
-                        for col in fetcher_result.select_dtypes(include=['datetime64[ns]', 'datetime64[ns, UTC]']).columns:
-                            logger.debug(f"{source_log_prefix} Converting Timestamp column '{col}' to ISO string for DataFrame conversion.")
-                            # Naive check for timezone, convert to UTC if naive or different
-                            if fetcher_result[col].dt.tz is None:
-                                fetcher_result[col] = fetcher_result[col].dt.tz_localize('UTC')
-                            else:
-                                fetcher_result[col] = fetcher_result[col].dt.tz_convert('UTC')
-                            fetcher_result[col] = fetcher_result[col].dt.strftime('%Y-%m-%dT%H:%M:%SZ')
-
-                        processed_raw_list = fetcher_result.to_dict(orient='records')
-                        logger.debug(f"{source_log_prefix} DataFrame converted to {len(processed_raw_list)} dicts.")
-                    except Exception as e_conv:
-                        logger.error(f"{source_log_prefix} Failed to convert DataFrame to List[Dict]: {e_conv}", exc_info=True)
-                        fetch_errors[source_name] = f"DataFrame conversion error: {e_conv}"
-                        continue
-                else:
-                    logger.info(f"{source_log_prefix} Fetcher returned an empty DataFrame.")
-                    processed_raw_list = []
-
-            elif isinstance(fetcher_result, list):
-                # Basic validation: check if list contains dictionaries
-                if all(isinstance(item, dict) for item in fetcher_result):
-                    logger.info(f"{source_log_prefix} Fetcher returned List with {len(fetcher_result)} items (assumed dicts).")
-                    processed_raw_list = fetcher_result
-                else:
-                    num_non_dicts = sum(1 for item in fetcher_result if not isinstance(item, dict))
-                    logger.warning(f"{source_log_prefix} Fetcher returned List, but it contains {num_non_dicts} non-dictionary items. Skipping source.")
-                    fetch_errors[source_name] = "List contains non-dict items"
-                    continue
-
-            else: # Unexpected type
-                logger.warning(f"{source_log_prefix} Fetcher returned unexpected type: {type(fetcher_result)}. Skipping source.")
-                fetch_errors[source_name] = f"Unexpected return type: {type(fetcher_result).__name__}"
-                continue
-
-            # --- Map to Standard Dictionaries and Deduplicate ---
-            if processed_raw_list is None: # Should not happen if logic above is correct, but safety check
-                 logger.error(f"{source_log_prefix} Internal logic error: processed_raw_list is None after result processing. Skipping.")
-                 fetch_errors[source_name] = "Internal error post-processing result"
-                 continue
-
-            if not processed_raw_list:
-                 logger.info(f"{source_log_prefix} No raw items to map after fetch/conversion.")
-                 continue
-
-            map_std_start = time.monotonic()
-            try:
-                logger.debug(f"{source_log_prefix} Mapping {len(processed_raw_list)} raw items to standard format...")
-                # Use the assumed imported mapper function
-                standard_dicts_from_source: List[StandardNewsDict] = mappers.map_raw_news_to_standard_dicts(
-                    processed_raw_list, source_name # Pass source_name for context
+                added = _merge_news_source_dicts(
+                    standard_dicts, deduplicator, all_standard_news_dicts, min_unique_target, source_name, log_prefix
                 )
-                map_std_duration = time.monotonic() - map_std_start
-                logger.debug(f"{source_log_prefix} Mapping to standard format took {map_std_duration:.4f}s.")
-
-                if not standard_dicts_from_source:
-                    logger.info(f"{source_log_prefix} Mapping resulted in an empty list of standard dicts.")
-                    continue
-                if not isinstance(standard_dicts_from_source, list):
-                     logger.error(f"{source_log_prefix} Mapper 'map_raw_news_to_standard_dicts' returned non-list type: {type(standard_dicts_from_source)}. Skipping source.")
-                     fetch_errors[source_name] = f"Standard mapper returned wrong type: {type(standard_dicts_from_source).__name__}"
-                     continue
-
-
-                added_count = 0
-                skipped_dedup_count = 0
-                logger.debug(f"{source_log_prefix} Deduplicating {len(standard_dicts_from_source)} standard items...")
-                for news_dict_idx, news_dict in enumerate(standard_dicts_from_source):
-                    item_title_for_log = news_dict.get('title', 'N/A_TITLE')
-                    
-                    if not isinstance(news_dict, dict):
-                        logger.warning(f"{source_log_prefix} Skipping item #{news_dict_idx} during deduplication: Not a dictionary. Type: {type(news_dict)}")
-                        skipped_dedup_count += 1
-                        continue
-
-                    raw_url_obj_or_str = news_dict.get('url') # Ez lehet HttpUrl vagy str
-                    
-                    logger.debug(f"{source_log_prefix} Item #{news_dict_idx}: "
-                                 f"Raw URL Obj/Str='{str(raw_url_obj_or_str)}' (Type: {type(raw_url_obj_or_str)}), "
-                                 f"Title='{item_title_for_log}' for normalization/deduplication.")
-                    
-                    # --- JAVÍTOTT URL ELLENŐRZÉS ÉS NORMALIZÁLÁS ---
-                    current_normalized_url: Optional[HttpUrl] = None
-                    
-                    if isinstance(raw_url_obj_or_str, HttpUrl):
-                        current_normalized_url = raw_url_obj_or_str # Már HttpUrl, nem kell újra normalizálni
-                        logger.debug(f"{source_log_prefix} Item #{news_dict_idx}: URL is already HttpUrl: '{str(current_normalized_url)}'")
-                    elif isinstance(raw_url_obj_or_str, str) and raw_url_obj_or_str.strip():
-                        try:
-                            normalization_context = f"NewsDeduplication:{symbol}:{source_name}:Item{news_dict_idx}"
-                            current_normalized_url = normalize_url(raw_url_obj_or_str, context=normalization_context)
-                            if not current_normalized_url:
-                                logger.warning(f"{source_log_prefix} Skipping item #{news_dict_idx} because normalize_url returned None for string URL. Original URL: '{raw_url_obj_or_str}', Title: '{item_title_for_log}'. See normalize_url logs for context '{normalization_context}'.")
-                        except Exception as e_norm_url: # Ha maga a normalize_url dob kivételt
-                            logger.error(f"{source_log_prefix} Error normalizing URL '{raw_url_obj_or_str}' for item #{news_dict_idx}: {e_norm_url}", exc_info=True)
-                    else: # Ha None, üres string, vagy nem string/HttpUrl
-                        logger.debug(f"{source_log_prefix} Skipping item #{news_dict_idx}: Missing, empty, or invalid type for URL. Raw URL data: '{raw_url_obj_or_str}', Title: '{item_title_for_log}'")
-
-                    if not current_normalized_url: # Ha a normalizálás sikertelen volt, vagy eleve nem volt URL
-                        skipped_dedup_count += 1
-                        continue
-
-                    if current_normalized_url not in seen_urls:
-                        seen_urls.add(current_normalized_url)
-                        all_standard_news_dicts.append(news_dict)
-                        added_count += 1
-                        if len(all_standard_news_dicts) >= min_unique_target:
-                            logger.debug(f"{source_log_prefix} Reached target of {min_unique_target} for source, breaking inner loop. Total unique after this source: {len(all_standard_news_dicts)}.")
-                            break 
-                    else: 
-                        logger.debug(f"{source_log_prefix} Item #{news_dict_idx}: URL '{str(current_normalized_url)}' already seen (duplication). Title: '{item_title_for_log}'")
-                        skipped_dedup_count +=1 # Ezt is számolni kell a skippedhez
-                
-
-                logger.info(f"{source_log_prefix} Finished processing. Added {added_count} unique items. Skipped (dedup/invalid URL): {skipped_dedup_count}. Total unique: {len(all_standard_news_dicts)}.")
-                if len(all_standard_news_dicts) >= min_unique_target:
-                    break # Exit outer loop (sources)
-
-            except NotImplementedError:
-                logger.error(f"{source_log_prefix} Standard news mapping failed: 'map_raw_news_to_standard_dicts' not implemented.", exc_info=False)
-                fetch_errors[source_name] = "Standard mapper not implemented"
-                continue
-            except Exception as e_map_std:
-                logger.error(f"{source_log_prefix} Unexpected error during standard mapping or deduplication: {e_map_std}", exc_info=True)
-                fetch_errors[source_name] = f"Standard map/dedup error: {e_map_std}"
-                continue
+                _record_news_source_stat(source_stats, source_name, "ok", latency, added)
 
-        # --- Catch Fetcher-Specific Errors ---
-        except TypeError as e_type:
-            fetch_duration = time.monotonic() - fetch_start
-            logger.error(f"{source_log_prefix} Fetch failed due to TypeError (likely wrong arguments) after {fetch_duration:.3f}s: {e_type}", exc_info=False)
-            fetch_errors[source_name] = f"TypeError: {e_type}"
-            # Log the arguments that were attempted if possible/safe
-            # logger.debug(f"{source_log_prefix} Arguments attempted: {args_to_pass.keys()}") # Be careful logging sensitive args like API keys
-            continue
-        except NotImplementedError: # If the fetcher itself is missing/not implemented
-            logger.error(f"{source_log_prefix} Fetch failed: Fetcher function '{fetcher_function.__name__}' not implemented correctly.", exc_info=False)
-            fetch_errors[source_name] = "Fetcher not implemented"
-            continue
-        except httpx.RequestError as e_http:
-            fetch_duration = time.monotonic() - fetch_start
-            logger.error(f"{source_log_prefix} Fetch failed due to HTTP request error after {fetch_duration:.3f}s: {e_http}", exc_info=True)
-            fetch_errors[source_name] = f"HTTP RequestError: {e_http}"
-            continue
-        except Exception as e_fetch_general: # Catch other potential exceptions during fetch
-            fetch_duration = time.monotonic() - fetch_start
-            logger.error(f"{source_log_prefix} Unexpected fetch error after {fetch_duration:.3f}s: {e_fetch_general}", exc_info=True)
-            fetch_errors[source_name] = f"Unexpected fetch error: {e_fetch_general}"
-            continue
-
-    logger.info(f"{log_prefix} Finished fetching attempts from {processed_sources_count} sources.")
+    logger.info(f"{log_prefix} Finished fetching attempts from {len(source_stats)} sources. Per-source stats: {source_stats}")
     if fetch_errors:
          logger.warning(f"{log_prefix} Errors encountered during fetch phase: {fetch_errors}")
 
@@ -1527,27 +1785,14 @@ async def _fetch_and_process_news_dynamically(
     logger.debug(f"{log_prefix} Sorting {len(all_standard_news_dicts)} unique standard news items by published_utc (desc)...")
     sort_start = time.monotonic()
     try:
-        def sort_key(item: StandardNewsDict) -> datetime:
-            dt_val = item.get('published_utc')
-            fallback_dt = datetime.min.replace(tzinfo=timezone.utc) # Timezone aware fallback
-
-            if isinstance(dt_val, datetime):
-                # Ensure timezone awareness
-                return dt_val if dt_val.tzinfo else dt_val.replace(tzinfo=timezone.utc)
-            elif isinstance(dt_val, str):
-                try:
-                    # pd.to_datetime is robust for various formats
-                    parsed_dt = pd.to_datetime(dt_val, errors='coerce', utc=True)
-                    if pd.isna(parsed_dt): return fallback_dt
-                    # Convert pandas Timestamp to standard datetime
-                    return parsed_dt.to_pydatetime()
-                except Exception as e_parse_str:
-                     # Log the specific error and the problematic string
-                     logger.debug(f"{log_prefix} Sort key parsing failed for string '{dt_val}': {e_parse_str}", exc_info=False)
-                     return fallback_dt
-            # Handle other potential types like int/float timestamps if necessary
-            # elif isinstance(dt_val, (int, float)): ...
-            return fallback_dt
+        # A mapper batch lépése már kiírta a `published_ts` (epoch ms) mezőt; a hiányzókat egy kötegben pótoljuk
+        missing_ts = [item for item in all_standard_news_dicts if "published_ts" not in item]
+        if missing_ts:
+            normalize_timestamp_field(missing_ts, "published_utc", epoch_key="published_ts")
+
+        def sort_key(item: StandardNewsDict) -> int:
+            ts_val = item.get('published_ts')
+            return ts_val if isinstance(ts_val, int) else NEWS_SORT_FALLBACK_TS
 
         all_standard_news_dicts.sort(key=sort_key, reverse=True)
         sort_duration = time.monotonic() - sort_start
@@ -1785,7 +2030,17 @@ async def process_premium_stock_data(
     client: httpx.AsyncClient,
     cache: CacheService,
     force_refresh: bool = False,
+    serve_stale: bool = True,
 ) -> FinBotStockResponse:
+    """
+    Prémium aggregált válasz összeállítása (stale-while-revalidate cache-sel).
+
+    Friss cache találat lock nélkül azonnal visszatér. Soft-expired (de a
+    hard TTL-en belüli) bejegyzés esetén az elavult választ azonnal
+    visszaadjuk (`is_data_stale=True`), és egyetlen háttérfrissítés indul a
+    szokásos orchestration lock alatt. Csak cache miss esetén blokkol a hívó.
+    `serve_stale=False` a háttérfrissítés saját hívása.
+    """
     orchestration_start_time = time.monotonic()
     if not symbol or not isinstance(symbol, str) or not symbol.strip():
          raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail={"error": "Symbol cannot be empty."})
@@ -1794,6 +2049,7 @@ async def process_premium_stock_data(
     request_id = f"{symbol_upper}-{uuid.uuid4().hex[:8]}"
     log_prefix = f"[{request_id}:{symbol_upper}]"
     lock_acquired = False
+    served_without_lock: Optional[str] = None
     e_orchestration_unexpected: Optional[Exception] = None
     logger.info(f"{log_prefix} === Orchestration START (Version: {version}) | ForceRefresh={force_refresh} ===")
 
@@ -1834,6 +2090,16 @@ async def process_premium_stock_data(
              logger.error(f"{log_prefix} LOGIC ERROR: OHLCV source set to 'eodhd' but key is missing. Forcing fallback to 'yfinance'.")
              ohlcv_source = "yfinance"
 
+        # Nyitott circuit breakernél egyből a másik egészséges forrás (nem várjuk ki az időtúllépést)
+        alternate_ohlcv_source = {"eodhd": "yfinance", "yfinance": "eodhd" if eodhd_key_present else None}.get(ohlcv_source)
+        if (
+            alternate_ohlcv_source
+            and not await provider_available(ohlcv_source, cache)
+            and await provider_available(alternate_ohlcv_source, cache)
+        ):
+            logger.warning(f"{log_prefix} Circuit breaker for OHLCV source '{ohlcv_source}' is open. Routing to '{alternate_ohlcv_source}'.")
+            ohlcv_source = alternate_ohlcv_source
+
         logger.info(f"{log_prefix} FINAL Determined OHLCV source for this run: '{ohlcv_source}'")
         logger.debug(f"{log_prefix} Symbols | Input='{symbol}', Base='{symbol_upper}', EODHDKey='{eodhd_symbol_for_keys}', YF='{yfinance_symbol}', FMP='{fmp_symbol}', OHLCV Src='{ohlcv_source}'")
 
@@ -1853,7 +2119,7 @@ async def process_premium_stock_data(
     final_earnings_data: Optional[EarningsData] = None # Korábban final_earnings_with_ratings része volt
     final_ratings_list: Optional[List[RatingPoint]] = None # Külön kezelve a ratingek
     final_news: List[NewsItem] = []
-    indicator_history_model: Optional[IndicatorHistory] = None
+    indicator_history_model: Optional[Union[IndicatorHistory, Dict[str, Any]]] = None
     latest_indicators_dict: Dict[str, Optional[float]] = {}
     final_ai_summary: Optional[str] = None
     history_ohlcv_list: List[CompanyPriceHistoryEntry] = []
@@ -1864,6 +2130,20 @@ async def process_premium_stock_data(
     eodhd_dividends_data: Optional[List[DividendData]] = None
     
     try:
+        # --- Lock nélküli gyors út: friss találat vagy stale-while-revalidate ---
+        if not force_refresh:
+            cached_response = await _check_aggregate_cache(aggregate_cache_key, request_id, cache) # type: ignore
+            if cached_response is not None:
+                if not cached_response.is_data_stale:
+                    served_without_lock = "CacheHit"
+                    logger.info(f"{log_prefix} === Orchestration END (Fresh Cache Hit, no lock). Total: {time.monotonic() - orchestration_start_time:.4f}s ===")
+                    return cached_response
+                if serve_stale:
+                    _schedule_aggregate_revalidation(symbol_upper, client, cache, aggregate_cache_key, request_id)
+                    served_without_lock = "StaleServed_Revalidating"
+                    logger.info(f"{log_prefix} === Orchestration END (Soft-expired cache served, revalidating in background). Total: {time.monotonic() - orchestration_start_time:.4f}s ===")
+                    return cached_response
+
         logger.debug(f"{log_prefix} Acquiring lock: '{lock_name}' (TTL: {LOCK_TTL_SECONDS}s, Timeout: {LOCK_BLOCKING_TIMEOUT_SECONDS}s)")
         lock_acquire_start = time.monotonic()
         lock: AsyncLock = cache.get_lock(lock_name, timeout=LOCK_TTL_SECONDS, blocking_timeout=LOCK_BLOCKING_TIMEOUT_SECONDS)
@@ -1873,13 +2153,13 @@ async def process_premium_stock_data(
             logger.info(f"{log_prefix} Lock acquired ('{lock_name}') in {time.monotonic() - lock_acquire_start:.4f}s.")
 
             if not force_refresh:
+                # Egy másik kérés/worker közben frissíthette a bejegyzést; csak friss találatot fogadunk el
                 cached_response = await _check_aggregate_cache(aggregate_cache_key, request_id, cache) # type: ignore
-                if cached_response:
-                    cached_response.is_data_stale = False # Ensure stale flag is correctly set for fresh cache hits
+                if cached_response and not cached_response.is_data_stale:
                     logger.info(f"{log_prefix} === Orchestration END (Cache Hit AFTER lock). Total: {time.monotonic() - orchestration_start_time:.4f}s ===")
                     return cached_response
                 else:
-                    logger.info(f"{log_prefix} Aggregate cache miss/invalid after lock. Fresh fetch.")
+                    logger.info(f"{log_prefix} Aggregate cache miss/stale/invalid after lock. Fresh fetch.")
             else:
                 logger.info(f"{log_prefix} Force refresh. Skipping cache check after lock.")
 
@@ -1887,19 +2167,40 @@ async def process_premium_stock_data(
             logger.info(f"{log_prefix} $$$ Checkpoint 1: Core Data Fetching (OHLCV, YF Company Info, EODHD Events) $$$")
             core_fetch_tasks = {}
 
-            if ohlcv_source == "eodhd" and eodhd_key_present:
-                logger.debug(f"{log_prefix} Adding EODHD OHLCV & Events combined fetch task for '{eodhd_symbol_for_keys}'.")
-                core_fetch_tasks["eodhd_combined_data"] = fetchers.fetch_eodhd_ohlcv_and_events(
+            ohlcv_fetch_factories = {
+                "eodhd": lambda: fetchers.fetch_eodhd_ohlcv_and_events(
                     symbol_with_exchange=eodhd_symbol_for_keys,
                     client=client,
                     cache=cache,
                     years=OHLCV_YEARS
-                )
+                ),
+                "yfinance": lambda: fetchers.fetch_yfinance_ohlcv(yfinance_symbol, years=OHLCV_YEARS, cache=cache),
+            }
+            ohlcv_fetch_source: Optional[str] = None
+            if ohlcv_source == "eodhd" and eodhd_key_present:
+                logger.debug(f"{log_prefix} Adding EODHD OHLCV & Events combined fetch task for '{eodhd_symbol_for_keys}'.")
+                ohlcv_fetch_source = "eodhd"
             elif ohlcv_source == "yfinance" or (ohlcv_source == "eodhd" and not eodhd_key_present):
                 if ohlcv_source == "eodhd":
                     logger.warning(f"{log_prefix} EODHD was the source, but key is missing. Falling back to YFinance for OHLCV.")
                 logger.debug(f"{log_prefix} Adding YFinance OHLCV fetch task for '{yfinance_symbol}' (years={OHLCV_YEARS}).")
-                core_fetch_tasks["ohlcv_raw_df_yf"] = fetchers.fetch_yfinance_ohlcv(yfinance_symbol, years=OHLCV_YEARS, cache=cache)
+                ohlcv_fetch_source = "yfinance"
+
+            # Hedge: ha az elsődleges forrás a megfigyelt p90-én belül nem válaszol, a másik is indul
+            ohlcv_hedge_source: Optional[str] = None
+            if ohlcv_fetch_source and settings.HEDGING.ENABLED and eodhd_key_present:
+                candidate_source = "yfinance" if ohlcv_fetch_source == "eodhd" else "eodhd"
+                if await provider_available(candidate_source, cache):
+                    ohlcv_hedge_source = candidate_source
+            if ohlcv_hedge_source:
+                logger.debug(f"{log_prefix} OHLCV fetch from '{ohlcv_fetch_source}' is hedged with '{ohlcv_hedge_source}'.")
+                core_fetch_tasks["ohlcv_hedged"] = OHLCV_HEDGER.run(
+                    (ohlcv_fetch_source, ohlcv_fetch_factories[ohlcv_fetch_source]),
+                    (ohlcv_hedge_source, ohlcv_fetch_factories[ohlcv_hedge_source]),
+                    _is_valid_ohlcv_result,
+                )
+            elif ohlcv_fetch_source:
+                core_fetch_tasks[OHLCV_SOURCE_TASK_KEYS[ohlcv_fetch_source]] = ohlcv_fetch_factories[ohlcv_fetch_source]()
 
             logger.debug(f"{log_prefix} Adding YFinance Company Info fetch task for '{yfinance_symbol}'.")
             core_fetch_tasks["yfinance_company_info_dict"] = fetchers.fetch_yfinance_company_info(yfinance_symbol, cache=cache)
@@ -1927,6 +2228,19 @@ async def process_premium_stock_data(
                     fetch_results[key] = None
                 else:
                     fetch_results[key] = result
+
+            if "ohlcv_hedged" in fetch_results:
+                # (nyertes forrás, eredmény) -> a forrás saját kulcsa, hogy a lenti feldolgozás változatlan maradjon
+                hedged_result = fetch_results.pop("ohlcv_hedged")
+                hedged_error = fetch_errors.pop("ohlcv_hedged", None)
+                if hedged_result is not None:
+                    ohlcv_source, ohlcv_result = hedged_result
+                else:
+                    ohlcv_source, ohlcv_result = ohlcv_fetch_source, None
+                fetch_results[OHLCV_SOURCE_TASK_KEYS[ohlcv_source]] = ohlcv_result
+                if hedged_error is not None:
+                    fetch_errors[OHLCV_SOURCE_TASK_KEYS[ohlcv_source]] = hedged_error
+                logger.info(f"{log_prefix} Hedged OHLCV fetch resolved from '{ohlcv_source}'.")
             
             # --- OHLCV, Splits, Dividends adatok kinyerése ---
             ohlcv_raw_df_from_fetch: Optional[pd.DataFrame] = None
@@ -2134,7 +2448,7 @@ async def process_premium_stock_data(
             if ohlcv_df_for_indicators is not None and not ohlcv_df_for_indicators.empty:
                 logger.info(f"{log_prefix} Calculating technical indicators...")
                 indic_calc_start = time.monotonic()
-                indicator_history_model = await _calculate_indicators(ohlcv_df_for_indicators, symbol_upper, request_id) # type: ignore
+                indicator_history_model = await _calculate_indicators(ohlcv_df_for_indicators, symbol_upper, request_id, cache=cache, interval="d") # type: ignore
                 logger.debug(f"{log_prefix} Indicator calculation took {time.monotonic() - indic_calc_start:.4f}s.")
                 if indicator_history_model:
                     logger.info(f"{log_prefix} Extracting latest indicator values...")
@@ -2320,7 +2634,7 @@ async def process_premium_stock_data(
         final_duration = time.monotonic() - orchestration_start_time
         error_occurred = isinstance(e_orchestration_unexpected, Exception)
         status_summary = "EndedWithError" if error_occurred else ("CacheHit" if not lock_acquired and not error_occurred else "Success") # Egyszerűsített státusz
-        if not lock_acquired and not error_occurred: status_summary = "LockFail_StaleCacheOrNoCache"
+        if not lock_acquired and not error_occurred: status_summary = served_without_lock or "LockFail_StaleCacheOrNoCache"
 
 
         logger.info(f"{log_prefix} --- Orchestration Finalizing ({status_summary}). Lock Acquired: {lock_acquired}. Total exec time: {final_duration:.4f}s ---")
@@ -2387,65 +2701,24 @@ async def get_basic_stock_data(
     cache: CacheService
 ) -> Optional[Dict[str, Any]]:
     """
-    Kifejezetten a /basic/{ticker} és a ticker-tape végpontokhoz.
+    Kifejezetten a /basic/{ticker} és a /header/{ticker} végpontokhoz.
+
+    Az ár a quote snapshot cache-ből (ticker szalag / real-time quote), a statikus
+    cégadatok a hosszú TTL-ű profil cache-ből jönnek (`quote_snapshot_service`);
+    OHLCV letöltés ezen az úton nincs.
     """
     request_id = f"basic-{symbol}-{uuid.uuid4().hex[:6]}"
     logger.info(f"[{request_id}] Getting basic stock data for {symbol}")
     
     try:
-        # Párhuzamos lekérdezés indítása a gyorsaságért
-        company_info_task = fetchers.yfinance.fetch_company_info_dict(symbol, cache)
-        
-        # EODHD hívás csak ha engedélyezve van és van kulcs
-        ohlcv_task = None
-        if settings.EODHD_FEATURES.USE_FOR_OHLCV_DAILY and settings.API_KEYS.EODHD:
-            eodhd_symbol = _get_eodhd_symbol(symbol, request_id)
-            ohlcv_task = fetchers.eodhd.fetch_eodhd_ohlcv(
-                symbol_with_exchange=eodhd_symbol,
-                client=client,
-                cache=cache,
-                interval="1d",
-                period_or_start_date=(datetime.now() - timedelta(days=OHLCV_YEARS*365)).strftime('%Y-%m-%d'),
-                force_refresh=False
-            )
-        
-        # Várakozás a két feladat befejezésére
-        ticker_info, ohlcv_df = await asyncio.gather(company_info_task, ohlcv_task)
-        
-        if not ticker_info:
-            logger.warning(f"[{request_id}] No ticker info available for {symbol}")
+        basic_data = await get_basic_snapshot(symbol, client, cache)
+        if not basic_data:
+            logger.warning(f"[{request_id}] No quote snapshot or company profile available for {symbol}")
             return None
-            
-        # Extract basic information
-        current_price = ticker_info.get('currentPrice') or ticker_info.get('regularMarketPrice')
-        previous_close = ticker_info.get('previousClose') or ticker_info.get('regularMarketPreviousClose')
-        
-        change = None
-        change_percent = None
-        if current_price and previous_close:
-            change = current_price - previous_close
-            change_percent = (change / previous_close) * 100
-        
-        basic_data = {
-            "symbol": symbol,
-            "company_name": ticker_info.get('longName') or ticker_info.get('shortName'),
-            "current_price": current_price,
-            "previous_close": previous_close,
-            "change": change,
-            "change_percent": change_percent,
-            "currency": ticker_info.get('currency', 'USD'),
-            "exchange": ticker_info.get('exchange'),
-            "market_cap": ticker_info.get('marketCap'),
-            "volume": ticker_info.get('volume') or ticker_info.get('regularMarketVolume'),
-            "day_high": ticker_info.get('dayHigh') or ticker_info.get('regularMarketDayHigh'),
-            "day_low": ticker_info.get('dayLow') or ticker_info.get('regularMarketDayLow'),
-            "sector": ticker_info.get('sector'),
-            "industry": ticker_info.get('industry'),
-            "timestamp": datetime.utcnow().isoformat(),
-            "request_id": request_id
-        }
-        
-        logger.info(f"[{request_id}] Basic data retrieved successfully")
+
+        basic_data["timestamp"] = datetime.utcnow().isoformat()
+        basic_data["request_id"] = request_id
+        logger.info(f"[{request_id}] Basic data retrieved successfully (quote source: {basic_data.get('quote_source')})")
         return basic_data
         
     except Exception as error:
@@ -2457,11 +2730,15 @@ async def get_chart_data(
     period: str, 
     interval: str, 
     client: httpx.AsyncClient,
-    cache: CacheService
+    cache: CacheService,
+    compact: bool = False
 ) -> Optional[Dict[str, Any]]:
     """
     Fetch chart data for progressive loading (Phase 2)
     Returns: OHLCV data for charting
+
+    `compact=True` esetén az `ohlcv` oszlopos alakú ({t, o, h, l, c, v}, `t` ms-ban),
+    különben rekord lista (date/timestamp[s]/open/high/low/close/volume).
     """
     log_prefix = f"chart-{symbol[:5]}-{str(uuid.uuid4())[:6]}"
     logger.info(f"[{log_prefix}] Initiating chart data fetch for '{symbol}'")
@@ -2470,7 +2747,11 @@ async def get_chart_data(
 
     try:
         # Use the correct fetcher based on EODHD settings
-        if settings.EODHD_FEATURES.USE_FOR_OHLCV_DAILY and settings.API_KEYS.EODHD:
+        # Nyitott EODHD circuit breakernél egyből a yfinance út
+        if (
+            settings.EODHD_FEATURES.USE_FOR_OHLCV_DAILY and settings.API_KEYS.EODHD
+            and await provider_available("eodhd", cache)
+        ):
             eodhd_symbol = _get_eodhd_symbol(symbol, log_prefix)
             
             # 🔧 FIX: EODHD interval conversion and endpoint selection
@@ -2510,60 +2791,44 @@ async def get_chart_data(
             logger.warning(f"[{log_prefix}] OHLCV data frame is missing or empty for {symbol}.")
             return None
         
-        # Convert to chart-ready format
-        chart_data = []
-        for index, row in ohlcv_df.iterrows():
-            # 🔧 FIX: Handle different column name cases (EODHD uses Title Case)
-            open_val = row.get('open') or row.get('Open')
-            high_val = row.get('high') or row.get('High') 
-            low_val = row.get('low') or row.get('Low')
-            close_val = row.get('close') or row.get('Close')
-            volume_val = row.get('volume') or row.get('Volume')
-            
-            chart_data.append({
-                "date": index.strftime('%Y-%m-%d'),
-                "timestamp": int(index.timestamp()),
-                "open": float(open_val) if pd.notna(open_val) else None,
-                "high": float(high_val) if pd.notna(high_val) else None,
-                "low": float(low_val) if pd.notna(low_val) else None,
-                "close": float(close_val) if pd.notna(close_val) else None,
-                "volume": int(volume_val) if pd.notna(volume_val) else None
-            })
-        
+        # Vektorizált konverzió (egyszeri oszlopnév-normalizálás, NumPy epoch, tömbszintű NaN -> None)
+        columns = ohlcv_to_columns(ohlcv_df, time_unit="ms" if compact else "s", with_dates=True)
+        if columns is None:
+            logger.warning(f"[{log_prefix}] OHLCV data frame has no usable OHLC columns or DatetimeIndex for {symbol}.")
+            return None
+        data_points = len(columns["t"])
+
+        if compact:
+            # Kompakt oszlopos alak: {t: [ms], o: [], h: [], l: [], c: [], v: []}
+            chart_data: Any = {key: columns[key] for key in COMPACT_RECORD_KEYS}
+        else:
+            chart_data = columns_to_records(columns, CHART_RECORD_KEYS)
+
         # Get latest OHLCV for current price
-        latest_row = ohlcv_df.iloc[-1] if not ohlcv_df.empty else None
-        latest_ohlcv = None
-        if latest_row is not None:
-            # 🔧 FIX: Handle different column name cases for latest data too
-            open_val = latest_row.get('open') or latest_row.get('Open')
-            high_val = latest_row.get('high') or latest_row.get('High')
-            low_val = latest_row.get('low') or latest_row.get('Low')
-            close_val = latest_row.get('close') or latest_row.get('Close')
-            volume_val = latest_row.get('volume') or latest_row.get('Volume')
-            
-            latest_ohlcv = {
-                "date": latest_row.name.strftime('%Y-%m-%d'),
-                "open": float(open_val) if pd.notna(open_val) else None,
-                "high": float(high_val) if pd.notna(high_val) else None,
-                "low": float(low_val) if pd.notna(low_val) else None,
-                "close": float(close_val) if pd.notna(close_val) else None,
-                "volume": int(volume_val) if pd.notna(volume_val) else None
-            }
+        latest_ohlcv = {
+            "date": columns["date"][-1],
+            "open": columns["o"][-1],
+            "high": columns["h"][-1],
+            "low": columns["l"][-1],
+            "close": columns["c"][-1],
+            "volume": columns["v"][-1],
+        }
         
         result = {
             "symbol": symbol,
             "period": period,
             "interval": interval,
             "ohlcv": chart_data,  # Changed from chart_data to ohlcv to match response structure
+            "ohlcv_format": "columnar" if compact else "records",
             "latest_ohlcv": latest_ohlcv,
-            "data_points": len(chart_data),
+            "data_points": data_points,
             "currency": "USD",  # Default currency
             "timezone": "America/New_York",  # Default timezone
             "timestamp": datetime.utcnow().isoformat(),
             "request_id": log_prefix
         }
         
-        logger.info(f"[{log_prefix}] Chart data retrieved successfully ({len(chart_data)} points)")
+        logger.info(f"[{log_prefix}] Chart data retrieved successfully ({data_points} points)")
         return result
         
     except Exception as error:
@@ -3021,7 +3286,7 @@ async def get_technical_analysis_data(
             return None
 
         # 3) Calculate full indicator history, then extract latest snapshot
-        indicator_history = await _calculate_indicators(ohlcv_df, symbol_upper, request_id)  # type: ignore
+        indicator_history = await _calculate_indicators(ohlcv_df, symbol_upper, request_id, cache=cache, interval=interval)  # type: ignore
         latest_indic_dict = _extract_latest_indicators(indicator_history, request_id) if indicator_history else {}
 
         # 4) Basic day change % from last two closes
@@ -4,13 +4,16 @@ import httpx
 import asyncio
 import json
 import traceback # Részletesebb hiba logoláshoz
-from typing import List, Dict, Any, Optional, Tuple, Literal
+from typing import List, Dict, Any, Optional, Tuple, Literal, Set
 
 # Core komponensek importálása
 from modules.financehub.backend.config import settings # Központi, validált beállítások
 from modules.financehub.backend.utils.logger_config import get_logger
 from ..models.ticker_tape import TickerTapeItem, TickerTapeData
 from .cache_service import CacheService
+from .fetchers._base_helpers import FETCH_RATE_LIMITER
+from .quote_snapshot_service import store_quote_snapshots
+from .rate_limiter import RateLimitTimeout, parse_retry_after, provider_for_url
 
 # Logger inicializálása a modulhoz
 logger = get_logger(__name__)
@@ -28,7 +31,11 @@ API_CONFIG = {
         # FONTOS: Az FMP '/v3/quote/' végpontja ADJA a változást, a '/v3/quote-short/' NEM!
         'endpoint_template': "https://financialmodelingprep.com/api/v3/quote/{symbol}?apikey={api_key}",
         'api_key_getter': lambda: settings.API_KEYS.FMP.get_secret_value() if settings.API_KEYS.FMP else None,
-        'response_parser': lambda data, symbol: parse_fmp_quote_response(data, symbol) # Külön függvény a parsoláshoz
+        'response_parser': lambda data, symbol: parse_fmp_quote_response(data, symbol), # Külön függvény a parsoláshoz
+        # Bulk: vesszővel elválasztott lista, a válasz soronként egy quote objektum
+        'bulk_endpoint_template': "https://financialmodelingprep.com/api/v3/quote/{symbols}?apikey={api_key}",
+        'bulk_symbol_field': 'symbol',
+        'bulk_row_parser': lambda row, symbol: parse_fmp_quote_response([row], symbol)
     },
     'ALPHA_VANTAGE': {
         'endpoint_template': "https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol={symbol}&apikey={api_key}",
@@ -40,7 +47,11 @@ API_CONFIG = {
         # A {symbol} itt a TELJES szimbólum lesz (pl. AAPL.US)
         'endpoint_template': "https://eodhistoricaldata.com/api/real-time/{symbol}?api_token={api_key}&fmt=json",
         'api_key_getter': lambda: settings.API_KEYS.EODHD.get_secret_value() if settings.API_KEYS.EODHD else None,
-        'response_parser': lambda data, symbol: parse_eodhd_realtime_response(data, symbol) # CSV parser függvény
+        'response_parser': lambda data, symbol: parse_eodhd_realtime_response(data, symbol), # CSV parser függvény
+        # Bulk: az első szimbólum az útvonalban, a többi az `s=` paraméterben; a válasz lista
+        'bulk_endpoint_template': "https://eodhistoricaldata.com/api/real-time/{symbol}?s={extra_symbols}&api_token={api_key}&fmt=json",
+        'bulk_symbol_field': 'code',
+        'bulk_row_parser': lambda row, symbol: parse_eodhd_realtime_response(row, symbol)
     }
 }
 
@@ -131,6 +142,29 @@ def parse_alpha_vantage_quote_response(api_response_data: Any, symbol: str) -> O
         "change_percent": round(change_percent, 2)
     }
 
+# EODHD real-time mezők -> quote snapshot mezők (opcionálisak; a ticker szalag figyelmen kívül hagyja őket)
+_EODHD_QUOTE_EXTRA_FIELDS: Dict[str, str] = {
+    "previousClose": "previous_close",
+    "open": "open",
+    "high": "day_high",
+    "low": "day_low",
+    "volume": "volume",
+    "timestamp": "timestamp",
+}
+
+def _extract_eodhd_quote_extras(data_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Az opcionális napi tartomány / forgalom mezők numerikus értéke (hiányzó vagy 'NA' érték kimarad)."""
+    extras: Dict[str, Any] = {}
+    for api_field, field in _EODHD_QUOTE_EXTRA_FIELDS.items():
+        try:
+            value = float(data_dict.get(api_field))
+        except (TypeError, ValueError):
+            continue
+        if value != value:  # NaN
+            continue
+        extras[field] = int(value) if field in ("volume", "timestamp") else round(value, 4)
+    return extras
+
 def parse_eodhd_realtime_response(api_response_data: Any, full_symbol: str) -> Optional[Dict[str, Any]]:
     """Feldolgozza az EODHD /real-time/ végpont CSV vagy JSON válaszát."""
     log_prefix = f"{MODULE_PREFIX} [ParseEODHD:{full_symbol}]"
@@ -161,7 +195,8 @@ def parse_eodhd_realtime_response(api_response_data: Any, full_symbol: str) -> O
                 "symbol": full_symbol,
                 "price": round(current_price, 4),
                 "change": round(change, 4),
-                "change_percent": round(change_percent, 2)
+                "change_percent": round(change_percent, 2),
+                **_extract_eodhd_quote_extras(api_response_data)
             }
             
         except (ValueError, TypeError, KeyError) as conv_err:
@@ -218,7 +253,8 @@ def parse_eodhd_realtime_response(api_response_data: Any, full_symbol: str) -> O
             "symbol": full_symbol,
             "price": round(current_price, 4),
             "change": round(change, 4),
-            "change_percent": round(change_percent, 2)
+            "change_percent": round(change_percent, 2),
+            **_extract_eodhd_quote_extras(data_dict)
         }
         
     except (ValueError, TypeError, IndexError) as conv_err:
@@ -273,6 +309,31 @@ def get_original_symbol(full_symbol: str, provider: str) -> str:
     else:
         return full_symbol
 
+# --- Rate limit (a make_api_request-tel közös szolgáltatói bucketek) ---
+
+async def _acquire_quote_slot(url: str, log_prefix: str) -> bool:
+    """A szolgáltató rate limit tokenje a quote kérés előtt; ha a határidőn belül nincs, False."""
+    if not settings.RATE_LIMIT.ENABLED:
+        return True
+    try:
+        await FETCH_RATE_LIMITER.acquire(provider_for_url(url))
+    except RateLimitTimeout as rate_err:
+        logger.warning(f"{log_prefix} {rate_err}. Skipping quote request.")
+        return False
+    return True
+
+
+async def _note_rate_limited(url: str, response: httpx.Response) -> None:
+    """429 után a szolgáltató bucketje a `Retry-After` idejére blokkolódik (a további kérések kivárják)."""
+    if not settings.RATE_LIMIT.ENABLED:
+        return
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    await FETCH_RATE_LIMITER.note_retry_after(
+        provider_for_url(url),
+        retry_after if retry_after is not None else settings.RATE_LIMIT.DEFAULT_RETRY_AFTER_SECONDS,
+    )
+
+
 # --- Fő Lekérdező Függvény (Egy Tickerhez) ---
 
 async def fetch_single_ticker_quote(
@@ -318,6 +379,8 @@ async def fetch_single_ticker_quote(
     # Logolás API kulcs nélkül a biztonság kedvéért
     logged_url = endpoint_template.format(symbol=api_symbol, api_key='***REDACTED***')
     logger.debug(f"{log_prefix} Requesting quote from URL: {logged_url}")
+    if not await _acquire_quote_slot(url, log_prefix):
+        return None
 
     try:
         response = await client.get(url)
@@ -364,6 +427,7 @@ async def fetch_single_ticker_quote(
             logger.error(f"{log_prefix} API Authentication/Authorization error ({status_code}) for {logged_url}. Check API key or plan limitations. Response: {response_text}...")
         elif status_code == 429:
             logger.warning(f"{log_prefix} API Rate Limit Exceeded ({status_code}) for {logged_url}. Consider increasing interval or upgrading plan. Response: {response_text}...")
+            await _note_rate_limited(url, exc.response)
         elif 400 <= status_code < 500:
             logger.warning(f"{log_prefix} Client-side API error ({status_code}) for {logged_url}. Possibly invalid symbol or request. Response: {response_text}...")
         else: # 5xx hibák
@@ -379,6 +443,153 @@ async def fetch_single_ticker_quote(
         return None
 
 
+# --- Bulk Lekérdezés (Több Tickerhez Egy Kérésben) ---
+
+def index_bulk_quote_rows(api_response_data: Any, symbol_field: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Egy bulk quote válasz sorait a szolgáltató szimbóluma (nagybetűsítve) szerint indexeli.
+    Egyetlen szimbólumnál egyes szolgáltatók (EODHD) lista helyett egy objektumot adnak.
+    """
+    if isinstance(api_response_data, dict):
+        rows = [api_response_data]
+    elif isinstance(api_response_data, list):
+        rows = api_response_data
+    else:
+        return {}
+    indexed: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        if isinstance(row, dict) and row.get(symbol_field):
+            indexed[str(row[symbol_field]).upper()] = row
+    return indexed
+
+
+async def fetch_bulk_ticker_quotes(
+    symbols: List[str],
+    client: httpx.AsyncClient,
+    provider_config: Dict[str, Any]
+) -> Tuple[Dict[str, Dict[str, Any]], Set[str]]:
+    """
+    Egy bulk kérés egy szimbólum csomagra.
+
+    Returns:
+        (sikeresen feldolgozott quote-ok eredeti szimbólum szerint,
+         azon szimbólumok halmaza, amelyekre nincs egyedi újrapróbálás).
+         Sikeres válasznál ezek a megválaszolt szimbólumok (a sikertelenül
+         parsolt sorok is); csak a válaszból hiányzók mennek egyedi kérésre.
+         Szerverhiba (5xx), hálózati hiba, érvénytelen JSON vagy rate limit
+         időtúllépés esetén a csomag minden szimbóluma ide kerül: a most hibázó
+         szolgáltatót nem terheljük szimbólumonkénti kérésekkel.
+         Rate limit (429) esetén egyik sem: az egyedi visszaesés a `Retry-After`
+         idejére blokkolt bucketen át, a rate limiter határidején belül próbálja
+         újra őket. Egyéb 4xx-nél (pl. a csomag egy hibás szimbóluma miatt) is
+         egyedi kérések jönnek.
+    """
+    log_prefix = f"{MODULE_PREFIX} [FetchBulk:{len(symbols)}]"
+    endpoint_template = provider_config['bulk_endpoint_template']
+    symbol_field = provider_config['bulk_symbol_field']
+    row_parser = provider_config['bulk_row_parser']
+
+    api_key = provider_config['api_key_getter']()
+    if not api_key:
+        logger.error(f"{log_prefix} API Key for provider '{SELECTED_API_PROVIDER}' is missing in settings. Cannot fetch quotes.")
+        return {}, set()
+
+    api_symbols = {symbol: normalize_symbol_for_provider(symbol, SELECTED_API_PROVIDER) for symbol in symbols}
+    ordered_api_symbols = list(api_symbols.values())
+    url_fields = {
+        "symbol": ordered_api_symbols[0],
+        "extra_symbols": ",".join(ordered_api_symbols[1:]),
+        "symbols": ",".join(ordered_api_symbols),
+    }
+    url = endpoint_template.format(api_key=api_key, **url_fields)
+    logged_url = endpoint_template.format(api_key='***REDACTED***', **url_fields)
+    logger.debug(f"{log_prefix} Requesting bulk quotes from URL: {logged_url}")
+    if not await _acquire_quote_slot(url, log_prefix):
+        return {}, set(symbols)
+
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+        api_response_data = response.json()
+    except httpx.HTTPStatusError as exc:
+        status_code = exc.response.status_code
+        if status_code == 429:
+            logger.warning(f"{log_prefix} API Rate Limit Exceeded ({status_code}) for bulk request. Per-symbol fallback will wait for the Retry-After window.")
+            await _note_rate_limited(url, exc.response)
+            return {}, set()
+        if status_code >= 500:
+            logger.warning(f"{log_prefix} Bulk request failed with server error ({status_code}) for {logged_url}. Skipping per-symbol fallback for this chunk.")
+            return {}, set(symbols)
+        logger.warning(f"{log_prefix} Bulk request failed ({status_code}) for {logged_url}. Response: {str(exc.response.text)[:200]}...")
+        return {}, set()
+    except httpx.RequestError as exc:
+        logger.error(f"{log_prefix} Network error during bulk request to {logged_url}. Error: {exc.__class__.__name__} - {exc}. Skipping per-symbol fallback for this chunk.")
+        return {}, set(symbols)
+    except (json.JSONDecodeError, ValueError) as exc:
+        logger.warning(f"{log_prefix} Bulk response is not valid JSON ({exc}). Skipping per-symbol fallback for this chunk.")
+        return {}, set(symbols)
+
+    rows = index_bulk_quote_rows(api_response_data, symbol_field)
+    quotes: Dict[str, Dict[str, Any]] = {}
+    answered: Set[str] = set()
+    for symbol, api_symbol in api_symbols.items():
+        row = rows.get(api_symbol.upper())
+        if row is None:
+            continue
+        answered.add(symbol)
+        parsed_data = row_parser(row, api_symbol)
+        if parsed_data is not None:
+            parsed_data["symbol"] = symbol
+            quotes[symbol] = parsed_data
+
+    logger.info(f"{log_prefix} Bulk response: rows={len(rows)}, parsed={len(quotes)}, missing={len(symbols) - len(answered)}.")
+    return quotes, answered
+
+
+async def fetch_ticker_quotes(
+    symbols: List[str],
+    client: httpx.AsyncClient,
+    provider_config: Dict[str, Any]
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Az összes ticker lekérése: bulk csomagokban, ha a szolgáltató támogatja,
+    majd egyedi kérés csak a bulk válaszból hiányzó szimbólumokra (szolgáltatói
+    hibánál a csomag kimarad, lásd `fetch_bulk_ticker_quotes`).
+    Az eredmény sorrendje a `symbols` sorrendje (sikertelen elemnél None).
+    """
+    log_prefix = f"{MODULE_PREFIX} [FetchQuotes]"
+    quotes: Dict[str, Dict[str, Any]] = {}
+    fallback_symbols = list(symbols)
+
+    if settings.TICKER_TAPE.BULK_ENABLED and provider_config.get('bulk_endpoint_template'):
+        chunk_size = settings.TICKER_TAPE.BULK_CHUNK_SIZE
+        chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+        chunk_results = await asyncio.gather(
+            *(fetch_bulk_ticker_quotes(chunk, client, provider_config) for chunk in chunks),
+            return_exceptions=True
+        )
+        settled: Set[str] = set()
+        for chunk, result in zip(chunks, chunk_results):
+            if isinstance(result, BaseException):
+                logger.error(f"{log_prefix} Unexpected error in bulk chunk ({len(chunk)} symbols): {result}", exc_info=result)
+                continue
+            chunk_quotes, chunk_settled = result
+            quotes.update(chunk_quotes)
+            settled.update(chunk_settled)
+        fallback_symbols = [symbol for symbol in symbols if symbol not in settled]
+        logger.info(f"{log_prefix} Bulk fetch: {len(chunks)} request(s), {len(quotes)} quotes, {len(fallback_symbols)} symbol(s) need per-symbol fallback.")
+
+    if fallback_symbols:
+        single_results = await asyncio.gather(
+            *(fetch_single_ticker_quote(symbol, client, provider_config) for symbol in fallback_symbols)
+        )
+        for symbol, result in zip(fallback_symbols, single_results):
+            if isinstance(result, dict):
+                quotes[symbol] = result
+
+    return [quotes.get(symbol) for symbol in symbols]
+
+
 # --- Fő Cache Frissítő Függvény ---
 
 async def update_ticker_tape_data_in_cache(
@@ -433,21 +644,14 @@ async def update_ticker_tape_data_in_cache(
         logger.critical(f"{log_prefix} Unexpected error during configuration setup: {e}", exc_info=True)
         return False
 
-    # 2. Párhuzamos Adatlekérdezés (asyncio.gather)
-    fetch_tasks = [
-        # Minden task megkapja a saját szimbólumát, a klienst és a KIVÁLASZTOTT szolgáltató configját
-        fetch_single_ticker_quote(symbol, client, provider_config) for symbol in symbols
-    ]
-
+    # 2. Adatlekérdezés (bulk csomagok, hiányzókra párhuzamos egyedi kérések)
     results: List[Optional[Dict[str, Any]]] = []
     try:
-        logger.debug(f"{log_prefix} Starting parallel fetch for {len(fetch_tasks)} tasks...")
-        # return_exceptions=True hasznos lehet, ha látni akarod a kivételeket a gather listában,
-        # de most a None-ra szűrés elegendő, mert a fetch_single... kezeli a saját hibáit.
-        results = await asyncio.gather(*fetch_tasks, return_exceptions=False)
-        logger.debug(f"{log_prefix} asyncio.gather completed.")
+        logger.debug(f"{log_prefix} Starting quote fetch for {len(symbols)} symbols...")
+        results = await fetch_ticker_quotes(symbols, client, provider_config)
+        logger.debug(f"{log_prefix} Quote fetch completed.")
     except Exception as gather_err:
-        logger.exception(f"{log_prefix} Unexpected error during asyncio.gather execution: {gather_err}")
+        logger.exception(f"{log_prefix} Unexpected error during quote fetch: {gather_err}")
         # Lehet, hogy itt False-t kellene visszaadni, mert a lekérdezés megszakadt
         return False
 
@@ -471,6 +675,8 @@ async def update_ticker_tape_data_in_cache(
             timeout_seconds=cache_ttl
         )
         logger.info(f"{log_prefix} Successfully updated cache key '{cache_key}' with {successful_count} ticker items.")
+        # A szalag quote-jai egyben a per-szimbólum quote snapshotok (header / basic végpontok)
+        await store_quote_snapshots(cache, valid_data, source=SELECTED_API_PROVIDER.lower())
         # Sikeres volt a cache írás, és legalább egy adatot lekértünk és feldolgoztunk
         return True
     except Exception as cache_err:
@@ -0,0 +1,206 @@
+# backend/core/worker_runtime.py
+"""
+Worker-szintű aszinkron futtatókörnyezet a Celery taskokhoz.
+
+Minden worker folyamat egyetlen, hosszú életű eseményhurkot futtat egy háttér
+szálon (`worker_process_init`-ből indítva), és ezen él a megosztott
+CacheService (Redis pool) és a HTTP/2 `httpx.AsyncClient`. A taskok a
+`run_in_worker_loop` segítségével adják át a coroutine-jukat, így a Redis és
+a szolgáltatói kapcsolatok taskok között újrahasznosulnak, ahelyett hogy
+minden futás `asyncio.run`-nal új hurkot és új poolokat építene.
+
+A hurok a taskok között is fut, így a CacheService háttér taszkjai (pl. az L1
+invalidációs listener) sem állnak meg. Fork után (prefork pool) a szülőtől
+örökölt runtime nem használható: a folyamat azonosító alapján új indul.
+"""
+
+import asyncio
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from modules.financehub.backend.utils.logger_config import get_logger
+
+logger = get_logger(__name__)
+MODULE_PREFIX = "[WorkerRuntime]"
+
+T = TypeVar("T")
+
+
+@dataclass
+class WorkerResources:
+    """A worker hurkán élő megosztott erőforrások (a taskok nem zárhatják le őket)."""
+
+    cache: Any  # CacheService
+    http_client: Any  # httpx.AsyncClient
+
+
+def _create_http_client() -> Any:
+    import httpx
+    from modules.financehub.backend.config import settings
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            settings.HTTP_CLIENT.REQUEST_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CLIENT.CONNECT_TIMEOUT_SECONDS,
+            pool=settings.HTTP_CLIENT.POOL_TIMEOUT_SECONDS,
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_CLIENT.MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_CLIENT.KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        headers={
+            "User-Agent": settings.HTTP_CLIENT.USER_AGENT,
+            "Referer": str(settings.HTTP_CLIENT.DEFAULT_REFERER),
+        },
+        http2=True,
+        follow_redirects=True,
+    )
+
+
+async def _create_default_resources() -> WorkerResources:
+    from .cache_service import CacheService
+
+    cache = await CacheService.create()
+    return WorkerResources(cache=cache, http_client=_create_http_client())
+
+
+async def _close_default_resources(resources: WorkerResources) -> None:
+    for name, closer in (("HTTP client", resources.http_client.aclose), ("CacheService", resources.cache.close)):
+        try:
+            await closer()
+        except Exception as e:
+            logger.error(f"{MODULE_PREFIX} Error closing {name}: {e}")
+
+
+class WorkerAsyncRuntime:
+    """
+    Egy worker folyamat hosszú életű eseményhurka (háttér szálon) és megosztott erőforrásai.
+
+    Args:
+        resource_factory: A hurkon lefutó coroutine factory, ami az erőforrásokat létrehozza.
+        resource_closer: A leállításkor az erőforrásokat lezáró coroutine factory.
+    """
+
+    def __init__(
+        self,
+        resource_factory: Callable[[], Awaitable[Any]] = _create_default_resources,
+        resource_closer: Callable[[Any], Awaitable[None]] = _close_default_resources,
+    ):
+        self._resource_factory = resource_factory
+        self._resource_closer = resource_closer
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._resources: Any = None
+        self._resources_lock: Optional[asyncio.Lock] = None
+        self._state_lock = threading.Lock()
+        self.pid = os.getpid()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self) -> None:
+        """A hurok szál indítása (idempotens)."""
+        with self._state_lock:
+            if self.running:
+                return
+            loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run_loop() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(started.set)
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name=f"worker-async-runtime-{self.pid}", daemon=True)
+            self._thread.start()
+            started.wait()
+            self._loop = loop
+            self._resources_lock = None
+            logger.info(f"{MODULE_PREFIX} Event loop started in worker process {self.pid}.")
+
+    async def _get_resources(self) -> Any:
+        # Lustán, a hurkon: ha indításkor pl. a Redis nem volt elérhető, a következő task újrapróbálja
+        if self._resources is None:
+            if self._resources_lock is None:
+                self._resources_lock = asyncio.Lock()
+            async with self._resources_lock:
+                if self._resources is None:
+                    self._resources = await self._resource_factory()
+                    logger.info(f"{MODULE_PREFIX} Shared resources initialized in worker process {self.pid}.")
+        return self._resources
+
+    def warm_up(self, timeout: Optional[float] = None) -> bool:
+        """A hurok indítása és az erőforrások előzetes létrehozása; hibánál False (a taskok újrapróbálják)."""
+        try:
+            self.submit(self._get_resources(), timeout=timeout)
+            return True
+        except Exception as e:
+            logger.error(f"{MODULE_PREFIX} Resource warm-up failed in worker process {self.pid}: {e}")
+            return False
+
+    def submit(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Coroutine futtatása a worker hurkán; a hívó szál blokkol az eredményig."""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def run(self, func: Callable[[Any], Awaitable[T]], timeout: Optional[float] = None) -> T:
+        """`func(resources)` futtatása a worker hurkán a megosztott erőforrásokkal."""
+
+        async def call() -> T:
+            return await func(await self._get_resources())
+
+        return self.submit(call(), timeout=timeout)
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Erőforrások lezárása, a hurok leállítása és a szál bevárása."""
+        with self._state_lock:
+            loop, thread = self._loop, self._thread
+            if loop is None or not loop.is_running():
+                return
+            resources, self._resources = self._resources, None
+            if resources is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(self._resource_closer(resources), loop).result(timeout)
+                except Exception as e:
+                    logger.error(f"{MODULE_PREFIX} Error closing shared resources: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            if thread is not None:
+                thread.join(timeout)
+            loop.close()
+            self._loop = self._thread = None
+            logger.info(f"{MODULE_PREFIX} Event loop stopped in worker process {self.pid}.")
+
+
+_runtime: Optional[WorkerAsyncRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_worker_runtime() -> WorkerAsyncRuntime:
+    """A folyamat runtime-ja (fork után újat hoz létre; a szülő hurka a gyermekben nem fut)."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None or _runtime.pid != os.getpid():
+            _runtime = WorkerAsyncRuntime()
+        return _runtime
+
+
+def run_in_worker_loop(func: Callable[[WorkerResources], Awaitable[T]], timeout: Optional[float] = None) -> T:
+    """Task segéd: `func(resources)` a worker hurkán, a megosztott Redis és HTTP poolokkal."""
+    return get_worker_runtime().run(func, timeout=timeout)
+
+
+def shutdown_worker_runtime() -> None:
+    global _runtime
+    with _runtime_lock:
+        runtime, _runtime = _runtime, None
+    if runtime is not None and runtime.pid == os.getpid():
+        runtime.shutdown()
@@ -250,10 +250,10 @@ try:
     # Prometheus Metrics Router (optional)
     try:
         from modules.financehub.backend.core.metrics.prometheus_exporter import (
-            PrometheusExporter, get_metrics_router,
+            get_exporter, get_metrics_router,
         )
 
-        exporter = PrometheusExporter()
+        exporter = get_exporter()
         app.include_router(get_metrics_router(exporter), prefix="", tags=["Metrics"])
         logger.info("Prometheus metrics router mounted at /metrics")
     except Exception as metrics_err:  # noqa: BLE001
@@ -333,6 +333,14 @@ async def health_check_endpoint(request: Request) -> Dict[str, Any]:
                 "ai_router": "✅ operational"
             }
         }
+
+        # Szolgáltatónkénti circuit breaker állapot (a Redisben megosztott nyitásokkal együtt)
+        from modules.financehub.backend.core.fetchers._base_helpers import FETCH_CIRCUIT_BREAKERS
+        known_providers = [*settings.RATE_LIMIT.PROVIDER_REQUESTS_PER_MINUTE, "yfinance"]
+        circuit_breakers = await FETCH_CIRCUIT_BREAKERS.shared_snapshot(known_providers)
+        health_data["circuit_breakers"] = circuit_breakers
+        if any(breaker["state"] == "open" for breaker in circuit_breakers.values()):
+            health_data["status"] = "degraded"
         
         logger.debug("Health check completed successfully.")
         return health_data
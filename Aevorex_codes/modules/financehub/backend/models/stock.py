@@ -1172,7 +1172,9 @@ class FinBotStockResponse(BaseModel):
     latest_ohlcv: Optional[LatestOHLCV] = Field(default=None)
     change_percent_day: Optional[StrictFloat] = Field(default=None)
     history_ohlcv: List[CompanyPriceHistoryEntry] = Field(..., description="Historikus OHLCV adatok (másodperc alapú timestamp).")
-    indicator_history: Optional[IndicatorHistory] = Field(default=None)
+    # Dict első helyen: az oszlopos payload (és a cache-ből visszaolvasott JSON) pontonkénti
+    # modell-validáció nélkül megy át; IndicatorHistory példány kompatibilitási módban érkezik.
+    indicator_history: Optional[Union[Dict[str, Any], IndicatorHistory]] = Field(default=None)
     technical_analysis: Optional[TechnicalAnalysis] = Field(default=None, description="High-level technical analysis summary.")
     latest_indicators: Optional[Dict[str, Optional[float]]] = Field(default=None)
 
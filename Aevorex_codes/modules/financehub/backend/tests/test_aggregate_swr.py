@@ -0,0 +1,73 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+try:
+    from modules.financehub.backend.config import settings
+    from modules.financehub.backend.core import stock_data_service as sds
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+
+class _StaleAggregateCache:
+    """Serves one soft-expired aggregate entry; any lock request means the caller blocked."""
+
+    def __init__(self, key):
+        self.entries = {
+            key: {
+                "symbol": "AAPL",
+                "request_timestamp_utc": datetime.now(timezone.utc).isoformat(),
+                "data_source_info": "test",
+                "is_data_stale": False,
+                "history_ohlcv": [],
+                sds.AGGREGATED_SOFT_EXPIRY_FIELD: time.time() - 5,
+            }
+        }
+        self.lock_requests = 0
+
+    async def get(self, key):
+        return self.entries.get(key)
+
+    def get_lock(self, *args, **kwargs):  # pragma: no cover – the stale path must not lock
+        self.lock_requests += 1
+        raise AssertionError("stale entry must be served without the orchestration lock")
+
+
+def test_stale_aggregate_is_served_and_revalidated_once_per_key(monkeypatch):
+    key = f"stock_premium_v{sds.APP_VERSION}:{sds._get_eodhd_symbol('AAPL', '[test]')}"
+    cache = _StaleAggregateCache(key)
+    serve_stale_entrypoint = sds.process_premium_stock_data
+    revalidations = []
+
+    async def provider_available(provider, cache=None):
+        return True
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def fake_refresh(symbol, client, cache, force_refresh=False, serve_stale=True):
+            revalidations.append((symbol, serve_stale))
+            await release.wait()
+
+        # The background task looks the orchestrator up through the module, so only it sees the fake
+        monkeypatch.setattr(sds, "process_premium_stock_data", fake_refresh)
+        responses = [await serve_stale_entrypoint("aapl", None, cache) for _ in range(3)]
+        responses += await asyncio.gather(*(serve_stale_entrypoint("AAPL", None, cache) for _ in range(3)))
+        task = sds._AGGREGATE_REVALIDATION_TASKS[key]
+        await asyncio.sleep(0)
+        running = len(revalidations)
+        release.set()
+        await task
+        return responses, running, dict(sds._AGGREGATE_REVALIDATION_TASKS)
+
+    monkeypatch.setattr(settings.CACHE, "ENABLED", True)
+    monkeypatch.setattr(sds, "provider_available", provider_available)
+    monkeypatch.setattr(sds, "_AGGREGATE_REVALIDATION_TASKS", {})
+    responses, running, tasks_after = asyncio.run(scenario())
+
+    assert all(r.is_data_stale and r.metadata["soft_expired"] for r in responses)
+    assert cache.lock_requests == 0
+    assert running == 1 and revalidations == [("AAPL", False)]  # one background refresh for six stale reads
+    assert tasks_after == {}  # the finished task unregisters itself
@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pd = pytest.importorskip("pandas")
+
+try:
+    from modules.financehub.backend.core.cache_service import CacheService
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+from modules.financehub.backend.core.dataframe_codec import decode_cache_entry, encode_dataframe  # noqa: E402
+from modules.financehub.backend.core.l1_cache import L1Cache  # noqa: E402
+
+
+class _CountingRedis:
+    """Wraps a fakeredis client and counts pipelines / MGET calls (Redis round trips)."""
+
+    def __init__(self, client):
+        self._client = client
+        self.round_trips = 0
+
+    def pipeline(self, *args, **kwargs):
+        self.round_trips += 1
+        return self._client.pipeline(*args, **kwargs)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return await self._client.mget(keys)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def _service(l1_prefixes=None):
+    server = fakeredis.FakeServer()
+    text = _CountingRedis(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True))
+    binary = _CountingRedis(fakeredis.aioredis.FakeRedis(server=server, decode_responses=False))
+    service = CacheService(text, None, binary, None)
+    service.l1 = None
+    if l1_prefixes is not None:
+        service.l1 = L1Cache(max_entries=10, max_bytes=10_000, max_ttl_seconds=300, key_prefixes=l1_prefixes)
+    return service, text, binary
+
+
+def test_set_many_then_get_many_round_trip_with_ttl_passthrough():
+    async def scenario():
+        service, text, _ = _service()
+        assert await service.set_many({"k1": 1, "k2": [2], "k3": {"a": "b"}}, timeout_seconds=42)
+        ttls = [await text.ttl(key) for key in ("k1", "k2", "k3")]
+        values = await service.get_many(["k1", "k2", "missing", "k1"])
+        return ttls, values, text.round_trips
+
+    ttls, values, round_trips = asyncio.run(scenario())
+    assert ttls == [42, 42, 42]
+    assert values == {"k1": 1, "k2": [2], "missing": None}
+    assert round_trips == 2  # one pipelined write, one MGET
+
+
+def test_get_many_serves_l1_hits_without_redis_and_fills_l1_from_pttl():
+    async def scenario():
+        service, text, _ = _service(l1_prefixes=("hot:",))
+        await text.set("hot:a", json.dumps("A"), ex=60)
+        await text.set("cold:b", json.dumps("B"), ex=60)
+        first = await service.get_many(["hot:a", "cold:b"])
+        trips_after_first = text.round_trips
+        second = await service.get_many(["hot:a"])
+        l1_ttl = service.l1._entries["hot:a"].expires_at - service.l1._clock()
+        return first, second, trips_after_first, text.round_trips, l1_ttl
+
+    first, second, trips_after_first, trips_total, l1_ttl = asyncio.run(scenario())
+    assert first == {"hot:a": "A", "cold:b": "B"}
+    assert second == {"hot:a": "A"}
+    assert trips_after_first == trips_total == 1  # the second read is an L1 hit
+    assert 55 < l1_ttl <= 60  # L1 entry expires with the remaining Redis TTL, not the L1 cap
+
+
+def test_get_many_treats_undecodable_entries_as_misses():
+    async def scenario():
+        service, text, _ = _service()
+        await text.set("bad", "{not json", ex=60)
+        await text.set("good", json.dumps({"ok": True}), ex=60)
+        return await service.get_many(["bad", "good"])
+
+    assert asyncio.run(scenario()) == {"bad": None, "good": {"ok": True}}
+
+
+def test_get_many_bytes_feeds_the_dataframe_codec():
+    frame = pd.DataFrame({"Close": [1.0, 2.0]}, index=pd.DatetimeIndex(["2024-01-01", "2024-01-02"], tz="UTC", name="Date"))
+
+    async def scenario():
+        service, _, binary = _service()
+        assert await service.set_bytes("payload", encode_dataframe(frame), timeout_seconds=60)
+        assert await service.set("marker", "FETCH_FAILED", timeout_seconds=60)
+        raw = await service.get_many_bytes(["payload", "marker", "missing"])
+        return raw, binary.round_trips
+
+    raw, round_trips = asyncio.run(scenario())
+    assert round_trips == 1
+    pd.testing.assert_frame_equal(decode_cache_entry(raw["payload"]), frame)
+    assert decode_cache_entry(raw["marker"]) == "FETCH_FAILED"
+    assert raw["missing"] is None and decode_cache_entry(raw["missing"]) is None
+
+
+def test_corrupt_redis_value_is_not_promoted_to_l1():
+    async def scenario():
+        service, text, _ = _service(l1_prefixes=("hot:",))
+        await text.set("hot:bad", "{not json", ex=60)
+        single = [await service.get("hot:bad") for _ in range(2)]
+        batch = await service.get_many(["hot:bad"])
+        return single, batch, "hot:bad" in service.l1._entries
+
+    single, batch, in_l1 = asyncio.run(scenario())
+    assert single == [None, None] and batch == {"hot:bad": None}
+    assert in_l1 is False
+
+
+def test_undecodable_l1_entry_is_invalidated():
+    async def scenario():
+        service, text, _ = _service(l1_prefixes=("hot:",))
+        await text.set("hot:a", json.dumps("A"), ex=60)
+        service.l1.put("hot:a", "{not json", 60)
+        first = await service.get("hot:a")  # the bad L1 entry is dropped
+        second = await service.get("hot:a")  # ...so this read goes to Redis again
+        return first, second
+
+    assert asyncio.run(scenario()) == (None, "A")
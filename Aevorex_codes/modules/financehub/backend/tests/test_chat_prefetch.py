@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+try:
+    from modules.financehub.backend.core.chat import chat_prefetch
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+
+class _StockFetch:
+    """Stands in for process_premium_stock_data; finishes only when `release` is set."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, symbol, client, cache, force_refresh):
+        self.calls.append(symbol)
+        await self.release.wait()
+        return None  # no model: the fragment warm-up callback must cope
+
+
+class _HangingCache:
+    def __init__(self):
+        self.cancelled = False
+
+    async def get(self, key):
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+@pytest.fixture()
+def stock_fetch(monkeypatch):
+    fetch = _StockFetch()
+    monkeypatch.setattr(chat_prefetch, "process_premium_stock_data", fetch)
+    return fetch
+
+
+def test_query_type_without_sections_never_starts_the_stock_fetch(stock_fetch):
+    async def scenario():
+        prefetch = chat_prefetch.start_chat_prefetch("AAPL", "Hello there!", client=None, cache=_HangingCache())
+        await asyncio.sleep(0)
+        return prefetch, await prefetch.stock_data(wait_seconds=0.01)
+
+    prefetch, data = asyncio.run(scenario())
+    assert prefetch.sections == () and prefetch.stock_task is None
+    assert data is None and stock_fetch.calls == []
+
+
+def test_stock_data_times_out_but_the_fetch_keeps_running(stock_fetch):
+    async def scenario():
+        prefetch = chat_prefetch.start_chat_prefetch("AAPL", "What's the RSI of TSLA?", client=None, cache=_HangingCache())
+        early = await prefetch.stock_data(wait_seconds=0.05)
+        still_running = not prefetch.stock_task.done()
+        prefetch.release()
+        stock_fetch.release.set()
+        await asyncio.wait({prefetch.stock_task}, timeout=1)
+        return early, still_running, prefetch.stock_task
+
+    early, still_running, task = asyncio.run(scenario())
+    assert early is None and still_running
+    assert task.done() and not task.cancelled() and task.result() is None  # finished in the background
+    assert stock_fetch.calls == ["AAPL"]
+
+
+def test_release_cancels_the_session_model_lookup(stock_fetch):
+    cache = _HangingCache()
+
+    async def scenario():
+        prefetch = chat_prefetch.start_chat_prefetch("AAPL", "Hello there!", client=None, cache=cache, session_id="s1")
+        await asyncio.sleep(0)
+        prefetch.release()
+        await asyncio.gather(prefetch.model_task, return_exceptions=True)
+        return prefetch.model_task
+
+    model_task = asyncio.run(scenario())
+    assert model_task.cancelled() and cache.cancelled
@@ -0,0 +1,124 @@
+import asyncio
+import json
+
+from modules.financehub.backend.core.circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreakerConfig,
+    CircuitBreakerRegistry,
+    ProviderCircuitBreaker,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, px=None):
+        self.data[key] = value
+
+
+_CONFIG = CircuitBreakerConfig(window_seconds=60, min_calls=4, error_rate_threshold=0.5, slow_call_seconds=5, open_seconds=30)
+
+
+def test_breaker_opens_on_error_rate_and_recovers_after_probe():
+    clock = _Clock()
+    breaker = ProviderCircuitBreaker("fmp", _CONFIG, clock=clock)
+    assert not breaker.record(False, 0.1)
+    assert not breaker.record(True, 0.1)
+    assert not breaker.record(False, 0.1)
+    assert breaker.record(False, 0.1)  # 3/4 errors with min_calls reached
+    assert breaker.state == STATE_OPEN and not breaker.allows_calls()
+
+    clock.now += 31
+    assert breaker.state == STATE_HALF_OPEN and breaker.try_acquire()
+    assert breaker.record(False, 0.1)  # failed probe re-opens
+    assert breaker.state == STATE_OPEN
+
+    clock.now += 31
+    assert breaker.try_acquire()
+    breaker.record(True, 0.1)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.times_opened == 2
+
+
+def test_breaker_opens_on_slow_calls_and_forgets_old_calls():
+    clock = _Clock()
+    breaker = ProviderCircuitBreaker("yfinance", _CONFIG, clock=clock)
+    for _ in range(3):
+        breaker.record(False, 0.1)
+    clock.now += 61  # errors fall out of the window
+    assert breaker.stats()["calls"] == 0
+    for _ in range(3):
+        assert not breaker.record(True, 6.0)
+    assert breaker.record(True, 6.0)
+    assert "slower than" in breaker.snapshot()["reason"]
+
+
+def test_registry_shares_open_state_through_redis():
+    async def scenario():
+        clock = _Clock()
+        redis = _FakeRedis()
+        worker_a = CircuitBreakerRegistry(_CONFIG, redis_client=redis, clock=clock)
+        worker_b = CircuitBreakerRegistry(_CONFIG, redis_client=redis, clock=clock)
+        assert await worker_b.is_available("eodhd")
+        for _ in range(4):
+            await worker_a.record("eodhd", False, 0.2)
+        before_refresh = await worker_b.is_available("eodhd")
+        clock.now += 3
+        after_refresh = await worker_b.is_available("eodhd")
+        return redis, before_refresh, after_refresh, await worker_b.shared_snapshot(["fmp"])
+
+    redis, before_refresh, after_refresh, snapshot = asyncio.run(scenario())
+    assert json.loads(redis.data["circuit:v1:eodhd"])["open_until"] == 1030.0
+    assert before_refresh is True  # remote state is polled at most every 2s
+    assert after_refresh is False
+    assert snapshot["eodhd"]["state"] == STATE_OPEN
+    assert snapshot["fmp"]["state"] == STATE_CLOSED
+
+
+def test_half_open_admits_a_single_probe_among_concurrent_callers():
+    async def scenario():
+        clock = _Clock()
+        registry = CircuitBreakerRegistry(_CONFIG, clock=clock)
+        for _ in range(4):
+            await registry.record("fmp", False, 0.1)
+        clock.now += 31  # half-open
+
+        async def caller():
+            return await registry.acquire("fmp")
+
+        admitted = await asyncio.gather(*(caller() for _ in range(5)))
+        routing_view = await registry.is_available("fmp")
+        probe_snapshot = registry.snapshot()["fmp"]
+        await registry.record("fmp", True, 0.1)  # probe succeeds
+        after_probe = await asyncio.gather(*(caller() for _ in range(3)))
+        return admitted, routing_view, probe_snapshot, after_probe, registry.get("fmp")
+
+    admitted, routing_view, probe_snapshot, after_probe, breaker = asyncio.run(scenario())
+    assert admitted.count(True) == 1
+    assert routing_view is False  # routing treats the provider as busy while the probe runs
+    assert probe_snapshot["state"] == STATE_HALF_OPEN and probe_snapshot["probe_in_flight"] is True
+    assert after_probe == [True, True, True] and breaker.state == STATE_CLOSED
+
+
+def test_stale_half_open_probe_is_handed_to_the_next_caller():
+    clock = _Clock()
+    breaker = ProviderCircuitBreaker("eodhd", _CONFIG, clock=clock)
+    breaker.open(clock.now, "test")
+    assert breaker.try_acquire()
+    assert not breaker.try_acquire()
+    clock.now += 31  # the probe never recorded (e.g. cancelled); its lease expired
+    assert breaker.try_acquire()
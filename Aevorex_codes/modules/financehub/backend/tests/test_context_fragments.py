@@ -0,0 +1,54 @@
+from modules.financehub.backend.core.chat.context_fragments import (
+    ContextFragmentCache,
+    ContextFragments,
+    assemble_context,
+    estimate_tokens,
+)
+
+
+def _fragments(version="v1"):
+    return ContextFragments.build(
+        "AAPL",
+        version,
+        "--- AAPL ---",
+        {
+            "indicators": "  RSI: 55.00\n  MACD: 1.20",
+            "price": "  Legutóbbi ár: 190.00",
+            "overview": "  Leírás: " + "x" * 400,
+            "news": "",
+        },
+    )
+
+
+def test_assemble_keeps_priority_order_and_respects_budget():
+    fragments = _fragments()
+    assert "news" not in fragments.fragments
+
+    text, included = assemble_context(fragments, ("overview", "indicators", "price"))
+    assert included == ("overview", "indicators", "price")
+    assert text.startswith("--- AAPL ---\n  Leírás")
+
+    # A nagy áttekintés nem fér bele, a kisebb, későbbi szekciók igen
+    budget = estimate_tokens("--- AAPL ---") + fragments.tokens["indicators"] + fragments.tokens["price"]
+    text, included = assemble_context(fragments, ("overview", "indicators", "price"), token_budget=budget)
+    assert included == ("indicators", "price")
+    assert "Leírás" not in text
+
+    assert assemble_context(fragments, ("news",)) == ("", ())
+
+
+def test_cache_reuses_fragments_until_version_changes():
+    cache = ContextFragmentCache(max_symbols=1)
+    renders = []
+
+    def render(version):
+        renders.append(version)
+        return _fragments(version)
+
+    first = cache.get_or_build("aapl", "v1", lambda: render("v1"))
+    assert cache.get_or_build("AAPL", "v1", lambda: render("v1")) is first
+    cache.get_or_build("AAPL", "v2", lambda: render("v2"))
+    cache.get_or_build("MSFT", "v1", lambda: render("v1"))  # kiszorítja az AAPL-t
+    cache.get_or_build("AAPL", "v2", lambda: render("v2"))
+    assert renders == ["v1", "v2", "v1", "v2"]
+    assert cache.stats() == {"symbols": 1, "hits": 1, "misses": 4}
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+try:
+    from modules.financehub.backend.core.chat.context_manager import (
+        InMemoryHistoryManager,
+        RedisHistoryManager,
+        _decode_message,
+        _encode_message,
+    )
+    from modules.financehub.backend.models.chat import ChatMessage, ChatRole
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _msg(content, role=ChatRole.USER, **extra):
+    return ChatMessage(role=role, content=content, **extra)
+
+
+def _contents(history):
+    return [m.content for m in history]
+
+
+def test_lru_eviction_at_max_conversations_drops_history_and_lock():
+    async def scenario():
+        manager = InMemoryHistoryManager(max_conversations=2)
+        await manager.add_message("a", _msg("a1"))
+        await manager.add_message("b", _msg("b1"))
+        await manager.get_history("a")  # "a" becomes most recently used
+        await manager.add_message("c", _msg("c1"))
+        state = list(manager.histories), set(manager.locks), set(manager._last_access)
+        return manager, state, await manager.get_history("a"), await manager.get_history("b")
+
+    manager, (conversations, locks, accessed), history_a, history_b = asyncio.run(scenario())
+    assert conversations == ["a", "c"]
+    assert locks == accessed == {"a", "c"}  # the evicted conversation's lock is gone too
+    assert _contents(history_a) == ["a1"] and history_b == []
+    assert manager.evictions == 1
+
+
+def test_idle_conversations_expire_with_injected_clock():
+    clock = _Clock()
+
+    async def scenario():
+        manager = InMemoryHistoryManager(ttl_seconds=60, clock=clock)
+        await manager.add_message("old", _msg("first"))
+        clock.now += 30
+        await manager.add_message("fresh", _msg("second"))
+        clock.now += 40  # "old" idle 70s, "fresh" idle 40s
+        kept = await manager.get_history("fresh")
+        expired = await manager.get_history("old")
+        clock.now += 61
+        await manager.add_message("new", _msg("third"))  # the write sweeps expired conversations
+        return manager, kept, expired
+
+    manager, kept, expired = asyncio.run(scenario())
+    assert _contents(kept) == ["second"] and expired == []
+    assert list(manager.histories) == ["new"]
+
+
+def test_encode_decode_round_trip():
+    stamp = datetime(2024, 5, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)
+    message = _msg("Mi a helyzet az OTP-vel? ✓", role=ChatRole.ASSISTANT, timestamp=stamp, metadata={"model": "x"})
+    encoded = _encode_message(message)
+    assert encoded.startswith('["a",')
+    decoded = _decode_message(encoded)
+    assert decoded.role == ChatRole.ASSISTANT and decoded.content == message.content
+    assert decoded.timestamp == stamp and decoded.metadata == {"model": "x"}
+    assert _decode_message("{not json") is None
+
+
+def test_redis_history_limit_returns_newest_messages_in_chronological_order():
+    async def scenario():
+        client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        manager = RedisHistoryManager(client, max_messages_per_conversation=4, ttl_seconds=120)
+        for n in range(6):
+            await manager.add_message("conv", _msg(f"m{n}"))
+        limited = await manager.get_history("conv", limit=3)
+        full = await manager.get_history("conv")
+        return limited, full, await client.ttl("chat:hist:conv")
+
+    limited, full, ttl = asyncio.run(scenario())
+    assert _contents(limited) == ["m3", "m4", "m5"]
+    assert _contents(full) == ["m2", "m3", "m4", "m5"]  # LTRIM kept the newest four
+    assert 0 < ttl <= 120
@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from modules.financehub.backend.core.dataframe_codec import (  # noqa: E402
+    DataFrameCodecError,
+    decode_cache_entry,
+    decode_dataframe,
+    encode_dataframe,
+    is_encoded_dataframe,
+)
+
+# -----------------------------------------------------------------------------
+# PyTest fixtures
+# -----------------------------------------------------------------------------
+@pytest.fixture()
+def ohlcv_df():
+    """Small tz-aware OHLCV frame shaped like the fetcher output."""
+    index = pd.date_range("2024-01-01", periods=5, freq="D", tz="UTC", name="Date")
+    return pd.DataFrame(
+        {
+            "open": [1.0, 2.0, np.nan, 4.0, 5.0],
+            "high": [1.5, 2.5, 3.5, 4.5, 5.5],
+            "low": [0.5, 1.5, 2.5, 3.5, 4.5],
+            "close": [1.2, 2.2, 3.2, 4.2, 5.2],
+            "adj_close": [1.2, 2.2, 3.2, 4.2, 5.2],
+            "volume": [10, 20, 30, 40, 50],
+        },
+        index=index,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Round-trip tests
+# -----------------------------------------------------------------------------
+def test_ohlcv_round_trip(ohlcv_df):
+    """Numeric columns, NaN values, index name and timezone survive a round trip."""
+    payload = encode_dataframe(ohlcv_df)
+    assert is_encoded_dataframe(payload)
+    pd.testing.assert_frame_equal(decode_dataframe(payload), ohlcv_df, check_freq=False)
+
+
+def test_mixed_dtypes_round_trip():
+    """Nullable ints, datetime and object columns are restored with their dtypes."""
+    df = pd.DataFrame(
+        {
+            "split_ratio_str": ["2/1", None, "4/1"],
+            "amount": pd.array([1, None, 3], dtype="Int64"),
+            "paid": pd.to_datetime(["2024-01-01", None, "2024-03-01"]),
+        },
+        index=pd.DatetimeIndex(["2024-01-01", "2024-02-01", "2024-03-01"], name="date"),
+    )
+    pd.testing.assert_frame_equal(decode_dataframe(encode_dataframe(df)), df)
+
+
+def test_empty_frame_round_trip():
+    """An empty frame keeps its columns and DatetimeIndex."""
+    df = pd.DataFrame(columns=["Open", "Close"], index=pd.DatetimeIndex([], tz="UTC", name="Date"))
+    restored = decode_dataframe(encode_dataframe(df))
+    assert list(restored.columns) == ["Open", "Close"]
+    assert isinstance(restored.index, pd.DatetimeIndex)
+    assert str(restored.index.tz) == "UTC"
+
+
+# -----------------------------------------------------------------------------
+# Cache entry handling
+# -----------------------------------------------------------------------------
+def test_decode_cache_entry_passes_json_markers_through():
+    """Failure markers written via CacheService.set are plain JSON strings."""
+    assert decode_cache_entry(json.dumps("FETCH_FAILED_V1").encode()) == "FETCH_FAILED_V1"
+    assert decode_cache_entry(None) is None
+
+
+def test_corrupted_payload_raises(ohlcv_df):
+    payload = encode_dataframe(ohlcv_df)
+    with pytest.raises(DataFrameCodecError):
+        decode_dataframe(payload[:-8])
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from modules.financehub.backend.core.hedging import (
+    OUTCOME_BUDGET_EXHAUSTED,
+    OUTCOME_HEDGE_WON,
+    OUTCOME_NOT_NEEDED,
+    OUTCOME_PRIMARY_WON,
+    HedgeBudget,
+    HedgedRequester,
+    LatencyTracker,
+)
+
+
+def _source(value, delay, calls):
+    async def fetch():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+
+    return fetch
+
+
+def _requester(outcomes, max_ratio=0.5):
+    return HedgedRequester(
+        HedgeBudget(max_ratio),
+        default_delay_seconds=0.02,
+        min_delay_seconds=0.01,
+        on_outcome=lambda primary, alternate, outcome: outcomes.append(outcome),
+    )
+
+
+def test_fast_primary_is_not_hedged():
+    outcomes, calls = [], []
+    result = asyncio.run(
+        _requester(outcomes).run(("eodhd", _source("e", 0, calls)), ("yfinance", _source("y", 0, calls)), lambda s, r: True)
+    )
+    assert result == ("eodhd", "e")
+    assert calls == ["e"]
+    assert outcomes == [OUTCOME_NOT_NEEDED]
+
+
+def test_slow_primary_is_hedged_and_first_valid_result_wins():
+    async def scenario():
+        outcomes, calls = [], []
+        requester = _requester(outcomes)
+        hedge_won = await requester.run(("eodhd", _source("e", 0.5, calls)), ("yfinance", _source("y", 0, calls)), lambda s, r: True)
+        # an invalid hedge result is ignored and the slower primary still wins
+        primary_won = await requester.run(
+            ("eodhd", _source("e", 0.1, calls)), ("yfinance", _source("bad", 0, calls)), lambda s, r: r != "bad"
+        )
+        return hedge_won, primary_won, outcomes
+
+    hedge_won, primary_won, outcomes = asyncio.run(scenario())
+    assert hedge_won == ("yfinance", "y")
+    assert primary_won == ("eodhd", "e")
+    assert outcomes == [OUTCOME_HEDGE_WON, OUTCOME_PRIMARY_WON]
+
+
+def test_budget_caps_hedge_share_of_traffic():
+    clock_now = [0.0]
+    budget = HedgeBudget(max_ratio=0.2, window_seconds=60, clock=lambda: clock_now[0])
+    for _ in range(4):
+        budget.record_request()
+    assert budget.try_acquire()  # 1 hedge of 5 requests = 20%
+    budget.record_request()
+    assert not budget.try_acquire()
+    clock_now[0] = 61
+    budget.record_request()
+    assert budget.try_acquire() is False  # 1 of 2 would exceed 20%
+
+    async def scenario():
+        outcomes, calls = [], []
+        requester = _requester(outcomes, max_ratio=0.01)
+        result = await requester.run(("eodhd", _source("e", 0.05, calls)), ("yfinance", _source("y", 0, calls)), lambda s, r: True)
+        return result, calls, outcomes
+
+    result, calls, outcomes = asyncio.run(scenario())
+    assert result == ("eodhd", "e") and calls == ["e"]
+    assert outcomes == [OUTCOME_BUDGET_EXHAUSTED]
+
+
+def test_latency_tracker_quantile_drives_hedge_delay():
+    tracker = LatencyTracker(min_samples=10)
+    for i in range(1, 11):
+        tracker.observe("eodhd", i / 10)
+    assert tracker.quantile("eodhd", 0.9) == pytest.approx(0.9)
+    assert tracker.quantile("yfinance", 0.9) is None
+    requester = HedgedRequester(HedgeBudget(0.1), latency=tracker, default_delay_seconds=2.0, max_delay_seconds=0.5)
+    assert requester.hedge_delay("eodhd") == 0.5
+    assert requester.hedge_delay("yfinance") == 0.5
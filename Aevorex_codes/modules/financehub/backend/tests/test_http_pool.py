@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+
+from modules.shared import http_pool
+from modules.shared.http_pool import UpstreamClientPool, UpstreamConfig
+
+
+def _transport_client(pool, upstream, handler):
+    """Pooled client whose network layer is an httpx.MockTransport (keeps the pool's hooks)."""
+    client = pool.client(upstream)
+    client._transport = httpx.MockTransport(handler)
+    return client
+
+
+def test_client_falls_back_to_http1_without_h2(monkeypatch):
+    monkeypatch.setattr(http_pool, "HTTP2_AVAILABLE", False)
+    pool = UpstreamClientPool()
+    pool.configure("api", UpstreamConfig(base_url="https://example.test", http2=True))
+    client = pool.client("api")  # httpx raises ImportError here if http2=True is passed without h2
+    assert client._transport._pool._http2 is False
+    assert client is pool.client("api")  # one long-lived client per upstream
+    asyncio.run(pool.aclose())
+    assert client.is_closed
+
+
+def test_reconfigure_replaces_client_and_requests_are_counted():
+    seen = []
+    pool = UpstreamClientPool(on_request=lambda upstream, reused: seen.append((upstream, reused)))
+    pool.configure("api", UpstreamConfig(base_url="https://example.test", http2=False))
+
+    async def scenario():
+        client = _transport_client(pool, "api", lambda request: httpx.Response(200, json={"ok": True}))
+        response = await client.get("/ping")
+        pool.configure("api", UpstreamConfig(base_url="https://example.test", http2=False, max_connections=5))
+        replaced = pool.client("api")
+        await pool.aclose()
+        return response, client, replaced
+
+    response, first, replaced = asyncio.run(scenario())
+    assert response.json() == {"ok": True}
+    assert replaced is not first
+    # MockTransport opens no TCP connection, so the request counts as reused
+    assert seen == [("api", True)]
+    assert pool.stats() == {"api": {"requests": 1, "new_connections": 0, "reused": 1}}
+
+
+def test_unknown_upstream_and_missing_warmup_path():
+    pool = UpstreamClientPool()
+    try:
+        pool.client("nope")
+    except KeyError:
+        pass
+    else:  # pragma: no cover
+        raise AssertionError("unknown upstream must raise KeyError")
+    pool.configure("api", UpstreamConfig(base_url="https://example.test", http2=False))
+    assert asyncio.run(pool.warm_up("api")) is False
@@ -0,0 +1,86 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from modules.financehub.backend.core.indicator_columnar import (  # noqa: E402
+    MACD_HIST_DOWN_COLOR,
+    MACD_HIST_UP_COLOR,
+    STOCH_D_KEY,
+    STOCH_K_KEY,
+    VOLUME_CLOSE_KEY,
+    VOLUME_DOWN_COLOR,
+    VOLUME_OPEN_KEY,
+    VOLUME_UP_COLOR,
+    ColumnarIndicatorHistory,
+)
+
+
+# -----------------------------------------------------------------------------
+# PyTest fixtures
+# -----------------------------------------------------------------------------
+@pytest.fixture()
+def index():
+    return pd.date_range("2024-01-01", periods=4, freq="D", tz="America/New_York")
+
+
+def _unix(ts) -> int:
+    return int(ts.timestamp())
+
+
+# -----------------------------------------------------------------------------
+# Payload shape
+# -----------------------------------------------------------------------------
+def test_payload_matches_indicator_history_dump_shape(index):
+    payload = ColumnarIndicatorHistory.from_index(index, {"SMA_SHORT": [np.nan, 1.5, math.inf, 2.5]}).to_payload()
+
+    assert list(payload) == ["sma", "ema", "bbands", "rsi", "volume", "volume_sma", "macd", "stoch"]
+    assert payload["ema"] is None
+    assert payload["sma"] == {
+        "SMA_SHORT": [{"t": _unix(index[1]), "value": 1.5}, {"t": _unix(index[3]), "value": 2.5}],
+        "SMA_LONG": None,
+    }
+    assert payload["macd"] == {"MACD_LINE": None, "MACD_SIGNAL": None, "MACD_HIST": None}
+    assert payload["stoch"] == {"STOCH": None}
+
+
+def test_empty_history_has_all_none_series():
+    payload = ColumnarIndicatorHistory.empty().to_payload()
+    assert payload["rsi"] == {"RSI": None}
+    assert payload["volume"] == {"VOLUME": None}
+
+
+# -----------------------------------------------------------------------------
+# Coloured / paired series
+# -----------------------------------------------------------------------------
+def test_volume_and_macd_hist_colors(index):
+    history = ColumnarIndicatorHistory.from_index(index, {
+        "VOLUME": [100.4, np.nan, -5.0, 300.0],
+        VOLUME_OPEN_KEY: [10.0, 10.0, 10.0, 12.0],
+        VOLUME_CLOSE_KEY: [10.0, 11.0, 11.0, 11.0],
+        "MACD_HIST": [0.0, -0.5, np.nan, 0.25],
+    })
+    payload = history.to_payload()
+
+    assert payload["volume"]["VOLUME"] == [
+        {"t": _unix(index[0]), "value": 100, "color": VOLUME_UP_COLOR},
+        {"t": _unix(index[3]), "value": 300, "color": VOLUME_DOWN_COLOR},
+    ]
+    assert [p["color"] for p in payload["macd"]["MACD_HIST"]] == [
+        MACD_HIST_UP_COLOR, MACD_HIST_DOWN_COLOR, MACD_HIST_UP_COLOR,
+    ]
+
+
+def test_stoch_requires_both_lines_in_range(index):
+    history = ColumnarIndicatorHistory.from_index(index, {
+        STOCH_K_KEY: [np.nan, 20.0, 101.0, 80.0],
+        STOCH_D_KEY: [10.0, 25.0, 50.0, np.nan],
+    })
+    assert history.to_payload()["stoch"]["STOCH"] == [{"t": _unix(index[1]), "k": 20.0, "d": 25.0}]
+
+
+def test_length_mismatch_is_rejected(index):
+    with pytest.raises(ValueError):
+        ColumnarIndicatorHistory.from_index(index, {"RSI": [1.0, 2.0]})
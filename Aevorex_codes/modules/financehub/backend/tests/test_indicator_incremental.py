@@ -0,0 +1,101 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from modules.financehub.backend.core.indicator_incremental import (  # noqa: E402
+    MODE_FULL,
+    MODE_HIT,
+    MODE_INCREMENTAL,
+    IndicatorParams,
+    compute_indicator_frame,
+    extend_indicator_frame,
+    indicator_frame_payload,
+)
+
+
+# -----------------------------------------------------------------------------
+# PyTest fixtures
+# -----------------------------------------------------------------------------
+@pytest.fixture()
+def bars():
+    rng = np.random.default_rng(7)
+    periods = 200
+    close = 100 + np.cumsum(rng.normal(0, 1, periods))
+    index = pd.date_range("2023-01-02", periods=periods, freq="D", tz="UTC")
+    return pd.DataFrame({
+        "open": close + rng.normal(0, 0.3, periods),
+        "high": close + rng.random(periods),
+        "low": close - rng.random(periods),
+        "close": close,
+        "volume": rng.integers(1_000, 5_000, periods).astype(float),
+    }, index=index)
+
+
+@pytest.fixture()
+def params():
+    return IndicatorParams()
+
+
+def _assert_frames_equal(left, right):
+    assert list(left.index) == list(right.index)
+    np.testing.assert_allclose(left.to_numpy(), right.to_numpy(), rtol=1e-9, equal_nan=True)
+
+
+# -----------------------------------------------------------------------------
+# TA-Lib compatible seeding
+# -----------------------------------------------------------------------------
+def test_rsi_matches_wilder_reference(bars, params):
+    close = bars["close"].to_numpy()
+    period = params.rsi_period
+    diff = np.diff(close)
+    avg_gain, avg_loss = np.clip(diff[:period], 0, None).mean(), np.clip(-diff[:period], 0, None).mean()
+    expected = [100 * avg_gain / (avg_gain + avg_loss)]
+    for change in diff[period:]:
+        avg_gain = (avg_gain * (period - 1) + max(change, 0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-change, 0)) / period
+        expected.append(100 * avg_gain / (avg_gain + avg_loss))
+
+    rsi = compute_indicator_frame(bars, params)["RSI"].to_numpy()
+    assert np.isnan(rsi[:period]).all()
+    np.testing.assert_allclose(rsi[period:], expected, rtol=1e-9)
+
+
+def test_macd_starts_after_slow_and_signal_lookback(bars, params):
+    frame = compute_indicator_frame(bars, params)
+    lookback = params.macd_slow + params.macd_signal - 2
+    assert frame["MACD_SIGNAL"].iloc[:lookback].isna().all()
+    assert frame["MACD_LINE"].iloc[lookback:].notna().all()
+
+
+# -----------------------------------------------------------------------------
+# Incremental extension
+# -----------------------------------------------------------------------------
+def test_appended_bars_match_full_recompute(bars, params):
+    previous = compute_indicator_frame(bars.iloc[:150], params)
+    frame, mode = extend_indicator_frame(previous, bars, params)
+    assert mode == MODE_INCREMENTAL
+    _assert_frames_equal(frame, compute_indicator_frame(bars, params))
+
+
+def test_revised_last_bar_is_recomputed(bars, params):
+    previous = compute_indicator_frame(bars.iloc[:150], params)
+    revised = bars.copy()
+    revised.iloc[149, revised.columns.get_loc("close")] += 3.0
+    frame, mode = extend_indicator_frame(previous, revised, params)
+    assert mode == MODE_INCREMENTAL
+    _assert_frames_equal(frame, compute_indicator_frame(revised, params))
+
+
+def test_unchanged_window_is_a_hit_and_payload_is_sliced(bars, params):
+    previous = compute_indicator_frame(bars, params)
+    frame, mode = extend_indicator_frame(previous, bars.iloc[20:], params)
+    assert mode == MODE_HIT
+    payload = indicator_frame_payload(frame, bars.index[20])
+    assert len(payload["volume"]["VOLUME"]) == 180
+
+
+def test_param_change_or_earlier_start_forces_full(bars, params):
+    previous = compute_indicator_frame(bars.iloc[20:], params)
+    assert extend_indicator_frame(previous, bars.iloc[20:], IndicatorParams(sma_short=5))[1] == MODE_FULL
+    assert extend_indicator_frame(previous, bars, params)[1] == MODE_FULL
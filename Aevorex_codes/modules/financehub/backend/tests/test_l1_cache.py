@@ -0,0 +1,69 @@
+from modules.financehub.backend.core.l1_cache import L1Cache
+
+
+class _FakeClock:
+    """Manually advanced monotonic clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _make_cache(**kwargs):
+    clock = _FakeClock()
+    params = {"max_entries": 3, "max_bytes": 1024, "max_ttl_seconds": 30}
+    params.update(kwargs)
+    return L1Cache(clock=clock, **params), clock
+
+
+def test_lru_eviction_by_entry_count():
+    cache, _ = _make_cache()
+    for key in ("a", "b", "c"):
+        cache.put(key, '"v"', 10)
+    cache.get("a")  # "a" becomes most recently used
+    cache.put("d", '"v"', 10)
+    assert cache.get("b") is None
+    assert cache.get("a") == '"v"'
+    assert cache.stats()["entries"] == 3
+
+
+def test_byte_cap_and_oversized_values():
+    cache, _ = _make_cache(max_entries=100, max_bytes=10)
+    assert cache.put("a", "12345", 10)
+    assert cache.put("b", "12345", 10)
+    assert cache.put("c", "12345", 10)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 10
+    assert not cache.put("huge", "x" * 11, 10)
+
+
+def test_size_is_counted_in_utf8_bytes():
+    cache, _ = _make_cache(max_entries=100, max_bytes=12)
+    assert cache.put("hu", "árfolyam", 10)  # 8 characters, 9 bytes
+    assert cache.stats()["bytes"] == 9
+    assert not cache.put("long", "őőőőőőő", 10)  # 7 characters but 14 bytes
+
+
+def test_ttl_is_capped_by_max_ttl():
+    cache, clock = _make_cache(max_ttl_seconds=5)
+    cache.put("a", '"v"', 600)
+    clock.now = 4.9
+    assert cache.get("a") == '"v"'
+    clock.now = 5.0
+    assert cache.get("a") is None
+
+
+def test_put_skipped_after_concurrent_invalidation():
+    cache, _ = _make_cache()
+    epoch = cache.epoch
+    cache.invalidate("a")
+    assert not cache.put("a", '"stale"', 10, epoch=epoch)
+    assert cache.get("a") is None
+
+
+def test_key_prefix_filter():
+    cache, _ = _make_cache(key_prefixes=("ticker_tape_data",))
+    assert not cache.put("other", '"v"', 10)
+    assert cache.put("ticker_tape_data", '"v"', 10)
@@ -0,0 +1,91 @@
+import asyncio
+
+import httpx
+import pytest
+
+try:
+    from modules.financehub.backend.config import settings
+    from modules.financehub.backend.core.fetchers import _base_helpers as bh
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+from modules.financehub.backend.core.circuit_breaker import (  # noqa: E402
+    STATE_HALF_OPEN,
+    CircuitBreakerConfig,
+    CircuitBreakerRegistry,
+)
+from modules.financehub.backend.core.rate_limiter import RateLimitTimeout  # noqa: E402
+
+
+class _DictCache:
+    def __init__(self):
+        self.data, self.reads = {}, []
+
+    async def get(self, key):
+        self.reads.append(key)
+        return self.data.get(key)
+
+    async def set(self, key, value, timeout_seconds=None):
+        self.data[key] = value
+        return True
+
+
+@pytest.fixture(autouse=True)
+def _isolated_helpers(monkeypatch):
+    monkeypatch.setattr(bh, "CACHE_ENABLED", True)
+    monkeypatch.setattr(settings.RATE_LIMIT, "ENABLED", False)
+    monkeypatch.setattr(settings.CIRCUIT_BREAKER, "ENABLED", True)
+    monkeypatch.setattr(settings.CIRCUIT_BREAKER, "REDIS_SHARED", False)
+    monkeypatch.setattr(bh, "FETCH_CIRCUIT_BREAKERS", CircuitBreakerRegistry())
+
+
+def _request(handler, cache, **kwargs):
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await bh.make_api_request(
+                client, "GET", "https://api.example.test/v1/news",
+                source_name_for_log="test", cache_service=cache, cache_key_for_failure="news:AAPL",
+                provider="example", **kwargs,
+            )
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("marker_checked", [False, True])
+def test_404_writes_the_failure_marker_on_both_paths(marker_checked):
+    cache = _DictCache()
+    result = _request(lambda request: httpx.Response(404, text="not found"), cache, failure_marker_checked=marker_checked)
+    assert result is None
+    assert cache.data == {"news:AAPL": bh.FETCH_FAILED_MARKER}
+    # a caller that already read the key skips only the marker read
+    assert cache.reads == ([] if marker_checked else ["news:AAPL"])
+
+
+def test_invalid_json_writes_the_failure_marker_on_the_normal_path():
+    cache = _DictCache()
+    assert _request(lambda request: httpx.Response(200, text="<html>"), cache, failure_marker_checked=True) is None
+    assert cache.data == {"news:AAPL": bh.FETCH_FAILED_MARKER}
+
+
+class _TimingOutLimiter:
+    store = None
+
+    async def acquire(self, provider, priority=None, max_wait=None):
+        raise RateLimitTimeout(provider, 5.0)
+
+
+def test_rate_limit_timeout_releases_the_half_open_probe(monkeypatch):
+    clock = [1000.0]
+    registry = CircuitBreakerRegistry(CircuitBreakerConfig(open_seconds=30), clock=lambda: clock[0])
+    registry.get("example").open(clock[0] + 30, "test")
+    clock[0] += 31  # half-open: the next call is the probe
+    monkeypatch.setattr(bh, "FETCH_CIRCUIT_BREAKERS", registry)
+    monkeypatch.setattr(bh, "FETCH_RATE_LIMITER", _TimingOutLimiter())
+    monkeypatch.setattr(settings.RATE_LIMIT, "ENABLED", True)
+    requests = []
+
+    result = _request(lambda request: requests.append(request) or httpx.Response(200, json={}), _DictCache())
+    breaker = registry.get("example")
+    assert result is None and requests == []
+    assert breaker.state == STATE_HALF_OPEN and breaker.probe_in_flight is False
+    assert breaker.try_acquire()  # the next caller gets the probe without waiting open_seconds
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+try:
+    from modules.financehub.backend.core import stock_data_service as sds
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+
+def _item(source, n):
+    return {"url": f"https://news.example/{source}/{n}", "title": f"{source} headline number {n} about the market", "source": source}
+
+
+SHARED = {"url": "https://news.example/shared", "title": "Syndicated headline seen by several providers", "source": "shared"}
+
+
+def _fetcher(items, delay=0.0, error=None, cancelled=None):
+    async def fetch(symbol, cache, client=None):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            if cancelled is not None:
+                cancelled.append(True)
+            raise
+        if error is not None:
+            raise error
+        return [dict(item) for item in items]
+
+    return fetch
+
+
+@pytest.fixture(autouse=True)
+def _passthrough_mapper(monkeypatch):
+    monkeypatch.setattr(sds.mappers, "map_raw_news_to_standard_dicts", lambda items, source: list(items))
+
+
+def _collect(order, fetchers, target=10, deadline=2.0):
+    return asyncio.run(sds._collect_news_concurrently(order, fetchers, "AAPL", None, None, target, deadline, "[test]"))
+
+
+def _sequential(order, items_by_source, target):
+    """What the sequential path merges when every source answers in time."""
+    merged, dedup = [], sds.NewsDeduplicator()
+    for source in order:
+        if len(merged) >= target:
+            break
+        if items_by_source.get(source):
+            sds._merge_news_source_dicts([dict(i) for i in items_by_source[source]], dedup, merged, target, source, "[test]")
+    return merged
+
+
+def test_merge_order_matches_sequential_path_when_low_priority_sources_finish_first():
+    items = {
+        "fmp": [_item("fmp", 1), SHARED, _item("fmp", 2)],
+        "marketaux": [SHARED, _item("marketaux", 1)],
+        "newsapi": [_item("newsapi", 1), _item("newsapi", 2), _item("newsapi", 3)],
+    }
+    order = ["fmp", "marketaux", "newsapi"]
+    fetchers = {
+        "fmp": _fetcher(items["fmp"], delay=0.15),
+        "marketaux": _fetcher(items["marketaux"], delay=0.05),
+        "newsapi": _fetcher(items["newsapi"]),
+    }
+    merged, errors, stats = _collect(order, fetchers, target=5)
+    assert merged == _sequential(order, items, target=5)
+    assert [m["url"] for m in merged][:2] == [_item("fmp", 1)["url"], SHARED["url"]]  # the shared item stays with fmp
+    assert errors == {}
+    assert stats["fmp"]["contributed"] == 3 and stats["newsapi"]["contributed"] == 1
+
+
+def test_slow_top_priority_source_is_cancelled_at_the_deadline():
+    cancelled = []
+    fetchers = {
+        "fmp": _fetcher([_item("fmp", 1)], delay=30, cancelled=cancelled),
+        "marketaux": _fetcher([_item("marketaux", 1)]),
+        "newsapi": _fetcher([_item("newsapi", 1)], delay=0.02),
+    }
+    merged, errors, stats = _collect(["fmp", "marketaux", "newsapi"], fetchers, deadline=0.2)
+    assert [m["source"] for m in merged] == ["marketaux", "newsapi"]  # finished sources keep priority order
+    assert cancelled == [True]
+    assert stats["fmp"] == {"status": "cancelled", "latency_ms": None, "contributed": 0}
+    assert errors == {}
+
+
+def test_failing_source_is_recorded_and_the_rest_still_merge():
+    fetchers = {
+        "fmp": _fetcher([], error=RuntimeError("upstream exploded")),
+        "marketaux": _fetcher([_item("marketaux", 1)]),
+        "newsapi": _fetcher([]),
+    }
+    merged, errors, stats = _collect(["fmp", "marketaux", "newsapi"], fetchers)
+    assert [m["source"] for m in merged] == ["marketaux"]
+    assert "upstream exploded" in errors["fmp"]
+    assert [stats[s]["status"] for s in ("fmp", "marketaux", "newsapi")] == ["error", "ok", "empty"]
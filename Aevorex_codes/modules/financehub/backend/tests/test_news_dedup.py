@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from modules.financehub.backend.core.news_dedup import (  # noqa: E402
+    NewsDeduplicator,
+    canonical_url,
+    dedupe_news_dicts,
+)
+
+
+# -----------------------------------------------------------------------------
+# Canonical URL
+# -----------------------------------------------------------------------------
+def test_canonical_url_drops_tracking_and_cosmetic_differences():
+    expected = canonical_url("https://reuters.com/markets/apple-beats?a=1&b=2")
+    assert canonical_url("HTTP://www.Reuters.com/markets/apple-beats/?utm_source=x&b=2&a=1#top") == expected
+    assert canonical_url("//reuters.com/markets/apple-beats?b=2&a=1&fbclid=abc") == expected
+
+
+def test_invalid_urls_are_rejected():
+    assert canonical_url(None) is None
+    assert canonical_url("not a url") is None
+    assert canonical_url("ftp://example.com/file") is None
+    dedup = NewsDeduplicator()
+    assert dedup.add("", "Some long enough headline about markets") is False
+    assert dedup.stats["invalid_url"] == 1
+
+
+# -----------------------------------------------------------------------------
+# Near-duplicate titles
+# -----------------------------------------------------------------------------
+def test_syndicated_headlines_collapse_to_first_item():
+    items = [
+        {"url": "https://reuters.com/a", "title": "Apple beats quarterly earnings estimates as iPhone sales surge - Reuters"},
+        {"url": "https://finance.yahoo.com/b", "title": "Apple Beats Quarterly Earnings Estimates as iPhone Sales Surge"},
+        {"url": "https://fmp.com/c", "title": "Tesla recalls two million vehicles over autopilot concerns"},
+        {"url": "https://www.reuters.com/a/?utm_medium=rss", "title": "Completely different title text here"},
+    ]
+    unique = dedupe_news_dicts(items)
+    assert [item["url"] for item in unique] == ["https://reuters.com/a", "https://fmp.com/c"]
+
+
+def test_short_titles_only_dedupe_by_url_and_limit_is_respected():
+    items = [{"url": f"https://example.com/{i}", "headline": "Stock market today"} for i in range(5)]
+    assert len(dedupe_news_dicts(items)) == 5
+    assert len(dedupe_news_dicts(items, limit=2)) == 2
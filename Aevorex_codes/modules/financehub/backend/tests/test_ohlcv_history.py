@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from modules.financehub.backend.core.dataframe_codec import decode_dataframe, encode_dataframe  # noqa: E402
+from modules.financehub.backend.core.ohlcv_history import (  # noqa: E402
+    HISTORY_ATTR_COVERED_FROM,
+    HISTORY_ATTR_FULL_REFRESH_AT,
+    has_new_corporate_action,
+    history_covers,
+    incremental_start,
+    mark_full_refresh,
+    merge_ohlcv_history,
+    slice_from,
+)
+
+
+# -----------------------------------------------------------------------------
+# PyTest fixtures
+# -----------------------------------------------------------------------------
+def _bars(start: str, periods: int, close_offset: float = 0.0, tz=None):
+    index = pd.date_range(start, periods=periods, freq="D", tz=tz, name="Date")
+    closes = [100.0 + i + close_offset for i in range(periods)]
+    return pd.DataFrame({"Close": closes, "Volume": list(range(periods))}, index=index)
+
+
+@pytest.fixture()
+def history():
+    df = _bars("2024-01-01", 5)
+    return mark_full_refresh(df, "2024-01-01", as_of=datetime(2024, 1, 5, tzinfo=timezone.utc))
+
+
+# -----------------------------------------------------------------------------
+# Merge / slice
+# -----------------------------------------------------------------------------
+def test_merge_replaces_overlapping_bar_and_appends(history):
+    """The re-fetched last bar wins, new bars are appended, attrs survive."""
+    new_bars = _bars("2024-01-05", 3, close_offset=0.5)
+    merged = merge_ohlcv_history(history, new_bars)
+
+    assert len(merged) == 7
+    assert merged.index.is_monotonic_increasing
+    assert merged.loc["2024-01-05", "Close"] == pytest.approx(100.5)
+    assert merged["Volume"].dtype == history["Volume"].dtype
+    assert merged.attrs[HISTORY_ATTR_COVERED_FROM] == "2024-01-01"
+
+
+def test_merge_aligns_timezone():
+    """Naive new bars are localized to the history's UTC index."""
+    utc_history = _bars("2024-01-01", 3, tz="UTC")
+    merged = merge_ohlcv_history(utc_history, _bars("2024-01-03", 2))
+    assert str(merged.index.tz) == "UTC"
+    assert len(merged) == 4
+
+
+def test_slice_and_coverage(history):
+    assert incremental_start(history) == pd.Timestamp("2024-01-05")
+    assert history_covers(history, "2024-01-03")
+    assert not history_covers(history, "2023-12-01")
+
+    sliced = slice_from(history, "2024-01-03")
+    assert list(sliced.index.strftime("%Y-%m-%d")) == ["2024-01-03", "2024-01-04", "2024-01-05"]
+    assert sliced.attrs == {}
+
+
+# -----------------------------------------------------------------------------
+# Corporate actions
+# -----------------------------------------------------------------------------
+def test_corporate_action_detection(history):
+    until = "2024-01-10"
+    # A teljes letöltés napján esedékes esemény már benne van az adatban
+    assert not has_new_corporate_action(history, [pd.Timestamp("2024-01-05", tz="America/New_York")], until=until)
+    assert has_new_corporate_action(history, ["2024-01-08"], until=until)
+    # Jövőbeli bejelentés nem vált ki teljes újratöltést
+    assert not has_new_corporate_action(history, ["2024-02-01"], until=until)
+    assert not has_new_corporate_action(history, [pd.NaT], until=until)
+
+    history.attrs.pop(HISTORY_ATTR_FULL_REFRESH_AT)
+    assert has_new_corporate_action(history, [], until=until)
+
+
+def test_history_attrs_survive_codec(history):
+    restored = decode_dataframe(encode_dataframe(history))
+    assert restored.attrs[HISTORY_ATTR_COVERED_FROM] == "2024-01-01"
+    assert restored.attrs[HISTORY_ATTR_FULL_REFRESH_AT] == "2024-01-05"
@@ -0,0 +1,79 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+
+from modules.financehub.backend.core.ohlcv_payload import (  # noqa: E402
+    CHART_RECORD_KEYS,
+    COMPACT_RECORD_KEYS,
+    columns_to_records,
+    normalize_ohlcv_columns,
+    ohlcv_to_columns,
+)
+
+
+# -----------------------------------------------------------------------------
+# PyTest fixtures
+# -----------------------------------------------------------------------------
+@pytest.fixture()
+def title_case_df():
+    """EODHD-style Title Case frame with a missing price and a missing volume."""
+    index = pd.date_range("2024-01-01", periods=3, freq="D", tz="America/New_York", name="Date")
+    return pd.DataFrame(
+        {
+            "Open": [1.0, np.nan, 3.0],
+            "High": [1.5, 2.5, 3.5],
+            "Low": [0.5, 1.5, 2.5],
+            "Close": [1.2, 2.2, 3.2],
+            "Adj Close": [1.1, 2.1, 3.1],
+            "Volume": [10, np.nan, 30],
+        },
+        index=index,
+    )
+
+
+# -----------------------------------------------------------------------------
+# Conversion tests
+# -----------------------------------------------------------------------------
+def test_normalize_columns_handles_case_and_spaces(title_case_df):
+    normalized = normalize_ohlcv_columns(title_case_df)
+    assert list(normalized.columns) == ["open", "high", "low", "close", "adj_close", "volume"]
+    assert list(title_case_df.columns)[0] == "Open"  # the input is left untouched
+
+
+def test_columns_match_per_row_conversion(title_case_df):
+    """Same values as the former iterrows() path: UTC epoch, NaN -> None."""
+    columns = ohlcv_to_columns(title_case_df, time_unit="s", with_dates=True)
+
+    assert columns["date"] == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert columns["t"] == [int(ts.timestamp()) for ts in title_case_df.index]
+    assert columns["o"] == [1.0, None, 3.0]
+    assert columns["v"] == [10, None, 30]
+    assert all(type(value) is float for value in columns["c"])
+    assert all(type(value) is int for value in columns["t"])
+
+
+def test_drop_incomplete_and_volume_fill(title_case_df):
+    columns = ohlcv_to_columns(title_case_df, drop_incomplete=True, volume_fill=0)
+    assert columns["t"] == [int(ts.timestamp() * 1000) for ts in title_case_df.index[[0, 2]]]
+    assert columns["v"] == [10, 30]
+
+    records = columns_to_records(columns, COMPACT_RECORD_KEYS)
+    assert records[0] == {"t": columns["t"][0], "o": 1.0, "h": 1.5, "l": 0.5, "c": 1.2, "v": 10}
+
+
+def test_pre_epoch_and_missing_columns():
+    index = pd.DatetimeIndex(["1969-12-31", "1970-01-02"], name="Date")
+    df = pd.DataFrame({"open": [1.0, 2.0], "high": [1.0, 2.0], "low": [1.0, 2.0], "close": [1.0, 2.0]}, index=index)
+
+    columns = ohlcv_to_columns(df, drop_pre_epoch=True)
+    assert columns["t"] == [86_400_000]
+    assert columns["v"] == [None]
+    assert ohlcv_to_columns(df.drop(columns=["low"])) is None
+
+
+def test_chart_records_shape(title_case_df):
+    columns = ohlcv_to_columns(title_case_df, time_unit="s", with_dates=True)
+    record = columns_to_records(columns, CHART_RECORD_KEYS)[1]
+    assert list(record) == ["date", "timestamp", "open", "high", "low", "close", "volume"]
+    assert record["open"] is None and record["volume"] is None
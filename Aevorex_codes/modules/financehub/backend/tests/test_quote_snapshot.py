@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+try:
+    from modules.financehub.backend.config import settings
+    from modules.financehub.backend.core import quote_snapshot_service as qss
+    from modules.financehub.backend.core import ticker_tape_service as tts
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+
+class _DictCache:
+    """Minimal async key-value store with the CacheService get/get_many/set/set_many surface."""
+
+    def __init__(self, data=None):
+        self.data = dict(data or {})
+        self.calls = []
+
+    async def get(self, key):
+        self.calls.append("get")
+        return self.data.get(key)
+
+    async def get_many(self, keys):
+        self.calls.append("get_many")
+        return {key: self.data.get(key) for key in keys}
+
+    async def set(self, key, value, timeout_seconds=None):
+        self.calls.append("set")
+        self.data[key] = value
+        return True
+
+    async def set_many(self, mapping, timeout_seconds=None):
+        self.calls.append("set_many")
+        self.data.update(mapping)
+        return True
+
+
+PROFILE = {"company_name": "Apple Inc.", "currency": "USD", "exchange": "NASDAQ", "sector": "Technology", "fallback_quote": None}
+INFO = {"longName": "Apple Inc.", "currency": "USD", "currentPrice": 190.0, "previousClose": 188.0, "dayHigh": 191.0, "volume": 5000}
+
+
+@pytest.fixture()
+def upstream(monkeypatch):
+    """Records real-time and yfinance info lookups; the API key is present unless the test clears it."""
+    calls = {"realtime": [], "info": [], "api_key": "test-key"}
+
+    async def fetch_single_ticker_quote(symbol, client, provider_config):
+        calls["realtime"].append(symbol)
+        return {"symbol": symbol, "price": 101.0, "change": 1.0, "change_percent": 1.0, "day_high": 102.0}
+
+    async def fetch_company_info_dict(symbol, cache):
+        calls["info"].append(symbol)
+        return dict(INFO)
+
+    monkeypatch.setattr(settings.CACHE, "SINGLE_FLIGHT_ENABLED", False)
+    monkeypatch.setitem(tts.API_CONFIG, tts.SELECTED_API_PROVIDER, {"api_key_getter": lambda: calls["api_key"]})
+    monkeypatch.setattr(tts, "fetch_single_ticker_quote", fetch_single_ticker_quote)
+    monkeypatch.setattr(qss, "fetch_company_info_dict", fetch_company_info_dict)
+    return calls
+
+
+def test_warm_snapshot_is_one_cache_round_trip(upstream):
+    quote = {"price": 100.0, "previous_close": 99.0, "change": 1.0, "change_percent": 1.01, "source": "eodhd"}
+    cache = _DictCache({qss._quote_key("AAPL"): quote, qss._profile_key("AAPL"): PROFILE})
+    basic = asyncio.run(qss.get_basic_snapshot("AAPL", None, cache))
+    assert cache.calls == ["get_many"]
+    assert upstream["realtime"] == [] and upstream["info"] == []
+    assert basic["current_price"] == 100.0 and basic["company_name"] == "Apple Inc." and basic["quote_source"] == "eodhd"
+
+
+def test_quote_miss_is_filled_from_one_realtime_request(upstream):
+    cache = _DictCache({qss._profile_key("AAPL"): PROFILE})
+    basic = asyncio.run(qss.get_basic_snapshot("AAPL", None, cache))
+    assert upstream["realtime"] == ["AAPL"] and upstream["info"] == []
+    assert basic["current_price"] == 101.0 and basic["previous_close"] == 100.0  # derived from the change
+    stored = cache.data[qss._quote_key("AAPL")]
+    assert stored["source"] == tts.SELECTED_API_PROVIDER.lower() and stored["day_high"] == 102.0
+
+
+def test_without_api_key_the_profile_fallback_quote_is_used(upstream):
+    upstream["api_key"] = None
+    cache = _DictCache()
+    basic = asyncio.run(qss.get_basic_snapshot("AAPL", None, cache))
+    assert upstream["realtime"] == [] and upstream["info"] == ["AAPL"]
+    assert basic["current_price"] == 190.0 and basic["change"] == 2.0 and basic["quote_source"] == "yfinance_info"
+    assert cache.data[qss._profile_key("AAPL")]["fallback_quote"]["price"] == 190.0
+    assert qss._quote_key("AAPL") not in cache.data  # fallback quotes are not cached as real-time snapshots
+
+
+def test_eodhd_quote_extras_skip_na_and_missing_fields():
+    extras = tts._extract_eodhd_quote_extras(
+        {"previousClose": "NA", "open": "nan", "high": "12.5", "low": None, "volume": "1200.0", "timestamp": 1714564800}
+    )
+    assert extras == {"day_high": 12.5, "volume": 1200, "timestamp": 1714564800}
+    assert tts._extract_eodhd_quote_extras({}) == {}
+
+
+def test_tape_quotes_are_stored_under_the_requested_symbol():
+    # fetch_ticker_quotes reports the symbol as requested (AAPL), not as sent to the provider (AAPL.US)
+    tape = [
+        {"symbol": "aapl", "price": 190.0, "change": 2.0, "change_percent": 1.06},
+        {"symbol": "OTP.BD", "price": 15000.0, "change": -50.0, "change_percent": -0.33},
+        {"symbol": "MSFT", "price": "NA"},
+    ]
+    cache = _DictCache()
+    stored = asyncio.run(qss.store_quote_snapshots(cache, tape, source="eodhd"))
+    assert stored == 2 and cache.calls == ["set_many"]
+    assert set(cache.data) == {"quote_snapshot:v1:AAPL", "quote_snapshot:v1:OTP.BD"}
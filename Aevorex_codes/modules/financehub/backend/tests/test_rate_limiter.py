@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from modules.financehub.backend.core.rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    LocalTokenBucketStore,
+    ProviderLimit,
+    ProviderRateLimiter,
+    RateLimitTimeout,
+    parse_retry_after,
+    provider_for_url,
+    request_priority,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_local_bucket_refills_at_rate():
+    async def scenario():
+        clock = _Clock()
+        store = LocalTokenBucketStore(clock=clock)
+        limit = ProviderLimit(rate_per_second=2.0, burst=2)
+        first = [await store.take("fmp", limit) for _ in range(3)]
+        clock.now = 0.5
+        refilled = await store.take("fmp", limit)
+        await store.block("fmp", 10)
+        blocked = await store.take("fmp", limit)
+        return first, refilled, blocked
+
+    first, refilled, blocked = asyncio.run(scenario())
+    assert first[:2] == [0.0, 0.0]
+    assert first[2] == pytest.approx(0.5)
+    assert refilled == 0.0
+    assert blocked == pytest.approx(10.0)
+
+
+def test_interactive_request_overtakes_queued_background_requests():
+    async def scenario():
+        limiter = ProviderRateLimiter({"alphavantage": ProviderLimit(rate_per_second=50.0, burst=1)})
+        order = []
+
+        async def request(name, priority):
+            await limiter.acquire("alphavantage", priority=priority)
+            order.append(name)
+
+        await limiter.acquire("alphavantage")  # consume the only token
+        background = [asyncio.create_task(request(f"bg{i}", PRIORITY_BACKGROUND)) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request("ui", PRIORITY_INTERACTIVE))
+        await asyncio.gather(*background, interactive)
+        return order
+
+    order = asyncio.run(scenario())
+    assert order.index("ui") <= 1
+    assert [name for name in order if name != "ui"] == ["bg0", "bg1", "bg2"]
+
+
+def test_acquire_times_out_and_unlimited_providers_pass():
+    async def scenario():
+        waits = []
+        limiter = ProviderRateLimiter(
+            {"newsapi": ProviderLimit(rate_per_second=0.1, burst=1)},
+            max_wait_seconds={PRIORITY_INTERACTIVE: 0.05, PRIORITY_BACKGROUND: 0.05},
+            on_wait=lambda provider, priority, outcome, seconds: waits.append((provider, priority, outcome)),
+        )
+        assert await limiter.acquire(None) == 0.0
+        assert await limiter.acquire("yahoo") == 0.0
+        await limiter.acquire("newsapi")
+        with request_priority(PRIORITY_BACKGROUND):
+            with pytest.raises(RateLimitTimeout):
+                await limiter.acquire("newsapi")
+        return waits, limiter.queue_depth("newsapi")
+
+    waits, depth = asyncio.run(scenario())
+    assert waits == [("newsapi", "interactive", "granted"), ("newsapi", "background", "timeout")]
+    assert depth == {"interactive": 0, "background": 0}
+
+
+def test_provider_for_url_and_retry_after_parsing():
+    assert provider_for_url("https://www.alphavantage.co/query") == "alphavantage"
+    assert provider_for_url("https://eodhd.com/api/news") == "eodhd"
+    assert provider_for_url("https://example.com/x") is None
+    now = datetime(2025, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after("Wed, 01 Jan 2025 12:00:30 GMT", now=now) == 30.0
+    assert parse_retry_after("soon") is None
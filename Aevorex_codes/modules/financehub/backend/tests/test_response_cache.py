@@ -0,0 +1,72 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from modules.financehub.backend.core.chat.response_cache import (
+    NO_DATA_VERSION,
+    ChatResponseCache,
+    normalize_question,
+)
+
+
+class _DictCache:
+    """Minimális aszinkron kulcs-érték tároló (a CacheService get_many/set/set_many felülete)."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    async def get_many(self, keys):
+        self.round_trips += 1
+        return {key: self.data.get(key) for key in keys}
+
+    async def set(self, key, value, timeout_seconds=None):
+        self.round_trips += 1
+        self.data[key] = value
+        return True
+
+    async def set_many(self, mapping, timeout_seconds=None):
+        self.round_trips += 1
+        self.data.update(mapping)
+        return True
+
+
+def _fresh_version(age_seconds=0):
+    return (datetime.now(timezone.utc) - timedelta(seconds=age_seconds)).strftime("%Y%m%dT%H%M%S")
+
+
+def test_normalize_question_ignores_order_filler_words_and_ticker():
+    assert normalize_question("Summary of AAPL?", "AAPL") == normalize_question("aapl summary", "AAPL") == "summary"
+    assert normalize_question("What is the RSI of AAPL.US", "AAPL.US") == "rsi"
+
+
+def test_exact_and_fuzzy_hits_are_scoped_to_version_and_variant():
+    async def scenario():
+        store = _DictCache()
+        cache = ChatResponseCache(store, fuzzy_threshold=0.75)
+        version = _fresh_version()
+        args = ("AAPL", "hybrid", "en", "rapid:m1", version)
+        assert await cache.set(*args, "why did apple shares drop after earnings", "Because...", 900)
+        assert store.round_trips == 2  # index read + one pipelined write of answer and index
+
+        exact = await cache.get(*args, "Why did Apple shares drop, after earnings?")
+        assert store.round_trips == 3  # entry and index fetched together
+        fuzzy = await cache.get(*args, "why did apple shares drop after the earnings report")
+        other_version = await cache.get("AAPL", "hybrid", "en", "rapid:m1", _fresh_version(60), "why did apple shares drop after earnings")
+        other_model = await cache.get("AAPL", "hybrid", "en", "rapid:m2", version, "why did apple shares drop after earnings")
+        unrelated = await cache.get(*args, "why did apple shares rise before the split")
+        return exact, fuzzy, other_version, other_model, unrelated
+
+    exact, fuzzy, other_version, other_model, unrelated = asyncio.run(scenario())
+    assert exact.answer == "Because..." and not exact.fuzzy
+    assert fuzzy.fuzzy and fuzzy.similarity >= 0.75
+    assert other_version is None and other_model is None and unrelated is None
+
+
+def test_ttl_follows_aggregate_freshness():
+    cache = ChatResponseCache(_DictCache(), min_ttl_seconds=30, no_data_ttl_seconds=120)
+    assert 890 <= cache.ttl_for(_fresh_version(), 900) <= 900
+    assert cache.ttl_for(_fresh_version(age_seconds=1000), 900) == 0
+    assert cache.ttl_for(NO_DATA_VERSION, 900) == 120
+
+    stored = asyncio.run(cache.set("AAPL", "summary", "en", "rapid:m1", _fresh_version(age_seconds=890), "summary", "x", 900))
+    assert stored is False
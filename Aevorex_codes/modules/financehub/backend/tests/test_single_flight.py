@@ -0,0 +1,86 @@
+import asyncio
+
+from modules.financehub.backend.core.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight("test")
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"rows": [1, 2, 3]}
+
+        results = await asyncio.gather(*(flight.do("AAPL", fetch) for _ in range(5)))
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert flight.stats() == {"in_flight": 0, "originated": 1, "coalesced": 4}
+    assert all(r == {"rows": [1, 2, 3]} for r in results)
+    # Waiters receive copies, so mutating one result does not leak into others
+    results[1]["rows"].append(4)
+    assert results[0]["rows"] == [1, 2, 3]
+
+
+def test_exception_propagates_to_all_waiters_and_key_is_released():
+    async def scenario():
+        flight = SingleFlight("test")
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream down")
+
+        outcomes = await asyncio.gather(*(flight.do("MSFT", failing) for _ in range(3)), return_exceptions=True)
+
+        async def ok():
+            return 42
+
+        return outcomes, await flight.do("MSFT", ok), flight
+
+    outcomes, retry_result, flight = asyncio.run(scenario())
+    assert all(isinstance(o, RuntimeError) for o in outcomes)
+    assert retry_result == 42
+    assert not flight.in_flight("MSFT")
+
+
+def test_metric_callback_receives_roles():
+    events = []
+
+    async def scenario():
+        flight = SingleFlight("test", on_call=lambda label, role: events.append((label, role)))
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return 1
+
+        await asyncio.gather(flight.do("K", fetch, label="yfinance_ohlcv"), flight.do("K", fetch, label="yfinance_ohlcv"))
+
+    asyncio.run(scenario())
+    assert events == [("yfinance_ohlcv", "originated"), ("yfinance_ohlcv", "coalesced")]
+
+
+def test_originator_mutation_does_not_leak_into_waiters():
+    async def scenario():
+        flight = SingleFlight("test")
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return {"rows": [1, 2, 3]}
+
+        async def originator():
+            result = await flight.do("AAPL", fetch)
+            result["rows"].append("MUTATED_BY_ORIGINATOR")  # runs before the waiters resume
+            return result
+
+        first = asyncio.create_task(originator())
+        await asyncio.sleep(0)
+        waiters = await asyncio.gather(*(flight.do("AAPL", fetch) for _ in range(2)))
+        return await first, waiters
+
+    mutated, waiters = asyncio.run(scenario())
+    assert mutated["rows"][-1] == "MUTATED_BY_ORIGINATOR"
+    assert waiters == [{"rows": [1, 2, 3]}, {"rows": [1, 2, 3]}]
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+import pytest
+
+from modules.financehub.backend.core.chat.sse_stream import SSEStreamError, iter_sse_deltas
+
+
+async def _lines(items):
+    for item in items:
+        yield item
+
+
+def _collect(lines):
+    async def run():
+        return [delta async for delta in iter_sse_deltas(_lines(lines))]
+
+    return asyncio.run(run())
+
+
+def _event(content):
+    return "data: " + json.dumps({"choices": [{"delta": {"content": content}}]})
+
+
+def test_deltas_are_yielded_in_order_and_stop_at_done():
+    lines = [
+        ": OPENROUTER PROCESSING",
+        "",
+        _event("Az "),
+        "",
+        _event("Apple"),
+        "",
+        "data: " + json.dumps({"choices": [{"delta": {"role": "assistant"}}]}),
+        "",
+        "data: [DONE]",
+        "",
+        _event("ignored"),
+        "",
+    ]
+    assert _collect(lines) == ["Az ", "Apple"]
+
+
+def test_unterminated_last_event_and_error_event():
+    assert _collect([_event("a"), "", _event("b")]) == ["a", "b"]
+    with pytest.raises(SSEStreamError):
+        _collect([_event("a"), "", 'data: {"error": {"message": "rate limited"}}', ""])
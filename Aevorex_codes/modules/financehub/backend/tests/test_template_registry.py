@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+pytest.importorskip("jinja2")
+
+from modules.financehub.backend.core.chat.template_registry import TemplateRegistry  # noqa: E402
+
+
+def _write(path, text, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_templates_are_compiled_once_and_hot_reloaded(tmp_path):
+    root = tmp_path / "templates"
+    _write(root / "rapid" / "summary_rapid.j2", "Summary for {{ ticker }}", mtime_ns=1_000_000_000)
+    _write(root / "deep" / "generic_deep.j2", "Deep {{ question }}", mtime_ns=1_000_000_000)
+    registry = TemplateRegistry(root, bytecode_cache_dir=tmp_path / "bytecode")
+
+    assert registry.load_all() == 2
+    assert registry.names() == ["deep/generic_deep.j2", "rapid/summary_rapid.j2"]
+    compiled = registry.get("rapid/summary_rapid.j2")
+    assert registry.render("rapid/summary_rapid.j2", ticker="AAPL") == "Summary for AAPL"
+    assert registry.refresh() == ([], [])
+    assert registry.get("rapid/summary_rapid.j2") is compiled
+
+    _write(root / "rapid" / "summary_rapid.j2", "Updated {{ ticker }}", mtime_ns=2_000_000_000)
+    (root / "deep" / "generic_deep.j2").unlink()
+    _write(root / "rapid" / "news_rapid.j2", "News", mtime_ns=2_000_000_000)
+
+    reloaded, removed = registry.refresh()
+    assert sorted(reloaded) == ["rapid/news_rapid.j2", "rapid/summary_rapid.j2"]
+    assert removed == ["deep/generic_deep.j2"]
+    assert registry.render("rapid/summary_rapid.j2", ticker="MSFT") == "Updated MSFT"
+    assert registry.render("deep/generic_deep.j2") is None
+
+
+def test_broken_edit_keeps_previous_version(tmp_path):
+    root = tmp_path / "templates"
+    _write(root / "rapid" / "indicator_rapid.j2", "RSI {{ ticker }}", mtime_ns=1_000_000_000)
+    registry = TemplateRegistry(root)
+    registry.load_all()
+
+    _write(root / "rapid" / "indicator_rapid.j2", "RSI {{ ticker ", mtime_ns=2_000_000_000)
+    assert registry.refresh() == ([], [])
+    assert registry.render("rapid/indicator_rapid.j2", ticker="AAPL") == "RSI AAPL"
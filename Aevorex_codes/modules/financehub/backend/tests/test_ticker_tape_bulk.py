@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+import pytest
+
+try:
+    from modules.financehub.backend.config import settings
+    from modules.financehub.backend.core import ticker_tape_service as tts
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+SYMBOLS = ["AAPL", "MSFT", "OTP.BD", "NVDA", "TSLA"]
+
+
+def _row(code):
+    return {"code": code, "close": 100.0, "change": 1.5, "change_p": 1.52, "previousClose": 98.5, "volume": 1000}
+
+
+class _Provider:
+    """EODHD real-time stand-in: bulk requests answer every symbol except `withheld` (or fail with `bulk_status`)."""
+
+    def __init__(self, withheld=(), bulk_status=None):
+        self.withheld = set(withheld)
+        self.bulk_status = bulk_status
+        self.bulk_requests, self.single_requests = [], []
+
+    def __call__(self, request):
+        first = request.url.path.rsplit("/", 1)[-1]
+        extra = request.url.params.get("s")
+        if extra is None:
+            self.single_requests.append(first)
+            return httpx.Response(200, json=_row(first))
+        requested = [first] + extra.split(",")
+        self.bulk_requests.append(requested)
+        if self.bulk_status == "network":
+            raise httpx.ConnectError("connection refused", request=request)
+        if self.bulk_status == "invalid_json":
+            return httpx.Response(200, text="<html>maintenance</html>")
+        if self.bulk_status is not None:
+            return httpx.Response(self.bulk_status, headers={"Retry-After": "7"}, text="error")
+        return httpx.Response(200, json=[_row(code) for code in requested if code not in self.withheld])
+
+
+class _RecordingLimiter:
+    def __init__(self):
+        self.acquired, self.blocked = [], []
+
+    async def acquire(self, provider, priority=None, max_wait=None):
+        self.acquired.append(provider)
+        return 0.0
+
+    async def note_retry_after(self, provider, seconds):
+        self.blocked.append((provider, seconds))
+
+
+@pytest.fixture()
+def eodhd_config(monkeypatch):
+    monkeypatch.setattr(settings.TICKER_TAPE, "BULK_ENABLED", True)
+    monkeypatch.setattr(settings.TICKER_TAPE, "BULK_CHUNK_SIZE", 3)
+    monkeypatch.setattr(settings.RATE_LIMIT, "ENABLED", False)
+    return {**tts.API_CONFIG["EODHD"], "api_key_getter": lambda: "test-key"}
+
+
+def _fetch(provider, config):
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(provider)) as client:
+            return await tts.fetch_ticker_quotes(SYMBOLS, client, config)
+
+    return asyncio.run(scenario())
+
+
+def test_full_bulk_hit_needs_no_single_requests(eodhd_config):
+    provider = _Provider()
+    quotes = _fetch(provider, eodhd_config)
+    assert provider.bulk_requests == [["AAPL.US", "MSFT.US", "OTP.BD"], ["NVDA.US", "TSLA.US"]]
+    assert provider.single_requests == []
+    assert [q["symbol"] for q in quotes] == SYMBOLS
+    assert quotes[0]["price"] == 100.0 and quotes[0]["previous_close"] == 98.5
+
+
+def test_partial_bulk_response_falls_back_per_symbol_in_order(eodhd_config):
+    provider = _Provider(withheld={"MSFT.US", "TSLA.US"})
+    quotes = _fetch(provider, eodhd_config)
+    assert sorted(provider.single_requests) == ["MSFT.US", "TSLA.US"]
+    assert [q["symbol"] for q in quotes] == SYMBOLS  # original order preserved
+
+
+def test_rate_limited_chunk_is_retried_per_symbol_through_the_limiter(eodhd_config, monkeypatch):
+    monkeypatch.setattr(settings.RATE_LIMIT, "ENABLED", True)
+    limiter = _RecordingLimiter()
+    monkeypatch.setattr(tts, "FETCH_RATE_LIMITER", limiter)
+    provider = _Provider(bulk_status=429)
+    quotes = _fetch(provider, eodhd_config)
+    assert ("eodhd", 7.0) in limiter.blocked  # Retry-After blocks the shared bucket
+    assert sorted(provider.single_requests) == sorted(["AAPL.US", "MSFT.US", "OTP.BD", "NVDA.US", "TSLA.US"])
+    assert limiter.acquired.count("eodhd") == 2 + len(SYMBOLS)  # every request waits for a token
+    assert [q["symbol"] for q in quotes] == SYMBOLS
+
+
+@pytest.mark.parametrize("bulk_status", [503, "network", "invalid_json"])
+def test_failed_bulk_chunk_is_not_fanned_out_to_single_requests(eodhd_config, bulk_status):
+    provider = _Provider(bulk_status=bulk_status)
+    quotes = _fetch(provider, eodhd_config)
+    assert len(provider.bulk_requests) == 2
+    assert provider.single_requests == []  # the failing provider gets no per-symbol retries
+    assert quotes == [None] * len(SYMBOLS)
+
+
+def test_client_error_on_bulk_falls_back_per_symbol(eodhd_config):
+    provider = _Provider(bulk_status=400)
+    quotes = _fetch(provider, eodhd_config)
+    assert len(provider.single_requests) == len(SYMBOLS)
+    assert [q["symbol"] for q in quotes] == SYMBOLS
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("pandas")
+
+from modules.financehub.backend.utils import timestamps  # noqa: E402
+from modules.financehub.backend.utils.timestamps import (  # noqa: E402
+    detect_timestamp_format,
+    normalize_timestamp_field,
+    parse_known_timestamp,
+    parse_timestamps,
+)
+
+EXPECTED_MS = 1714566600000  # 2024-05-01T12:30:00Z
+
+
+# -----------------------------------------------------------------------------
+# Scalar fast path
+# -----------------------------------------------------------------------------
+@pytest.mark.parametrize("text", [
+    "2024-05-01T12:30:00.000000Z",   # MarketAux
+    "2024-05-01T12:30:00Z",          # NewsAPI
+    "2024-05-01T14:30:00+02:00",     # EODHD
+    "2024-05-01 12:30:00",           # FMP
+    "20240501T123000",               # Alpha Vantage
+    "Wed, 01 May 2024 12:30:00 +0000",
+])
+def test_known_provider_formats_parse_to_utc(text):
+    assert parse_known_timestamp(text) == datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+
+
+def test_unknown_format_is_left_to_the_slow_path():
+    assert detect_timestamp_format("May 1, 2024 12:30 PM") is None
+    assert parse_known_timestamp("garbage") is None
+
+
+def test_invalid_value_does_not_poison_its_shape(monkeypatch):
+    monkeypatch.setattr(timestamps, "_FORMAT_BY_SHAPE", {})
+    # same digit shape as a valid FMP timestamp, but month 13 fails every format
+    assert parse_known_timestamp("2031-13-45 12:30:00") is None
+    assert parse_known_timestamp("2031-05-01 12:30:00") == datetime(2031, 5, 1, 12, 30, tzinfo=timezone.utc)
+    # shapes no known format could ever match are still memoized as misses
+    assert detect_timestamp_format("n/a") is None
+    assert timestamps._FORMAT_BY_SHAPE == {"9999-99-99 99:99:99": "%Y-%m-%d %H:%M:%S", "n/a": None}
+
+
+# -----------------------------------------------------------------------------
+# Batch stage
+# -----------------------------------------------------------------------------
+def test_batch_parse_handles_mixed_inputs():
+    values = [
+        "2024-05-01 12:30:00", 1714566600, EXPECTED_MS, datetime(2024, 5, 1, 12, 30),
+        "May 1, 2024 12:30 PM", None, "garbage", "1980-01-01",
+    ]
+    index = parse_timestamps(values)
+    assert [ts.value // 1_000_000 for ts in index[:5]] == [EXPECTED_MS] * 5
+    assert index[5:].isna().all()
+
+
+def test_normalize_field_writes_iso_and_epoch():
+    records = [{"published": "2024-05-01T14:30:00+02:00"}, {"published": "n/a"}]
+    failed = normalize_timestamp_field(records, "published", iso_key="published_utc", epoch_key="published_ts")
+    assert failed == 1
+    assert records[0]["published_utc"] == "2024-05-01T12:30:00.000Z"
+    assert records[0]["published_ts"] == EXPECTED_MS
+    assert records[1]["published_utc"] is None and records[1]["published_ts"] is None
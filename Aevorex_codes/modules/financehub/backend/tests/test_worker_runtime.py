@@ -0,0 +1,51 @@
+import asyncio
+
+from modules.financehub.backend.core.worker_runtime import WorkerAsyncRuntime
+
+
+def test_runtime_reuses_loop_and_resources_across_tasks():
+    created, closed = [], []
+
+    async def factory():
+        created.append(asyncio.get_running_loop())
+        return {"pool": object()}
+
+    async def closer(resources):
+        closed.append(resources)
+
+    async def task(resources):
+        await asyncio.sleep(0)
+        return asyncio.get_running_loop(), resources["pool"]
+
+    runtime = WorkerAsyncRuntime(resource_factory=factory, resource_closer=closer)
+    assert runtime.warm_up(timeout=5)
+    first_loop, first_pool = runtime.run(task, timeout=5)
+    second_loop, second_pool = runtime.run(task, timeout=5)
+    runtime.shutdown()
+
+    assert first_loop is second_loop is created[0]
+    assert first_pool is second_pool
+    assert len(created) == 1 and len(closed) == 1
+    assert not runtime.running
+
+
+def test_failed_resource_init_is_retried_by_next_task():
+    attempts = []
+
+    async def flaky_factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("redis down")
+        return "resources"
+
+    async def closer(resources):
+        pass
+
+    async def task(resources):
+        return resources
+
+    runtime = WorkerAsyncRuntime(resource_factory=flaky_factory, resource_closer=closer)
+    assert runtime.warm_up(timeout=5) is False
+    assert runtime.run(task, timeout=5) == "resources"
+    runtime.shutdown()
+    assert len(attempts) == 2
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pandas")
+
+try:
+    from modules.financehub.backend.core.fetchers import yfinance as yf_fetcher
+except (ImportError, RuntimeError) as exc:  # config.py needs the full settings environment
+    pytest.skip(f"backend config unavailable: {exc}", allow_module_level=True)
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class HTTPError(Exception):
+    """Mimics requests.HTTPError: carries the response."""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.response = _Response(status_code)
+
+
+class ReadTimeout(Exception):
+    """Same class name as requests.exceptions.ReadTimeout."""
+
+
+def _wrapper(exc=None, result=None):
+    """Shaped like the _get_yf_*_sync wrappers: swallow the error, report it, return None."""
+
+    def call():
+        if exc is None:
+            return result
+        try:
+            raise exc
+        except Exception as e:
+            yf_fetcher._note_yf_exception(e)
+            return None
+
+    return call
+
+
+@pytest.mark.parametrize("sync_func, expected_success", [
+    (_wrapper(result=None), True),                    # unknown ticker / no data
+    (_wrapper(result={"symbol": "AAPL"}), True),
+    (_wrapper(exc=HTTPError(404)), True),             # like 404 in make_api_request
+    (_wrapper(exc=KeyError("regularMarketPrice")), True),
+    (_wrapper(exc=HTTPError(503)), False),
+    (_wrapper(exc=HTTPError(429)), False),
+    (_wrapper(exc=ReadTimeout("read timed out")), False),
+    (_wrapper(exc=ConnectionResetError()), False),
+])
+def test_only_transport_failures_count_against_the_breaker(monkeypatch, sync_func, expected_success):
+    recorded = []
+
+    async def record(provider, success, latency):
+        recorded.append((provider, success))
+
+    monkeypatch.setattr(yf_fetcher, "record_provider_call", record)
+    asyncio.run(yf_fetcher._yf_to_thread(sync_func))
+    assert recorded == [("yfinance", expected_success)]
@@ -39,6 +39,8 @@ except ImportError:
     package_logger = logging.getLogger(f"aevorex_finbot.helpers_fallback.{__name__}") # Egyedi név a fallbacknek is
     package_logger.warning(f"Could not import get_logger from logger_config. Using fallback basicConfig logger for helpers module ({__name__}).")
 
+from modules.financehub.backend.utils.timestamps import parse_known_timestamp # Memoizált gyors út ismert időbélyeg-formátumokra
+
 # --- Modul Szintű Konstansok ---
 
 # Minimális elfogadható Unix timestamp (másodpercben), az 1990-01-01 00:00:00 UTC időpont alapján.
@@ -236,21 +238,24 @@ def parse_string_to_aware_datetime(
 
         elif isinstance(cleaned_value, str):
             # package_logger.debug(f"{log_prefix}parse_string_to_aware_datetime: Attempting to parse string: '{cleaned_value}'")
-            parsed_from_string = False
-            # 1. Próba: pd.to_datetime (robusztus)
-            try:
-                # infer_datetime_format=True gyorsíthat, dayfirst=False a gyakoribb formátumokhoz
-                # utc=True biztosítja, hogy ha naiv string, akkor UTC-ként értelmeződjön, és az eredmény UTC aware legyen.
-                pd_ts = pd.to_datetime(cleaned_value, errors='coerce', utc=True, infer_datetime_format=True, dayfirst=False)
-                if pd.isna(pd_ts): # NaT (Not a Time)
-                    package_logger.debug(f"{log_prefix}parse_string_to_aware_datetime: pd.to_datetime returned NaT for string: '{cleaned_value}'. Trying specific formats.")
-                else:
-                    dt_object = pd_ts.to_pydatetime() # Python datetime objektummá
-                    # Mivel utc=True, dt_object.tzinfo már timezone.utc (vagy ekvivalens)
-                    parsed_from_string = True
-                    package_logger.debug(f"{log_prefix}parse_string_to_aware_datetime: Parsed string '{cleaned_value}' using pd.to_datetime to UTC: {dt_object}")
-            except Exception as pd_err:
-                package_logger.debug(f"{log_prefix}parse_string_to_aware_datetime: pd.to_datetime failed for '{cleaned_value}': {pd_err}. Trying specific formats.")
+            # 0. Gyors út: ismert szolgáltatói formátum (alakonként memoizált strptime)
+            dt_object = parse_known_timestamp(cleaned_value)
+            parsed_from_string = dt_object is not None
+            # 1. Próba: pd.to_datetime (robusztus, de skalárra lassú)
+            if not parsed_from_string:
+                try:
+                    # dayfirst=False a gyakoribb formátumokhoz; az infer_datetime_format pandas 2 alatt elavult (és minden hívásnál figyelmeztet)
+                    # utc=True biztosítja, hogy ha naiv string, akkor UTC-ként értelmeződjön, és az eredmény UTC aware legyen.
+                    pd_ts = pd.to_datetime(cleaned_value, errors='coerce', utc=True, dayfirst=False)
+                    if pd.isna(pd_ts): # NaT (Not a Time)
+                        package_logger.debug(f"{log_prefix}parse_string_to_aware_datetime: pd.to_datetime returned NaT for string: '{cleaned_value}'. Trying specific formats.")
+                    else:
+                        dt_object = pd_ts.to_pydatetime() # Python datetime objektummá
+                        # Mivel utc=True, dt_object.tzinfo már timezone.utc (vagy ekvivalens)
+                        parsed_from_string = True
+                        package_logger.debug(f"{log_prefix}parse_string_to_aware_datetime: Parsed string '{cleaned_value}' using pd.to_datetime to UTC: {dt_object}")
+                except Exception as pd_err:
+                    package_logger.debug(f"{log_prefix}parse_string_to_aware_datetime: pd.to_datetime failed for '{cleaned_value}': {pd_err}. Trying specific formats.")
 
             if not parsed_from_string:
                 # 2. Próba: datetime.fromisoformat (Python 3.7+)
@@ -0,0 +1,233 @@
+# backend/utils/timestamps.py
+"""
+Gyors időbélyeg-feldolgozás ismert szolgáltatói formátumokra, egyenként és kötegben.
+
+A `parse_string_to_aware_datetime` eddig minden egyes stringre skalár
+`pd.to_datetime` hívást végzett (formátum-kitalálással), ami a hír- és
+fundamentum-mapperek egyik fő költsége volt. Itt:
+
+    - a string "alakja" (számjegyek -> '9') alapján memoizáljuk, melyik ismert
+      `strptime` formátum illik rá, így egy adott szolgáltató minden további
+      időbélyege egyetlen `datetime.strptime` hívás (negatív eredményt csak
+      olyan alakra jegyzünk meg, amelyre szerkezetileg egyik formátum sem illhet);
+    - a `parse_timestamps()` egy teljes listát formátum-csoportonként egyetlen
+      vektorizált `pd.to_datetime(format=...)` hívással dolgoz fel;
+    - a `normalize_timestamp_field()` rekordlistákra ISO stringet és epoch
+      (ms) egészet is ír, így a rendezés soha nem parse-ol újra.
+
+A modul tisztán pandas/NumPy alapú, I/O-mentes; az ismeretlen formátumok
+kezelése a hívó (lassú, általános) útjára marad.
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, MutableMapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Minimális elfogadható időpont (1990-01-01 UTC), mint a helpers modulban
+MIN_VALID_EPOCH_SECONDS = 631152000
+
+# Ismert szolgáltatói formátumok, a próbálkozás sorrendjében
+KNOWN_TIMESTAMP_FORMATS: Tuple[str, ...] = (
+    "%Y-%m-%dT%H:%M:%S.%fZ",      # MarketAux, saját ISO kimenet
+    "%Y-%m-%dT%H:%M:%SZ",         # NewsAPI
+    "%Y-%m-%dT%H:%M:%S%z",        # EODHD
+    "%Y-%m-%dT%H:%M:%S.%f%z",
+    "%Y-%m-%d %H:%M:%S",          # FMP
+    "%Y-%m-%d %H:%M:%S%z",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y%m%dT%H%M%S",              # Alpha Vantage
+    "%Y%m%dT%H%M",
+    "%Y-%m-%d",                   # fundamentumok dátumai
+    "%a, %d %b %Y %H:%M:%S %z",   # RSS
+    "%a, %d %b %Y %H:%M:%S GMT",
+)
+
+_SHAPE_TABLE = str.maketrans("0123456789", "9999999999")
+_MAX_MEMO_SHAPES = 512
+_FORMAT_BY_SHAPE: Dict[str, Optional[str]] = {}
+# Ennél nagyobb numerikus időbélyegek ezredmásodpercben vannak megadva
+_EPOCH_MS_THRESHOLD = 100_000_000_000
+
+# strptime direktívák alak-szintű (bővebb) mintái: ha egy alakra egyik formátum
+# mintája sem illik, akkor semmilyen azonos alakú érték sem parse-olható
+_SHAPE_DIRECTIVE_PATTERNS: Dict[str, str] = {
+    "Y": "9999",
+    "m": " ?9{1,2}", "d": " ?9{1,2}", "H": " ?9{1,2}", "M": " ?9{1,2}", "S": " ?9{1,2}",
+    "f": "9{1,6}",
+    "z": r"(?:[+-]99:?99(?::?99(?:\.9{1,6})?)?|z)",
+    "a": "[a-z]+", "b": "[a-z]+",
+}
+
+
+def _shape_pattern(fmt: str) -> "re.Pattern[str]":
+    parts: List[str] = []
+    pos = 0
+    while pos < len(fmt):
+        char = fmt[pos]
+        if char == "%" and pos + 1 < len(fmt):
+            parts.append(_SHAPE_DIRECTIVE_PATTERNS[fmt[pos + 1]])
+            pos += 2
+            continue
+        parts.append(r"\s+" if char.isspace() else re.escape(char))
+        pos += 1
+    return re.compile("".join(parts), re.IGNORECASE)
+
+
+_SHAPE_PATTERNS: Tuple["re.Pattern[str]", ...] = tuple(_shape_pattern(fmt) for fmt in KNOWN_TIMESTAMP_FORMATS)
+
+
+def _shape(text: str) -> str:
+    return text.translate(_SHAPE_TABLE)
+
+
+def detect_timestamp_format(text: str) -> Optional[str]:
+    """
+    Az ismert formátumok közül az első, amelyre a string illeszkedik (alakonként memoizálva).
+
+    A sikeres találat az alakra memoizálódik. Ha egyik formátum sem illik, az
+    eredmény csak akkor kerül a memóba, ha az alak szerkezetileg sem illhet
+    egyikre sem; egy érvénytelen érték (pl. "2024-13-45") így nem "mérgezi"
+    az azonos alakú érvényes értékeket.
+    """
+    shape = _shape(text)
+    try:
+        return _FORMAT_BY_SHAPE[shape]
+    except KeyError:
+        pass
+    detected: Optional[str] = None
+    for fmt in KNOWN_TIMESTAMP_FORMATS:
+        try:
+            datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        detected = fmt
+        break
+    if detected is None and any(pattern.fullmatch(shape) for pattern in _SHAPE_PATTERNS):
+        return None
+    if len(_FORMAT_BY_SHAPE) >= _MAX_MEMO_SHAPES:
+        _FORMAT_BY_SHAPE.clear()
+    _FORMAT_BY_SHAPE[shape] = detected
+    return detected
+
+
+def parse_known_timestamp(text: str) -> Optional[datetime]:
+    """
+    UTC "aware" datetime egy ismert formátumú stringből, különben None
+    (ismeretlen formátum vagy érvénytelen érték; ilyenkor a hívó lassú útja dönt).
+    """
+    fmt = detect_timestamp_format(text)
+    if fmt is None:
+        return None
+    try:
+        parsed = datetime.strptime(text, fmt)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _coerce_group(values: Sequence[Any], fmt: Optional[str]) -> pd.DatetimeIndex:
+    if fmt is not None:
+        return pd.DatetimeIndex(pd.to_datetime(list(values), format=fmt, utc=True, errors="coerce"))
+    try:
+        return pd.DatetimeIndex(pd.to_datetime(list(values), format="mixed", utc=True, errors="coerce"))
+    except (TypeError, ValueError):
+        return pd.DatetimeIndex([pd.to_datetime(v, utc=True, errors="coerce") for v in values])
+
+
+def parse_timestamps(values: Sequence[Any]) -> pd.DatetimeIndex:
+    """
+    Időbélyeg-lista kötegelt feldolgozása UTC DatetimeIndex-szé (hibás / hiányzó: NaT).
+
+    Stringek formátum-csoportonként egy vektorizált hívással, számok unix
+    másodpercként (vagy ezredmásodpercként, ha nagyok), datetime/Timestamp
+    értékek közvetlenül. Az 1990 előtti időpontok NaT-ok lesznek.
+    """
+    count = len(values)
+    result = np.full(count, np.datetime64("NaT", "ns"), dtype="datetime64[ns]")
+    string_groups: Dict[Optional[str], List[int]] = {}
+    numeric_positions: List[int] = []
+    numeric_values: List[float] = []
+    direct_positions: List[int] = []
+
+    for pos, value in enumerate(values):
+        if value is None or isinstance(value, bool):
+            continue
+        if isinstance(value, str):
+            text = value.strip()
+            if text:
+                string_groups.setdefault(detect_timestamp_format(text), []).append(pos)
+        elif isinstance(value, (int, float, np.integer, np.floating)):
+            if np.isfinite(value):
+                numeric_positions.append(pos)
+                numeric_values.append(float(value))
+        elif isinstance(value, (datetime, pd.Timestamp, np.datetime64)):
+            direct_positions.append(pos)
+
+    for fmt, positions in string_groups.items():
+        parsed = _coerce_group([values[pos].strip() for pos in positions], fmt)
+        result[positions] = parsed.tz_convert("UTC").tz_localize(None).values
+
+    if numeric_positions:
+        numbers = np.asarray(numeric_values)
+        seconds = np.where(np.abs(numbers) >= _EPOCH_MS_THRESHOLD, numbers / 1000.0, numbers)
+        result[numeric_positions] = pd.to_datetime(seconds, unit="s", errors="coerce").values
+
+    if direct_positions:
+        parsed = pd.DatetimeIndex([pd.Timestamp(values[pos]) for pos in direct_positions])
+        # Naiv értékek UTC-ként értelmezve (mint a skalár útnál)
+        parsed = parsed.tz_localize("UTC") if parsed.tz is None else parsed.tz_convert("UTC")
+        result[direct_positions] = parsed.tz_localize(None).values
+
+    index = pd.DatetimeIndex(result).tz_localize("UTC")
+    too_old = index.asi8 < MIN_VALID_EPOCH_SECONDS * 1_000_000_000
+    if too_old.any():
+        index = index.where(~too_old)
+    return index
+
+
+def iso_utc_strings(index: pd.DatetimeIndex) -> List[Optional[str]]:
+    """`YYYY-MM-DDTHH:MM:SS.sssZ` stringek (a `parse_timestamp_to_iso_utc` kimeneti alakja), NaT -> None."""
+    naive = index.tz_convert("UTC").tz_localize(None) if index.tz is not None else index
+    strings = np.datetime_as_string(naive.values.astype("datetime64[ms]"), unit="ms")
+    return [None if text == "NaT" else f"{text}Z" for text in strings.tolist()]
+
+
+def epoch_ms_values(index: pd.DatetimeIndex) -> List[Optional[int]]:
+    """Unix ezredmásodpercek, NaT -> None."""
+    missing = index.isna()
+    values = (index.asi8 // 1_000_000).tolist()
+    if missing.any():
+        for pos in np.flatnonzero(missing):
+            values[pos] = None
+    return values
+
+
+def normalize_timestamp_field(
+    records: Sequence[MutableMapping[str, Any]],
+    source_key: str,
+    *,
+    iso_key: Optional[str] = None,
+    epoch_key: Optional[str] = None,
+) -> int:
+    """
+    Kötegelt dátum-normalizálás rekordlistán: a `source_key` értékeit egyszer
+    feldolgozza, és (ha meg van adva) ISO stringet ír `iso_key`-be, epoch ms
+    egészet `epoch_key`-be. Visszaadja a sikertelenül feldolgozott értékek számát.
+    """
+    if not records:
+        return 0
+    index = parse_timestamps([record.get(source_key) for record in records])
+    iso_values = iso_utc_strings(index) if iso_key else None
+    epoch_values = epoch_ms_values(index) if epoch_key else None
+    for pos, record in enumerate(records):
+        if iso_values is not None:
+            record[iso_key] = iso_values[pos]
+        if epoch_values is not None:
+            record[epoch_key] = epoch_values[pos]
+    return int(index.isna().sum())
@@ -0,0 +1,198 @@
+# modules/shared/http_pool.py
+"""
+Upstream-enkénti, tartós (pooled) httpx kliensek az LLM és egyéb külső hívásokhoz.
+
+Korábban több hívó (pl. a FinanceHub RapidRenderer) minden kérésnél új
+`httpx.AsyncClient(http2=True)`-et nyitott, így minden üzenet kifizette a
+TCP + TLS + HTTP/2 felépítést. Itt upstreamenként (pl. "openrouter") egyetlen
+hosszú életű kliens van, konfigurálható keep-alive-val és kapcsolat-limitekkel;
+induláskor opcionálisan "bemelegíthető" (egy könnyű kérés felépíti a kapcsolatot).
+
+A kapcsolat-újrahasznosítás mérése a httpcore `trace` kiterjesztésével
+történik: ha egy kérés alatt nem épült új TCP kapcsolat, a kérés újrahasznált
+kapcsolaton ment ki. A számlálók a `stats()`-ból olvashatók, és egy opcionális
+`on_request(upstream, reused)` callback (pl. Prometheus) is megkapja őket.
+
+A modul független az egyes hub-ok konfigurációjától; a beállításokat a hívók
+(`UpstreamConfig`) adják át. A HTTP/2-höz a `h2` csomag kell (`httpx[http2]`);
+ha nincs telepítve, a kliensek HTTP/1.1-re esnek vissza.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import httpx
+
+try:
+    import h2  # noqa: F401 – a httpx HTTP/2 támogatásához (`httpx[http2]`)
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover – környezetfüggő
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_UPSTREAM = "openrouter"
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# httpcore trace esemény, amely új kapcsolat felépítését jelzi
+_NEW_CONNECTION_EVENT = "connection.connect_tcp.complete"
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    """Egy upstream kliensének beállításai."""
+
+    base_url: str
+    timeout_seconds: float = 30.0
+    connect_timeout_seconds: float = 10.0
+    pool_timeout_seconds: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry_seconds: float = 120.0
+    http2: bool = True
+    headers: Mapping[str, str] = field(default_factory=dict)
+    # Relatív út a bemelegítő kérésnek (None: nincs bemelegítés)
+    warmup_path: Optional[str] = None
+
+
+DEFAULT_UPSTREAMS: Dict[str, UpstreamConfig] = {
+    OPENROUTER_UPSTREAM: UpstreamConfig(base_url=OPENROUTER_BASE_URL, warmup_path="/models"),
+}
+
+
+class _ConnectionTrace:
+    """httpcore trace callback: jelzi, ha a kérés új kapcsolatot nyitott."""
+
+    __slots__ = ("new_connection",)
+
+    def __init__(self) -> None:
+        self.new_connection = False
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == _NEW_CONNECTION_EVENT:
+            self.new_connection = True
+
+
+class UpstreamClientPool:
+    """
+    Upstream név -> tartós `httpx.AsyncClient`, lusta létrehozással.
+
+    Args:
+        on_request: Opcionális callback `(upstream, reused)` minden befejezett kéréshez (metrikákhoz).
+    """
+
+    def __init__(self, on_request: Optional[Callable[[str, bool], None]] = None) -> None:
+        self._configs: Dict[str, UpstreamConfig] = dict(DEFAULT_UPSTREAMS)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self.on_request = on_request
+
+    # ------------------------------------------------------------------
+    # Konfiguráció és kliensek
+    # ------------------------------------------------------------------
+    def configure(self, upstream: str, config: UpstreamConfig) -> None:
+        """Upstream (újra)konfigurálása; egy már létező, eltérő beállítású kliens a következő `client()` híváskor cserélődik."""
+        if self._configs.get(upstream) == config:
+            return
+        self._configs[upstream] = config
+        stale = self._clients.pop(upstream, None)
+        if stale is not None:
+            self._close_later(stale)
+
+    def client(self, upstream: str) -> httpx.AsyncClient:
+        """Az upstream tartós kliense (első híváskor jön létre). Ismeretlen upstream: KeyError."""
+        existing = self._clients.get(upstream)
+        if existing is not None and not existing.is_closed:
+            return existing
+        config = self._configs[upstream]
+        http2 = config.http2 and HTTP2_AVAILABLE
+        if config.http2 and not http2:
+            logger.warning("HTTP/2 requested for upstream '%s' but the 'h2' package is not installed; using HTTP/1.1.", upstream)
+        self._clients[upstream] = self._build_client(upstream, config, http2)
+        logger.info(
+            "Pooled HTTP client created for upstream '%s' (http2=%s, max_connections=%d, keepalive=%d, expiry=%.0fs).",
+            upstream, http2, config.max_connections, config.max_keepalive_connections, config.keepalive_expiry_seconds,
+        )
+        return self._clients[upstream]
+
+    def _build_client(self, upstream: str, config: UpstreamConfig, http2: bool) -> httpx.AsyncClient:
+        async def attach_trace(request: httpx.Request) -> None:
+            request.extensions["trace"] = _ConnectionTrace()
+
+        async def record_reuse(response: httpx.Response) -> None:
+            trace = response.request.extensions.get("trace")
+            if isinstance(trace, _ConnectionTrace):
+                self._record(upstream, reused=not trace.new_connection)
+
+        return httpx.AsyncClient(
+            base_url=config.base_url,
+            http2=http2,
+            headers=dict(config.headers),
+            timeout=httpx.Timeout(
+                config.timeout_seconds, connect=config.connect_timeout_seconds, pool=config.pool_timeout_seconds
+            ),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry_seconds,
+            ),
+            event_hooks={"request": [attach_trace], "response": [record_reuse]},
+        )
+
+    # ------------------------------------------------------------------
+    # Bemelegítés, statisztika, lezárás
+    # ------------------------------------------------------------------
+    async def warm_up(self, upstream: str) -> bool:
+        """Egy könnyű kérés a `warmup_path`-ra, hogy a TLS/HTTP2 kapcsolat már álljon az első valódi hívásnál."""
+        config = self._configs.get(upstream)
+        if config is None or not config.warmup_path:
+            return False
+        try:
+            response = await self.client(upstream).get(config.warmup_path)
+            logger.info("Upstream '%s' warmed up (status %d).", upstream, response.status_code)
+            return True
+        except httpx.HTTPError as exc:
+            logger.warning("Upstream '%s' warm-up failed: %s", upstream, exc)
+            return False
+
+    def _record(self, upstream: str, *, reused: bool) -> None:
+        stats = self._stats.setdefault(upstream, {"requests": 0, "new_connections": 0, "reused": 0})
+        stats["requests"] += 1
+        stats["reused" if reused else "new_connections"] += 1
+        if self.on_request is not None:
+            try:
+                self.on_request(upstream, reused)
+            except Exception:  # pragma: no cover – a metrika opcionális
+                logger.debug("HTTP pool on_request callback failed.", exc_info=True)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {upstream: dict(values) for upstream, values in self._stats.items()}
+
+    def _close_later(self, client: httpx.AsyncClient) -> None:
+        try:
+            asyncio.get_running_loop().create_task(client.aclose())
+        except RuntimeError:
+            # Nincs futó event loop: a kliens a GC-vel záródik
+            pass
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for upstream, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as exc:  # pragma: no cover
+                logger.warning("Error closing pooled HTTP client for '%s': %s", upstream, exc)
+
+
+_POOL: Optional[UpstreamClientPool] = None
+
+
+def get_upstream_pool() -> UpstreamClientPool:
+    """Folyamatszintű közös pool (singleton)."""
+    global _POOL
+    if _POOL is None:
+        _POOL = UpstreamClientPool()
+    return _POOL